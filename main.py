@@ -5,6 +5,7 @@ Sleep Scoring Application - Main Entry Point.
 Allows running as: python main.py.
 """
 
+import multiprocessing
 import sys
 
 import pyqtgraph as pg
@@ -88,4 +89,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Required for import worker processes in frozen builds
+    multiprocessing.freeze_support()
     main()
@@ -1,28 +1,20 @@
 """Command-line interface for sleep scoring algorithms.
 
-Future Feature: CLI interface for running sleep scoring algorithms from the command line.
-This module is a placeholder for future development.
+Headless batch processing with no PyQt dependency, installed as ``sleep-scoring-cli``:
 
-Planned features:
-    - Batch processing of activity data files
-    - JSON/CSV output formats
-    - Progress reporting to stdout
-    - Configuration via command-line arguments or config files
-
-Example future usage:
     ```bash
-    sleep-scoring-cli score --input data.csv --output results.json
-    sleep-scoring-cli detect-nonwear --input data.csv --config choi.json
+    sleep-scoring-cli score ./study_data --diary diary.csv -o results.csv --workers 8
+    sleep-scoring-cli detect-nonwear ./study_data -o nonwear.parquet
+    sleep-scoring-cli import ./study_data --db study.db
+    sleep-scoring-cli export --db study.db -o export.json
     ```
 
-Dependencies:
-    - argparse or click for argument parsing
-    - Core algorithms from sleep_scoring_app.core.algorithms
-    - No PyQt dependencies
-
-See: /docs/cli_design.md (to be created)
+Per-file work runs in a process pool and results are written as each file
+completes (CSV, JSON, or Parquet with pyarrow installed).
 """
 
 from __future__ import annotations
 
-__all__: list[str] = []
+from sleep_scoring_app.cli.app import main
+
+__all__: list[str] = ["main"]
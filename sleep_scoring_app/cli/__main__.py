@@ -0,0 +1,10 @@
+"""Allows running the CLI as: python -m sleep_scoring_app.cli."""
+
+from __future__ import annotations
+
+import sys
+
+from sleep_scoring_app.cli.app import main
+
+if __name__ == "__main__":
+    sys.exit(main())
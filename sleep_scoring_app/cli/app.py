@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Entry point for the sleep-scoring command-line interface.
+
+Examples:
+    sleep-scoring-cli score ./study_data --diary diary.csv -o results.csv --workers 8
+    sleep-scoring-cli detect-nonwear ./study_data -o nonwear.parquet
+    sleep-scoring-cli import ./study_data --db study.db --precompute-scoring
+    sleep-scoring-cli export --db study.db -o export.json
+    sleep-scoring-cli migrate-storage --db study.db
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from sleep_scoring_app.cli import commands
+from sleep_scoring_app.core.algorithms import ActivityColumn, AlgorithmFactory, OnsetOffsetRuleFactory
+from sleep_scoring_app.core.constants import ConfigDefaults
+from sleep_scoring_app.services.export_writer import ExportWriter
+
+logger = logging.getLogger(__name__)
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Output file (.csv, .json or .parquet)")
+    parser.add_argument("--format", choices=ExportWriter.FORMATS, help="Output format (default: from output extension, else csv)")
+
+
+def _add_workers_argument(parser: argparse.ArgumentParser, default: int) -> None:
+    parser.add_argument("-j", "--workers", type=int, default=default, help=f"Worker processes (default: {default})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog="sleep-scoring-cli", description="Headless batch sleep scoring for actigraphy studies.")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Increase log output (-v info, -vv debug)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score = subparsers.add_parser("score", help="Auto-score every activity epoch file in a study directory")
+    score.add_argument("input", type=Path, help="Directory of activity epoch CSV files")
+    score.add_argument("--diary", type=Path, required=True, help="Sleep diary CSV file")
+    score.add_argument(
+        "--algorithm", choices=sorted(AlgorithmFactory.get_available_algorithms()), default=AlgorithmFactory.get_default_algorithm_id()
+    )
+    score.add_argument("--rule", choices=sorted(OnsetOffsetRuleFactory.get_available_rules()), default=OnsetOffsetRuleFactory.get_default_rule_id())
+    score.add_argument(
+        "--choi-column", choices=[column.name.lower() for column in ActivityColumn], default=ActivityColumn.VECTOR_MAGNITUDE.name.lower()
+    )
+    _add_output_arguments(score)
+    _add_workers_argument(score, _default_workers())
+    score.set_defaults(handler=commands.run_score)
+
+    nonwear = subparsers.add_parser("detect-nonwear", help="Run Choi nonwear detection over epoch files")
+    nonwear.add_argument("input", type=Path, help="Activity epoch CSV file or directory")
+    nonwear.add_argument(
+        "--activity-column", choices=[column.name.lower() for column in ActivityColumn], default=ActivityColumn.VECTOR_MAGNITUDE.name.lower()
+    )
+    nonwear.add_argument("--skip-rows", type=int, default=0, help="Header rows to skip before the column names")
+    _add_output_arguments(nonwear)
+    _add_workers_argument(nonwear, _default_workers())
+    nonwear.set_defaults(handler=commands.run_detect_nonwear)
+
+    import_parser = subparsers.add_parser("import", help="Import activity CSV files into a study database")
+    import_parser.add_argument("input", type=Path, help="Activity CSV file or directory")
+    import_parser.add_argument("--db", type=Path, required=True, help="Study database (.db), created if missing")
+    import_parser.add_argument(
+        "--skip-rows", type=int, default=ConfigDefaults.SKIP_ROWS, help=f"Header rows to skip (default: {ConfigDefaults.SKIP_ROWS})"
+    )
+    import_parser.add_argument("--force", action="store_true", help="Reimport files that are unchanged")
+    import_parser.add_argument("--include-nonwear", action="store_true", help="Also import nonwear sensor files found in the directory")
+    import_parser.add_argument(
+        "--precompute-scoring", action="store_true", help="Score each imported file once so the GUI and exports read stored results"
+    )
+    import_parser.add_argument(
+        "--algorithm", choices=sorted(AlgorithmFactory.get_available_algorithms()), default=AlgorithmFactory.get_default_algorithm_id()
+    )
+    _add_workers_argument(import_parser, min(_default_workers(), ConfigDefaults.IMPORT_WORKERS))
+    import_parser.set_defaults(handler=commands.run_import)
+
+    export = subparsers.add_parser("export", help="Export saved sleep scoring results from a study database")
+    export.add_argument("--db", type=Path, required=True, help="Study database (.db)")
+    _add_output_arguments(export)
+    export.set_defaults(handler=commands.run_export)
+
+    migrate = subparsers.add_parser("migrate-storage", help="Move activity stored one row per epoch into columnar blocks")
+    migrate.add_argument("--db", type=Path, required=True, help="Study database (.db)")
+    migrate.set_defaults(handler=commands.run_migrate_storage)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the CLI and return the process exit code."""
+    args = build_parser().parse_args(argv)
+
+    log_level = {0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG)
+    logging.basicConfig(level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    except Exception as e:
+        logger.debug("Command failed", exc_info=True)
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
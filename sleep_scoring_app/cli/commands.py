@@ -0,0 +1,283 @@
+"""
+Subcommand implementations for the sleep-scoring command-line interface.
+
+Each command takes the parsed argparse namespace and returns a process exit code
+(0 = every file succeeded, 1 = at least one file failed). Per-file work runs in
+a process pool; results are written as each file completes. Nothing here
+imports PyQt, so the commands run on headless servers.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from sleep_scoring_app.core.algorithms import (
+    ActivityColumn,
+    AlgorithmFactory,
+    OnsetOffsetRuleFactory,
+    detect_nonwear,
+    iter_auto_score_activity_epoch_files,
+)
+from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_and_collapse_epochs
+from sleep_scoring_app.services.export_writer import ExportWriter
+from sleep_scoring_app.utils.participant_extractor import extract_participant_info
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Callable, Iterator, Sequence
+    from pathlib import Path
+
+    from sleep_scoring_app.data.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Columns of detect-nonwear results, also written when no nonwear is found
+NONWEAR_RESULT_COLUMNS = ("filename", "participant_id", "start_time", "end_time", "duration_minutes", "source")
+
+
+class BatchStats:
+    """Counts and throughput for one command run."""
+
+    def __init__(self, total_files: int = 0) -> None:
+        self.total_files = total_files
+        self.processed_files = 0
+        self.failed_files = 0
+        self.epochs = 0
+        self.started_at = time.perf_counter()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def record(self, filename: str, error: str | None = None, detail: str = "") -> None:
+        """Count a finished file and print a progress line."""
+        self.processed_files += 1
+        position = f"[{self.processed_files}/{self.total_files}]" if self.total_files else f"[{self.processed_files}]"
+        if error is not None:
+            self.failed_files += 1
+            print(f"{position} {filename}: FAILED - {error}")
+        else:
+            print(f"{position} {filename}{': ' + detail if detail else ''}")
+
+    def summary(self, verb: str, rows_written: int | None = None, output_path: Path | None = None) -> str:
+        """Human-readable totals and throughput."""
+        elapsed = max(self.elapsed_seconds, 1e-9)
+        succeeded = self.processed_files - self.failed_files
+        parts = [f"{verb} {succeeded}/{self.processed_files} files in {elapsed:.1f}s ({self.processed_files / elapsed:.2f} files/s"]
+        if self.epochs:
+            parts[0] += f", {self.epochs / elapsed:,.0f} epochs/s"
+        parts[0] += ")"
+        if rows_written is not None and output_path is not None:
+            parts.append(f"{rows_written} rows written to {output_path}")
+        if self.failed_files:
+            parts.append(f"{self.failed_files} failed")
+        return "; ".join(parts)
+
+
+def iter_file_results(
+    func: Callable[..., Any],
+    files: list[Path],
+    max_workers: int,
+    *args: Any,
+) -> Iterator[tuple[Path, Any, str | None]]:
+    """
+    Apply func(file, *args) to every file, yielding (file, result, error) as each completes.
+
+    Runs in-process when max_workers is 1; otherwise in a spawn-context process pool,
+    so func and its arguments must be picklable module-level objects.
+    """
+    if max_workers <= 1 or len(files) <= 1:
+        for path in files:
+            try:
+                yield path, func(path, *args), None
+            except Exception as e:
+                logger.exception("Error processing %s", path.name)
+                yield path, None, str(e)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(func, path, *args): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                logger.warning("Error processing %s: %s", path.name, e)
+                yield path, None, str(e)
+
+
+def detect_file_nonwear(activity_file: Path, activity_column: ActivityColumn, skip_rows: int = 0) -> tuple[list[dict[str, Any]], int]:
+    """
+    Run Choi nonwear detection over one epoch CSV file (runs in worker processes).
+
+    Returns:
+        (one row per nonwear period, number of epochs scanned)
+
+    """
+    df = pd.read_csv(activity_file, skiprows=skip_rows)
+    datetime_col = find_datetime_column(df)
+    df[datetime_col] = pd.to_datetime(df[datetime_col])
+    df = validate_and_collapse_epochs(df, datetime_col)
+
+    column_name = activity_column.value
+    if column_name not in df.columns:
+        msg = f"Column '{column_name}' not found. Available columns: {df.columns.tolist()}"
+        raise ValueError(msg)
+
+    periods = detect_nonwear(df[column_name].to_numpy(), df[datetime_col].tolist())
+    participant = extract_participant_info(activity_file.name)
+    rows = [
+        {
+            "filename": activity_file.name,
+            "participant_id": participant.numerical_id,
+            "start_time": period.start_time.isoformat(),
+            "end_time": period.end_time.isoformat(),
+            "duration_minutes": period.duration_minutes,
+            "source": str(period.source),
+        }
+        for period in periods
+    ]
+    return rows, len(df)
+
+
+def _result_writer(args: argparse.Namespace, columns: Sequence[str] | None = None) -> ExportWriter:
+    """Writer for a command's --output and --format, keeping floats at full precision."""
+    return ExportWriter(args.output, args.format, selected_columns=columns, float_format=None)
+
+
+def _activity_files(input_path: Path, pattern: str = "*.csv") -> list[Path]:
+    """A single file, or every matching file in a directory (sorted)."""
+    if input_path.is_file():
+        return [input_path]
+    if not input_path.is_dir():
+        msg = f"Input not found: {input_path}"
+        raise FileNotFoundError(msg)
+    return sorted(input_path.glob(pattern))
+
+
+def run_score(args: argparse.Namespace) -> int:
+    """Auto-score every activity file in a study directory."""
+    sleep_algorithm = AlgorithmFactory.create(args.algorithm)
+    onset_offset_rule = OnsetOffsetRuleFactory.create(args.rule)
+    stats = BatchStats(len(_activity_files(args.input)))
+
+    with _result_writer(args) as writer:
+        for result in iter_auto_score_activity_epoch_files(
+            str(args.input),
+            str(args.diary),
+            choi_activity_column=ActivityColumn[args.choi_column.upper()],
+            sleep_algorithm=sleep_algorithm,
+            onset_offset_rule=onset_offset_rule,
+            max_workers=args.workers,
+        ):
+            rows = result.sleep_metrics.to_export_dict_list() if result.sleep_metrics else []
+            writer.write_rows(rows)
+            stats.epochs += result.epochs
+            stats.record(result.activity_file.name, result.error, f"{len(rows)} periods")
+
+    print(stats.summary("Scored", writer.rows_written, writer.output_path))
+    return 1 if stats.failed_files else 0
+
+
+def run_detect_nonwear(args: argparse.Namespace) -> int:
+    """Run Choi nonwear detection over an epoch file or directory."""
+    files = _activity_files(args.input)
+    stats = BatchStats(len(files))
+    activity_column = ActivityColumn[args.activity_column.upper()]
+
+    with _result_writer(args, NONWEAR_RESULT_COLUMNS) as writer:
+        for path, result, error in iter_file_results(detect_file_nonwear, files, args.workers, activity_column, args.skip_rows):
+            if result is not None:
+                rows, epochs = result
+                writer.write_rows(rows)
+                stats.epochs += epochs
+            stats.record(path.name, error, f"{len(result[0])} nonwear periods" if result else "")
+
+    print(stats.summary("Checked", writer.rows_written, writer.output_path))
+    return 1 if stats.failed_files else 0
+
+
+def run_import(args: argparse.Namespace) -> int:
+    """Import activity CSV files into a study database."""
+    from sleep_scoring_app.data.database import DatabaseManager
+    from sleep_scoring_app.services.activity_importer import ActivityImporter
+    from sleep_scoring_app.services.precompute_service import ScoringPrecomputeService
+
+    db_manager = DatabaseManager(args.db)
+    precomputer = ScoringPrecomputeService(db_manager, AlgorithmFactory.create(args.algorithm)) if args.precompute_scoring else None
+    importer = ActivityImporter(db_manager, max_workers=args.workers, scoring_precomputer=precomputer)
+    stats = BatchStats()
+
+    if args.input.is_dir():
+        progress = importer.import_directory(args.input, skip_rows=args.skip_rows, force_reimport=args.force, include_nonwear=args.include_nonwear)
+    else:
+        progress = importer.import_files([args.input], skip_rows=args.skip_rows, force_reimport=args.force)
+
+    for filename in progress.imported_files:
+        print(f"Imported {filename}")
+    for skipped in progress.skipped_files:
+        print(f"Skipped {skipped}")
+    for error in progress.errors:
+        print(f"ERROR {error}")
+    for warning in progress.warnings:
+        print(f"WARNING {warning}")
+
+    elapsed = max(stats.elapsed_seconds, 1e-9)
+    print(
+        f"Imported {len(progress.imported_files)} files, skipped {len(progress.skipped_files)}, "
+        f"{len(progress.errors)} errors in {elapsed:.1f}s "
+        f"({progress.processed_records:,} epochs, {progress.processed_records / elapsed:,.0f} epochs/s)"
+    )
+    return 1 if progress.errors else 0
+
+
+def _export_rows(db_manager: DatabaseManager) -> Iterator[dict[str, Any]]:
+    """Export rows (one per sleep period) of every saved metric, converted as the metrics are read."""
+    from sleep_scoring_app.services.nonwear_service import NonwearDataService
+
+    nwt_resolver = NonwearDataService(db_manager).load_sensor_resolver()
+    for metric in db_manager.iter_sleep_metrics_for_export():
+        try:
+            rows = metric.to_export_dict_list(nwt_resolver)
+        except (ValueError, AttributeError) as e:
+            logger.warning("Skipping invalid export record for %s: %s", metric.filename, e)
+            continue
+        if not all(row.get("filename") for row in rows):
+            logger.warning("Skipping export record without a filename")
+            continue
+        yield from rows
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """Stream all saved sleep scoring results from a study database into the output file."""
+    from sleep_scoring_app.data.database import DatabaseManager
+
+    stats = BatchStats()
+    with _result_writer(args) as writer:
+        writer.write_rows(_export_rows(DatabaseManager(args.db)))
+
+    elapsed = max(stats.elapsed_seconds, 1e-9)
+    print(f"Exported {writer.rows_written} rows to {writer.output_path} in {elapsed:.1f}s ({writer.rows_written / elapsed:,.0f} rows/s)")
+    return 0
+
+
+def run_migrate_storage(args: argparse.Namespace) -> int:
+    """Move a study database's per-epoch activity rows into columnar blocks."""
+    from sleep_scoring_app.data.database import DatabaseManager
+
+    stats = BatchStats()
+
+    def report(filename: str, epochs: int, error: str | None) -> None:
+        stats.epochs += epochs
+        stats.record(filename, error, f"{epochs} epochs")
+
+    DatabaseManager(args.db).migrate_activity_rows_to_blocks(report)
+
+    print(stats.summary("Migrated"))
+    return 1 if stats.failed_files else 0
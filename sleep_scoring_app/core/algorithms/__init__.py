@@ -40,6 +40,7 @@ Package Structure:
     - protocols.py: Framework-agnostic callback protocols
     - config.py: Algorithm configuration dataclasses (SleepRulesConfig only)
     - sadeh.py: Sadeh algorithm implementation (function-based)
+    - weighted_window.py: Weighted-window kernel shared by linear-filter algorithms
     - choi.py: Choi algorithm implementation (function-based)
     - sleep_rules.py: Sleep onset/offset rules
     - nwt_correlation.py: NWT correlation functions
@@ -47,7 +48,7 @@ Package Structure:
 
 from __future__ import annotations
 
-from sleep_scoring_app.core.algorithms.auto_score import auto_score_activity_epoch_files
+from sleep_scoring_app.core.algorithms.auto_score import FileScoreResult, auto_score_activity_epoch_files, iter_auto_score_activity_epoch_files
 from sleep_scoring_app.core.algorithms.calibration import (
     CalibrationConfig,
     CalibrationResult,
@@ -80,12 +81,16 @@ from sleep_scoring_app.core.algorithms.nwt_correlation import (
 )
 from sleep_scoring_app.core.algorithms.onset_offset_factory import OnsetOffsetRuleFactory
 from sleep_scoring_app.core.algorithms.onset_offset_protocol import OnsetOffsetRule
+from sleep_scoring_app.core.algorithms.period_metrics import PeriodMetrics, SleepMetricsEngine
 from sleep_scoring_app.core.algorithms.protocols import CancellationCheck, LogCallback, ProgressCallback
+from sleep_scoring_app.core.algorithms.run_length import SleepWakeRunIndex
 from sleep_scoring_app.core.algorithms.sadeh import SadehAlgorithm, sadeh_score, score_activity
 from sleep_scoring_app.core.algorithms.sleep_rules import SleepRules, find_sleep_onset_offset
 from sleep_scoring_app.core.algorithms.sleep_scoring_protocol import SleepScoringAlgorithm
+from sleep_scoring_app.core.algorithms.time_index import EpochTimeIndex
 from sleep_scoring_app.core.algorithms.tudor_locke import TudorLockeConfig, TudorLockeRule
 from sleep_scoring_app.core.algorithms.types import ActivityColumn
+from sleep_scoring_app.core.algorithms.weighted_window import WeightedWindowAlgorithm, WeightedWindowKernel, weighted_window_sum
 
 # Note: ChoiNonwearDetector and SleepScoringAlgorithms are deprecated and moved to legacy_algorithms.py
 # Import them directly from sleep_scoring_app.core.legacy_algorithms if needed (but use new DI pattern instead)
@@ -106,6 +111,8 @@ __all__ = [
     "ColeKripkeAlgorithm",
     "DataSourceFactory",
     "DataSourceLoader",
+    # === Epoch Time Index (timestamp lookups) ===
+    "EpochTimeIndex",
     "GT3XDataSourceLoader",
     # === Imputation ===
     "ImputationConfig",
@@ -120,6 +127,9 @@ __all__ = [
     # === Onset/Offset Rule Protocol and Factory (Dependency Injection) ===
     "OnsetOffsetRule",
     "OnsetOffsetRuleFactory",
+    # === Sleep Period Metrics (prefix sums) ===
+    "PeriodMetrics",
+    "SleepMetricsEngine",
     # === Callback Protocols ===
     "ProgressCallback",
     # === Algorithm Protocol Implementation ===
@@ -129,14 +139,21 @@ __all__ = [
     "SleepRulesConfig",
     # === Algorithm Protocol ===
     "SleepScoringAlgorithm",
+    # === Run-Length Sleep/Wake Index (onset/offset rule queries) ===
+    "SleepWakeRunIndex",
     # === Tudor-Locke Onset/Offset Rules ===
     "TudorLockeConfig",
     "TudorLockeRule",
     "TimeRange",
+    # === Weighted-Window Kernel (linear-filter algorithms) ===
+    "WeightedWindowAlgorithm",
+    "WeightedWindowKernel",
     # === Calibration Functions ===
     "apply_calibration",
     # === Auto-Scoring Orchestration ===
+    "FileScoreResult",
     "auto_score_activity_epoch_files",
+    "iter_auto_score_activity_epoch_files",
     "calculate_nwt_offset",
     "calculate_nwt_onset",
     "calculate_total_nwt_overlaps",
@@ -159,6 +176,7 @@ __all__ = [
     "score_activity",
     "score_activity_cole_kripke",
     "select_stationary_points",
+    "weighted_window_sum",
 ]
 
 __version__ = "2.0.0"
@@ -23,8 +23,12 @@ Example usage:
 from __future__ import annotations
 
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pandas as pd
 
@@ -40,11 +44,25 @@ from .onset_offset_protocol import OnsetOffsetRule
 from .sadeh import sadeh_score
 from .sleep_rules import SleepRules
 from .sleep_scoring_protocol import SleepScoringAlgorithm
+from .time_index import EpochTimeIndex
 from .types import ActivityColumn
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class FileScoreResult:
+    """Outcome of auto-scoring one activity file."""
+
+    activity_file: Path
+    sleep_metrics: SleepMetrics | None = None  # None if the file was skipped or failed
+    error: str | None = None
+    epochs: int = 0  # Activity epochs scored
+
+
 def auto_score_activity_epoch_files(
     activity_folder: str,
     diary_file: str,
@@ -52,6 +70,7 @@ def auto_score_activity_epoch_files(
     choi_activity_column: ActivityColumn = ActivityColumn.VECTOR_MAGNITUDE,
     sleep_algorithm: SleepScoringAlgorithm | None = None,
     onset_offset_rule: OnsetOffsetRule | None = None,
+    max_workers: int = 1,
 ) -> list[SleepMetrics]:
     """
     Automatically score sleep for all activity epoch files in a folder.
@@ -68,9 +87,10 @@ def auto_score_activity_epoch_files(
         choi_activity_column: Activity column for Choi nonwear detection (default: VECTOR_MAGNITUDE)
         sleep_algorithm: Optional sleep scoring algorithm instance. If None, uses default Sadeh algorithm.
         onset_offset_rule: Optional onset/offset rule instance. If None, uses default Consecutive 3/5 rule.
+        max_workers: Number of worker processes scoring files in parallel (1 = in-process)
 
     Returns:
-        List of SleepMetrics objects, one per successfully processed file
+        List of SleepMetrics objects, one per successfully processed file, in file order
 
     Example:
         >>> from sleep_scoring_app.core.algorithms import auto_score_activity_epoch_files
@@ -87,6 +107,55 @@ def auto_score_activity_epoch_files(
         >>> for sleep_metrics in results:
         ...     db.save_sleep_metrics(sleep_metrics, is_autosave=False)
 
+    """
+    activity_files = _discover_activity_files(activity_folder)
+    scored = {
+        result.activity_file: result.sleep_metrics
+        for result in iter_auto_score_activity_epoch_files(
+            activity_folder,
+            diary_file,
+            nwt_folder=nwt_folder,
+            choi_activity_column=choi_activity_column,
+            sleep_algorithm=sleep_algorithm,
+            onset_offset_rule=onset_offset_rule,
+            max_workers=max_workers,
+        )
+    }
+    results = [scored[activity_file] for activity_file in activity_files if scored.get(activity_file)]
+
+    logger.info("Successfully processed %d/%d files", len(results), len(activity_files))
+    return results
+
+
+def iter_auto_score_activity_epoch_files(
+    activity_folder: str,
+    diary_file: str,
+    nwt_folder: str | None = None,
+    choi_activity_column: ActivityColumn = ActivityColumn.VECTOR_MAGNITUDE,
+    sleep_algorithm: SleepScoringAlgorithm | None = None,
+    onset_offset_rule: OnsetOffsetRule | None = None,
+    max_workers: int = 1,
+) -> Iterator[FileScoreResult]:
+    """
+    Auto-score every activity file in a folder, yielding each result as soon as it is ready.
+
+    With max_workers > 1 files are scored in a process pool and results arrive in
+    completion order; otherwise files are scored in-process in sorted order. Per-file
+    failures, including a worker that crashes or arguments that cannot be sent to it,
+    are reported in FileScoreResult.error rather than raised.
+
+    Args:
+        activity_folder: Path to folder containing activity epoch CSV files
+        diary_file: Path to diary CSV file with sleep entries
+        nwt_folder: Optional path to NWT sensor data folder (reserved for future use)
+        choi_activity_column: Activity column for Choi nonwear detection
+        sleep_algorithm: Optional sleep scoring algorithm instance (default Sadeh)
+        onset_offset_rule: Optional onset/offset rule instance (default Consecutive 3/5)
+        max_workers: Number of worker processes scoring files in parallel
+
+    Yields:
+        One FileScoreResult per activity file
+
     """
     # 0. Initialize algorithm (use default Sadeh if none provided)
     if sleep_algorithm is None:
@@ -107,20 +176,44 @@ def auto_score_activity_epoch_files(
     logger.info("Loaded diary with %d entries", len(diary_df))
 
     # 3. Process each activity file
-    results = []
-    for activity_file in activity_files:
-        try:
-            sleep_metrics = _process_activity_file(activity_file, diary_df, choi_activity_column, sleep_algorithm, onset_offset_rule)
-            if sleep_metrics:
-                results.append(sleep_metrics)
-                num_periods = len(sleep_metrics.daily_sleep_markers.get_complete_periods())
-                logger.info("Processed %s: %d periods", activity_file.name, num_periods)
-        except Exception:
-            logger.exception("Error processing %s", activity_file.name)
-            continue
+    if max_workers <= 1 or len(activity_files) <= 1:
+        for activity_file in activity_files:
+            yield _score_activity_file(activity_file, diary_df, choi_activity_column, sleep_algorithm, onset_offset_rule)
+        return
+
+    # Spawned workers do not inherit GUI state from the calling process
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(_score_activity_file, activity_file, diary_df, choi_activity_column, sleep_algorithm, onset_offset_rule): activity_file
+            for activity_file in activity_files
+        }
+        for future in as_completed(futures):
+            activity_file = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.warning("Error processing %s: %s", activity_file.name, e)
+                yield FileScoreResult(activity_file, error=f"Error processing {activity_file.name}: {e}")
 
-    logger.info("Successfully processed %d/%d files", len(results), len(activity_files))
-    return results
+
+def _score_activity_file(
+    activity_file: Path,
+    diary_df: pd.DataFrame,
+    choi_activity_column: ActivityColumn,
+    sleep_algorithm: SleepScoringAlgorithm,
+    onset_offset_rule: OnsetOffsetRule,
+) -> FileScoreResult:
+    """Score one file, capturing failures in the result (runs in worker processes)."""
+    try:
+        sleep_metrics, epochs = _process_activity_file(activity_file, diary_df, choi_activity_column, sleep_algorithm, onset_offset_rule)
+    except Exception as e:
+        logger.exception("Error processing %s", activity_file.name)
+        return FileScoreResult(activity_file, error=f"Error processing {activity_file.name}: {e}")
+
+    if sleep_metrics:
+        num_periods = len(sleep_metrics.daily_sleep_markers.get_complete_periods())
+        logger.info("Processed %s: %d periods", activity_file.name, num_periods)
+    return FileScoreResult(activity_file, sleep_metrics, epochs=epochs)
 
 
 def _discover_activity_files(activity_folder: str) -> list[Path]:
@@ -175,9 +268,9 @@ def _process_activity_file(
     choi_activity_column: ActivityColumn = ActivityColumn.VECTOR_MAGNITUDE,
     sleep_algorithm: SleepScoringAlgorithm | None = None,
     onset_offset_rule: OnsetOffsetRule | None = None,
-) -> SleepMetrics | None:
+) -> tuple[SleepMetrics | None, int]:
     """
-    Process a single activity file and return SleepMetrics.
+    Process a single activity file and return SleepMetrics with the number of epochs scored.
 
     Args:
         activity_file: Path to activity CSV file
@@ -187,7 +280,7 @@ def _process_activity_file(
         onset_offset_rule: Onset/offset rule instance to use
 
     Returns:
-        SleepMetrics object with calculated metrics, or None if processing fails
+        (SleepMetrics object with calculated metrics, or None if the file has no datetime column, number of epochs scored)
 
     """
     # 1. Extract participant ID and date from filename
@@ -200,7 +293,7 @@ def _process_activity_file(
     # Validate required columns exist
     if "datetime" not in activity_df.columns:
         logger.warning("No 'datetime' column in %s, skipping", activity_file.name)
-        return None
+        return None, 0
 
     # Ensure datetime column is parsed
     activity_df["datetime"] = pd.to_datetime(activity_df["datetime"])
@@ -247,7 +340,7 @@ def _process_activity_file(
         # Fallback if identifier doesn't match enum
         algorithm_type = AlgorithmType.SADEH_1994_ACTILIFE
 
-    return SleepMetrics(
+    sleep_metrics = SleepMetrics(
         filename=activity_file.name,
         analysis_date=analysis_date,
         algorithm_type=algorithm_type,
@@ -257,6 +350,7 @@ def _process_activity_file(
         onset_offset_rule=onset_offset_rule.identifier if onset_offset_rule else "consecutive_3_5",
         **metrics_dict,
     )
+    return sleep_metrics, len(activity_df)
 
 
 def _extract_participant_info(activity_file: Path) -> ParticipantInfo:
@@ -507,9 +601,9 @@ def _calculate_metrics(
     offset_dt = datetime.fromtimestamp(main_sleep.offset_timestamp)
 
     # Find closest indices
-    timestamps = activity_df["datetime"].tolist()
-    onset_idx = _find_closest_index(timestamps, onset_dt)
-    offset_idx = _find_closest_index(timestamps, offset_dt)
+    time_index = EpochTimeIndex(activity_df["datetime"].to_numpy())
+    onset_idx = time_index.nearest(onset_dt)
+    offset_idx = time_index.nearest(offset_dt)
 
     if onset_idx is None or offset_idx is None:
         logger.warning("Could not find indices for onset/offset in activity data")
@@ -602,30 +696,3 @@ def _calculate_metrics(
         "choi_offset": choi_offset,
         "total_choi_counts": total_choi_counts,
     }
-
-
-def _find_closest_index(timestamps: list[datetime], target: datetime) -> int | None:
-    """
-    Find index of closest timestamp to target.
-
-    Args:
-        timestamps: List of datetime objects
-        target: Target datetime to find
-
-    Returns:
-        Index of closest timestamp, or None if list is empty
-
-    """
-    if not timestamps:
-        return None
-
-    min_diff = float("inf")
-    closest_idx = None
-
-    for i, ts in enumerate(timestamps):
-        diff = abs((ts - target).total_seconds())
-        if diff < min_diff:
-            min_diff = diff
-            closest_idx = i
-
-    return closest_idx
@@ -28,7 +28,7 @@ import numpy as np
 import pandas as pd
 
 from sleep_scoring_app.core.algorithms.types import ActivityColumn
-from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_and_collapse_epochs
+from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_activity_counts, validate_and_collapse_epochs
 from sleep_scoring_app.core.constants import NonwearDataSource
 from sleep_scoring_app.core.dataclasses import NonwearPeriod
 
@@ -42,6 +42,84 @@ SPIKE_TOLERANCE: int = 2
 WINDOW_SIZE: int = 30
 
 
+def _find_nonwear_index_ranges(counts: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Find unmerged Choi nonwear periods as inclusive (start_index, end_index) pairs.
+
+    A candidate period starts at any epoch that is not positive and extends
+    through zero epochs, tolerating non-zero epochs while at most SPIKE_TOLERANCE
+    positive epochs fall in the surrounding +/- WINDOW_SIZE window. The period
+    ends at the last zero epoch before the first non-zero epoch that breaks that
+    tolerance.
+
+    Instead of re-scanning each window, the positive-epoch counts of all windows
+    come from one prefix sum, and "next breaking epoch" / "last zero before"
+    lookups are precomputed with cumulative min/max scans. Every candidate start
+    is therefore resolved in O(1), and the outer scan only visits accepted
+    periods, so the whole search is linear in the number of epochs.
+
+    Args:
+        counts: 1-D array of activity counts
+
+    Returns:
+        List of (start_index, end_index) tuples in ascending order
+
+    """
+    n = len(counts)
+    if n == 0:
+        return []
+
+    positive = counts > 0
+    is_zero = counts == 0
+    indices = np.arange(n)
+
+    positive_prefix = np.concatenate(([0], np.cumsum(positive, dtype=np.int64)))
+    window_positive = positive_prefix[np.minimum(indices + WINDOW_SIZE, n)] - positive_prefix[np.maximum(indices - WINDOW_SIZE, 0)]
+    breaks_period = ~is_zero & (window_positive > SPIKE_TOLERANCE)
+
+    # next_break[i]: first index >= i that ends a period (n if none)
+    next_break = np.minimum.accumulate(np.where(breaks_period, indices, n)[::-1])[::-1]
+    # last_zero_before[j]: last zero-count index < j (-1 if none)
+    last_zero_before = np.concatenate(([-1], np.maximum.accumulate(np.where(is_zero, indices, -1))))
+
+    candidate_starts = np.flatnonzero(~positive)
+    candidate_ends = last_zero_before[next_break[candidate_starts]]
+    candidate_ends = np.where(candidate_ends >= candidate_starts, candidate_ends, candidate_starts)
+
+    accepted = candidate_ends - candidate_starts + 1 >= MIN_PERIOD_LENGTH
+    starts = candidate_starts[accepted]
+    ends = candidate_ends[accepted]
+
+    ranges: list[tuple[int, int]] = []
+    position = 0
+    while position < len(starts):
+        start_idx = int(starts[position])
+        end_idx = int(ends[position])
+        ranges.append((start_idx, end_idx))
+        # Scanning resumes after the accepted period
+        position = int(np.searchsorted(starts, end_idx + 1))
+
+    return ranges
+
+
+def _ranges_to_mask(ranges: list[tuple[int, int]], length: int) -> np.ndarray:
+    """
+    Paint inclusive index ranges into a 0/1 integer mask.
+
+    Args:
+        ranges: List of inclusive (start_index, end_index) tuples
+        length: Length of the mask
+
+    Returns:
+        Integer array of 0/1 values
+
+    """
+    mask = np.zeros(length, dtype=int)
+    for start_idx, end_idx in ranges:
+        mask[start_idx : end_idx + 1] = 1
+    return mask
+
+
 def _merge_adjacent_periods(periods: list[NonwearPeriod]) -> list[NonwearPeriod]:
     """
     Merge adjacent or overlapping nonwear periods.
@@ -151,61 +229,22 @@ def choi_detect_nonwear(
         result_df["Choi Nonwear"] = []
         return result_df
 
-    nonwear_periods: list[NonwearPeriod] = []
-    i = 0
-
-    while i < len(counts):
-        if counts[i] > 0:
-            i += 1
-            continue
-
-        start_idx = i
-        end_idx = i
-
-        nonwear_continuation = i
-
-        while nonwear_continuation < len(counts):
-            if counts[nonwear_continuation] == 0:
-                end_idx = nonwear_continuation
-                nonwear_continuation += 1
-                continue
-
-            window_start = max(0, nonwear_continuation - WINDOW_SIZE)
-            window_end = min(len(counts), nonwear_continuation + WINDOW_SIZE)
-
-            if window_end - window_start > 1000000:
-                logger.warning(f"Window size too large: {window_end - window_start}, limiting to 1000000")
-                window_end = window_start + 1000000
-
-            nonzero_count = np.sum(counts[window_start:window_end] > 0)
-
-            if nonzero_count > SPIKE_TOLERANCE:
-                break
-
-            nonwear_continuation += 1
-
-        if end_idx - start_idx + 1 >= MIN_PERIOD_LENGTH:
-            start_time = pd.to_datetime(timestamps[start_idx])
-            end_time = pd.to_datetime(timestamps[end_idx])
-            period = NonwearPeriod(
-                start_time=start_time,
-                end_time=end_time,
-                participant_id="",
-                source=NonwearDataSource.CHOI_ALGORITHM,
-                duration_minutes=end_idx - start_idx + 1,
-                start_index=start_idx,
-                end_index=end_idx,
-            )
-            nonwear_periods.append(period)
-            i = end_idx + 1
-        else:
-            i += 1
+    nonwear_periods = [
+        NonwearPeriod(
+            start_time=pd.to_datetime(timestamps[start_idx]),
+            end_time=pd.to_datetime(timestamps[end_idx]),
+            participant_id="",
+            source=NonwearDataSource.CHOI_ALGORITHM,
+            duration_minutes=end_idx - start_idx + 1,
+            start_index=start_idx,
+            end_index=end_idx,
+        )
+        for start_idx, end_idx in _find_nonwear_index_ranges(counts)
+    ]
 
     merged_periods = _merge_adjacent_periods(nonwear_periods)
 
-    nonwear_mask = np.zeros(len(df), dtype=int)
-    for period in merged_periods:
-        nonwear_mask[period.start_index : period.end_index + 1] = 1
+    nonwear_mask = _ranges_to_mask([(period.start_index, period.end_index) for period in merged_periods], len(df))
 
     result_df = df.copy()
     result_df["Choi Nonwear"] = nonwear_mask
@@ -251,75 +290,60 @@ def detect_nonwear(
     if len(activity_data) == 0:
         return []
 
-    counts = np.array(activity_data, dtype=np.float64)
-
-    if np.any(np.isnan(counts)):
-        msg = "activity_data contains NaN (Not a Number) values"
-        raise ValueError(msg)
-
-    if np.any(np.isinf(counts)):
-        msg = "activity_data contains infinite values"
-        raise ValueError(msg)
-
-    if np.any(counts < 0):
-        negative_indices = np.where(counts < 0)[0]
-        msg = f"activity_data contains negative values at indices: {negative_indices[:10].tolist()}"
-        raise ValueError(msg)
+    counts = validate_activity_counts(activity_data)
 
     logger.debug(f"Running Choi algorithm on {len(counts)} epochs")
 
-    nonwear_periods: list[NonwearPeriod] = []
-    i = 0
+    nonwear_periods = [
+        NonwearPeriod(
+            start_time=timestamps[start_idx],
+            end_time=timestamps[end_idx],
+            participant_id="",
+            source=NonwearDataSource.CHOI_ALGORITHM,
+            duration_minutes=end_idx - start_idx + 1,
+            start_index=start_idx,
+            end_index=end_idx,
+        )
+        for start_idx, end_idx in _find_nonwear_index_ranges(counts)
+    ]
 
-    while i < len(counts):
-        if counts[i] > 0:
-            i += 1
-            continue
+    merged_periods = _merge_adjacent_periods(nonwear_periods)
 
-        start_idx = i
-        end_idx = i
+    logger.debug(f"Choi algorithm completed successfully. Found {len(merged_periods)} nonwear periods")
 
-        nonwear_continuation = i
+    return merged_periods
 
-        while nonwear_continuation < len(counts):
-            if counts[nonwear_continuation] == 0:
-                end_idx = nonwear_continuation
-                nonwear_continuation += 1
-                continue
 
-            window_start = max(0, nonwear_continuation - WINDOW_SIZE)
-            window_end = min(len(counts), nonwear_continuation + WINDOW_SIZE)
+def detect_nonwear_mask(activity_data: list[float] | np.ndarray) -> np.ndarray:
+    """
+    Compute the per-epoch Choi nonwear mask for uniformly spaced 1-minute epochs.
 
-            if window_end - window_start > 1000000:
-                logger.warning(f"Window size too large: {window_end - window_start}, limiting to 1000000")
-                window_end = window_start + 1000000
+    Equivalent to running detect_nonwear() with consecutive 1-minute timestamps and
+    painting the merged periods into a mask, without building timestamps or
+    NonwearPeriod objects.
 
-            nonzero_count = np.sum(counts[window_start:window_end] > 0)
+    Args:
+        activity_data: Array/list of activity count values
 
-            if nonzero_count > SPIKE_TOLERANCE:
-                break
+    Returns:
+        Integer array of 0/1 values where 1=nonwear
 
-            nonwear_continuation += 1
+    """
+    if activity_data is None:
+        msg = "activity_data cannot be None"
+        raise ValueError(msg)
 
-        if end_idx - start_idx + 1 >= MIN_PERIOD_LENGTH:
-            start_time = timestamps[start_idx]
-            end_time = timestamps[end_idx]
-            period = NonwearPeriod(
-                start_time=start_time,
-                end_time=end_time,
-                participant_id="",
-                source=NonwearDataSource.CHOI_ALGORITHM,
-                duration_minutes=end_idx - start_idx + 1,
-                start_index=start_idx,
-                end_index=end_idx,
-            )
-            nonwear_periods.append(period)
-            i = end_idx + 1
-        else:
-            i += 1
+    if len(activity_data) == 0:
+        return np.zeros(0, dtype=int)
 
-    merged_periods = _merge_adjacent_periods(nonwear_periods)
+    counts = validate_activity_counts(activity_data)
 
-    logger.debug(f"Choi algorithm completed successfully. Found {len(merged_periods)} nonwear periods")
+    # With 1-minute spacing, "starts within 60 seconds of the previous end" means an index gap of at most one epoch
+    merged: list[list[int]] = []
+    for start_idx, end_idx in _find_nonwear_index_ranges(counts):
+        if merged and start_idx - merged[-1][1] <= 1:
+            merged[-1][1] = max(merged[-1][1], end_idx)
+        else:
+            merged.append([start_idx, end_idx])
 
-    return merged_periods
+    return _ranges_to_mask([(start_idx, end_idx) for start_idx, end_idx in merged], len(counts))
@@ -18,6 +18,7 @@ from typing import TYPE_CHECKING, Any
 import numpy as np
 
 from sleep_scoring_app.core.algorithms.choi import detect_nonwear as _detect_nonwear_core
+from sleep_scoring_app.core.algorithms.choi import detect_nonwear_mask as _detect_nonwear_mask_core
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -122,29 +123,7 @@ class ChoiAlgorithm:
             ValueError: If input data is invalid
 
         """
-        if activity_data is None:
-            msg = "activity_data cannot be None"
-            raise ValueError(msg)
-
-        if len(activity_data) == 0:
-            return []
-
-        # Create dummy timestamps for mask generation
-        from datetime import datetime, timedelta
-
-        timestamps = [datetime(2000, 1, 1) + timedelta(minutes=i) for i in range(len(activity_data))]
-
-        # Get nonwear periods
-        periods = self.detect(activity_data, timestamps)
-
-        # Convert to mask
-        mask = [0] * len(activity_data)
-        for period in periods:
-            if period.start_index is not None and period.end_index is not None:
-                for i in range(period.start_index, min(period.end_index + 1, len(mask))):
-                    mask[i] = 1
-
-        return mask
+        return _detect_nonwear_mask_core(activity_data).tolist()
 
     def get_parameters(self) -> dict[str, Any]:
         """
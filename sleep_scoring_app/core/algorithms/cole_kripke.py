@@ -10,7 +10,8 @@ References:
     Automatic sleep/wake identification from wrist activity. Sleep, 15(5), 461-469.
 
 Algorithm Details:
-    - Uses a 7-minute sliding window (4 previous + current + 2 future epochs)
+    - Uses a 7-minute sliding window (4 previous + current + 2 future epochs),
+      computed for all epochs at once as a correlation with the coefficients
     - Activity counts are scaled by dividing by 100 and capping at 300
     - Uses weighted sum of activity in the sliding window
     - Formula: SI = P * (W4*A4 + W3*A3 + W2*A2 + W1*A1 + W0*A0 + W-1*A-1 + W-2*A-2)
@@ -36,7 +37,8 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 
-from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_and_collapse_epochs
+from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_activity_counts, validate_and_collapse_epochs
+from sleep_scoring_app.core.algorithms.weighted_window import WeightedWindowKernel
 
 if TYPE_CHECKING:
     import pandas as pd
@@ -62,6 +64,19 @@ COEF_CURRENT: int = 230  # A(t)
 COEF_LEAD1: int = 74  # A(t+1)
 COEF_LEAD2: int = 67  # A(t+2)
 
+COEFFICIENTS = np.array([COEF_LAG4, COEF_LAG3, COEF_LAG2, COEF_LAG1, COEF_CURRENT, COEF_LEAD1, COEF_LEAD2], dtype=np.float64)
+LAG_EPOCHS: int = 4
+
+# Scale and cap, weighted 7-epoch window sum (zero activity past either end) and threshold
+COLE_KRIPKE_KERNEL = WeightedWindowKernel(
+    weights=tuple(COEFFICIENTS.tolist()),
+    lags=LAG_EPOCHS,
+    scale=SCALING_FACTOR,
+    threshold=THRESHOLD,
+    activity_scale=ACTIVITY_SCALE,
+    activity_cap=ACTIVITY_CAP,
+)
+
 
 def cole_kripke_score(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -121,27 +136,11 @@ def cole_kripke_score(df: pd.DataFrame) -> pd.DataFrame:
         msg = "DataFrame must contain 'Axis1' column. Cole-Kripke algorithm ALWAYS uses Axis1."
         raise ValueError(msg)
 
-    activity_data = df["Axis1"].to_numpy(dtype=np.float64)
-
-    if np.any(np.isnan(activity_data)):
-        msg = "Axis1 column contains NaN (Not a Number) values"
-        raise ValueError(msg)
-
-    if np.any(np.isinf(activity_data)):
-        msg = "Axis1 column contains infinite values"
-        raise ValueError(msg)
-
-    if np.any(activity_data < 0):
-        negative_indices = np.where(activity_data < 0)[0]
-        msg = f"Axis1 column contains negative values at indices: {negative_indices[:10].tolist()}"
-        raise ValueError(msg)
+    activity_data = validate_activity_counts(df["Axis1"].to_numpy(dtype=np.float64), "Axis1 column")
 
     logger.debug(f"Running Cole-Kripke algorithm on {len(activity_data)} epochs")
 
-    # Scale and cap activity counts
-    scaled_activity = np.minimum(activity_data / ACTIVITY_SCALE, ACTIVITY_CAP)
-
-    sleep_wake_scores = _calculate_cole_kripke_scores(scaled_activity)
+    sleep_wake_scores = COLE_KRIPKE_KERNEL.score(activity_data)
 
     logger.debug(f"Cole-Kripke algorithm completed successfully for {len(activity_data)} epochs")
 
@@ -151,42 +150,6 @@ def cole_kripke_score(df: pd.DataFrame) -> pd.DataFrame:
     return result_df
 
 
-def _calculate_cole_kripke_scores(scaled_activity: np.ndarray) -> np.ndarray:
-    """
-    Calculate Cole-Kripke sleep/wake scores for scaled activity data.
-
-    Args:
-        scaled_activity: Array of activity counts scaled by /100 and capped at 300
-
-    Returns:
-        Array of sleep/wake classifications (1=sleep, 0=wake)
-
-    """
-    n = len(scaled_activity)
-    sleep_wake_scores = np.zeros(n, dtype=int)
-
-    # Pad activity with zeros for boundary handling
-    # 4 zeros at start (for lag), 2 zeros at end (for lead)
-    padded_activity = np.pad(scaled_activity, pad_width=(4, 2), mode="constant", constant_values=0)
-
-    # Coefficients array for vectorized multiplication
-    coefficients = np.array([COEF_LAG4, COEF_LAG3, COEF_LAG2, COEF_LAG1, COEF_CURRENT, COEF_LEAD1, COEF_LEAD2])
-
-    for i in range(n):
-        # Extract 7-epoch window (4 lag + current + 2 lead)
-        window_start = i  # Due to padding of 4, position i in padded = lag 4
-        window = padded_activity[window_start : window_start + WINDOW_SIZE]
-
-        # Calculate sleep index
-        weighted_sum = np.dot(coefficients, window)
-        sleep_index = SCALING_FACTOR * weighted_sum
-
-        # Classify: SI < 1.0 = Sleep (1), SI >= 1.0 = Wake (0)
-        sleep_wake_scores[i] = 1 if sleep_index < THRESHOLD else 0
-
-    return sleep_wake_scores
-
-
 def score_activity_cole_kripke(activity_data: list[float] | np.ndarray) -> list[int]:
     """
     Legacy convenience function for backwards compatibility.
@@ -213,31 +176,11 @@ def score_activity_cole_kripke(activity_data: list[float] | np.ndarray) -> list[
         logger.debug("Empty activity_data provided to Cole-Kripke algorithm")
         return []
 
-    try:
-        activity_array = np.array(activity_data, dtype=np.float64)
-    except (ValueError, TypeError) as e:
-        msg = f"activity_data contains non-numeric values: {e}"
-        raise ValueError(msg) from e
-
-    if np.any(np.isnan(activity_array)):
-        msg = "activity_data contains NaN (Not a Number) values"
-        raise ValueError(msg)
-
-    if np.any(np.isinf(activity_array)):
-        msg = "activity_data contains infinite values"
-        raise ValueError(msg)
-
-    if np.any(activity_array < 0):
-        negative_indices = np.where(activity_array < 0)[0]
-        msg = f"activity_data contains negative values at indices: {negative_indices[:10].tolist()}"
-        raise ValueError(msg)
+    activity_array = validate_activity_counts(activity_data)
 
     logger.debug(f"Running Cole-Kripke algorithm on {len(activity_array)} epochs")
 
-    # Scale and cap activity counts
-    scaled_activity = np.minimum(activity_array / ACTIVITY_SCALE, ACTIVITY_CAP)
-
-    sleep_wake_scores = _calculate_cole_kripke_scores(scaled_activity)
+    sleep_wake_scores = COLE_KRIPKE_KERNEL.score(activity_array)
 
     logger.debug(f"Cole-Kripke algorithm completed successfully for {len(activity_array)} epochs")
 
@@ -9,11 +9,12 @@ Architecture:
     - Handles CSV, XLSX, and XLS file formats
     - Detects ActiGraph CSV format automatically
     - Validates data structure and content
+    - Reads CSV files with explicit columns, dtypes and datetime format when given a format detector (see csv_ingest)
 
 Example Usage:
     >>> from sleep_scoring_app.core.algorithms.csv_datasource import CSVDataSourceLoader
     >>>
-    >>> loader = CSVDataSourceLoader()
+    >>> loader = CSVDataSourceLoader(format_detector=FormatDetector())
     >>> result = loader.load_file("/path/to/data.csv")
     >>> activity_df = result["activity_data"]
     >>> metadata = result["metadata"]
@@ -25,9 +26,9 @@ References:
 from __future__ import annotations
 
 import logging
-import math
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
 
 from sleep_scoring_app.core.constants import ActivityColumn, DatabaseColumn
@@ -36,6 +37,8 @@ from sleep_scoring_app.core.dataclasses import ColumnMapping
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from sleep_scoring_app.core.algorithms.csv_ingest import IngestStats, ReadFormatDetector
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,15 +50,19 @@ class CSVDataSourceLoader:
     and format validation. Implements DataSourceLoader protocol for DI compatibility.
     """
 
-    def __init__(self, skip_rows: int = 10) -> None:
+    def __init__(self, skip_rows: int = 10, fast_ingest: bool = True, format_detector: ReadFormatDetector | None = None) -> None:
         """
         Initialize CSV loader.
 
         Args:
             skip_rows: Number of header rows to skip (default 10 for ActiGraph)
+            fast_ingest: Read CSV files with explicit columns, dtypes and datetime format when they fit
+            format_detector: Detects the device and datetime format for typed reads (without one, files are read with full type inference)
 
         """
         self.skip_rows = skip_rows
+        self.fast_ingest = fast_ingest
+        self.format_detector = format_detector
         self.max_file_size = 100 * 1024 * 1024  # 100MB limit
 
     @property
@@ -133,6 +140,26 @@ class CSVDataSourceLoader:
             msg = f"File too large: {file_size / 1024 / 1024:.1f}MB > {self.max_file_size / 1024 / 1024:.1f}MB"
             raise ValueError(msg)
 
+        # Typed CSV read: only the mapped columns, explicit dtypes, one datetime format
+        if self.fast_ingest and self.format_detector is not None and file_path.suffix.lower() == ".csv":
+            typed = self._load_csv_typed(file_path, skip_rows, custom_columns)
+            if typed is not None:
+                standardized_df, column_mapping, stats = typed
+                metadata = self.get_file_metadata(file_path)
+                metadata.update(
+                    {
+                        "total_epochs": len(standardized_df),
+                        "start_time": standardized_df[DatabaseColumn.TIMESTAMP].iloc[0],
+                        "end_time": standardized_df[DatabaseColumn.TIMESTAMP].iloc[-1],
+                        "rows_per_second": stats.rows_per_second,
+                    },
+                )
+                return {
+                    "activity_data": standardized_df,
+                    "metadata": metadata,
+                    "column_mapping": column_mapping,
+                }
+
         # Load CSV/Excel file
         try:
             if file_path.suffix.lower() == ".csv":
@@ -190,6 +217,61 @@ class CSVDataSourceLoader:
             "column_mapping": column_mapping,
         }
 
+    def _load_csv_typed(
+        self,
+        file_path: Path,
+        skip_rows: int,
+        custom_columns: dict[str, str] | None,
+    ) -> tuple[pd.DataFrame, ColumnMapping, IngestStats] | None:
+        """
+        Load a CSV file through a typed read plan.
+
+        Returns:
+            Tuple of (standardized DataFrame, column mapping, parse throughput), or None
+            when the file should be loaded with full type inference instead
+
+        """
+        from sleep_scoring_app.core.algorithms.csv_ingest import parse_datetimes, plan_typed_read, read_csv_typed, read_header
+
+        try:
+            header = pd.DataFrame(columns=read_header(file_path, skip_rows))
+            column_mapping = self._create_custom_mapping(header, custom_columns) if custom_columns else self.detect_columns(header)
+            is_valid, _ = self._validate_column_mapping(column_mapping)
+            if not is_valid:
+                return None
+
+            if column_mapping.datetime_column:
+                datetime_columns = [column_mapping.datetime_column]
+            else:
+                datetime_columns = [column for column in (column_mapping.date_column, column_mapping.time_column) if column]
+            value_columns = [
+                column
+                for column in (
+                    column_mapping.activity_column,
+                    column_mapping.axis_x_column,
+                    column_mapping.axis_z_column,
+                    column_mapping.vector_magnitude_column,
+                )
+                if column
+            ]
+            plan = plan_typed_read(file_path, skip_rows, datetime_columns, value_columns, self.format_detector)
+            if plan is None:
+                return None
+
+            df, stats = read_csv_typed(file_path, skip_rows, plan)
+            if df.empty:
+                return None
+            timestamps = parse_datetimes(df, plan.datetime_columns, plan.datetime_format)
+            standardized_df = self._standardize_columns(df, column_mapping, timestamps)
+            is_valid, _ = self.validate_data(standardized_df)
+            if not is_valid:
+                return None
+            return standardized_df, column_mapping, stats
+
+        except Exception as e:
+            logger.debug("Typed read of %s failed, using inferred read: %s", file_path.name, e)
+            return None
+
     def detect_columns(self, df: pd.DataFrame) -> ColumnMapping:
         """
         Detect and map column names.
@@ -369,7 +451,7 @@ class CSVDataSourceLoader:
 
         return len(errors) == 0, errors
 
-    def _standardize_columns(self, df: pd.DataFrame, mapping: ColumnMapping) -> pd.DataFrame:
+    def _standardize_columns(self, df: pd.DataFrame, mapping: ColumnMapping, timestamps: pd.Series | None = None) -> pd.DataFrame:
         """
         Standardize column names to database schema.
 
@@ -383,6 +465,7 @@ class CSVDataSourceLoader:
         Args:
             df: Original DataFrame
             mapping: Column mapping
+            timestamps: Already parsed timestamps (parsed from the mapped columns if None)
 
         Returns:
             DataFrame with standardized columns
@@ -391,7 +474,9 @@ class CSVDataSourceLoader:
         result = pd.DataFrame()
 
         # Process timestamp
-        if mapping.datetime_column:
+        if timestamps is not None:
+            result[DatabaseColumn.TIMESTAMP] = timestamps
+        elif mapping.datetime_column:
             result[DatabaseColumn.TIMESTAMP] = pd.to_datetime(df[mapping.datetime_column])
         elif mapping.date_column:
             if mapping.time_column:
@@ -416,9 +501,8 @@ class CSVDataSourceLoader:
             result[DatabaseColumn.VECTOR_MAGNITUDE] = df[mapping.vector_magnitude_column].fillna(0).astype(float)
         elif DatabaseColumn.AXIS_X in result and DatabaseColumn.AXIS_Y in result and DatabaseColumn.AXIS_Z in result:
             # Calculate vector magnitude from X, Y, Z
-            result[DatabaseColumn.VECTOR_MAGNITUDE] = result.apply(
-                lambda row: math.sqrt(row[DatabaseColumn.AXIS_X] ** 2 + row[DatabaseColumn.AXIS_Y] ** 2 + row[DatabaseColumn.AXIS_Z] ** 2),
-                axis=1,
+            result[DatabaseColumn.VECTOR_MAGNITUDE] = np.sqrt(
+                result[DatabaseColumn.AXIS_X] ** 2 + result[DatabaseColumn.AXIS_Y] ** 2 + result[DatabaseColumn.AXIS_Z] ** 2
             )
 
         return result
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Typed CSV ingest for activity files.
+
+pd.read_csv without hints reads every column of an activity export, infers
+each column's type from its values, and leaves the timestamps to be parsed by
+guessing their format row by row. Both import paths only need the date/time
+columns and a handful of count columns, whose types are known once the header
+and the device are known.
+
+plan_typed_read reads a sample of datetime strings and asks the given format
+detector (FormatDetector in the app) for the device and one datetime format
+that parses the whole sample. read_csv_typed then reads only the needed columns
+with explicit dtypes, in chunks with the C engine or in one pass with the
+pyarrow engine when pyarrow is installed, and reports the parse throughput.
+
+Callers fall back to their original inference-based read when no plan can be
+made or the typed read fails, so files with unusual content still load.
+
+Example:
+    >>> plan = plan_typed_read(path, skip_rows, ["Date", "Time"], ["Axis1", "Vector Magnitude"], FormatDetector())
+    >>> df, stats = read_csv_typed(path, skip_rows, plan)
+    >>> timestamps = parse_datetimes(df, plan.datetime_columns, plan.datetime_format)
+
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+import pandas as pd
+
+from sleep_scoring_app.core.constants import DevicePreset
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 200_000
+DATETIME_SAMPLE_ROWS = 50
+
+
+class ReadFormatDetector(Protocol):
+    """Device and datetime format detection a read plan needs."""
+
+    def detect_device_format(self, file_path: str | Path) -> tuple[DevicePreset, float]: ...
+
+    def detect_datetime_format(self, samples: list[str], device: DevicePreset | None = None) -> str | None: ...
+
+
+@dataclass(frozen=True)
+class CSVReadPlan:
+    """Columns, dtypes and datetime format for a typed read of one activity file."""
+
+    datetime_columns: tuple[str, ...]  # Combined datetime, or date then time
+    value_columns: tuple[str, ...]
+    datetime_format: str
+    device: DevicePreset = DevicePreset.GENERIC_CSV
+
+    @property
+    def usecols(self) -> list[str]:
+        return list(dict.fromkeys(self.datetime_columns + self.value_columns))
+
+    @property
+    def dtypes(self) -> dict[str, type]:
+        dtypes: dict[str, type] = dict.fromkeys(self.value_columns, np.float64)
+        dtypes.update(dict.fromkeys(self.datetime_columns, str))
+        return dtypes
+
+
+@dataclass(frozen=True)
+class IngestStats:
+    """Parse throughput of one typed read."""
+
+    rows: int
+    seconds: float
+    file_bytes: int
+    engine: str
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.file_bytes / 1024 / 1024 / self.seconds if self.seconds > 0 else 0.0
+
+
+def pyarrow_available() -> bool:
+    """Whether the optional pyarrow CSV engine can be used."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def read_header(file_path: str | Path, skip_rows: int) -> list[str]:
+    """Column names of a CSV file without reading its data rows."""
+    return list(pd.read_csv(file_path, skiprows=skip_rows, nrows=0).columns)
+
+
+def combine_datetime_strings(df: pd.DataFrame, datetime_columns: Sequence[str]) -> pd.Series:
+    """Datetime strings from a combined column, or date and time columns joined by a space."""
+    combined = df[datetime_columns[0]].astype(str)
+    for column in datetime_columns[1:]:
+        combined = combined + " " + df[column].astype(str)
+    return combined
+
+
+def plan_typed_read(
+    file_path: str | Path,
+    skip_rows: int,
+    datetime_columns: Sequence[str],
+    value_columns: Sequence[str],
+    detector: ReadFormatDetector,
+) -> CSVReadPlan | None:
+    """
+    Plan a typed read of the given columns.
+
+    Args:
+        file_path: Path to the CSV file
+        skip_rows: Number of header rows to skip
+        datetime_columns: Combined datetime column, or date and time columns
+        value_columns: Numeric columns to read as float64
+        detector: Detects the device and the datetime format of the sample
+
+    Returns:
+        The plan, or None if no single datetime format parses the sampled rows
+
+    """
+    device, _ = detector.detect_device_format(file_path)
+
+    sample = pd.read_csv(file_path, skiprows=skip_rows, nrows=DATETIME_SAMPLE_ROWS, usecols=list(datetime_columns), dtype=str)
+    datetime_format = detector.detect_datetime_format(combine_datetime_strings(sample.dropna(), datetime_columns).tolist(), device)
+    if datetime_format is None:
+        logger.debug("No single datetime format fits %s; using inferred parsing", Path(file_path).name)
+        return None
+
+    return CSVReadPlan(
+        datetime_columns=tuple(datetime_columns),
+        value_columns=tuple(column for column in value_columns if column not in datetime_columns),
+        datetime_format=datetime_format,
+        device=device,
+    )
+
+
+def read_csv_typed(
+    file_path: str | Path,
+    skip_rows: int,
+    plan: CSVReadPlan,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    use_pyarrow: bool | None = None,
+) -> tuple[pd.DataFrame, IngestStats]:
+    """
+    Read only the planned columns with explicit dtypes.
+
+    Args:
+        file_path: Path to the CSV file
+        skip_rows: Number of header rows to skip
+        plan: Columns and dtypes from plan_typed_read
+        chunk_rows: Rows per chunk for the C engine
+        use_pyarrow: Use the pyarrow engine (default: when pyarrow is installed)
+
+    Returns:
+        Tuple of (DataFrame with the planned columns in file order, parse throughput)
+
+    Raises:
+        ValueError: If a value column holds non-numeric values
+        pd.errors.ParserError: If the file cannot be parsed
+
+    """
+    file_path = Path(file_path)
+    if use_pyarrow is None:
+        use_pyarrow = pyarrow_available()
+
+    start = time.perf_counter()
+    df = None
+    engine = "c"
+    if use_pyarrow:
+        try:
+            df = _read_with_pyarrow(file_path, skip_rows, plan)
+            engine = "pyarrow"
+        except Exception as e:
+            logger.debug("pyarrow engine could not read %s, using the C engine: %s", file_path.name, e)
+
+    if df is None:
+        chunks = pd.read_csv(file_path, skiprows=skip_rows, usecols=plan.usecols, dtype=plan.dtypes, chunksize=chunk_rows)
+        df = pd.concat(list(chunks), ignore_index=True)
+    elapsed = time.perf_counter() - start
+
+    stats = IngestStats(rows=len(df), seconds=elapsed, file_bytes=file_path.stat().st_size, engine=engine)
+    logger.info(
+        "Parsed %s: %d rows in %.2fs (%.0f rows/s, %.1f MB/s, %s engine)",
+        file_path.name,
+        stats.rows,
+        stats.seconds,
+        stats.rows_per_second,
+        stats.megabytes_per_second,
+        stats.engine,
+    )
+    return df, stats
+
+
+def _read_with_pyarrow(file_path: Path, skip_rows: int, plan: CSVReadPlan) -> pd.DataFrame:
+    """
+    Read the planned columns with pyarrow's CSV reader.
+
+    pandas' pyarrow engine ignores skiprows and infers timestamp columns before
+    applying dtypes, re-rendering the text of datetime columns; here datetime
+    columns are read as the strings in the file, as the C engine reads them.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    usecols = set(plan.usecols)
+    column_types = {column: pa.string() for column in plan.datetime_columns}
+    column_types.update((column, pa.float64()) for column in plan.value_columns)
+    table = pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(skip_rows=skip_rows),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=[column for column in read_header(file_path, skip_rows) if column in usecols],
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def parse_datetimes(df: pd.DataFrame, datetime_columns: Sequence[str], datetime_format: str) -> pd.Series:
+    """
+    Parse date/time columns with one fixed format.
+
+    Epoch files repeat each date for a whole day and each time of day on every
+    day, so the date and time parts are parsed once per unique value and added,
+    instead of parsing every combined string. Formats without a space between
+    the date and time parts (such as ISO "T" timestamps) are parsed whole.
+
+    Args:
+        df: DataFrame holding the columns
+        datetime_columns: Combined datetime column, or date then time column
+        datetime_format: strptime format of the date and time strings joined by a space
+
+    Returns:
+        Naive datetime64 Series aligned with df (NaT where a date or time is missing)
+
+    Raises:
+        ValueError: If a value does not match the format
+
+    """
+    date_format, _, time_format = datetime_format.partition(" ")
+    if not time_format:
+        return pd.Series(pd.to_datetime(combine_datetime_strings(df, datetime_columns), format=datetime_format), index=df.index)
+
+    if len(datetime_columns) == 1:
+        parts = df[datetime_columns[0]].str.split(" ", n=1, expand=True)
+        if parts.shape[1] != 2:
+            msg = f"Datetime values do not match format {datetime_format}"
+            raise ValueError(msg)
+        dates, times = parts[0], parts[1]
+    else:
+        dates, times = df[datetime_columns[0]], df[datetime_columns[1]]
+
+    day_starts = _parse_unique(dates, date_format)
+    time_of_day = _parse_unique(times, time_format) - np.datetime64("1900-01-01", "ns")
+    return pd.Series(day_starts + time_of_day, index=df.index)
+
+
+def _parse_unique(values: pd.Series, fmt: str) -> np.ndarray:
+    """Parse each distinct string once; missing values become NaT."""
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(uniques.astype(str), format=fmt).to_numpy(dtype="datetime64[ns]")
+    return np.append(parsed, np.datetime64("NaT", "ns"))[codes]
@@ -34,6 +34,7 @@ from typing import TYPE_CHECKING, Any
 from sleep_scoring_app.core.algorithms.cole_kripke import ColeKripkeAlgorithm
 from sleep_scoring_app.core.algorithms.sadeh import SadehAlgorithm
 from sleep_scoring_app.core.algorithms.sleep_scoring_protocol import SleepScoringAlgorithm
+from sleep_scoring_app.core.algorithms.weighted_window import WeightedWindowAlgorithm, WeightedWindowKernel
 
 if TYPE_CHECKING:
     from sleep_scoring_app.utils.config import AppConfig
@@ -73,6 +74,7 @@ class AlgorithmFactory:
         create: Create a configured algorithm instance
         get_available_algorithms: List all registered algorithms
         register_algorithm: Register a new algorithm type
+        register_weighted_window_algorithm: Register a linear-filter algorithm from its kernel
         get_default_algorithm_id: Get the default algorithm identifier
 
     """
@@ -187,6 +189,39 @@ class AlgorithmFactory:
         )
         logger.info("Registered new sleep scoring algorithm: %s", algorithm_id)
 
+    @classmethod
+    def register_weighted_window_algorithm(
+        cls,
+        algorithm_id: str,
+        display_name: str,
+        kernel: WeightedWindowKernel,
+    ) -> None:
+        """
+        Register a linear-filter algorithm defined only by its weighted-window kernel.
+
+        Args:
+            algorithm_id: Unique identifier for the algorithm
+            display_name: Human-readable name for UI display
+            kernel: Window weights, scaling and threshold of the algorithm
+
+        Raises:
+            ValueError: If algorithm_id already registered
+
+        Example:
+            >>> AlgorithmFactory.register_weighted_window_algorithm(
+            ...     'webster_1982',
+            ...     'Webster (1982)',
+            ...     WeightedWindowKernel(weights=(0.15, 0.15, 0.15, 0.08, 0.21, 0.12, 0.13), lags=4, scale=0.025),
+            ... )
+
+        """
+        cls.register_algorithm(
+            algorithm_id,
+            WeightedWindowAlgorithm,
+            display_name,
+            {"kernel": kernel, "identifier": algorithm_id, "name": display_name},
+        )
+
     @classmethod
     def get_default_algorithm_id(cls) -> str:
         """
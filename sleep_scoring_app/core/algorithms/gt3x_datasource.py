@@ -16,6 +16,12 @@ Architecture:
     - Extracts device metadata and settings
     - Converts binary data to DataFrame
     - Supports both raw (high-frequency) and epoch-aggregated output
+    - Epoch output is aggregated chunk by chunk (EpochAccumulator), carrying
+      partial epochs across chunk boundaries, so no full-recording DataFrame
+      or temporaries are built
+    - Raw samples (load_raw_samples, raw mode) can be served from a cache
+      passed in by the caller (data.raw_sample_cache.RawSampleCache),
+      memory-mapped instead of decoded again
 
 Example Usage:
     >>> from sleep_scoring_app.core.algorithms.gt3x_datasource import GT3XDataSourceLoader
@@ -39,8 +45,10 @@ References:
 from __future__ import annotations
 
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Protocol
 
 import numpy as np
 import pandas as pd
@@ -49,10 +57,196 @@ from sleep_scoring_app.core.constants import DatabaseColumn
 from sleep_scoring_app.core.dataclasses import ColumnMapping
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
     from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Samples calibrated and aggregated per chunk (about 2.8 hours at 100 Hz)
+DEFAULT_CHUNK_SAMPLES = 1_000_000
+
+
+@dataclass(frozen=True)
+class RawSamples:
+    """Decoded, calibrated raw samples of one file (memory-mapped when read from a cache)."""
+
+    timestamps: np.ndarray  # float64 Unix seconds
+    samples: np.ndarray  # float32 (n_samples, 3) X, Y, Z in g
+    sample_rate: float
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def datetimes(self) -> pd.DatetimeIndex:
+        """Sample timestamps as naive datetimes."""
+        return pd.to_datetime(self.timestamps, unit="s")
+
+
+class RawSampleStore(Protocol):
+    """Cache of decoded raw samples keyed by file content, as the loader uses it."""
+
+    def key_for(self, file_path: str | Path) -> str: ...
+
+    def get(self, file_hash: str) -> RawSamples | None: ...
+
+    def put(self, file_hash: str, sample_rate: float, n_samples: int, chunks: Iterable[tuple[np.ndarray, np.ndarray]]) -> RawSamples: ...
+
+
+def _sum_epochs(epoch_data: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum absolute axis values and per-sample vector magnitude for each epoch.
+
+    Args:
+        epoch_data: Array of shape (n_epochs, samples_per_epoch, 3) with X, Y, Z in g
+
+    Returns:
+        Tuple of (x, y, z, vector_magnitude) epoch sums
+
+    """
+    # ActiGraph epochs represent total activity (sum of absolute accelerations)
+    epoch_x = np.sum(np.abs(epoch_data[:, :, 0]), axis=1)
+    epoch_y = np.sum(np.abs(epoch_data[:, :, 1]), axis=1)
+    epoch_z = np.sum(np.abs(epoch_data[:, :, 2]), axis=1)
+
+    # VM = sqrt(x^2 + y^2 + z^2) for each sample, then sum over epoch
+    vm_per_sample = np.sqrt(np.sum(epoch_data**2, axis=2))
+    epoch_vm = np.sum(vm_per_sample, axis=1)
+    return epoch_x, epoch_y, epoch_z, epoch_vm
+
+
+def _epoch_dataframe(epoch_start_timestamps: np.ndarray, sums: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> pd.DataFrame:
+    """Build the epoch DataFrame from epoch start timestamps and (x, y, z, vm) sums."""
+    # Convert timestamps to datetime if needed
+    if np.issubdtype(epoch_start_timestamps.dtype, np.datetime64):
+        epoch_datetimes = pd.to_datetime(epoch_start_timestamps)
+    else:
+        # Assume Unix timestamps (float seconds)
+        epoch_datetimes = pd.to_datetime(epoch_start_timestamps, unit="s")
+
+    epoch_x, epoch_y, epoch_z, epoch_vm = sums
+    return pd.DataFrame(
+        {
+            DatabaseColumn.TIMESTAMP: epoch_datetimes,
+            DatabaseColumn.AXIS_X: epoch_x,
+            DatabaseColumn.AXIS_Y: epoch_y,
+            DatabaseColumn.AXIS_Z: epoch_z,
+            DatabaseColumn.VECTOR_MAGNITUDE: epoch_vm,
+        },
+    )
+
+
+class EpochAccumulator:
+    """
+    Incremental epoch aggregation over chunks of raw samples.
+
+    Samples that do not fill an epoch at the end of a chunk are carried over
+    and completed by the next chunk, so the epochs are the same as aggregating
+    the whole recording at once. Only complete epochs are emitted.
+
+    Example:
+        >>> accumulator = EpochAccumulator(samples_per_epoch=30 * 60)
+        >>> for timestamps, samples in chunks:
+        ...     accumulator.add(timestamps, samples)
+        >>> df = accumulator.to_dataframe()
+
+    """
+
+    def __init__(self, samples_per_epoch: int) -> None:
+        """
+        Start an empty accumulator.
+
+        Args:
+            samples_per_epoch: Number of raw samples in one epoch
+
+        """
+        if samples_per_epoch < 1:
+            msg = f"samples_per_epoch must be at least 1, got {samples_per_epoch}"
+            raise ValueError(msg)
+        self.samples_per_epoch = samples_per_epoch
+        self.total_samples = 0
+        self._carry_timestamps: np.ndarray | None = None
+        self._carry_samples: np.ndarray | None = None
+        self._starts: list[np.ndarray] = []
+        self._sums: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def add(self, timestamps: np.ndarray, samples: np.ndarray) -> None:
+        """
+        Aggregate one chunk of samples.
+
+        Args:
+            timestamps: Sample timestamps (datetime64 or Unix seconds), in order
+            samples: Array of shape (n_samples, 3) with X, Y, Z in g
+
+        """
+        self.total_samples += len(samples)
+        if self._carry_samples is not None:
+            timestamps = np.concatenate((self._carry_timestamps, timestamps))
+            samples = np.concatenate((self._carry_samples, samples))
+
+        n_epochs = len(samples) // self.samples_per_epoch
+        complete = n_epochs * self.samples_per_epoch
+        if n_epochs > 0:
+            epoch_data = samples[:complete].reshape(n_epochs, self.samples_per_epoch, 3)
+            self._sums.append(_sum_epochs(epoch_data))
+            self._starts.append(timestamps[: complete : self.samples_per_epoch].copy())
+
+        # Copy the partial epoch so the chunk itself can be released
+        remainder = len(samples) - complete
+        self._carry_timestamps = timestamps[complete:].copy() if remainder else None
+        self._carry_samples = samples[complete:].copy() if remainder else None
+
+    @property
+    def epoch_count(self) -> int:
+        """Number of complete epochs aggregated so far."""
+        return sum(len(starts) for starts in self._starts)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Complete epochs as a DataFrame (trailing samples short of an epoch are dropped)."""
+        if not self._starts:
+            return pd.DataFrame(
+                columns=[
+                    DatabaseColumn.TIMESTAMP,
+                    DatabaseColumn.AXIS_X,
+                    DatabaseColumn.AXIS_Y,
+                    DatabaseColumn.AXIS_Z,
+                    DatabaseColumn.VECTOR_MAGNITUDE,
+                ]
+            )
+        sums = tuple(np.concatenate([chunk_sums[axis] for chunk_sums in self._sums]) for axis in range(4))
+        return _epoch_dataframe(np.concatenate(self._starts), sums)
+
+
+def iter_sample_chunks(reader: Any, chunk_samples: int = DEFAULT_CHUNK_SAMPLES) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield calibrated (timestamps, X/Y/Z) chunks of an open pygt3x FileReader.
+
+    Equivalent to reader.to_pandas(calibrate=True) sliced into chunks: samples
+    are calibrated and downcast to float32 one chunk at a time, in timestamp order.
+
+    Args:
+        reader: Open pygt3x FileReader
+        chunk_samples: Maximum number of samples per chunk
+
+    """
+    acceleration = reader.acceleration
+    n_samples = len(acceleration)
+    timestamps = acceleration[:, 0]
+
+    # pygt3x returns seconds in order; sort (stably, as to_pandas does) only if needed
+    order = None
+    for start in range(0, n_samples, chunk_samples):
+        chunk = timestamps[max(start - 1, 0) : start + chunk_samples]
+        if not bool(np.all(chunk[1:] >= chunk[:-1])):
+            order = np.argsort(timestamps, kind="stable")
+            break
+
+    for start in range(0, n_samples, chunk_samples):
+        rows = acceleration[start : start + chunk_samples] if order is None else acceleration[order[start : start + chunk_samples]]
+        samples = rows[:, 1:4]
+        if not reader.nhanes:
+            samples = reader.calibrate_acceleration(samples)
+        yield rows[:, 0].copy(), np.asarray(samples, dtype=np.float32)
+
 
 class GT3XDataSourceLoader:
     """
@@ -68,23 +262,35 @@ class GT3XDataSourceLoader:
     Attributes:
         epoch_length_seconds: Length of epoch window in seconds (default: 60)
         return_raw: If True, return raw samples; if False, aggregate to epochs
+        chunk_samples: Samples calibrated and aggregated at a time in epoch mode
+        raw_cache: Optional on-disk cache of decoded raw samples, keyed by file hash
 
     """
 
     # GT3X format constants
     MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB limit
 
-    def __init__(self, epoch_length_seconds: int = 60, return_raw: bool = False) -> None:
+    def __init__(
+        self,
+        epoch_length_seconds: int = 60,
+        return_raw: bool = False,
+        chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+        raw_cache: RawSampleStore | None = None,
+    ) -> None:
         """
         Initialize GT3X loader.
 
         Args:
             epoch_length_seconds: Epoch length in seconds for aggregation (default: 60)
             return_raw: If True, return raw samples without aggregation (default: False)
+            chunk_samples: Samples calibrated and aggregated at a time in epoch mode
+            raw_cache: Cache of decoded raw samples used by raw mode and load_raw_samples (default: none)
 
         """
         self.epoch_length_seconds = epoch_length_seconds
         self.return_raw = return_raw
+        self.chunk_samples = chunk_samples
+        self.raw_cache = raw_cache
 
     @property
     def name(self) -> str:
@@ -170,33 +376,44 @@ class GT3XDataSourceLoader:
             msg = "pygt3x is required for GT3X file reading. Install with: pip install pygt3x"
             raise ImportError(msg) from e
 
-        # Load GT3X file using pygt3x
-        try:
-            with FileReader(str(file_path)) as reader:
-                # Load data with calibration to get g-units
-                df = reader.to_pandas(calibrate=True)
+        # Raw samples come from the cache when it has them
+        read_started = time.perf_counter()
+        if self.return_raw:
+            raw = self.load_raw_samples(file_path)
+            sample_rate = raw.sample_rate
+            total_samples = len(raw)
+            serial_number, timezone_offset = self._read_device_info(file_path)
 
-                # Extract metadata
-                sample_rate = reader.info.sample_rate
-                start_time = reader.info.start_date
-                serial_number = getattr(reader.info, "serial_number", "UNKNOWN")
-                timezone_offset = getattr(reader.info, "timezone", None)
+        # Load GT3X file using pygt3x
+        else:
+            try:
+                with FileReader(str(file_path)) as reader:
+                    # Extract metadata
+                    sample_rate = reader.info.sample_rate
+                    serial_number = getattr(reader.info, "serial_number", "UNKNOWN")
+                    timezone_offset = getattr(reader.info, "timezone", None)
+
+                    # Calibrate and aggregate chunk by chunk instead of building the full sample DataFrame
+                    accumulator = EpochAccumulator(int(sample_rate * self.epoch_length_seconds))
+                    for chunk_timestamps, chunk_samples in iter_sample_chunks(reader, self.chunk_samples):
+                        accumulator.add(chunk_timestamps, chunk_samples)
+                    total_samples = accumulator.total_samples
 
-                # Extract accelerometer data
-                # df has columns: X, Y, Z, IdleSleepMode
-                # Index is timestamps
-                timestamps = df.index.to_numpy()
-                acc_data = df[["X", "Y", "Z"]].values
+            except Exception as e:
+                msg = f"Error reading GT3X file with pygt3x: {e}"
+                raise ValueError(msg) from e
 
-        except Exception as e:
-            msg = f"Error reading GT3X file with pygt3x: {e}"
-            raise ValueError(msg) from e
+        read_seconds = time.perf_counter() - read_started
+        samples_per_second = total_samples / read_seconds if read_seconds > 0 else None
+        logger.info("Read %d GT3X samples from %s in %.2f s (%.0f samples/s)", total_samples, file_path.name, read_seconds, samples_per_second or 0)
 
         # Create DataFrame based on mode
         if self.return_raw:
-            result_df = self._create_raw_dataframe(acc_data, timestamps, sample_rate)
+            result_df = self._create_raw_dataframe(raw.samples, raw.timestamps, sample_rate)
         else:
-            result_df = self._create_epoch_dataframe(acc_data, timestamps, sample_rate)
+            if accumulator.epoch_count == 0:
+                logger.warning("Not enough samples for even one epoch, returning empty DataFrame")
+            result_df = accumulator.to_dataframe()
 
         if result_df.empty:
             msg = f"No data in GT3X file: {file_path}"
@@ -220,7 +437,8 @@ class GT3XDataSourceLoader:
             "end_time": result_df[DatabaseColumn.TIMESTAMP].iloc[-1],
             "timezone_offset": timezone_offset,
             "total_epochs": len(result_df) if not self.return_raw else None,
-            "total_samples": len(acc_data),
+            "total_samples": total_samples,
+            "samples_per_second": samples_per_second,
             "epoch_length_seconds": None if self.return_raw else self.epoch_length_seconds,
         }
 
@@ -230,6 +448,83 @@ class GT3XDataSourceLoader:
             "column_mapping": column_mapping,
         }
 
+    def load_raw_samples(self, file_path: str | Path, file_hash: str | None = None) -> RawSamples:
+        """
+        Decoded, calibrated raw samples of a GT3X file.
+
+        With a raw_cache, samples are decoded and written to the cache on first
+        use and memory-mapped from it afterwards; the returned arrays are then
+        read-only and can be passed directly to calibrate, impute_timegaps and
+        VanHeesNonwearAlgorithm.detect.
+
+        Args:
+            file_path: Path to the GT3X file
+            file_hash: SHA256 of the file content, if already known (computed otherwise)
+
+        Returns:
+            RawSamples with float64 Unix-second timestamps and float32 (n_samples, 3) X, Y, Z in g
+
+        Raises:
+            FileNotFoundError: If file does not exist
+            ValueError: If file format is invalid or corrupted
+            ImportError: If pygt3x library is not installed
+
+        """
+        from pathlib import Path
+
+        file_path = Path(file_path)
+        if not file_path.exists():
+            msg = f"File not found: {file_path}"
+            raise FileNotFoundError(msg)
+
+        if self.raw_cache is not None:
+            file_hash = file_hash or self.raw_cache.key_for(file_path)
+            cached = self.raw_cache.get(file_hash)
+            if cached is not None:
+                logger.debug("Mapped %d cached raw samples for %s", len(cached), file_path.name)
+                return cached
+
+        try:
+            from pygt3x.reader import FileReader
+        except ImportError as e:
+            msg = "pygt3x is required for GT3X file reading. Install with: pip install pygt3x"
+            raise ImportError(msg) from e
+
+        try:
+            with FileReader(str(file_path)) as reader:
+                sample_rate = float(reader.info.sample_rate)
+                chunks = iter_sample_chunks(reader, self.chunk_samples)
+                if self.raw_cache is not None:
+                    return self.raw_cache.put(file_hash, sample_rate, len(reader.acceleration), chunks)
+
+                chunk_list = list(chunks)
+        except Exception as e:
+            msg = f"Error reading GT3X file with pygt3x: {e}"
+            raise ValueError(msg) from e
+
+        if not chunk_list:
+            return RawSamples(timestamps=np.zeros(0), samples=np.zeros((0, 3), dtype=np.float32), sample_rate=sample_rate)
+        return RawSamples(
+            timestamps=np.concatenate([timestamps for timestamps, _ in chunk_list]),
+            samples=np.concatenate([samples for _, samples in chunk_list]),
+            sample_rate=sample_rate,
+        )
+
+    @staticmethod
+    def _read_device_info(file_path: Path) -> tuple[str, str | None]:
+        """Serial number and timezone of a GT3X file, from info.txt only."""
+        import zipfile
+
+        try:
+            from pygt3x.components import Info
+
+            with zipfile.ZipFile(file_path) as archive:
+                info = Info.read_zip(archive)
+        except Exception as e:
+            msg = f"Error reading GT3X file with pygt3x: {e}"
+            raise ValueError(msg) from e
+        return getattr(info, "serial_number", "UNKNOWN"), getattr(info, "timezone", None)
+
     def _create_epoch_dataframe(self, raw_data: np.ndarray, timestamps: np.ndarray, sample_rate: float) -> pd.DataFrame:
         """
         Create epoch-aggregated DataFrame from raw samples.
@@ -274,39 +569,8 @@ class GT3XDataSourceLoader:
         epoch_data = epoch_data.reshape(n_epochs, samples_per_epoch, 3)
         epoch_timestamps = epoch_timestamps.reshape(n_epochs, samples_per_epoch)
 
-        # Sum absolute values for each axis
-        # ActiGraph epochs represent total activity (sum of absolute accelerations)
-        epoch_x = np.sum(np.abs(epoch_data[:, :, 0]), axis=1)
-        epoch_y = np.sum(np.abs(epoch_data[:, :, 1]), axis=1)
-        epoch_z = np.sum(np.abs(epoch_data[:, :, 2]), axis=1)
-
-        # Calculate vector magnitude for each epoch
-        # VM = sqrt(x^2 + y^2 + z^2) for each sample, then sum over epoch
-        vm_per_sample = np.sqrt(np.sum(epoch_data**2, axis=2))
-        epoch_vm = np.sum(vm_per_sample, axis=1)
-
         # Use first timestamp of each epoch
-        epoch_start_timestamps = epoch_timestamps[:, 0]
-
-        # Convert timestamps to datetime if needed
-        if np.issubdtype(epoch_start_timestamps.dtype, np.datetime64):
-            epoch_datetimes = pd.to_datetime(epoch_start_timestamps)
-        else:
-            # Assume Unix timestamps (float seconds)
-            epoch_datetimes = pd.to_datetime(epoch_start_timestamps, unit="s")
-
-        # Create DataFrame
-        df = pd.DataFrame(
-            {
-                DatabaseColumn.TIMESTAMP: epoch_datetimes,
-                DatabaseColumn.AXIS_X: epoch_x,
-                DatabaseColumn.AXIS_Y: epoch_y,
-                DatabaseColumn.AXIS_Z: epoch_z,
-                DatabaseColumn.VECTOR_MAGNITUDE: epoch_vm,
-            },
-        )
-
-        return df
+        return _epoch_dataframe(epoch_timestamps[:, 0], _sum_epochs(epoch_data))
 
     def _create_raw_dataframe(self, raw_data: np.ndarray, timestamps: np.ndarray, sample_rate: float) -> pd.DataFrame:
         """
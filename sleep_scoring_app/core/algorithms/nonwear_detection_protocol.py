@@ -140,3 +140,8 @@ class NonwearDetectionAlgorithm(Protocol):
 
         """
         ...
+
+
+def nonwear_parameters(algorithm: NonwearDetectionAlgorithm, activity_column: str | None) -> dict[str, Any]:
+    """Settings identifying a nonwear result: the detector's parameters and the column it ran on."""
+    return {"activity_column": activity_column, **algorithm.get_parameters()}
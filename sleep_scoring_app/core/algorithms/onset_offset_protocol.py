@@ -11,8 +11,10 @@ Critical distinction:
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Protocol, runtime_checkable
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+if TYPE_CHECKING:
+    from datetime import datetime
 
 
 @runtime_checkable
@@ -0,0 +1,199 @@
+"""
+Prefix-sum engine for sleep period metrics.
+
+Sleep period metrics (TST, WASO, efficiency, awakenings, total counts, movement
+and fragmentation indices, Choi/NWT totals) are sums and run counts over the
+epochs between an onset and an offset. SleepMetricsEngine builds cumulative
+sums of the sleep epochs, activity, non-zero activity and nonwear masks, plus a
+run-length index of the sleep/wake series, once per loaded window. Any
+(onset, offset) pair is then evaluated in O(log n), so the metrics can follow a
+marker while it is being dragged.
+
+The results are identical to scanning the epochs one by one (the original
+DataManager.calculate_sleep_metrics loop), including its ActiLife-compatible
+WASO and awakening definitions.
+
+Example:
+    >>> engine = SleepMetricsEngine(sleep_scores, axis_y_counts, x_data, choi_mask)
+    >>> metrics = engine.evaluate_timestamps(onset_timestamp, offset_timestamp)
+    >>> metrics.total_sleep_time, metrics.waso, metrics.awakenings
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from sleep_scoring_app.core.algorithms.run_length import SLEEP, SleepWakeRunIndex
+from sleep_scoring_app.core.algorithms.time_index import EpochTimeIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# Largest total a float64 cumulative sum of integers represents exactly
+_EXACT_FLOAT_SUM_LIMIT = 2.0**53
+
+
+@dataclass(frozen=True)
+class PeriodMetrics:
+    """Unrounded metrics for one sleep period (epoch counts are minutes for 60s epochs)."""
+
+    onset_index: int
+    offset_index: int
+    total_minutes_in_bed: int
+    total_sleep_time: int
+    waso: int
+    efficiency: float
+    awakenings: int
+    average_awakening_length: float
+    total_activity: float
+    movement_events: int
+    movement_index: float
+    fragmentation_index: float
+    sleep_fragmentation_index: float
+    total_choi_counts: float
+    total_nwt_counts: float
+
+
+class _PrefixSum:
+    """Range sums of a per-epoch series in O(1) when they can be computed exactly."""
+
+    def __init__(self, values: Sequence[Any] | np.ndarray) -> None:
+        self._values = values
+        self._length = len(values)
+        array = np.asarray(values, dtype=np.float64)
+        exact = bool(np.all(np.isfinite(array)) and np.all(array == np.round(array)) and np.sum(np.abs(array)) < _EXACT_FLOAT_SUM_LIMIT)
+        # Non-integer or non-finite values are summed epoch by epoch so rounding matches the original loop
+        self._cumulative = np.concatenate(([0.0], np.cumsum(array))) if exact else None
+
+    def total(self, start: int, stop: int) -> float:
+        """Sum of values[start:stop], clipped to the series."""
+        start, stop = max(start, 0), min(stop, self._length)
+        if stop <= start:
+            return 0
+        if self._cumulative is not None:
+            return float(self._cumulative[stop] - self._cumulative[start])
+        total = 0
+        for value in self._values[start:stop]:
+            total += value
+        return total
+
+
+class SleepMetricsEngine:
+    """
+    Sleep period metrics for any onset/offset pair of one loaded window.
+
+    Build one engine per window (sleep scores, activity and nonwear results of
+    the plot); the inputs are not copied and must not be modified afterwards.
+    """
+
+    def __init__(
+        self,
+        sleep_scores: Sequence[int] | np.ndarray | None,
+        activity_data: Sequence[float] | np.ndarray | None,
+        x_data: Sequence[float] | np.ndarray | None,
+        choi_results: Sequence[int] | np.ndarray | None = None,
+        nwt_sensor_results: Sequence[int] | np.ndarray | None = None,
+    ) -> None:
+        """
+        Build prefix sums over the window's series.
+
+        Args:
+            sleep_scores: Sleep/wake classifications (1=sleep, 0=wake)
+            activity_data: Activity counts aligned with sleep_scores
+            x_data: Epoch Unix timestamps, used to locate marker timestamps
+            choi_results: Per-epoch Choi nonwear mask (1=nonwear)
+            nwt_sensor_results: Per-epoch nonwear sensor mask (1=nonwear)
+
+        Missing (None) series are treated as empty.
+
+        Raises:
+            TypeError, ValueError: If a series contains non-numeric values
+
+        """
+        self.sources = (sleep_scores, activity_data, x_data, choi_results, nwt_sensor_results)
+        sleep_scores = sleep_scores if sleep_scores is not None else []
+        activity_data = activity_data if activity_data is not None else []
+        x_data = x_data if x_data is not None else []
+        self._sleep_length = len(sleep_scores)
+        self._activity_length = len(activity_data)
+
+        self._runs = SleepWakeRunIndex(sleep_scores)
+        self._sleep = _PrefixSum(np.asarray(np.asarray(sleep_scores) == SLEEP, dtype=np.int64))
+        self._activity = _PrefixSum(activity_data)
+        self._movement = _PrefixSum(np.asarray(np.asarray(activity_data, dtype=np.float64) > 0, dtype=np.int64))
+        self._choi = _PrefixSum(choi_results if choi_results is not None else [])
+        self._nwt = _PrefixSum(nwt_sensor_results if nwt_sensor_results is not None else [])
+
+        self._time_index = EpochTimeIndex(np.asarray(x_data, dtype=np.float64))
+
+    def built_from(
+        self,
+        sleep_scores: Any,
+        activity_data: Any,
+        x_data: Any,
+        choi_results: Any = None,
+        nwt_sensor_results: Any = None,
+    ) -> bool:
+        """True if the engine was built from exactly these (unmodified) objects."""
+        return all(a is b for a, b in zip(self.sources, (sleep_scores, activity_data, x_data, choi_results, nwt_sensor_results), strict=True))
+
+    def index_of(self, timestamp: float) -> int | None:
+        """Index of the epoch closest to timestamp (the earliest on ties), or None without epochs."""
+        return self._time_index.nearest(timestamp)
+
+    def evaluate_timestamps(self, onset_timestamp: float, offset_timestamp: float) -> PeriodMetrics | None:
+        """Metrics for the epochs closest to the marker timestamps, or None without epochs."""
+        onset_idx = self.index_of(min(onset_timestamp, offset_timestamp))
+        offset_idx = self.index_of(max(onset_timestamp, offset_timestamp))
+        if onset_idx is None or offset_idx is None:
+            return None
+        return self.evaluate(onset_idx, offset_idx)
+
+    def evaluate(self, onset_idx: int, offset_idx: int) -> PeriodMetrics:
+        """
+        Metrics for the epochs from onset_idx up to (excluding) offset_idx.
+
+        Choi and NWT totals include the offset epoch, as in the exported files.
+        """
+        end = min(offset_idx, self._sleep_length)
+        activity_end = min(end, self._activity_length)
+
+        total_activity = self._activity.total(onset_idx, activity_end)
+        movement_events = int(self._movement.total(onset_idx, activity_end))
+        sleep_minutes = int(self._sleep.total(onset_idx, end))
+        total_minutes_in_bed = offset_idx - onset_idx
+
+        # First and last actual sleep epochs bound WASO and awakenings (ActiLife-compatible)
+        first_sleep_idx = self._runs.first_window(SLEEP, 1, onset_idx, end - 1)
+        last_sleep_idx = self._runs.last_window(SLEEP, 1, onset_idx, end - 1)
+        if first_sleep_idx is not None and last_sleep_idx is not None:
+            total_sleep_time = sleep_minutes
+            waso = (last_sleep_idx - first_sleep_idx + 1) - sleep_minutes
+            # Every sleep run starting after the first sleep epoch ends one awakening
+            awakenings = self._runs.count_runs(SLEEP, first_sleep_idx + 1, last_sleep_idx)
+        else:
+            total_sleep_time = 0
+            waso = total_minutes_in_bed
+            awakenings = 0
+
+        return PeriodMetrics(
+            onset_index=onset_idx,
+            offset_index=offset_idx,
+            total_minutes_in_bed=total_minutes_in_bed,
+            total_sleep_time=total_sleep_time,
+            waso=waso,
+            efficiency=(total_sleep_time / total_minutes_in_bed * 100) if total_minutes_in_bed > 0 else 0,
+            awakenings=awakenings,
+            average_awakening_length=waso / awakenings if awakenings else 0,
+            total_activity=total_activity,
+            movement_events=movement_events,
+            movement_index=movement_events / total_minutes_in_bed if total_minutes_in_bed > 0 else 0,
+            fragmentation_index=(awakenings / total_sleep_time * 100) if total_sleep_time > 0 else 0,
+            sleep_fragmentation_index=((waso + movement_events) / total_minutes_in_bed * 100) if total_minutes_in_bed > 0 else 0,
+            total_choi_counts=self._choi.total(onset_idx, offset_idx + 1),
+            total_nwt_counts=self._nwt.total(onset_idx, offset_idx + 1),
+        )
@@ -0,0 +1,209 @@
+"""
+Run-length index over sleep/wake classifications.
+
+Onset/offset rules ask two kinds of questions of a scored series: "where is the
+first window of at least N consecutive sleep (or wake) epochs starting at or
+after index i" and "where is the last such window before index j". Scanning
+every candidate position and checking its N epochs costs O(n * N) per query,
+and the plot repeats the query on every marker drag.
+
+SleepWakeRunIndex stores the maximal runs of sleep and of wake epochs once per
+scoring result and answers both questions with a binary search over the runs.
+It is also a read-only sequence of the scores, so it can be passed as
+sleep_scores to any OnsetOffsetRule; the built-in rules reuse it instead of
+building their own.
+
+Example:
+    >>> index = SleepWakeRunIndex([0, 1, 1, 1, 0, 1, 1, 1, 1, 0])
+    >>> index.first_window(SLEEP, 3, 2, 9)
+    5
+    >>> index.last_window(SLEEP, 3, 0, 9, followed_by_other=True)
+    6
+
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from datetime import datetime
+
+SLEEP = 1
+WAKE = 0
+
+
+class _Runs(NamedTuple):
+    """Maximal runs of one value, as sorted start and (inclusive) end indices."""
+
+    starts: list[int]
+    ends: list[int]
+
+
+class SleepWakeRunIndex(Sequence):
+    """
+    Maximal sleep and wake runs of a sleep/wake series (1=sleep, 0=wake).
+
+    Epochs with any other value belong to neither kind of run. Build one per
+    scoring result; queries are O(log runs) after the first query for a given
+    window length.
+    """
+
+    def __init__(self, sleep_scores: Sequence[int] | np.ndarray) -> None:
+        """
+        Index the sleep and wake runs of a scored series.
+
+        Args:
+            sleep_scores: Sleep/wake classifications (1=sleep, 0=wake)
+
+        """
+        self.scores = sleep_scores
+        values = np.asarray(sleep_scores)
+        self._length = len(values)
+        self._is_value = {SLEEP: np.asarray(values == SLEEP, dtype=bool), WAKE: np.asarray(values == WAKE, dtype=bool)}
+        self._runs = {value: self._find_runs(mask) for value, mask in self._is_value.items()}
+        self._filtered: dict[tuple[int, int, str | None], _Runs] = {}
+
+    @classmethod
+    def from_scores(cls, sleep_scores: Sequence[int] | np.ndarray | SleepWakeRunIndex) -> SleepWakeRunIndex:
+        """Return sleep_scores if it is already an index, otherwise index it."""
+        if isinstance(sleep_scores, SleepWakeRunIndex):
+            return sleep_scores
+        return cls(sleep_scores)
+
+    # === Sequence API ===
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.scores[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.scores)
+
+    # === Queries ===
+
+    def first_window(self, value: int, length: int, lo: int, hi: int, preceded_by_other: bool = False) -> int | None:
+        """
+        First start index i in [lo, hi] of `length` consecutive epochs equal to value.
+
+        Args:
+            value: SLEEP or WAKE
+            length: Required number of consecutive epochs (at least 1)
+            lo: Smallest allowed start index
+            hi: Largest allowed start index
+            preceded_by_other: Only accept windows whose previous epoch has the
+                opposite value (the window then starts a run)
+
+        Returns:
+            Start index of the window, or None if there is none
+
+        """
+        runs = self._runs_at_least(value, length, "preceded" if preceded_by_other else None)
+        if preceded_by_other:
+            r = bisect.bisect_left(runs.starts, lo)
+            if r < len(runs.starts) and runs.starts[r] <= hi:
+                return runs.starts[r]
+            return None
+
+        # Windows in run r start anywhere in [start, end - length + 1]
+        r = bisect.bisect_left(runs.ends, lo + length - 1)
+        if r < len(runs.ends):
+            candidate = max(runs.starts[r], lo)
+            if candidate <= hi:
+                return candidate
+        return None
+
+    def last_window(self, value: int, length: int, lo: int, hi: int, followed_by_other: bool = False) -> int | None:
+        """
+        Last start index i in [lo, hi] of `length` consecutive epochs equal to value.
+
+        Args:
+            value: SLEEP or WAKE
+            length: Required number of consecutive epochs (at least 1)
+            lo: Smallest allowed start index
+            hi: Largest allowed start index
+            followed_by_other: Only accept windows whose next epoch has the
+                opposite value (the window then ends a run)
+
+        Returns:
+            Start index of the window, or None if there is none
+
+        """
+        runs = self._runs_at_least(value, length, "followed" if followed_by_other else None)
+        if followed_by_other:
+            r = bisect.bisect_right(runs.ends, hi + length - 1) - 1
+            if r >= 0 and runs.ends[r] - length + 1 >= lo:
+                return runs.ends[r] - length + 1
+            return None
+
+        r = bisect.bisect_right(runs.starts, hi) - 1
+        if r >= 0:
+            candidate = min(runs.ends[r] - length + 1, hi)
+            if candidate >= lo:
+                return candidate
+        return None
+
+    def count_runs(self, value: int, lo: int, hi: int) -> int:
+        """Number of maximal runs of value that start in [lo, hi]."""
+        starts = self._runs[value].starts
+        return max(0, bisect.bisect_right(starts, hi) - bisect.bisect_left(starts, lo))
+
+    # === Construction ===
+
+    @staticmethod
+    def _find_runs(mask: np.ndarray) -> _Runs:
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        return _Runs(starts.tolist(), ends.tolist())
+
+    def _runs_at_least(self, value: int, length: int, neighbour: str | None) -> _Runs:
+        """Runs of value at least `length` long, optionally bordered by the opposite value."""
+        if length < 1:
+            msg = f"length must be at least 1, got {length}"
+            raise ValueError(msg)
+
+        cache_key = (value, length, neighbour)
+        if cache_key not in self._filtered:
+            runs = self._runs[value]
+            starts = np.asarray(runs.starts, dtype=np.int64)
+            ends = np.asarray(runs.ends, dtype=np.int64)
+            keep = ends - starts + 1 >= length
+            other = self._is_value[WAKE if value == SLEEP else SLEEP]
+            if neighbour == "preceded":
+                keep &= starts > 0
+                keep[keep] &= other[starts[keep] - 1]
+            elif neighbour == "followed":
+                keep &= ends < self._length - 1
+                keep[keep] &= other[ends[keep] + 1]
+            self._filtered[cache_key] = _Runs(starts[keep].tolist(), ends[keep].tolist())
+        return self._filtered[cache_key]
+
+
+def find_marker_indices(
+    timestamps: Sequence[datetime],
+    sleep_start_marker: datetime,
+    sleep_end_marker: datetime,
+) -> tuple[int | None, int | None]:
+    """
+    Indices of the first epoch at or after the start marker and the last epoch at or before the end marker.
+
+    Args:
+        timestamps: Epoch timestamps in ascending order
+        sleep_start_marker: User-provided approximate sleep start time
+        sleep_end_marker: User-provided approximate sleep end time
+
+    Returns:
+        Tuple of (start_index, end_index); either is None if no epoch qualifies
+
+    """
+    start_idx = bisect.bisect_left(timestamps, sleep_start_marker)
+    end_idx = bisect.bisect_right(timestamps, sleep_end_marker) - 1
+    return (start_idx if start_idx < len(timestamps) else None), (end_idx if end_idx >= 0 else None)
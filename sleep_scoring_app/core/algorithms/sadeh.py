@@ -32,8 +32,9 @@ import logging
 from typing import TYPE_CHECKING
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_and_collapse_epochs
+from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_activity_counts, validate_and_collapse_epochs
 
 if TYPE_CHECKING:
     import pandas as pd
@@ -52,6 +53,47 @@ COEFFICIENT_C: float = 1.08
 COEFFICIENT_D: float = 0.056
 COEFFICIENT_E: float = 0.703
 
+# Forward-looking SD window used by ActiLife (current epoch + 5 following epochs)
+SD_WINDOW_SIZE: int = 6
+_PAD_WIDTH: int = WINDOW_SIZE // 2
+
+
+def _score_capped_activity(capped_activity: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Vectorized Sadeh kernel operating on capped activity counts.
+
+    All windows are evaluated at once through strided views over the
+    zero-padded series. Each window is copied into a contiguous block before
+    reduction so NumPy sums every row in the same order as a standalone
+    ``np.mean``/``np.std`` call on that window, keeping the output bit-for-bit
+    identical to the per-epoch reference implementation.
+
+    Args:
+        capped_activity: 1-D float64 array of activity counts already capped at ACTIVITY_CAP
+
+    Returns:
+        Integer array of sleep/wake classifications (1=sleep, 0=wake)
+
+    """
+    n = len(capped_activity)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+
+    padded_activity = np.pad(capped_activity, pad_width=_PAD_WIDTH, mode="constant", constant_values=0)
+
+    logger.info("SADEH ALGORITHM: Using FORWARD ROLLING STD (6-epoch window, ddof=1) - ActiLife compatible")
+    sd_windows = np.ascontiguousarray(sliding_window_view(padded_activity[: n + SD_WINDOW_SIZE - 1], SD_WINDOW_SIZE))
+    rolling_sds = np.std(sd_windows, axis=1, ddof=1)
+
+    windows = np.ascontiguousarray(sliding_window_view(padded_activity, WINDOW_SIZE))
+    avg = np.mean(windows, axis=1)
+    nats = np.count_nonzero((windows >= NATS_MIN) & (windows < NATS_MAX), axis=1)
+    lg = np.log(capped_activity + 1)
+
+    ps = COEFFICIENT_A - (COEFFICIENT_B * avg) - (COEFFICIENT_C * nats) - (COEFFICIENT_D * rolling_sds) - (COEFFICIENT_E * lg)
+
+    return (ps > threshold).astype(int)
+
 
 def sadeh_score(df: pd.DataFrame, threshold: float = -4.0) -> pd.DataFrame:
     """
@@ -116,55 +158,13 @@ def sadeh_score(df: pd.DataFrame, threshold: float = -4.0) -> pd.DataFrame:
         msg = "DataFrame must contain 'Axis1' column. Sadeh algorithm ALWAYS uses Axis1."
         raise ValueError(msg)
 
-    activity_data = df["Axis1"].to_numpy(dtype=np.float64)
-
-    if np.any(np.isnan(activity_data)):
-        msg = "Axis1 column contains NaN (Not a Number) values"
-        raise ValueError(msg)
-
-    if np.any(np.isinf(activity_data)):
-        msg = "Axis1 column contains infinite values"
-        raise ValueError(msg)
-
-    if np.any(activity_data < 0):
-        negative_indices = np.where(activity_data < 0)[0]
-        msg = f"Axis1 column contains negative values at indices: {negative_indices[:10].tolist()}"
-        raise ValueError(msg)
+    activity_data = validate_activity_counts(df["Axis1"].to_numpy(dtype=np.float64), "Axis1 column")
 
     logger.debug(f"Running Sadeh algorithm on {len(activity_data)} epochs")
 
     capped_activity = np.minimum(activity_data, ACTIVITY_CAP)
 
-    sleep_wake_scores = np.zeros(len(capped_activity), dtype=int)
-
-    padded_activity = np.pad(capped_activity, pad_width=5, mode="constant", constant_values=0)
-
-    logger.info("SADEH ALGORITHM: Using FORWARD ROLLING STD (6-epoch window, ddof=1) - ActiLife compatible")
-    rolling_sds = np.zeros(len(capped_activity))
-    for i in range(len(capped_activity)):
-        sd_window = padded_activity[i : i + 6]
-        if len(sd_window) >= 2:
-            rolling_sds[i] = np.std(sd_window, ddof=1)
-        else:
-            rolling_sds[i] = 0.0
-
-    for i in range(len(capped_activity)):
-        window_start = i
-        window_end = i + WINDOW_SIZE
-        window = padded_activity[window_start:window_end]
-
-        avg = np.mean(window)
-
-        nats = np.sum((window >= NATS_MIN) & (window < NATS_MAX))
-
-        sd = rolling_sds[i]
-
-        current_count = capped_activity[i]
-        lg = np.log(current_count + 1)
-
-        ps = COEFFICIENT_A - (COEFFICIENT_B * avg) - (COEFFICIENT_C * nats) - (COEFFICIENT_D * sd) - (COEFFICIENT_E * lg)
-
-        sleep_wake_scores[i] = 1 if ps > threshold else 0
+    sleep_wake_scores = _score_capped_activity(capped_activity, threshold)
 
     logger.debug(f"Sadeh algorithm completed successfully for {len(capped_activity)} epochs")
 
@@ -203,56 +203,13 @@ def score_activity(activity_data: list[float] | np.ndarray, threshold: float = -
         logger.debug("Empty activity_data provided to Sadeh algorithm")
         return []
 
-    try:
-        activity_array = np.array(activity_data, dtype=np.float64)
-    except (ValueError, TypeError) as e:
-        msg = f"activity_data contains non-numeric values: {e}"
-        raise ValueError(msg) from e
-
-    if np.any(np.isnan(activity_array)):
-        msg = "activity_data contains NaN (Not a Number) values"
-        raise ValueError(msg)
-
-    if np.any(np.isinf(activity_array)):
-        msg = "activity_data contains infinite values"
-        raise ValueError(msg)
-
-    if np.any(activity_array < 0):
-        negative_indices = np.where(activity_array < 0)[0]
-        msg = f"activity_data contains negative values at indices: {negative_indices[:10].tolist()}"
-        raise ValueError(msg)
+    activity_array = validate_activity_counts(activity_data)
 
     logger.debug(f"Running Sadeh algorithm on {len(activity_array)} epochs")
 
     capped_activity = np.minimum(activity_array, ACTIVITY_CAP)
 
-    sleep_wake_scores = np.zeros(len(capped_activity), dtype=int)
-
-    padded_activity = np.pad(capped_activity, pad_width=5, mode="constant", constant_values=0)
-
-    logger.info("SADEH ALGORITHM: Using FORWARD ROLLING STD (6-epoch window, ddof=1) - ActiLife compatible")
-    rolling_sds = np.zeros(len(capped_activity))
-    for i in range(len(capped_activity)):
-        sd_window = padded_activity[i : i + 6]
-        if len(sd_window) >= 2:
-            rolling_sds[i] = np.std(sd_window, ddof=1)
-        else:
-            rolling_sds[i] = 0.0
-
-    for i in range(len(capped_activity)):
-        window_start = i
-        window_end = i + WINDOW_SIZE
-        window = padded_activity[window_start:window_end]
-
-        avg = np.mean(window)
-        nats = np.sum((window >= NATS_MIN) & (window < NATS_MAX))
-        sd = rolling_sds[i]
-        current_count = capped_activity[i]
-        lg = np.log(current_count + 1)
-
-        ps = COEFFICIENT_A - (COEFFICIENT_B * avg) - (COEFFICIENT_C * nats) - (COEFFICIENT_D * sd) - (COEFFICIENT_E * lg)
-
-        sleep_wake_scores[i] = 1 if ps > threshold else 0
+    sleep_wake_scores = _score_capped_activity(capped_activity, threshold)
 
     logger.debug(f"Sadeh algorithm completed successfully for {len(capped_activity)} epochs")
 
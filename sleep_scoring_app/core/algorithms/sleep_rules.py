@@ -19,6 +19,8 @@ import logging
 from dataclasses import replace
 from typing import TYPE_CHECKING, Any
 
+from sleep_scoring_app.core.algorithms.run_length import SLEEP, SleepWakeRunIndex, find_marker_indices
+
 if TYPE_CHECKING:
     from datetime import datetime
 
@@ -180,21 +182,15 @@ class SleepRules:
             return None, None
 
         # Find corresponding indices for markers in the data
-        start_idx = None
-        end_idx = None
-
-        for i, timestamp in enumerate(timestamps):
-            if start_idx is None and timestamp >= sleep_start_marker:
-                start_idx = i
-            if timestamp <= sleep_end_marker:
-                end_idx = i
-
+        start_idx, end_idx = find_marker_indices(timestamps, sleep_start_marker, sleep_end_marker)
         if start_idx is None or end_idx is None:
             return None, None
 
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+
         # Find sleep onset: FIRST occurrence of N consecutive sleep minutes
         sleep_onset_idx = self._find_sleep_onset(
-            sleep_scores=sleep_scores,
+            sleep_scores=run_index,
             start_idx=start_idx,
             end_idx=end_idx,
         )
@@ -203,7 +199,7 @@ class SleepRules:
         sleep_offset_idx = None
         if sleep_onset_idx is not None:
             sleep_offset_idx = self._find_sleep_offset(
-                sleep_scores=sleep_scores,
+                sleep_scores=run_index,
                 start_idx=start_idx,
                 end_idx=end_idx,
                 onset_idx=sleep_onset_idx,
@@ -213,7 +209,7 @@ class SleepRules:
 
     def _find_sleep_onset(
         self,
-        sleep_scores: list[int],
+        sleep_scores: list[int] | SleepWakeRunIndex,
         start_idx: int,
         end_idx: int,
     ) -> int | None:
@@ -233,29 +229,16 @@ class SleepRules:
         extended_start = max(0, start_idx - self.config.search_extension_minutes)
         extended_end = min(len(sleep_scores) - 1, end_idx + self.config.search_extension_minutes)
 
-        # Find ALL instances of N consecutive sleep minutes, then choose the FIRST one
-        sleep_onset_candidates = []
-
         # Ensure we don't go beyond available data - need space for consecutive minutes
         safe_end = min(extended_end, len(sleep_scores) - self.config.onset_consecutive_minutes)
 
-        for i in range(extended_start, safe_end + 1):
-            # Check if we have N consecutive sleep minutes starting at position i
-            if all(sleep_scores[i + offset] == 1 for offset in range(self.config.onset_consecutive_minutes)):
-                sleep_onset_candidates.append(i)
-
-        # Filter to unique values only
-        sleep_onset_candidates = list(set(sleep_onset_candidates))
-
-        # Choose the FIRST occurrence (earliest time)
-        if sleep_onset_candidates:
-            return min(sleep_onset_candidates)
-
-        return None
+        # Choose the FIRST occurrence (earliest time) of N consecutive sleep minutes
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+        return run_index.first_window(SLEEP, self.config.onset_consecutive_minutes, extended_start, safe_end)
 
     def _find_sleep_offset(
         self,
-        sleep_scores: list[int],
+        sleep_scores: list[int] | SleepWakeRunIndex,
         start_idx: int,
         end_idx: int,
         onset_idx: int,
@@ -277,9 +260,6 @@ class SleepRules:
         extended_start = max(0, start_idx - self.config.search_extension_minutes)
         extended_end = min(len(sleep_scores) - 1, end_idx + self.config.search_extension_minutes)
 
-        # Search for patterns of N consecutive sleep minutes followed by wake
-        sleep_offset_candidates = []
-
         # Ensure we can check the full pattern including the wake minute if required
         consecutive_check = self.config.offset_consecutive_minutes
         if self.config.require_wake_after_offset:
@@ -292,33 +272,21 @@ class SleepRules:
         # Start search from a safe position that allows for N minutes of history
         safe_start = max(onset_idx + consecutive_check, consecutive_check)
 
-        for i in range(safe_start, safe_end + 1):
-            # Check for N consecutive sleep minutes
-            consecutive_sleep = all(sleep_scores[i + offset] == 1 for offset in range(consecutive_check))
-
-            if not consecutive_sleep:
-                continue
-
-            # Check if followed by wake (if required)
-            if self.config.require_wake_after_offset:
-                if i + consecutive_check < len(sleep_scores):
-                    followed_by_wake = sleep_scores[i + consecutive_check] == 0
-                    if not followed_by_wake:
-                        continue
-                else:
-                    # Can't verify wake after, skip this candidate
-                    continue
-
-            # This is a valid N-minute sleep period (possibly followed by wake)
-            # The offset is the LAST minute of these N sleep minutes
-            candidate_idx = i + (consecutive_check - 1)
-            sleep_offset_candidates.append(candidate_idx)
-
-        # Choose the LAST occurrence (latest time)
-        if sleep_offset_candidates:
-            return max(sleep_offset_candidates)
-
-        return None
+        # Choose the LAST occurrence (latest time) of N consecutive sleep minutes, ending a
+        # sleep run that is followed by wake if required
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+        window_start = run_index.last_window(
+            SLEEP,
+            consecutive_check,
+            safe_start,
+            safe_end,
+            followed_by_other=self.config.require_wake_after_offset,
+        )
+        if window_start is None:
+            return None
+
+        # The offset is the LAST minute of these N sleep minutes
+        return window_start + (consecutive_check - 1)
 
 
 def find_sleep_onset_offset(
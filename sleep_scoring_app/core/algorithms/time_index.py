@@ -0,0 +1,173 @@
+"""
+Sorted time index for epoch timestamp lookups.
+
+The plot, marker tables, metrics and auto-scoring all map a timestamp (a marker
+position, a hovered x coordinate, a timestamp of another window) to an epoch
+index. EpochTimeIndex stores the epoch times of one loaded window once as a
+sorted int64 array of microseconds, so each lookup is a binary search instead
+of a scan over the window.
+
+Two clocks are supported, matching how the application represents time:
+    - Wall clock: naive datetimes (the activity timestamps). Unix-second
+      queries are converted with datetime.fromtimestamp, as the plot does.
+    - Unix clock: Unix seconds (the plot's x_data). Naive datetime queries are
+      converted with datetime.timestamp.
+
+Example:
+    >>> index = EpochTimeIndex(timestamps)
+    >>> index.nearest(marker_timestamp)
+    >>> index.nearest(other_timestamp, tolerance=timedelta(seconds=30))
+    >>> index.slice_between(start_time, end_time)
+
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_MICROSECONDS = 1_000_000
+
+
+class EpochTimeIndex:
+    """
+    Binary-search index over the epoch times of one activity window.
+
+    Lookups return positions in the original sequence. Out-of-order input is
+    supported but costs a sort; activity windows are already in order.
+    """
+
+    def __init__(self, timestamps: Sequence[Any] | np.ndarray) -> None:
+        """
+        Index a sequence of epoch timestamps.
+
+        Args:
+            timestamps: Naive datetimes (or pandas Timestamps / datetime64), or Unix seconds
+
+        """
+        self.source = timestamps
+        values = np.asarray(timestamps) if not isinstance(timestamps, np.ndarray) else timestamps
+        self.unix_clock = len(values) > 0 and np.issubdtype(values.dtype, np.number)
+
+        if self.unix_clock:
+            keys = np.round(values.astype(np.float64) * _MICROSECONDS).astype(np.int64)
+        elif len(values) == 0:
+            keys = np.zeros(0, dtype=np.int64)
+        else:
+            keys = np.asarray(values, dtype="datetime64[us]").astype(np.int64)
+
+        if len(keys) > 1 and not bool(np.all(keys[1:] >= keys[:-1])):
+            self._order: np.ndarray | None = np.argsort(keys, kind="stable")
+            keys = keys[self._order]
+        else:
+            self._order = None
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # === Lookups ===
+
+    def searchsorted(self, value: Any, side: str = "left") -> int:
+        """Insertion point of value among the sorted epoch times."""
+        return int(np.searchsorted(self.keys, self._to_key(value), side=side))
+
+    def nearest(self, value: Any, tolerance: timedelta | float | None = None) -> int | None:
+        """
+        Index of the epoch closest to value (the earliest on ties).
+
+        Args:
+            value: Datetime or Unix seconds
+            tolerance: Maximum distance (timedelta or seconds); None accepts any distance
+
+        Returns:
+            Index of the closest epoch, or None if there are no epochs or none within tolerance
+
+        """
+        indices = self.nearest_indices([value], tolerance)
+        if len(indices) == 0 or indices[0] < 0:
+            return None
+        return int(indices[0])
+
+    def nearest_indices(self, values: Sequence[Any] | np.ndarray, tolerance: timedelta | float | None = None) -> np.ndarray:
+        """
+        Vectorised nearest: index of the closest epoch for each value.
+
+        Returns:
+            int64 array of indices, -1 where there are no epochs or none within tolerance
+
+        """
+        queries = self._to_keys(values)
+        if len(self.keys) == 0:
+            return np.full(len(queries), -1, dtype=np.int64)
+
+        position = np.searchsorted(self.keys, queries, side="left")
+        before = np.clip(position - 1, 0, len(self.keys) - 1)
+        after = np.clip(position, 0, len(self.keys) - 1)
+        before_distance = np.abs(queries - self.keys[before])
+        after_distance = np.abs(self.keys[after] - queries)
+        chosen = np.where(before_distance <= after_distance, before, after)
+        distance = np.minimum(before_distance, after_distance)
+        # First of several epochs with the same time
+        chosen = np.searchsorted(self.keys, self.keys[chosen], side="left")
+
+        result = self._original_positions(chosen)
+        if tolerance is not None:
+            result = np.where(distance <= self._tolerance_key(tolerance), result, -1)
+        return result.astype(np.int64)
+
+    def slice_between(self, start: Any, end: Any, include_end: bool = True) -> slice:
+        """
+        Positions of the epochs from start up to end, as a slice of the sorted times.
+
+        For in-order windows (the usual case) the slice applies directly to the
+        timestamps and every aligned array.
+        """
+        lo = self.searchsorted(start, side="left")
+        hi = self.searchsorted(end, side="right" if include_end else "left")
+        return slice(lo, max(lo, hi))
+
+    def mask_between(self, start: Any, end: Any, include_end: bool = True) -> np.ndarray:
+        """Boolean mask over the original positions of the epochs from start up to end."""
+        mask = np.zeros(len(self.keys), dtype=bool)
+        window = self.slice_between(start, end, include_end)
+        if self._order is None:
+            mask[window] = True
+        else:
+            mask[self._order[window]] = True
+        return mask
+
+    # === Conversion ===
+
+    def _original_positions(self, sorted_positions: np.ndarray) -> np.ndarray:
+        return sorted_positions if self._order is None else self._order[sorted_positions]
+
+    def _to_key(self, value: Any) -> int:
+        if isinstance(value, int | float | np.number):
+            if self.unix_clock:
+                return round(float(value) * _MICROSECONDS)
+            value = datetime.fromtimestamp(float(value))
+        elif self.unix_clock and isinstance(value, datetime):
+            # pandas Timestamps treat naive values as UTC; plain datetimes as local time, like the plot
+            plain = value.to_pydatetime() if hasattr(value, "to_pydatetime") else value
+            return round(datetime.timestamp(plain) * _MICROSECONDS)
+        return int(np.datetime64(value, "us").astype(np.int64))
+
+    def _to_keys(self, values: Sequence[Any] | np.ndarray) -> np.ndarray:
+        array = values if isinstance(values, np.ndarray) else np.asarray(values)
+        if len(array) > 0 and self.unix_clock and np.issubdtype(array.dtype, np.number):
+            return np.round(array.astype(np.float64) * _MICROSECONDS).astype(np.int64)
+        if len(array) > 0 and not self.unix_clock and (np.issubdtype(array.dtype, np.datetime64) or isinstance(array[0], datetime)):
+            return array.astype("datetime64[us]").astype(np.int64)
+        return np.fromiter((self._to_key(value) for value in values), dtype=np.int64, count=len(array))
+
+    @staticmethod
+    def _tolerance_key(tolerance: timedelta | float) -> int:
+        if isinstance(tolerance, timedelta):
+            return round(tolerance.total_seconds() * _MICROSECONDS)
+        return round(float(tolerance) * _MICROSECONDS)
@@ -32,6 +32,8 @@ import logging
 from dataclasses import dataclass, replace
 from typing import TYPE_CHECKING, Any
 
+from sleep_scoring_app.core.algorithms.run_length import SLEEP, WAKE, SleepWakeRunIndex, find_marker_indices
+
 if TYPE_CHECKING:
     from datetime import datetime
 
@@ -217,21 +219,15 @@ class TudorLockeRule:
             return None, None
 
         # Find corresponding indices for markers in the data
-        start_idx = None
-        end_idx = None
-
-        for i, timestamp in enumerate(timestamps):
-            if start_idx is None and timestamp >= sleep_start_marker:
-                start_idx = i
-            if timestamp <= sleep_end_marker:
-                end_idx = i
-
+        start_idx, end_idx = find_marker_indices(timestamps, sleep_start_marker, sleep_end_marker)
         if start_idx is None or end_idx is None:
             return None, None
 
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+
         # Find sleep onset: FIRST occurrence of N consecutive sleep minutes
         sleep_onset_idx = self._find_sleep_onset(
-            sleep_scores=sleep_scores,
+            sleep_scores=run_index,
             start_idx=start_idx,
             end_idx=end_idx,
         )
@@ -240,7 +236,7 @@ class TudorLockeRule:
         sleep_offset_idx = None
         if sleep_onset_idx is not None:
             sleep_offset_idx = self._find_sleep_offset(
-                sleep_scores=sleep_scores,
+                sleep_scores=run_index,
                 start_idx=start_idx,
                 end_idx=end_idx,
                 onset_idx=sleep_onset_idx,
@@ -250,7 +246,7 @@ class TudorLockeRule:
 
     def _find_sleep_onset(
         self,
-        sleep_scores: list[int],
+        sleep_scores: list[int] | SleepWakeRunIndex,
         start_idx: int,
         end_idx: int,
     ) -> int | None:
@@ -276,15 +272,12 @@ class TudorLockeRule:
         consecutive_required = self.config.onset_consecutive_minutes
         safe_end = min(extended_end, len(sleep_scores) - consecutive_required)
 
-        for i in range(extended_start, safe_end + 1):
-            if all(sleep_scores[i + offset] == 1 for offset in range(consecutive_required)):
-                return i
-
-        return None
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+        return run_index.first_window(SLEEP, consecutive_required, extended_start, safe_end)
 
     def _find_sleep_offset(
         self,
-        sleep_scores: list[int],
+        sleep_scores: list[int] | SleepWakeRunIndex,
         start_idx: int,
         end_idx: int,
         onset_idx: int,
@@ -318,21 +311,19 @@ class TudorLockeRule:
         # Need room for M consecutive wake minutes
         safe_end = min(extended_end, len(sleep_scores) - consecutive_wake_required)
 
-        for i in range(search_start, safe_end + 1):
-            # Check if we have M consecutive wake minutes starting at position i
-            if all(sleep_scores[i + offset] == 0 for offset in range(consecutive_wake_required)):
-                # Found consecutive wake period
-                # The offset is the minute BEFORE this wake period begins
-                # But we need to verify there was sleep before the wake
-                if i > onset_idx and sleep_scores[i - 1] == 1:
-                    return i - 1
+        # Find the FIRST M consecutive wake minutes after the onset that directly follow
+        # a sleep minute; the offset is the minute BEFORE this wake period begins
+        run_index = SleepWakeRunIndex.from_scores(sleep_scores)
+        wake_start = run_index.first_window(
+            WAKE,
+            consecutive_wake_required,
+            max(search_start, onset_idx + 1),
+            safe_end,
+            preceded_by_other=True,
+        )
+        if wake_start is not None:
+            return wake_start - 1
 
         # If no consecutive wake period found, look for the last sleep minute in the search window
         # This handles edge cases where the data ends during sleep
-        last_sleep_idx = None
-        for i in range(extended_end, onset_idx, -1):
-            if i < len(sleep_scores) and sleep_scores[i] == 1:
-                last_sleep_idx = i
-                break
-
-        return last_sleep_idx
+        return run_index.last_window(SLEEP, 1, onset_idx + 1, extended_end)
@@ -85,3 +85,40 @@ def validate_and_collapse_epochs(df: pd.DataFrame, datetime_col: str) -> pd.Data
     resampled = df[numeric_cols].resample("1min").sum()
 
     return resampled.reset_index()
+
+
+def validate_activity_counts(activity_data: list[float] | np.ndarray, label: str = "activity_data") -> np.ndarray:
+    """
+    Convert activity counts to float64, rejecting NaN, infinite and negative values.
+
+    Args:
+        activity_data: Activity count values
+        label: Name used in error messages (e.g. "Axis1 column")
+
+    Returns:
+        float64 array of the counts
+
+    Raises:
+        ValueError: If the counts are not finite, non-negative numbers
+
+    """
+    try:
+        activity_array = np.array(activity_data, dtype=np.float64)
+    except (ValueError, TypeError) as e:
+        msg = f"{label} contains non-numeric values: {e}"
+        raise ValueError(msg) from e
+
+    if np.any(np.isnan(activity_array)):
+        msg = f"{label} contains NaN (Not a Number) values"
+        raise ValueError(msg)
+
+    if np.any(np.isinf(activity_array)):
+        msg = f"{label} contains infinite values"
+        raise ValueError(msg)
+
+    if np.any(activity_array < 0):
+        negative_indices = np.where(activity_array < 0)[0]
+        msg = f"{label} contains negative values at indices: {negative_indices[:10].tolist()}"
+        raise ValueError(msg)
+
+    return activity_array
@@ -31,6 +31,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Epochs with at least this many axes meeting both criteria are nonwear
+NONWEAR_AXES_THRESHOLD: int = 2
+# Medium epochs scored per batch (16 x 15 min at 100 Hz is ~35 MB of float64 samples)
+DEFAULT_CHUNK_EPOCHS: int = 16
+
 
 class VanHeesNonwearAlgorithm:
     """
@@ -194,16 +199,22 @@ class VanHeesNonwearAlgorithm:
         nonwear_scores = self._detect_nonwear_scores(data)
 
         # Convert to binary mask (score >= 2 = nonwear)
-        mask = [1 if score >= 2 else 0 for score in nonwear_scores]
-
-        return mask
+        return (nonwear_scores >= NONWEAR_AXES_THRESHOLD).astype(int).tolist()
 
-    def _detect_nonwear_scores(self, data: np.ndarray) -> np.ndarray:
+    def _detect_nonwear_scores(self, data: np.ndarray, chunk_epochs: int | None = DEFAULT_CHUNK_EPOCHS) -> np.ndarray:
         """
         Core nonwear detection algorithm.
 
+        Medium epochs are evaluated in batches: each chunk of samples is reshaped
+        to (epochs, samples_per_epoch, 3) so range and SD are computed for every
+        window and axis at once. SD is only computed for the (epoch, axis) pairs
+        that already pass the range criterion, and each selected window is a
+        contiguous row so the result matches a per-window ``np.std`` exactly.
+
         Args:
             data: Raw accelerometer data (n_samples, 3) in g-units
+            chunk_epochs: Maximum medium epochs evaluated per batch to bound
+                temporary memory, or None to process the whole recording at once
 
         Returns:
             Array of nonwear scores (0-3) per medium epoch
@@ -217,32 +228,20 @@ class VanHeesNonwearAlgorithm:
             return np.array([], dtype=int)
 
         nonwear_scores = np.zeros(n_medium_epochs, dtype=int)
+        step = n_medium_epochs if chunk_epochs is None else max(1, chunk_epochs)
 
-        # Process each medium epoch
-        for h in range(n_medium_epochs):
-            epoch_start = h * medium_epoch_size
-            epoch_end = (h + 1) * medium_epoch_size
-            epoch_data = data[epoch_start:epoch_end]
-
-            # Check each axis for nonwear criteria
-            axes_nonwear = 0
-
-            for axis_idx in range(3):
-                axis_data = epoch_data[:, axis_idx]
+        for chunk_start in range(0, n_medium_epochs, step):
+            chunk_end = min(chunk_start + step, n_medium_epochs)
+            windows = data[chunk_start * medium_epoch_size : chunk_end * medium_epoch_size].reshape(chunk_end - chunk_start, medium_epoch_size, 3)
 
-                # Calculate range
-                data_range = np.ptp(axis_data)  # peak-to-peak (max - min)
+            # Range per (epoch, axis); check it first since SD is only needed where it passes
+            axis_nonwear = (windows.max(axis=1) - windows.min(axis=1)) < self._range_criterion
 
-                # Check range criterion first (faster)
-                if data_range < self._range_criterion:
-                    # Calculate standard deviation (only if range criterion met)
-                    sd_val = np.std(axis_data, ddof=1)
+            if axis_nonwear.any():
+                candidate_windows = windows.transpose(0, 2, 1)[axis_nonwear]
+                axis_nonwear[axis_nonwear] = np.std(candidate_windows, axis=1, ddof=1) < self._sd_criterion
 
-                    # Both criteria must be met for nonwear
-                    if sd_val < self._sd_criterion:
-                        axes_nonwear += 1
-
-            nonwear_scores[h] = axes_nonwear
+            nonwear_scores[chunk_start:chunk_end] = axis_nonwear.sum(axis=1)
 
         return nonwear_scores
 
@@ -254,7 +253,8 @@ class VanHeesNonwearAlgorithm:
         """
         Convert nonwear scores to NonwearPeriod objects.
 
-        Consecutive epochs with score >= 2 (2+ axes nonwear) are merged into periods.
+        Consecutive epochs with score >= 2 (2+ axes nonwear) are merged into periods
+        by run-length encoding the nonwear flags.
 
         Args:
             nonwear_scores: Array of nonwear scores (0-3) per medium epoch
@@ -271,60 +271,29 @@ class VanHeesNonwearAlgorithm:
             return []
 
         medium_epoch_size = int(self._medium_epoch_sec * self._sample_freq)
-        periods = []
+        epoch_minutes = self._medium_epoch_sec // 60
 
-        # Find consecutive nonwear epochs (score >= 2)
-        in_period = False
-        period_start_idx = None
-        period_start_epoch = None
-
-        for epoch_idx, score in enumerate(nonwear_scores):
-            is_nonwear = score >= 2
-
-            if is_nonwear and not in_period:
-                # Start new period
-                in_period = True
-                period_start_idx = epoch_idx * medium_epoch_size
-                period_start_epoch = epoch_idx
-
-            elif not is_nonwear and in_period:
-                # End current period
-                period_end_idx = epoch_idx * medium_epoch_size - 1
-                period_end_epoch = epoch_idx - 1
-
-                # Create NonwearPeriod
-                start_time = timestamps[period_start_idx]
-                end_time = timestamps[min(period_end_idx, len(timestamps) - 1)]
-                duration_minutes = (period_end_epoch - period_start_epoch + 1) * (self._medium_epoch_sec // 60)
-
-                period = NonwearPeriod(
-                    start_time=start_time,
-                    end_time=end_time,
-                    participant_id="",  # Will be filled by caller
-                    source=NonwearDataSource.CHOI_ALGORITHM,  # Using same source enum for now
-                    duration_minutes=duration_minutes,
-                    start_index=period_start_idx,
-                    end_index=period_end_idx,
-                )
-                periods.append(period)
-
-                in_period = False
-
-        # Handle period extending to end of data
-        if in_period:
-            period_end_idx = len(timestamps) - 1
-            period_end_epoch = len(nonwear_scores) - 1
-
-            start_time = timestamps[period_start_idx]
-            end_time = timestamps[period_end_idx]
-            duration_minutes = (period_end_epoch - period_start_epoch + 1) * (self._medium_epoch_sec // 60)
+        # Run boundaries of consecutive nonwear epochs (score >= 2)
+        is_nonwear = np.concatenate(([False], np.asarray(nonwear_scores) >= NONWEAR_AXES_THRESHOLD, [False]))
+        edges = np.flatnonzero(np.diff(is_nonwear.astype(np.int8)))
+        run_starts = edges[::2]
+        run_ends = edges[1::2]
+
+        periods = []
+        for start_epoch, end_epoch in zip(run_starts.tolist(), run_ends.tolist(), strict=True):
+            period_start_idx = start_epoch * medium_epoch_size
+            if end_epoch == len(nonwear_scores):
+                # Period extending to end of data covers any trailing partial epoch
+                period_end_idx = len(timestamps) - 1
+            else:
+                period_end_idx = end_epoch * medium_epoch_size - 1
 
             period = NonwearPeriod(
-                start_time=start_time,
-                end_time=end_time,
-                participant_id="",
-                source=NonwearDataSource.CHOI_ALGORITHM,
-                duration_minutes=duration_minutes,
+                start_time=timestamps[period_start_idx],
+                end_time=timestamps[min(period_end_idx, len(timestamps) - 1)],
+                participant_id="",  # Will be filled by caller
+                source=NonwearDataSource.CHOI_ALGORITHM,  # Using same source enum for now
+                duration_minutes=(end_epoch - start_epoch) * epoch_minutes,
                 start_index=period_start_idx,
                 end_index=period_end_idx,
             )
@@ -0,0 +1,192 @@
+"""
+Weighted-window kernel for linear-filter sleep scoring algorithms.
+
+Several published sleep/wake algorithms (Cole-Kripke, Webster, Sazonov-style
+filters) score each epoch from a fixed weighted sum of the activity in a
+window of previous and following epochs, then compare it with a threshold.
+That sum is a single correlation with the weight vector, so the whole series
+is scored in one NumPy call instead of a per-epoch loop.
+
+A WeightedWindowKernel describes such an algorithm; WeightedWindowAlgorithm
+wraps a kernel in the SleepScoringAlgorithm protocol so it can be registered
+with AlgorithmFactory.register_weighted_window_algorithm.
+
+Example:
+    >>> from sleep_scoring_app.core.algorithms import AlgorithmFactory, WeightedWindowKernel
+    >>> kernel = WeightedWindowKernel(weights=(0.1, 0.2, 1.0, 0.2), lags=2, scale=0.01, threshold=1.0)
+    >>> AlgorithmFactory.register_weighted_window_algorithm("my_filter", "My Filter", kernel)
+    >>> scores = AlgorithmFactory.create("my_filter").score_array(activity_counts)
+
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from sleep_scoring_app.core.algorithms.utils import find_datetime_column, validate_activity_counts, validate_and_collapse_epochs
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def weighted_window_sum(values: np.ndarray, weights: np.ndarray, lags: int) -> np.ndarray:
+    """
+    Weighted sum of each epoch's window, treating epochs beyond either end as zero.
+
+    Args:
+        values: Per-epoch values
+        weights: Window weights from the earliest lag to the last lead epoch
+        lags: Number of previous epochs in the window (weights[lags] applies to the epoch itself)
+
+    Returns:
+        float64 array with one weighted sum per epoch
+
+    """
+    leads = len(weights) - lags - 1
+    if lags < 0 or leads < 0:
+        msg = f"lags must be between 0 and {len(weights) - 1}, got {lags}"
+        raise ValueError(msg)
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    padded = np.pad(np.asarray(values, dtype=np.float64), pad_width=(lags, leads), mode="constant", constant_values=0)
+    return np.correlate(padded, np.asarray(weights, dtype=np.float64), mode="valid")
+
+
+@dataclass(frozen=True)
+class WeightedWindowKernel:
+    """
+    A linear-filter sleep/wake rule.
+
+    Each epoch's activity is divided by activity_scale and capped at
+    activity_cap; the sleep index is scale times the weighted sum of the window,
+    and epochs with an index below threshold are scored as sleep.
+    """
+
+    weights: tuple[float, ...]  # Earliest lag first
+    lags: int  # Previous epochs in the window
+    scale: float = 1.0
+    threshold: float = 1.0
+    activity_scale: float = 1.0
+    activity_cap: float = float("inf")
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.lags < len(self.weights):
+            msg = f"lags must be between 0 and {len(self.weights) - 1}, got {self.lags}"
+            raise ValueError(msg)
+
+    @property
+    def window_size(self) -> int:
+        return len(self.weights)
+
+    def sleep_index(self, activity: np.ndarray) -> np.ndarray:
+        """Sleep index per epoch for validated activity counts."""
+        scaled_activity = np.minimum(activity / self.activity_scale, self.activity_cap)
+        return self.scale * weighted_window_sum(scaled_activity, np.asarray(self.weights), self.lags)
+
+    def score(self, activity: np.ndarray) -> np.ndarray:
+        """Sleep/wake classification per epoch (1=sleep, 0=wake) for validated activity counts."""
+        return (self.sleep_index(activity) < self.threshold).astype(int)
+
+    def get_parameters(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class WeightedWindowAlgorithm:
+    """
+    SleepScoringAlgorithm for a WeightedWindowKernel scoring the vertical axis.
+
+    Register instances through AlgorithmFactory.register_weighted_window_algorithm.
+    """
+
+    def __init__(
+        self,
+        kernel: WeightedWindowKernel,
+        identifier: str,
+        name: str,
+        activity_column: str = "Axis1",
+        score_column: str = "Sleep Score",
+    ) -> None:
+        self.kernel = kernel
+        self._identifier = identifier
+        self._name = name
+        self.activity_column = activity_column
+        self.score_column = score_column
+
+    @property
+    def name(self) -> str:
+        """Algorithm name for display."""
+        return self._name
+
+    @property
+    def identifier(self) -> str:
+        """Unique algorithm identifier."""
+        return self._identifier
+
+    @property
+    def requires_axis(self) -> str:
+        """Required accelerometer axis - vertical axis counts."""
+        return "axis_y"
+
+    def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score sleep/wake for a DataFrame of 1-minute epochs.
+
+        Args:
+            df: DataFrame with datetime column and the activity column
+
+        Returns:
+            Copy of the DataFrame with the score column appended (1=sleep, 0=wake)
+
+        """
+        if df is None or len(df) == 0:
+            msg = "DataFrame cannot be None or empty"
+            raise ValueError(msg)
+
+        df = validate_and_collapse_epochs(df, find_datetime_column(df))
+        if self.activity_column not in df.columns:
+            msg = f"DataFrame must contain '{self.activity_column}' column"
+            raise ValueError(msg)
+
+        activity = validate_activity_counts(df[self.activity_column].to_numpy(), f"{self.activity_column} column")
+        result_df = df.copy()
+        result_df[self.score_column] = self.kernel.score(activity)
+        return result_df
+
+    def score_array(
+        self,
+        activity_data: list[float] | np.ndarray,
+        timestamps: list | None = None,
+    ) -> list[int]:
+        """
+        Score sleep/wake from array (legacy API).
+
+        Args:
+            activity_data: List or array of activity count values
+            timestamps: Optional list of timestamps (not used)
+
+        Returns:
+            List of sleep/wake classifications (1=sleep, 0=wake)
+
+        """
+        if activity_data is None:
+            msg = "activity_data cannot be None"
+            raise ValueError(msg)
+        if len(activity_data) == 0:
+            return []
+        return self.kernel.score(validate_activity_counts(activity_data)).tolist()
+
+    def get_parameters(self) -> dict[str, Any]:
+        """Get the kernel parameters (read-only)."""
+        return self.kernel.get_parameters()
+
+    def set_parameters(self, **kwargs: Any) -> None:
+        """Kernels are fixed; parameters are ignored with a warning."""
+        if kwargs:
+            logger.warning("%s has fixed parameters. Ignoring parameters: %s", self._name, list(kwargs.keys()))
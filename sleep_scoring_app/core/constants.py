@@ -15,6 +15,7 @@ class FeatureFlags:
     """Feature flags for enabling/disabling functionality."""
 
     ENABLE_AUTOSAVE = False  # Set to False to disable autosave functionality
+    ENABLE_COLUMNAR_ACTIVITY_STORAGE = True  # Store raw epochs as per-day BLOB blocks instead of one row per epoch
 
 
 class AlgorithmType(StrEnum):
@@ -200,6 +201,7 @@ class DatabaseTable(StrEnum):
     SLEEP_METRICS = "sleep_metrics"
     AUTOSAVE_METRICS = "autosave_metrics"
     RAW_ACTIVITY_DATA = "raw_activity_data"
+    RAW_ACTIVITY_BLOCKS = "raw_activity_blocks"
     FILE_REGISTRY = "file_registry"
     NONWEAR_SENSOR_PERIODS = "nonwear_sensor_periods"
     CHOI_ALGORITHM_PERIODS = "choi_algorithm_periods"
@@ -210,6 +212,9 @@ class DatabaseTable(StrEnum):
     DIARY_NONWEAR_PERIODS = "diary_nonwear_periods"
     SLEEP_MARKERS_EXTENDED = "sleep_markers_extended"
     MANUAL_NWT_MARKERS = "manual_nwt_markers"
+    ALGORITHM_RESULT_CACHE = "algorithm_result_cache"
+    EPOCH_SCORES = "epoch_scores"
+    FILE_DATES = "file_dates"
 
 
 class DatabaseColumn(StrEnum):
@@ -283,6 +288,26 @@ class DatabaseColumn(StrEnum):
     LUX = "lux"
     IMPORT_DATE = "import_date"
 
+    # Columnar activity block columns
+    BLOCK_DATE = "block_date"
+    BLOCK_START = "block_start"
+    BLOCK_END = "block_end"
+    EPOCH_COUNT = "epoch_count"
+
+    # File date index columns
+    ACTIVITY_DATE = "activity_date"
+
+    # Algorithm result cache columns
+    WINDOW_START = "window_start"
+    ALGORITHM_ID = "algorithm_id"
+    ALGORITHM_PARAMETERS = "algorithm_parameters"
+    RESULT_MASK = "result_mask"
+    RESULT_RANGES = "result_ranges"
+    LAST_USED = "last_used"
+
+    # Precomputed epoch score columns
+    VALID_MASK = "valid_mask"
+
     # File registry columns
     ORIGINAL_PATH = "original_path"
     FILE_SIZE = "file_size"
@@ -491,6 +516,14 @@ class ConfigDefaults:
     WINDOW_HEIGHT = 800
     EPOCH_LENGTH = 60
     SKIP_ROWS = 10
+    IMPORT_WORKERS = 4  # Upper bound on file-parsing processes during multi-file imports
+    IMPORT_HASH_THREADS = 4  # Threads hashing possibly changed files before a multi-file import
+    EXPORT_WORKERS = 4  # Threads recalculating sleep period metrics, one file each, before an export
+    ALGORITHM_CACHE_MAX_ENTRIES = 5000  # Persisted algorithm results kept per study database (LRU)
+    RAW_SAMPLE_CACHE_MAX_MB = 4096  # Decoded raw accelerometer samples kept on disk (LRU)
+    DB_CACHED_STATEMENTS = 512  # Prepared statements kept per pooled SQLite connection
+    DB_CACHE_SIZE_KB = 16384  # SQLite page cache per pooled connection
+    DB_MMAP_SIZE_MB = 256  # Database file bytes SQLite reads through memory mapping
     # Activity column preferences - Y-axis (vertical) is default for Sadeh algorithm
     DEFAULT_ACTIVITY_COLUMN = ActivityDataPreference.AXIS_Y
     DEFAULT_CHOI_ACTIVITY_COLUMN = ActivityDataPreference.VECTOR_MAGNITUDE
@@ -569,6 +602,7 @@ class FileName(StrEnum):
 
     SLEEP_SCORING_DB = "sleep_scoring.db"
     CONFIG_JSON = "config.json"
+    RAW_SAMPLE_CACHE = "raw_sample_cache"
 
 
 # ============================================================================
@@ -31,6 +31,8 @@ from sleep_scoring_app.utils.column_registry import column_registry
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from sleep_scoring_app.services.nonwear_service import NonwearSensorResolver
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,9 @@ logger = logging.getLogger(__name__)
 # Avoids creating thousands of DatabaseManager instances during export
 _cached_db_manager = None
 
+# Export fields holding NWT sensor values, by the metric type calculated for them
+_NWT_FIELD_METRIC_TYPES = {"nwt_onset": "onset", "nwt_offset": "offset", "total_nwt_counts": "total"}
+
 # ============================================================================
 # DATACLASS DEFINITIONS
 # ============================================================================
@@ -413,8 +418,14 @@ class SleepMetrics:
             self.onset_time = ""
             self.offset_time = ""
 
-    def to_export_dict_list(self) -> list[dict[str, Any]]:
-        """Convert to list of export dictionaries - one per sleep period."""
+    def to_export_dict_list(self, nwt_resolver: NonwearSensorResolver | None = None) -> list[dict[str, Any]]:
+        """
+        Convert to list of export dictionaries - one per sleep period.
+
+        When exporting many metrics, pass an nwt_resolver loaded once for all of
+        them so NWT sensor values are looked up in memory rather than queried
+        per period.
+        """
         complete_periods = self.daily_sleep_markers.get_complete_periods()
 
         # Check if this is a NO_SLEEP case
@@ -425,12 +436,12 @@ class SleepMetrics:
                 # NO_SLEEP case - return single row with NO_SLEEP marker type
                 return [self._create_no_sleep_export_row()]
             # No complete periods and not NO_SLEEP - return single row with empty markers for compatibility
-            return [self._create_export_row(None)]
+            return [self._create_export_row(None, nwt_resolver)]
 
         # Return one row per complete sleep period
         export_rows = []
         for period in complete_periods:
-            export_rows.append(self._create_export_row(period))
+            export_rows.append(self._create_export_row(period, nwt_resolver))
 
         return export_rows
 
@@ -439,7 +450,7 @@ class SleepMetrics:
         main_sleep = self.daily_sleep_markers.get_main_sleep()
         return self._create_export_row(main_sleep)
 
-    def _create_export_row(self, sleep_period: SleepPeriod | None) -> dict[str, Any]:
+    def _create_export_row(self, sleep_period: SleepPeriod | None, nwt_resolver: NonwearSensorResolver | None = None) -> dict[str, Any]:
         """Create a single export row for a specific sleep period."""
         # Reconstruct full_id with correct format: ID + Timepoint + Group
         correct_full_id = f"{self.participant.numerical_id} {self.participant.timepoint} {self.participant.group}"
@@ -486,7 +497,7 @@ class SleepMetrics:
         # Add data from column registry with period-specific calculations
         for column in column_registry.get_exportable():
             if column.export_column and column.export_column not in export_data:
-                value = self._get_period_specific_field_value(column.name, sleep_period)
+                value = self._get_period_specific_field_value(column.name, sleep_period, nwt_resolver)
                 # Include all columns, even with None values, for consistent CSV structure
                 export_data[column.export_column] = value
 
@@ -841,7 +852,9 @@ class SleepMetrics:
 
         return field_mappings.get(field_name)
 
-    def _get_period_specific_field_value(self, field_name: str, sleep_period: SleepPeriod | None) -> Any:
+    def _get_period_specific_field_value(
+        self, field_name: str, sleep_period: SleepPeriod | None, nwt_resolver: NonwearSensorResolver | None = None
+    ) -> Any:
         """Get value of a field by name for a specific sleep period."""
         # Check dynamic fields first
         if field_name in self._dynamic_fields:
@@ -872,6 +885,10 @@ class SleepMetrics:
             if field_name in period_specific_metrics:
                 return None
 
+        # NWT sensor values need a nonwear lookup, so they are only calculated for their own fields
+        if field_name in _NWT_FIELD_METRIC_TYPES:
+            return self._calculate_nwt_from_database(sleep_period, _NWT_FIELD_METRIC_TYPES[field_name], nwt_resolver)
+
         # Get period-specific calculated metrics
         # First check if we have stored calculated metrics for this specific period
         period_metrics = self._get_stored_period_metrics(sleep_period)
@@ -917,9 +934,6 @@ class SleepMetrics:
             "sleep_algorithm_offset": period_metrics.get("sleep_algorithm_offset")
             if period_metrics
             else (self.sleep_algorithm_offset if self.sleep_algorithm_offset is not None else (self.sadeh_offset if is_main_sleep else None)),
-            "nwt_onset": self._calculate_nwt_from_database(sleep_period, "onset") if sleep_period and sleep_period.is_complete else None,
-            "nwt_offset": self._calculate_nwt_from_database(sleep_period, "offset") if sleep_period and sleep_period.is_complete else None,
-            "total_nwt_counts": self._calculate_nwt_from_database(sleep_period, "total") if sleep_period and sleep_period.is_complete else None,
             # Period-specific timestamps
             "onset_timestamp": sleep_period.onset_timestamp if sleep_period and sleep_period.is_complete else None,
             "offset_timestamp": sleep_period.offset_timestamp if sleep_period and sleep_period.is_complete else None,
@@ -986,14 +1000,22 @@ class SleepMetrics:
         period_key = f"period_{sleep_period.marker_index}_metrics"
         self._dynamic_fields[period_key] = metrics
 
-    def _calculate_nwt_from_database(self, sleep_period: SleepPeriod, metric_type: str) -> int | None:
+    def _calculate_nwt_from_database(
+        self, sleep_period: SleepPeriod, metric_type: str, nwt_resolver: NonwearSensorResolver | None = None
+    ) -> int | None:
         """Calculate NWT sensor values from database using sleep period timestamps."""
         if not sleep_period or not sleep_period.is_complete:
             return None
 
-        try:
-            from datetime import datetime
+        if nwt_resolver is not None:
+            return nwt_resolver.nwt_value(
+                self.filename,
+                datetime.fromtimestamp(sleep_period.onset_timestamp),
+                datetime.fromtimestamp(sleep_period.offset_timestamp),
+                metric_type,
+            )
 
+        try:
             from sleep_scoring_app.data.database import DatabaseManager
             from sleep_scoring_app.services.nonwear_service import NonwearDataService, NonwearDataSource
 
@@ -1177,6 +1199,7 @@ class AppConfig:
     auto_scroll_to_unmarked: bool = True
     auto_advance_after_save: bool = False
     auto_populate_nap_markers: bool = True
+    precompute_scores_on_import: bool = True  # Score whole recordings at import so dates and exports read stored results
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON storage (only directory paths)."""
@@ -9,19 +9,47 @@ from __future__ import annotations
 import logging
 import threading
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Protocol
 
-from sleep_scoring_app.core.algorithms import NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms import EpochTimeIndex, NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
 from sleep_scoring_app.core.constants import ActivityDataPreference, NonwearDataSource
 from sleep_scoring_app.core.dataclasses import NonwearPeriod
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
     from datetime import datetime
 
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+class StoredResultLookup(Protocol):
+    """Stored algorithm results that Choi periods can be read from (data.algorithm_cache.AlgorithmResultCache in the app)."""
+
+    def make_key(self, filename: str | None, timestamps: Sequence[datetime], algorithm_id: str, parameters: dict[str, Any] | None = None) -> Any: ...
+
+    def get(self, key: Any) -> Any: ...
+
+
+def choi_periods_from_ranges(ranges: np.ndarray | Sequence[tuple[int, int]], timestamps: Sequence[datetime]) -> list[NonwearPeriod]:
+    """Rebuild Choi periods from stored (start, end) epoch index pairs."""
+    return [
+        NonwearPeriod(
+            start_time=timestamps[start_idx],
+            end_time=timestamps[end_idx],
+            participant_id="",
+            source=NonwearDataSource.CHOI_ALGORITHM,
+            duration_minutes=end_idx - start_idx + 1,
+            start_index=start_idx,
+            end_index=end_idx,
+        )
+        for start_idx, end_idx in (ranges.tolist() if hasattr(ranges, "tolist") else ranges)
+    ]
+
+
 @dataclass(frozen=True)
 class ActivityDataView:
     """Immutable view of activity data with defined timeframe."""
@@ -50,6 +78,11 @@ class ActivityDataView:
         """Return function to test if a time period overlaps with this activity data."""
         return lambda start, end: (start <= self.end_time and end >= self.start_time)
 
+    @cached_property
+    def time_index(self) -> EpochTimeIndex:
+        """Sorted time index of the timestamps, built on first use."""
+        return EpochTimeIndex(self.timestamps)
+
     @property
     def duration_hours(self) -> float:
         """Duration of activity data in hours."""
@@ -76,8 +109,9 @@ class NonwearData:
         raw_sensor_periods: list[NonwearPeriod],
         nonwear_service=None,
         choi_activity_column: ActivityDataPreference = ActivityDataPreference.VECTOR_MAGNITUDE,
+        choi_periods: list[NonwearPeriod] | None = None,
     ) -> NonwearData:
-        """Create NonwearData from activity view and raw sensor periods."""
+        """Create NonwearData from activity view and raw sensor periods, running Choi unless its periods are given."""
         logger.debug("Creating NonwearData for %s with %d raw sensor periods", activity_view.filename, len(raw_sensor_periods))
         logger.debug("Activity data timeframe: %s to %s (%d points)", activity_view.start_time, activity_view.end_time, len(activity_view))
 
@@ -100,7 +134,8 @@ class NonwearData:
 
         logger.debug("Processed %d sensor periods, kept %d (removed filtering)", len(raw_sensor_periods), len(sensor_periods))
 
-        choi_periods = cls._compute_choi_periods(activity_view, choi_activity_column)
+        if choi_periods is None:
+            choi_periods = cls._compute_choi_periods(activity_view, choi_activity_column)
 
         sensor_mask = cls._periods_to_mask(sensor_periods, activity_view)
         choi_mask = cls._periods_to_mask(choi_periods, activity_view)
@@ -152,12 +187,9 @@ class NonwearData:
                     continue
 
             try:
-                period_start = period.start_time
-                period_end = period.end_time
-
-                for i, timestamp in enumerate(activity_view.timestamps):
-                    if period_start <= timestamp <= period_end:
-                        mask[i] = 1
+                inside = activity_view.time_index.mask_between(period.start_time, period.end_time)
+                for i in inside.nonzero()[0].tolist():
+                    mask[i] = 1
             except (ValueError, AttributeError) as e:
                 logger.warning("Error parsing period timestamps for mask: %s", e)
                 continue
@@ -189,13 +221,21 @@ class NonwearData:
 class NonwearDataFactory:
     """Factory for creating and caching NonwearData objects."""
 
-    def __init__(self, nonwear_service) -> None:
+    def __init__(self, nonwear_service, choi_results: StoredResultLookup | None = None) -> None:
         self.nonwear_service = nonwear_service
         self._cache: dict[str, NonwearData] = {}
+        self._choi_results = choi_results
         self._lock = threading.Lock()
 
-    def get_nonwear_data(self, activity_view: ActivityDataView) -> NonwearData:
-        """Get NonwearData for activity view, using cache when possible."""
+    def get_nonwear_data(self, activity_view: ActivityDataView, activity_column: ActivityDataPreference | None = None) -> NonwearData:
+        """
+        Get NonwearData for activity view, using cache when possible.
+
+        When activity_column names the imported column the counts were loaded from
+        and the factory was given stored results, Choi periods are read from them
+        (precomputed at import or cached from an earlier session) instead of being
+        recomputed.
+        """
         cache_key = self._generate_cache_key(activity_view)
 
         with self._lock:
@@ -209,7 +249,10 @@ class NonwearDataFactory:
 
                 logger.debug("Loaded %d raw sensor periods from database for %s", len(raw_sensor_periods), activity_view.filename)
 
-                self._cache[cache_key] = NonwearData.create_for_activity_view(activity_view, raw_sensor_periods, self.nonwear_service)
+                stored_choi_periods = self._load_stored_choi_periods(activity_view, activity_column) if activity_column else None
+                self._cache[cache_key] = NonwearData.create_for_activity_view(
+                    activity_view, raw_sensor_periods, self.nonwear_service, choi_periods=stored_choi_periods
+                )
 
                 logger.debug("Created and cached NonwearData for %s", cache_key)
             else:
@@ -217,6 +260,26 @@ class NonwearDataFactory:
 
             return self._cache[cache_key]
 
+    def _load_stored_choi_periods(self, activity_view: ActivityDataView, activity_column: ActivityDataPreference) -> list[NonwearPeriod] | None:
+        """Load Choi periods for the view from the stored results, or None if none are stored."""
+        if self._choi_results is None:
+            return None
+
+        try:
+            choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+            key = self._choi_results.make_key(
+                activity_view.filename, activity_view.timestamps, choi_algorithm.identifier, nonwear_parameters(choi_algorithm, activity_column)
+            )
+            result = self._choi_results.get(key) if key is not None else None
+        except Exception as e:
+            logger.warning("Error loading stored Choi periods: %s", e)
+            return None
+
+        if result is None or result.ranges is None:
+            return None
+        logger.debug("Using stored Choi periods for %s", activity_view.filename)
+        return choi_periods_from_ranges(result.ranges, activity_view.timestamps)
+
     def _generate_cache_key(self, activity_view: ActivityDataView) -> str:
         """Generate cache key for activity view."""
         return f"{activity_view.filename}_{activity_view.start_time.isoformat()}_{activity_view.end_time.isoformat()}_{len(activity_view)}"
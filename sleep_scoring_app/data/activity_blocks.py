@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Columnar block storage for raw activity epochs.
+
+Instead of one SQLite row per epoch, each imported file is stored as one block
+per calendar day. A block holds the epoch timestamps as packed int64 seconds
+(naive local time, as imported) and each activity axis as a packed float32
+array, so a 48h window is read with a single indexed fetch of two or three
+BLOB rows followed by a slice.
+
+Missing values inside an axis are stored as NaN; an axis with no values at all
+for a block is stored as NULL.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable
+from sleep_scoring_app.data.file_dates import refresh_file_dates
+
+if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Iterable, Iterator, Sequence
+    from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f4")
+
+# Activity columns stored per block, in storage order
+BLOCK_VALUE_COLUMNS: tuple[DatabaseColumn, ...] = (
+    DatabaseColumn.AXIS_Y,
+    DatabaseColumn.AXIS_X,
+    DatabaseColumn.AXIS_Z,
+    DatabaseColumn.VECTOR_MAGNITUDE,
+)
+
+
+@dataclass(frozen=True)
+class ActivityBlock:
+    """One calendar day of activity epochs for a single file."""
+
+    block_date: str
+    timestamps: np.ndarray  # int64 seconds since 1970-01-01 (naive local time)
+    values: dict[str, np.ndarray]  # column name -> float array (NaN = missing)
+
+    @property
+    def epoch_count(self) -> int:
+        return len(self.timestamps)
+
+
+def to_epoch_seconds(timestamps: Sequence[str] | Sequence[datetime] | np.ndarray) -> np.ndarray:
+    """Convert ISO strings, datetimes or datetime64 values to int64 epoch seconds."""
+    return np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def datetime_to_epoch_seconds(value: datetime) -> int:
+    """Convert a datetime to epoch seconds, rounding sub-second values up."""
+    micros = int(np.datetime64(value, "us").astype(np.int64))
+    return -(-micros // 1_000_000)
+
+
+def encode_array(values: np.ndarray | None, dtype: np.dtype = VALUE_DTYPE) -> bytes | None:
+    """Pack an array into little-endian bytes, or None if it holds no values."""
+    if values is None:
+        return None
+    array = np.ascontiguousarray(values, dtype=dtype)
+    if array.dtype.kind == "f" and (len(array) == 0 or np.isnan(array).all()):
+        return None
+    return array.tobytes()
+
+
+def decode_array(blob: bytes | None, length: int, dtype: np.dtype = VALUE_DTYPE) -> np.ndarray:
+    """Unpack bytes produced by encode_array; NULL blobs decode to all-NaN."""
+    if blob is None:
+        return np.full(length, np.nan, dtype=dtype)
+    return np.frombuffer(blob, dtype=dtype)
+
+
+def split_into_day_blocks(timestamps: np.ndarray, values: dict[str, np.ndarray | None]) -> list[ActivityBlock]:
+    """
+    Split sorted epoch arrays into one block per calendar day.
+
+    Args:
+        timestamps: int64 epoch seconds, ascending
+        values: Column name -> array aligned with timestamps (None if absent)
+
+    Returns:
+        List of ActivityBlock objects in date order
+
+    """
+    if len(timestamps) == 0:
+        return []
+
+    order = np.argsort(timestamps, kind="stable")
+    if not np.array_equal(order, np.arange(len(timestamps))):
+        timestamps = timestamps[order]
+        values = {name: (None if array is None else np.asarray(array)[order]) for name, array in values.items()}
+
+    days = timestamps.astype("datetime64[s]").astype("datetime64[D]")
+    boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(timestamps)]))
+
+    blocks = []
+    for start, end in zip(starts.tolist(), ends.tolist(), strict=True):
+        block_values = {
+            name: (np.full(end - start, np.nan) if array is None else np.asarray(array, dtype=np.float64)[start:end])
+            for name, array in values.items()
+        }
+        blocks.append(ActivityBlock(block_date=str(days[start]), timestamps=timestamps[start:end], values=block_values))
+
+    return blocks
+
+
+def iter_block_records(filename: str, blocks: Iterable[ActivityBlock]) -> Iterator[tuple]:
+    """Yield executemany parameter tuples matching INSERT_BLOCK_SQL."""
+    for block in blocks:
+        yield (
+            filename,
+            block.block_date,
+            int(block.timestamps[0]),
+            int(block.timestamps[-1]),
+            block.epoch_count,
+            block.timestamps.astype(TIMESTAMP_DTYPE).tobytes(),
+            *(encode_array(block.values.get(column)) for column in BLOCK_VALUE_COLUMNS),
+        )
+
+
+INSERT_BLOCK_SQL = f"""
+    INSERT OR REPLACE INTO {DatabaseTable.RAW_ACTIVITY_BLOCKS} (
+        {DatabaseColumn.FILENAME}, {DatabaseColumn.BLOCK_DATE},
+        {DatabaseColumn.BLOCK_START}, {DatabaseColumn.BLOCK_END},
+        {DatabaseColumn.EPOCH_COUNT}, {DatabaseColumn.TIMESTAMP},
+        {", ".join(BLOCK_VALUE_COLUMNS)}
+    ) VALUES (?, ?, ?, ?, ?, ?, {", ".join("?" for _ in BLOCK_VALUE_COLUMNS)})
+"""
+
+
+def write_activity_blocks(
+    conn: sqlite3.Connection,
+    filename: str,
+    timestamps: np.ndarray,
+    values: dict[str, np.ndarray | None],
+) -> int:
+    """
+    Replace a file's stored epochs with per-day blocks and re-index the file's dates.
+
+    Must be called inside the caller's transaction; does not commit.
+
+    Returns:
+        Number of blocks written
+
+    """
+    blocks = split_into_day_blocks(timestamps, values)
+    conn.execute(f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS} WHERE {DatabaseColumn.FILENAME} = ?", (filename,))
+    conn.executemany(INSERT_BLOCK_SQL, iter_block_records(filename, blocks))
+    refresh_file_dates(conn, filename)
+    return len(blocks)
+
+
+def read_activity_blocks(
+    conn: sqlite3.Connection,
+    filename: str,
+    columns: Sequence[str],
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+) -> tuple[np.ndarray, dict[str, np.ndarray]] | None:
+    """
+    Read a file's epochs from block storage, optionally limited to [start_time, end_time).
+
+    Args:
+        conn: SQLite connection
+        filename: File to read
+        columns: Activity columns to decode (subset of BLOCK_VALUE_COLUMNS)
+        start_time: Optional inclusive window start (used together with end_time)
+        end_time: Optional exclusive window end
+
+    Returns:
+        (int64 epoch seconds, column -> float64 array) or None if the file has no blocks
+
+    """
+    for column in columns:
+        if column not in BLOCK_VALUE_COLUMNS:
+            msg = f"Invalid activity block column: {column}"
+            raise ValueError(msg)
+
+    query = f"""
+        SELECT {DatabaseColumn.EPOCH_COUNT}, {DatabaseColumn.TIMESTAMP}{"".join(f", {column}" for column in columns)}
+        FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS}
+        WHERE {DatabaseColumn.FILENAME} = ?
+    """
+    params: list = [filename]
+    windowed = start_time is not None and end_time is not None
+    if windowed:
+        query += f" AND {DatabaseColumn.BLOCK_DATE} >= ? AND {DatabaseColumn.BLOCK_DATE} <= ?"
+        params.extend([start_time.date().isoformat(), end_time.date().isoformat()])
+    query += f" ORDER BY {DatabaseColumn.BLOCK_DATE}"
+
+    rows = conn.execute(query, params).fetchall()
+    if not rows:
+        if not windowed or not has_activity_blocks(conn, filename):
+            return None
+        return np.zeros(0, dtype=np.int64), {column: np.zeros(0) for column in columns}
+
+    timestamps = np.concatenate([decode_array(row[1], row[0], TIMESTAMP_DTYPE) for row in rows])
+    values = {
+        column: np.concatenate([decode_array(row[2 + index], row[0]) for row in rows]).astype(np.float64) for index, column in enumerate(columns)
+    }
+
+    if windowed:
+        first = int(np.searchsorted(timestamps, datetime_to_epoch_seconds(start_time), side="left"))
+        last = int(np.searchsorted(timestamps, datetime_to_epoch_seconds(end_time), side="left"))
+        timestamps = timestamps[first:last]
+        values = {column: array[first:last] for column, array in values.items()}
+
+    return timestamps, values
+
+
+def has_activity_blocks(conn: sqlite3.Connection, filename: str) -> bool:
+    """Check whether a file is stored in block form."""
+    cursor = conn.execute(
+        f"SELECT 1 FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS} WHERE {DatabaseColumn.FILENAME} = ? LIMIT 1",
+        (filename,),
+    )
+    return cursor.fetchone() is not None
+
+
+def migrate_rows_to_blocks(conn: sqlite3.Connection, filename: str) -> int:
+    """
+    Move one file's legacy per-epoch rows into blocks.
+
+    The blocks are read back and compared with the rows (at the float32 precision
+    blocks store) before the rows are deleted. Must be called inside the caller's
+    transaction; does not commit.
+
+    Returns:
+        Number of epochs migrated
+
+    Raises:
+        ValueError: If the stored blocks do not match the rows; the caller should roll back
+
+    """
+    rows = conn.execute(
+        f"""
+        SELECT {DatabaseColumn.TIMESTAMP}, {", ".join(BLOCK_VALUE_COLUMNS)}
+        FROM {DatabaseTable.RAW_ACTIVITY_DATA}
+        WHERE {DatabaseColumn.FILENAME} = ?
+        ORDER BY {DatabaseColumn.TIMESTAMP}
+        """,
+        (filename,),
+    ).fetchall()
+    if not rows:
+        return 0
+
+    columns = list(zip(*rows, strict=True))
+    timestamps = to_epoch_seconds(list(columns[0]))
+    values = {
+        column: np.array([np.nan if value is None else value for value in columns[1 + index]], dtype=np.float64)
+        for index, column in enumerate(BLOCK_VALUE_COLUMNS)
+    }
+    write_activity_blocks(conn, filename, timestamps, values)
+
+    stored = read_activity_blocks(conn, filename, BLOCK_VALUE_COLUMNS)
+    if stored is None or not np.array_equal(stored[0], timestamps):
+        msg = f"Stored blocks of {filename} do not have its {len(rows)} epochs"
+        raise ValueError(msg)
+    for column, array in values.items():
+        if not np.array_equal(stored[1][column], array.astype(VALUE_DTYPE).astype(np.float64), equal_nan=True):
+            msg = f"Stored blocks of {filename} do not match its {column} values"
+            raise ValueError(msg)
+
+    conn.execute(f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_DATA} WHERE {DatabaseColumn.FILENAME} = ?", (filename,))
+    return len(rows)
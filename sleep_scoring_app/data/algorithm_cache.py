@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of per-epoch algorithm results.
+
+Sleep/wake scores and nonwear masks are 0/1 per epoch, so each result is stored
+bit-packed (one bit per epoch) together with optional (start, end) index pairs
+for the periods the algorithm reported. Entries are keyed by the imported
+file's content hash, the window (first epoch and epoch count), the algorithm
+identifier and its parameters. Revisiting a date therefore costs one indexed
+lookup instead of hashing the activity data and rerunning the algorithm, and
+results survive restarts.
+
+The table is size-bounded: once it holds more than the configured number of
+entries, the least recently used ones are evicted.
+
+Results can also be precomputed at import over the whole recording (one row per
+file, algorithm and setting in the epoch scores table). Those rows are only
+used while the file hash, epoch count and settings still match, and any window
+of the file is served as a slice of them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from sleep_scoring_app.core.constants import ConfigDefaults, DatabaseColumn, DatabaseTable
+from sleep_scoring_app.data.activity_blocks import datetime_to_epoch_seconds
+
+if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Sequence
+    from datetime import datetime
+
+    from sleep_scoring_app.data.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+RANGE_DTYPE = np.dtype("<i4")
+
+
+@dataclass(frozen=True)
+class AlgorithmResultKey:
+    """Identifies one algorithm run over one window of an imported file."""
+
+    file_hash: str
+    window_start: int  # First epoch, int64 seconds (naive local time)
+    epoch_count: int
+    algorithm_id: str
+    parameters: str = ""
+    persistent: bool = True  # False for keys derived from the values (not stored in the database)
+    filename: str | None = field(default=None, compare=False)  # Imported file, for precomputed scores
+
+    @classmethod
+    def create(
+        cls,
+        file_hash: str,
+        timestamps: Sequence[datetime],
+        algorithm_id: str,
+        parameters: dict[str, Any] | None = None,
+        persistent: bool = True,
+        filename: str | None = None,
+    ) -> AlgorithmResultKey:
+        """Build a key from a window's timestamps and the algorithm settings."""
+        return cls(
+            file_hash=file_hash,
+            window_start=datetime_to_epoch_seconds(timestamps[0]) if len(timestamps) else 0,
+            epoch_count=len(timestamps),
+            algorithm_id=algorithm_id,
+            parameters=canonical_parameters(parameters),
+            persistent=persistent,
+            filename=filename,
+        )
+
+
+@dataclass(frozen=True)
+class CachedAlgorithmResult:
+    """A cached per-epoch result."""
+
+    mask: np.ndarray  # uint8, one 0/1 value per epoch
+    ranges: np.ndarray | None = None  # int32 (n, 2) inclusive start/end epoch indices
+
+    def __len__(self) -> int:
+        return len(self.mask)
+
+
+@dataclass(frozen=True)
+class EpochScores:
+    """
+    One algorithm's result over a whole recording.
+
+    Algorithms only see the epochs where their input column has a value, so
+    valid marks which of the file's epochs the result covers (None: all of them).
+    """
+
+    algorithm_id: str
+    parameters: dict[str, Any]
+    result: CachedAlgorithmResult
+    valid: np.ndarray | None = None
+
+
+def canonical_parameters(parameters: dict[str, Any] | None) -> str:
+    """Serialize algorithm settings so that equal settings give equal strings."""
+    return json.dumps(parameters or {}, sort_keys=True, default=str)
+
+
+def pack_mask(values: Sequence[int] | np.ndarray) -> bytes:
+    """Pack a 0/1 sequence into bytes (one bit per epoch)."""
+    return np.packbits(np.asarray(values, dtype=bool)).tobytes()
+
+
+def unpack_mask(blob: bytes, length: int) -> np.ndarray:
+    """Unpack bytes produced by pack_mask into a uint8 0/1 array."""
+    return np.unpackbits(np.frombuffer(blob, dtype=np.uint8), count=length)
+
+
+def encode_ranges(ranges: Sequence[tuple[int, int]] | np.ndarray | None) -> bytes | None:
+    """Pack (start, end) index pairs as int32 bytes."""
+    if ranges is None:
+        return None
+    return np.asarray(ranges, dtype=RANGE_DTYPE).reshape(-1, 2).tobytes()
+
+
+def decode_ranges(blob: bytes | None) -> np.ndarray | None:
+    """Unpack bytes produced by encode_ranges into an (n, 2) array."""
+    if blob is None:
+        return None
+    return np.frombuffer(blob, dtype=RANGE_DTYPE).reshape(-1, 2)
+
+
+_KEY_COLUMNS = (
+    DatabaseColumn.FILE_HASH,
+    DatabaseColumn.WINDOW_START,
+    DatabaseColumn.EPOCH_COUNT,
+    DatabaseColumn.ALGORITHM_ID,
+    DatabaseColumn.ALGORITHM_PARAMETERS,
+)
+_KEY_WHERE = " AND ".join(f"{column} = ?" for column in _KEY_COLUMNS)
+
+
+def _key_params(key: AlgorithmResultKey) -> tuple:
+    return key.file_hash, key.window_start, key.epoch_count, key.algorithm_id, key.parameters
+
+
+def read_algorithm_result(conn: sqlite3.Connection, key: AlgorithmResultKey) -> CachedAlgorithmResult | None:
+    """
+    Look up a cached result and mark it as recently used.
+
+    Does not commit; the caller owns the transaction.
+    """
+    row = conn.execute(
+        f"""
+        SELECT rowid, {DatabaseColumn.RESULT_MASK}, {DatabaseColumn.RESULT_RANGES}
+        FROM {DatabaseTable.ALGORITHM_RESULT_CACHE}
+        WHERE {_KEY_WHERE}
+        """,
+        _key_params(key),
+    ).fetchone()
+    if row is None:
+        return None
+
+    conn.execute(
+        f"UPDATE {DatabaseTable.ALGORITHM_RESULT_CACHE} SET {DatabaseColumn.LAST_USED} = ? WHERE rowid = ?",
+        (time.time_ns(), row[0]),
+    )
+    return CachedAlgorithmResult(mask=unpack_mask(row[1], key.epoch_count), ranges=decode_ranges(row[2]))
+
+
+def write_algorithm_result(
+    conn: sqlite3.Connection,
+    key: AlgorithmResultKey,
+    filename: str,
+    mask: Sequence[int] | np.ndarray,
+    ranges: Sequence[tuple[int, int]] | np.ndarray | None = None,
+    max_entries: int = ConfigDefaults.ALGORITHM_CACHE_MAX_ENTRIES,
+) -> None:
+    """
+    Store a result, then evict the least recently used entries beyond max_entries.
+
+    Does not commit; the caller owns the transaction.
+    """
+    if len(mask) != key.epoch_count:
+        msg = f"Result length {len(mask)} does not match window length {key.epoch_count}"
+        raise ValueError(msg)
+
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO {DatabaseTable.ALGORITHM_RESULT_CACHE} (
+            {DatabaseColumn.FILENAME}, {", ".join(_KEY_COLUMNS)},
+            {DatabaseColumn.RESULT_MASK}, {DatabaseColumn.RESULT_RANGES}, {DatabaseColumn.LAST_USED}
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (filename, *_key_params(key), pack_mask(mask), encode_ranges(ranges), time.time_ns()),
+    )
+    conn.execute(
+        f"""
+        DELETE FROM {DatabaseTable.ALGORITHM_RESULT_CACHE}
+        WHERE rowid IN (
+            SELECT rowid FROM {DatabaseTable.ALGORITHM_RESULT_CACHE}
+            ORDER BY {DatabaseColumn.LAST_USED} DESC
+            LIMIT -1 OFFSET ?
+        )
+        """,
+        (max_entries,),
+    )
+
+
+def slice_result(result: CachedAlgorithmResult, first: int, count: int) -> CachedAlgorithmResult:
+    """Cut epochs [first, first + count) out of a result, clipping its periods to the slice."""
+    ranges = None
+    if result.ranges is not None:
+        last = first + count - 1
+        overlapping = result.ranges[(result.ranges[:, 1] >= first) & (result.ranges[:, 0] <= last)]
+        ranges = (np.clip(overlapping, first, last) - first).astype(RANGE_DTYPE)
+    return CachedAlgorithmResult(mask=result.mask[first : first + count], ranges=ranges)
+
+
+def write_epoch_scores(conn: sqlite3.Connection, filename: str, epoch_count: int, scores: Sequence[EpochScores]) -> None:
+    """
+    Replace a file's precomputed results.
+
+    Does not commit; the caller owns the transaction.
+    """
+    row = conn.execute(
+        f"SELECT {DatabaseColumn.FILE_HASH} FROM {DatabaseTable.FILE_REGISTRY} WHERE {DatabaseColumn.FILENAME} = ?",
+        (filename,),
+    ).fetchone()
+    if row is None or not row[0]:
+        msg = f"File {filename} is not imported"
+        raise ValueError(msg)
+
+    records = []
+    for score in scores:
+        covered = epoch_count if score.valid is None else int(np.count_nonzero(score.valid))
+        if len(score.result) != covered:
+            msg = f"{score.algorithm_id} result length {len(score.result)} does not match {covered} scored epochs"
+            raise ValueError(msg)
+        records.append(
+            (
+                filename,
+                row[0],
+                score.algorithm_id,
+                canonical_parameters(score.parameters),
+                epoch_count,
+                None if score.valid is None else pack_mask(score.valid),
+                pack_mask(score.result.mask),
+                encode_ranges(score.result.ranges),
+            )
+        )
+
+    conn.execute(f"DELETE FROM {DatabaseTable.EPOCH_SCORES} WHERE {DatabaseColumn.FILENAME} = ?", (filename,))
+    conn.executemany(
+        f"""
+        INSERT INTO {DatabaseTable.EPOCH_SCORES} (
+            {DatabaseColumn.FILENAME}, {DatabaseColumn.FILE_HASH}, {DatabaseColumn.ALGORITHM_ID},
+            {DatabaseColumn.ALGORITHM_PARAMETERS}, {DatabaseColumn.EPOCH_COUNT}, {DatabaseColumn.VALID_MASK},
+            {DatabaseColumn.RESULT_MASK}, {DatabaseColumn.RESULT_RANGES}
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        records,
+    )
+
+
+def read_epoch_scores(
+    conn: sqlite3.Connection,
+    filename: str,
+    algorithm_id: str,
+    parameters: str,
+    epoch_seconds: np.ndarray,
+) -> tuple[np.ndarray, CachedAlgorithmResult] | None:
+    """
+    Look up a file's precomputed result.
+
+    Args:
+        conn: SQLite connection
+        filename: Imported file
+        algorithm_id: Algorithm identifier
+        parameters: Canonical settings (see canonical_parameters)
+        epoch_seconds: The file's epoch timestamps (int64 seconds)
+
+    Returns:
+        (epoch seconds of the scored epochs, result), or None if nothing is stored
+        for these settings or the file changed since it was scored
+
+    """
+    row = conn.execute(
+        f"""
+        SELECT s.{DatabaseColumn.EPOCH_COUNT}, s.{DatabaseColumn.VALID_MASK},
+               s.{DatabaseColumn.RESULT_MASK}, s.{DatabaseColumn.RESULT_RANGES}
+        FROM {DatabaseTable.EPOCH_SCORES} s
+        JOIN {DatabaseTable.FILE_REGISTRY} r
+            ON r.{DatabaseColumn.FILENAME} = s.{DatabaseColumn.FILENAME} AND r.{DatabaseColumn.FILE_HASH} = s.{DatabaseColumn.FILE_HASH}
+        WHERE s.{DatabaseColumn.FILENAME} = ? AND s.{DatabaseColumn.ALGORITHM_ID} = ? AND s.{DatabaseColumn.ALGORITHM_PARAMETERS} = ?
+        """,
+        (filename, algorithm_id, parameters),
+    ).fetchone()
+    if row is None or row[0] != len(epoch_seconds):
+        return None
+
+    scored_seconds = epoch_seconds if row[1] is None else epoch_seconds[unpack_mask(row[1], row[0]).astype(bool)]
+    result = CachedAlgorithmResult(mask=unpack_mask(row[2], len(scored_seconds)), ranges=decode_ranges(row[3]))
+    return scored_seconds, result
+
+
+def slice_epoch_scores(scored_seconds: np.ndarray, result: CachedAlgorithmResult, key: AlgorithmResultKey) -> CachedAlgorithmResult | None:
+    """Cut the window identified by key out of a precomputed result, or None if the windows do not line up."""
+    first = int(np.searchsorted(scored_seconds, key.window_start))
+    if first + key.epoch_count > len(scored_seconds) or scored_seconds[first] != key.window_start:
+        return None
+    return slice_result(result, first, key.epoch_count)
+
+
+class AlgorithmResultCache:
+    """
+    Two-level result cache for the plot: recent results in memory, all results in the study database.
+
+    For imported files the key uses the file hash recorded at import, so building
+    one never touches the activity values, and a window missing from the cache is
+    served from the file's precomputed scores when they exist. Without a database
+    (CSV mode) or for files that are not imported, the key falls back to a digest
+    of the values and the result is kept in memory only.
+    """
+
+    def __init__(self, db_manager: DatabaseManager | None, memory_entries: int = 8) -> None:
+        self.db_manager = db_manager
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[AlgorithmResultKey, CachedAlgorithmResult] = OrderedDict()
+
+    def make_key(
+        self,
+        filename: str | None,
+        timestamps: Sequence[datetime],
+        algorithm_id: str,
+        parameters: dict[str, Any] | None = None,
+        values: Sequence[float] | np.ndarray | None = None,
+    ) -> AlgorithmResultKey | None:
+        """
+        Build the key for a window.
+
+        Args:
+            filename: Imported file the window belongs to
+            timestamps: Epoch timestamps of the window
+            algorithm_id: Algorithm identifier
+            parameters: Algorithm settings that affect the result
+            values: Input values, hashed only when the file has no recorded hash
+
+        Returns:
+            The key, or None if the window cannot be identified
+
+        """
+        if not len(timestamps):
+            return None
+        file_hash = self.db_manager.get_file_hash(filename) if filename and self.db_manager is not None else None
+        if file_hash:
+            return AlgorithmResultKey.create(file_hash, timestamps, algorithm_id, parameters, filename=filename)
+        if values is None:
+            return None
+        try:
+            data = np.asarray(values, dtype=np.float64).tobytes()
+        except (TypeError, ValueError):
+            data = repr(list(values)).encode()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return AlgorithmResultKey.create(f"values:{digest}", timestamps, algorithm_id, parameters, persistent=False)
+
+    def get(self, key: AlgorithmResultKey) -> CachedAlgorithmResult | None:
+        """Return a cached result from memory, the database cache or the file's precomputed scores."""
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            return result
+
+        if self.db_manager is None or not key.persistent:
+            return None
+        result = self.db_manager.load_algorithm_result(key)
+        if result is None and key.filename:
+            result = self.db_manager.load_precomputed_result(key)
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(
+        self,
+        key: AlgorithmResultKey,
+        filename: str,
+        mask: Sequence[int] | np.ndarray,
+        ranges: Sequence[tuple[int, int]] | np.ndarray | None = None,
+    ) -> None:
+        """Cache a result in memory and persist it if the key identifies an imported file."""
+        result = CachedAlgorithmResult(
+            mask=np.asarray(mask, dtype=np.uint8),
+            ranges=None if ranges is None else np.asarray(ranges, dtype=RANGE_DTYPE).reshape(-1, 2),
+        )
+        self._remember(key, result)
+        if self.db_manager is not None and key.persistent:
+            self.db_manager.save_algorithm_result(key, filename, result.mask, result.ranges)
+
+    def clear(self) -> None:
+        """Drop in-memory entries (persisted results stay valid: their keys include the file hash and settings)."""
+        self._memory.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def values(self) -> list[CachedAlgorithmResult]:
+        """In-memory results, least recently used first."""
+        return list(self._memory.values())
+
+    def _remember(self, key: AlgorithmResultKey, result: CachedAlgorithmResult) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
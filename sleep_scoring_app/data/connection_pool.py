@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Per-thread pool of SQLite connections to one database file.
+
+Most database operations run one small query, and the app runs many of them
+per user action, so opening a connection and applying its PRAGMAs used to cost
+more than the query itself. Each thread now keeps one connection open, set up
+once, and reuses it; prepared statements stay cached on it as well.
+
+Reusing a connection keeps the behaviour of a fresh one: work left uncommitted
+when an operation ends is rolled back, as closing the connection did, and row
+factories are reset. A thread asking for a connection while it already holds
+its own (a nested operation) gets a separate short-lived one, so two
+operations never share a transaction. A connection is discarded after an
+error and reopened on the next request.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sleep_scoring_app.core.constants import ConfigDefaults
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ConnectionPoolStats:
+    """Connection counters of a pool since it was created."""
+
+    opened: int  # Connections opened, pooled or not
+    reused: int  # Requests served by the thread's open connection
+    overflow: int  # Short-lived connections for nested or unpooled requests
+    discarded: int  # Pooled connections closed after an error
+    open: int  # Pooled connections currently open
+
+
+class _ThreadConnection:
+    """A thread's pooled connection; dropped, and its connection closed, when the thread ends."""
+
+    __slots__ = ("__weakref__", "close_on_release", "connection", "in_use")
+
+    def __init__(self) -> None:
+        self.connection: sqlite3.Connection | None = None
+        self.in_use = False
+        self.close_on_release = False  # Set by close_all while the connection is in use
+
+
+class SQLiteConnectionPool:
+    """Hands out one reusable connection per thread."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        timeout: float = 30.0,
+        cached_statements: int = ConfigDefaults.DB_CACHED_STATEMENTS,
+        cache_size_kb: int = ConfigDefaults.DB_CACHE_SIZE_KB,
+        mmap_size_mb: int = ConfigDefaults.DB_MMAP_SIZE_MB,
+    ) -> None:
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        # Applied once to every new connection
+        self.pragmas = (
+            "PRAGMA foreign_keys = ON",
+            "PRAGMA journal_mode = WAL",
+            f"PRAGMA cache_size = -{cache_size_kb}",
+            f"PRAGMA mmap_size = {mmap_size_mb * 1024 * 1024}",
+        )
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread_connections: weakref.WeakSet[_ThreadConnection] = weakref.WeakSet()
+        self._opened = 0
+        self._reused = 0
+        self._overflow = 0
+        self._discarded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections may be closed by close_all from another thread, but are only used by their own
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, cached_statements=self.cached_statements, check_same_thread=False)
+        try:
+            for pragma in self.pragmas:
+                conn.execute(pragma)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self, pooled: bool = True) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Provide a connection for one operation.
+
+        This is the calling thread's pooled connection, or a new one closed on
+        exit when pooled is False or the thread's connection is already in use.
+        """
+        thread_connection: _ThreadConnection | None = getattr(self._local, "connection", None)
+        if not pooled or (thread_connection is not None and thread_connection.in_use):
+            with self._lock:
+                self._overflow += 1
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                with contextlib.suppress(sqlite3.Error):
+                    conn.close()
+            return
+
+        if thread_connection is None:
+            thread_connection = _ThreadConnection()
+            self._local.connection = thread_connection
+            with self._lock:
+                self._thread_connections.add(thread_connection)
+
+        # Marked in use before the connection is read, so close_all leaves it open
+        with self._lock:
+            thread_connection.in_use = True
+        try:
+            if thread_connection.connection is None:
+                thread_connection.connection = self._connect()
+            else:
+                with self._lock:
+                    self._reused += 1
+
+            conn = thread_connection.connection
+            try:
+                yield conn
+            except BaseException:
+                self._discard(thread_connection)
+                raise
+            else:
+                self._reset(thread_connection)
+        finally:
+            self._release(thread_connection)
+
+    def _release(self, thread_connection: _ThreadConnection) -> None:
+        """End an operation, closing the connection if close_all was called during it."""
+        with self._lock:
+            thread_connection.in_use = False
+            conn = None
+            if thread_connection.close_on_release:
+                thread_connection.close_on_release = False
+                conn, thread_connection.connection = thread_connection.connection, None
+        if conn is not None:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
+
+    def _reset(self, thread_connection: _ThreadConnection) -> None:
+        """Leave the connection as a fresh one would be for its next use."""
+        conn = thread_connection.connection
+        conn.row_factory = None
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                logger.warning("Could not roll back pooled connection to %s", self.db_path, exc_info=True)
+                self._discard(thread_connection)
+
+    def _discard(self, thread_connection: _ThreadConnection) -> None:
+        conn, thread_connection.connection = thread_connection.connection, None
+        if conn is None:
+            return
+        with contextlib.suppress(sqlite3.Error):
+            conn.rollback()
+        with contextlib.suppress(sqlite3.Error):
+            conn.close()
+        with self._lock:
+            self._discarded += 1
+
+    def stats(self) -> ConnectionPoolStats:
+        """Counters of connections opened, reused and discarded, and pooled connections open now."""
+        with self._lock:
+            return ConnectionPoolStats(
+                opened=self._opened,
+                reused=self._reused,
+                overflow=self._overflow,
+                discarded=self._discarded,
+                open=sum(1 for thread_connection in self._thread_connections if thread_connection.connection is not None),
+            )
+
+    def close_all(self) -> None:
+        """
+        Close every thread's pooled connection; threads reconnect on their next request.
+
+        A connection in use by an operation is closed when that operation ends.
+        """
+        connections = []
+        with self._lock:
+            for thread_connection in self._thread_connections:
+                if thread_connection.in_use:
+                    thread_connection.close_on_release = True
+                elif thread_connection.connection is not None:
+                    connections.append(thread_connection.connection)
+                    thread_connection.connection = None
+        for conn in connections:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
@@ -14,6 +14,8 @@ from contextlib import contextmanager
 from datetime import date, datetime
 from typing import TYPE_CHECKING, Any, ClassVar
 
+import numpy as np
+
 from sleep_scoring_app.core.constants import (
     ActivityDataPreference,
     AlgorithmType,
@@ -32,6 +34,17 @@ from sleep_scoring_app.core.exceptions import (
     ValidationError,
 )
 from sleep_scoring_app.core.validation import InputValidator
+from sleep_scoring_app.data.activity_blocks import datetime_to_epoch_seconds, has_activity_blocks, migrate_rows_to_blocks, read_activity_blocks
+from sleep_scoring_app.data.algorithm_cache import (
+    canonical_parameters,
+    read_algorithm_result,
+    read_epoch_scores,
+    slice_epoch_scores,
+    slice_result,
+    write_algorithm_result,
+    write_epoch_scores,
+)
+from sleep_scoring_app.data.connection_pool import SQLiteConnectionPool
 from sleep_scoring_app.data.database_schema import DatabaseSchemaManager
 from sleep_scoring_app.services.memory_service import resource_manager
 from sleep_scoring_app.utils.column_registry import (
@@ -41,9 +54,12 @@ from sleep_scoring_app.utils.column_registry import (
 from sleep_scoring_app.utils.resource_resolver import get_database_path
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator, Iterator, Sequence
     from pathlib import Path
 
+    from sleep_scoring_app.data.algorithm_cache import AlgorithmResultKey, CachedAlgorithmResult, EpochScores
+    from sleep_scoring_app.data.connection_pool import ConnectionPoolStats
+
 # Configure logging
 logging.basicConfig(level=logging.WARNING)  # Only show warnings and errors
 logger = logging.getLogger(__name__)
@@ -60,6 +76,7 @@ class DatabaseManager:
         DatabaseTable.SLEEP_METRICS,
         DatabaseTable.AUTOSAVE_METRICS,
         DatabaseTable.RAW_ACTIVITY_DATA,
+        DatabaseTable.RAW_ACTIVITY_BLOCKS,
         DatabaseTable.FILE_REGISTRY,
         DatabaseTable.NONWEAR_SENSOR_PERIODS,
         DatabaseTable.CHOI_ALGORITHM_PERIODS,
@@ -70,6 +87,9 @@ class DatabaseManager:
         DatabaseTable.DIARY_NONWEAR_PERIODS,
         DatabaseTable.SLEEP_MARKERS_EXTENDED,
         DatabaseTable.MANUAL_NWT_MARKERS,
+        DatabaseTable.ALGORITHM_RESULT_CACHE,
+        DatabaseTable.EPOCH_SCORES,
+        DatabaseTable.FILE_DATES,
     }
     VALID_COLUMNS: ClassVar[set[str]] = {
         DatabaseColumn.ID,
@@ -111,6 +131,21 @@ class DatabaseManager:
         DatabaseColumn.STEPS,
         DatabaseColumn.LUX,
         DatabaseColumn.IMPORT_DATE,
+        # Columnar activity block columns
+        DatabaseColumn.BLOCK_DATE,
+        DatabaseColumn.BLOCK_START,
+        DatabaseColumn.BLOCK_END,
+        DatabaseColumn.EPOCH_COUNT,
+        # File date index columns
+        DatabaseColumn.ACTIVITY_DATE,
+        # Algorithm result cache columns
+        DatabaseColumn.WINDOW_START,
+        DatabaseColumn.ALGORITHM_ID,
+        DatabaseColumn.ALGORITHM_PARAMETERS,
+        DatabaseColumn.RESULT_MASK,
+        DatabaseColumn.RESULT_RANGES,
+        DatabaseColumn.LAST_USED,
+        DatabaseColumn.VALID_MASK,
         # File registry columns
         DatabaseColumn.ORIGINAL_PATH,
         DatabaseColumn.FILE_SIZE,
@@ -191,6 +226,9 @@ class DatabaseManager:
         # Ensure database directory exists
         InputValidator.validate_directory_path(self.db_path.parent, must_exist=False, create_if_missing=True)
 
+        # One reusable connection per thread, set up once
+        self._connection_pool = SQLiteConnectionPool(self.db_path)
+
         # Initialize schema manager with validation callbacks
         self._schema_manager = DatabaseSchemaManager(
             validate_table_name=self._validate_table_name,
@@ -214,39 +252,36 @@ class DatabaseManager:
                 self._valid_columns.add(column.database_column)
 
     @contextmanager
-    def _get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Get database connection with proper error handling."""
-        conn = None
+    def _get_connection(self, pooled: bool = True) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Get database connection with proper error handling.
+
+        The calling thread's pooled connection is reused; pass pooled=False for a
+        connection of its own, closed on exit, when changing connection settings.
+        """
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.execute("PRAGMA foreign_keys = ON")
-            conn.execute("PRAGMA journal_mode = WAL")
-            yield conn
+            with self._connection_pool.connection(pooled=pooled) as conn:
+                yield conn
         except sqlite3.OperationalError as e:
             logger.exception("Database operation failed")
-            if conn:
-                with contextlib.suppress(sqlite3.Error):
-                    conn.rollback()
             msg = f"Database operation failed: {e}"
             raise DatabaseError(msg, ErrorCodes.DB_CONNECTION_FAILED) from e
         except sqlite3.IntegrityError as e:
             logger.exception("Database integrity violation")
-            if conn:
-                with contextlib.suppress(sqlite3.Error):
-                    conn.rollback()
             msg = f"Database integrity violation: {e}"
             raise DataIntegrityError(msg, ErrorCodes.DB_INTEGRITY_VIOLATION) from e
         except Exception as e:
             logger.exception("Unexpected database error")
-            if conn:
-                with contextlib.suppress(sqlite3.Error):
-                    conn.rollback()
             msg = f"Unexpected database error: {e}"
             raise DatabaseError(msg, ErrorCodes.DB_QUERY_FAILED) from e
-        finally:
-            if conn:
-                with contextlib.suppress(sqlite3.Error):
-                    conn.close()
+
+    def connection_pool_stats(self) -> ConnectionPoolStats:
+        """Counters of the database connections opened and reused by this manager."""
+        return self._connection_pool.stats()
+
+    def close_connections(self) -> None:
+        """Close the pooled connections of every thread; they reopen on the next operation."""
+        self._connection_pool.close_all()
 
     def _validate_table_name(self, table_name: str) -> str:
         """Validate table name to prevent SQL injection."""
@@ -290,7 +325,7 @@ class DatabaseManager:
 
     def _cleanup_resources(self) -> None:
         """Clean up database resources."""
-        # Close any open connections (they should be auto-closed by context manager)
+        self.close_connections()
         logger.info("Database resources cleaned up")
 
     def save_sleep_metrics(self, sleep_metrics: SleepMetrics, is_autosave: bool = False) -> bool:
@@ -777,24 +812,29 @@ class DatabaseManager:
             updated_at=data.get("Saved At", ""),
         )
 
+    # Diary nap fields exported with each night, as dynamic SleepMetrics fields
+    EXPORT_DIARY_FIELDS: ClassVar[tuple[DatabaseColumn, ...]] = (
+        DatabaseColumn.NAP_OCCURRED,
+        DatabaseColumn.NAP_ONSET_TIME,
+        DatabaseColumn.NAP_OFFSET_TIME,
+        DatabaseColumn.NAP_ONSET_TIME_2,
+        DatabaseColumn.NAP_OFFSET_TIME_2,
+    )
+
     def get_all_sleep_data_for_export(self) -> list[dict[str, Any]]:
         """Get all sleep data formatted for export with validation - multiple periods per participant."""
-        try:
-            metrics = self.load_sleep_metrics()
-
-            # No external diary service dependency - we'll query directly
+        from sleep_scoring_app.services.nonwear_service import NonwearDataService
 
+        try:
             # Convert SleepMetrics objects to export format - multiple periods per participant
             export_data = []
             total_participants = 0
+            nwt_resolver = NonwearDataService(self).load_sensor_resolver()
 
-            for metric in metrics:
+            for metric in self.iter_sleep_metrics_for_export():
                 try:
-                    # Integrate diary data into SleepMetrics before export
-                    self._integrate_diary_data_into_metrics(metric)
-
                     # Get all sleep periods for this participant/date
-                    period_records = metric.to_export_dict_list()
+                    period_records = metric.to_export_dict_list(nwt_resolver)
                     for record in period_records:
                         self._validate_export_data(record)
                         export_data.append(record)
@@ -811,51 +851,57 @@ class DatabaseManager:
             msg = f"Failed to prepare export data: {e}"
             raise DatabaseError(msg, ErrorCodes.DB_QUERY_FAILED) from e
 
-    def _integrate_diary_data_into_metrics(self, metric: SleepMetrics) -> None:
-        """Integrate diary data (nap information) into SleepMetrics object for export using direct database query."""
-        try:
-            # Extract participant info from the metric
-            participant_key = metric.participant.participant_key
-
-            # Parse analysis date for diary lookup
-            if not metric.analysis_date:
-                logger.debug("No analysis date found for %s", metric.filename)
-                return
-
-            analysis_date_str = metric.analysis_date
-
-            # Query diary data directly from database
-            with self._get_connection() as conn:
-                cursor = conn.execute(
-                    f"""SELECT {self._validate_column_name(DatabaseColumn.NAP_OCCURRED)},
-                              {self._validate_column_name(DatabaseColumn.NAP_ONSET_TIME)},
-                              {self._validate_column_name(DatabaseColumn.NAP_OFFSET_TIME)},
-                              {self._validate_column_name(DatabaseColumn.NAP_ONSET_TIME_2)},
-                              {self._validate_column_name(DatabaseColumn.NAP_OFFSET_TIME_2)}
-                         FROM {self._validate_table_name(DatabaseTable.DIARY_DATA)}
-                         WHERE {self._validate_column_name(DatabaseColumn.PARTICIPANT_KEY)} = ?
-                           AND {self._validate_column_name(DatabaseColumn.DIARY_DATE)} = ?""",
-                    (participant_key, analysis_date_str),
-                )
-
-                row = cursor.fetchone()
-
-                if row:
-                    nap_occurred, nap_onset_time, nap_offset_time, nap_onset_time_2, nap_offset_time_2 = row
+    def iter_sleep_metrics_for_export(self) -> Iterator[SleepMetrics]:
+        """
+        Stream all saved sleep metrics with their diary nap fields, most recently updated first.
 
-                    # Set nap data in dynamic fields for export
-                    metric.set_dynamic_field("nap_occurred", nap_occurred)
-                    metric.set_dynamic_field("nap_onset_time", nap_onset_time)
-                    metric.set_dynamic_field("nap_offset_time", nap_offset_time)
-                    metric.set_dynamic_field("nap_onset_time_2", nap_onset_time_2)
-                    metric.set_dynamic_field("nap_offset_time_2", nap_offset_time_2)
+        Metrics and the diary entry for the same participant and date (the first one
+        stored, if several diary files cover it) come from one joined query that is
+        read row by row over a single connection.
+        """
+        metrics_table = self._validate_table_name(DatabaseTable.SLEEP_METRICS)
+        diary_table = self._validate_table_name(DatabaseTable.DIARY_DATA)
+        key_col = self._validate_column_name(DatabaseColumn.PARTICIPANT_KEY)
+        diary_date_col = self._validate_column_name(DatabaseColumn.DIARY_DATE)
+        analysis_date_col = self._validate_column_name(DatabaseColumn.ANALYSIS_DATE)
+        nap_cols = [self._validate_column_name(column) for column in self.EXPORT_DIARY_FIELDS]
+
+        # The participant key _row_to_sleep_metrics gives the metric (ParticipantInfo.participant_key)
+        metric_key = " || '_' || ".join(
+            f"COALESCE(NULLIF(m.{self._validate_column_name(column)}, ''), '{default}')"
+            for column, default in (
+                (DatabaseColumn.PARTICIPANT_ID, "Unknown"),
+                (DatabaseColumn.PARTICIPANT_GROUP, "G1"),
+                (DatabaseColumn.PARTICIPANT_TIMEPOINT, "BO"),
+            )
+        )
+        query = f"""
+            SELECT m.*, d.diary_id, {", ".join(f"d.{col} AS diary_{col}" for col in nap_cols)}
+            FROM {metrics_table} AS m
+            LEFT JOIN (
+                SELECT MIN({self._validate_column_name(DatabaseColumn.ID)}) AS diary_id, {key_col}, {diary_date_col}, {", ".join(nap_cols)}
+                FROM {diary_table}
+                GROUP BY {key_col}, {diary_date_col}
+            ) AS d
+                ON d.{key_col} = {metric_key}
+                AND d.{diary_date_col} = m.{analysis_date_col}
+                AND m.{analysis_date_col} != ''
+            ORDER BY m.{self._validate_column_name(DatabaseColumn.UPDATED_AT)} DESC
+        """
 
-                    logger.debug("Integrated diary nap data for %s on %s", participant_key, analysis_date_str)
-                else:
-                    logger.debug("No diary data found for %s on %s", participant_key, analysis_date_str)
+        with self._get_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute(query):
+                try:
+                    metric = self._row_to_sleep_metrics(row)
+                except (ValueError, KeyError, ValidationError) as e:
+                    logger.warning("Skipping invalid database row: %s", e)
+                    continue
 
-        except Exception as e:
-            logger.warning("Failed to integrate diary data for %s: %s", metric.filename, e)
+                if row["diary_id"] is not None:
+                    for column in nap_cols:
+                        metric.set_dynamic_field(column, row[f"diary_{column}"])
+                yield metric
 
     def cleanup_old_autosaves(self, days_old: int = 7) -> int:
         """Remove autosave entries older than specified days with validation."""
@@ -904,90 +950,143 @@ class DatabaseManager:
                 "unique_files": unique_files,
             }
 
-    def load_raw_activity_data(
+    # Activity data preference -> raw activity storage column
+    ACTIVITY_COLUMNS: ClassVar[dict[ActivityDataPreference, DatabaseColumn]] = {
+        ActivityDataPreference.AXIS_Y: DatabaseColumn.AXIS_Y,
+        ActivityDataPreference.AXIS_X: DatabaseColumn.AXIS_X,
+        ActivityDataPreference.AXIS_Z: DatabaseColumn.AXIS_Z,
+        ActivityDataPreference.VECTOR_MAGNITUDE: DatabaseColumn.VECTOR_MAGNITUDE,
+    }
+
+    def load_activity_window(
         self,
         filename: str,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
-        activity_column: ActivityDataPreference = ActivityDataPreference.VECTOR_MAGNITUDE,
-    ) -> tuple[list[datetime], list[float]]:
+        columns: Sequence[ActivityDataPreference] | None = None,
+    ) -> tuple[np.ndarray, dict[ActivityDataPreference, np.ndarray]]:
         """
-        Load raw activity data from database for visualization.
+        Load several activity columns for a time window as NumPy arrays in a single query.
 
         Args:
             filename: Name of the file to load data for
-            start_time: Optional start time to filter data
-            end_time: Optional end time to filter data
-            activity_column: Which activity column to use (vector_magnitude or axis_y)
+            start_time: Optional inclusive start time (used together with end_time)
+            end_time: Optional exclusive end time
+            columns: Activity columns to load (default: all axes and vector magnitude)
 
         Returns:
-            Tuple of (timestamps, activities) lists
+            Tuple of (datetime64[s] timestamps, {column: float64 values}). Values are
+            clamped to be non-negative; epochs without a value for a column are NaN.
 
         """
-        # Validate inputs
         InputValidator.validate_string(filename, min_length=1, name="filename")
 
-        # Validate table and column names
-        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
+        preferences = list(columns) if columns is not None else list(self.ACTIVITY_COLUMNS)
+        db_columns = [self._validate_column_name(self.ACTIVITY_COLUMNS[ActivityDataPreference(pref)]) for pref in preferences]
 
         try:
             with self._get_connection() as conn:
-                conn.row_factory = sqlite3.Row
+                # Columnar block storage: one indexed fetch per day, sliced in NumPy
+                block_data = read_activity_blocks(conn, filename, db_columns, start_time, end_time)
+                if block_data is not None:
+                    epoch_seconds, block_values = block_data
+                    timestamps = epoch_seconds.astype("datetime64[s]")
+                    raw_values = [block_values[db_col] for db_col in db_columns]
+                else:
+                    timestamps, raw_values = self._load_activity_rows(conn, filename, db_columns, start_time, end_time)
 
-                # Determine which activity column to use
-                if activity_column == ActivityDataPreference.VECTOR_MAGNITUDE:
-                    activity_col = DatabaseColumn.VECTOR_MAGNITUDE
-                elif activity_column == ActivityDataPreference.AXIS_X:
-                    activity_col = DatabaseColumn.AXIS_X
-                elif activity_column == ActivityDataPreference.AXIS_Z:
-                    activity_col = DatabaseColumn.AXIS_Z
-                else:  # ActivityDataPreference.AXIS_Y (vertical - default for Sadeh)
-                    activity_col = DatabaseColumn.AXIS_Y
-
-                # Build query with optional time filtering
-                base_query = f"""
-                    SELECT {self._validate_column_name(DatabaseColumn.TIMESTAMP)},
-                           {self._validate_column_name(activity_col)}
-                    FROM {table_name}
-                    WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?
-                """
+            values = {pref: np.maximum(array, 0.0) for pref, array in zip(preferences, raw_values, strict=True)}  # Ensure non-negative
+            logger.debug("Loaded %s epochs of %s for %s", len(timestamps), preferences, filename)
+            return timestamps, values
 
-                params = [filename]
+        except Exception:
+            logger.exception("Failed to load activity window for %s", filename)
+            return np.array([], dtype="datetime64[s]"), {pref: np.array([], dtype=np.float64) for pref in preferences}
 
-                if start_time and end_time:
-                    base_query += f"""
-                        AND {self._validate_column_name(DatabaseColumn.TIMESTAMP)} >= ?
-                        AND {self._validate_column_name(DatabaseColumn.TIMESTAMP)} < ?
-                    """
-                    params.extend([start_time.isoformat(), end_time.isoformat()])
+    def _load_activity_rows(
+        self,
+        conn: sqlite3.Connection,
+        filename: str,
+        db_columns: list[str],
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> tuple[np.ndarray, list[np.ndarray]]:
+        """
+        Load activity columns from the legacy one-row-per-epoch table.
 
-                base_query += f" ORDER BY {self._validate_column_name(DatabaseColumn.TIMESTAMP)}"
+        Rows whose timestamp does not parse are skipped and logged. Timestamps
+        are truncated to whole seconds, the resolution of activity blocks, so
+        both storage formats return the same epochs.
+        """
+        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
+        timestamp_col = self._validate_column_name(DatabaseColumn.TIMESTAMP)
 
-                cursor = conn.execute(base_query, params)
+        query = f"""
+            SELECT {", ".join([timestamp_col, *db_columns])}
+            FROM {table_name}
+            WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?
+        """
+        params = [filename]
+        if start_time is not None and end_time is not None:
+            query += f" AND {timestamp_col} >= ? AND {timestamp_col} < ?"
+            params.extend([start_time.isoformat(), end_time.isoformat()])
+        query += f" ORDER BY {timestamp_col}"
+
+        rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return np.array([], dtype="datetime64[s]"), [np.array([], dtype=np.float64) for _ in db_columns]
+
+        row_columns = list(zip(*rows, strict=True))
+        timestamps = self._parse_stored_timestamps(row_columns[0])
+        values = [np.array(column, dtype=np.float64) for column in row_columns[1:]]  # NULL -> NaN
+        valid = ~np.isnat(timestamps)
+        if not valid.all():
+            logger.warning("Skipping %s rows of %s with invalid timestamps", int((~valid).sum()), filename)
+            timestamps = timestamps[valid]
+            values = [column[valid] for column in values]
+        return timestamps.astype("datetime64[s]"), values
+
+    @staticmethod
+    def _parse_stored_timestamps(values: Sequence[Any]) -> np.ndarray:
+        """Parse ISO timestamps as datetime64[us], with NaT for missing values and ones that do not parse."""
+        try:
+            return np.array(values, dtype="datetime64[us]")
+        except ValueError:
+            parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[us]")
+            for index, value in enumerate(values):
+                with contextlib.suppress(ValueError, TypeError):
+                    parsed[index] = np.datetime64(value, "us")
+            return parsed
 
-                timestamps = []
-                activities = []
+    def load_raw_activity_data(
+        self,
+        filename: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        activity_column: ActivityDataPreference = ActivityDataPreference.VECTOR_MAGNITUDE,
+    ) -> tuple[list[datetime], list[float]]:
+        """
+        Load raw activity data from database for visualization.
 
-                for row in cursor:
-                    try:
-                        # Parse ISO timestamp
-                        timestamp_str = row[DatabaseColumn.TIMESTAMP]
-                        timestamp = datetime.fromisoformat(timestamp_str)
-                        activity = max(0.0, float(row[activity_col]))  # Ensure non-negative
+        Args:
+            filename: Name of the file to load data for
+            start_time: Optional start time to filter data
+            end_time: Optional end time to filter data
+            activity_column: Which activity column to use (vector_magnitude or axis_y)
 
-                        timestamps.append(timestamp)
-                        activities.append(activity)
+        Returns:
+            Tuple of (timestamps, activities) lists
 
-                    except (ValueError, TypeError) as e:
-                        logger.warning("Skipping invalid data row: %s", e)
-                        continue
+        """
+        if activity_column not in self.ACTIVITY_COLUMNS:
+            activity_column = ActivityDataPreference.AXIS_Y  # Vertical axis - default for Sadeh
 
-                logger.debug("Loaded %s activity data points for %s", len(timestamps), filename)
-                return timestamps, activities
+        timestamps, values = self.load_activity_window(filename, start_time, end_time, columns=[activity_column])
+        activities = values[activity_column]
 
-        except Exception:
-            logger.exception("Failed to load raw activity data for %s", filename)
-            return [], []
+        # Epochs without a value for this column are skipped
+        valid = ~np.isnan(activities)
+        return timestamps[valid].tolist(), activities[valid].tolist()
 
     def get_available_activity_columns(self, filename: str) -> list[ActivityDataPreference]:
         """
@@ -1002,6 +1101,7 @@ class DatabaseManager:
         """
         InputValidator.validate_string(filename, min_length=1, name="filename")
         table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
+        blocks_table = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_BLOCKS)
 
         available = []
         column_mapping = [
@@ -1013,10 +1113,12 @@ class DatabaseManager:
 
         try:
             with self._get_connection() as conn:
+                # Block columns are NULL when the axis has no values for that day
+                source_table = blocks_table if has_activity_blocks(conn, filename) else table_name
                 for pref, db_col in column_mapping:
                     # Check if column has any non-null values
                     query = f"""
-                        SELECT COUNT(*) FROM {table_name}
+                        SELECT COUNT(*) FROM {source_table}
                         WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?
                         AND {self._validate_column_name(db_col)} IS NOT NULL
                         LIMIT 1
@@ -1083,33 +1185,154 @@ class DatabaseManager:
             logger.exception("Failed to get available files")
             return []
 
+    def get_file_hash(self, filename: str) -> str | None:
+        """Get the content hash recorded when a file was imported."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(
+                    f"""
+                    SELECT {self._validate_column_name(DatabaseColumn.FILE_HASH)}
+                    FROM {self._validate_table_name(DatabaseTable.FILE_REGISTRY)}
+                    WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?
+                    """,
+                    (filename,),
+                )
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+        except Exception:
+            logger.exception("Failed to get file hash for %s", filename)
+            return None
+
+    def load_algorithm_result(self, key: AlgorithmResultKey) -> CachedAlgorithmResult | None:
+        """Load a cached algorithm result for a file window, or None if not cached."""
+        try:
+            with self._get_connection() as conn:
+                result = read_algorithm_result(conn, key)
+                conn.commit()
+                return result
+
+        except Exception:
+            logger.exception("Failed to load cached %s result", key.algorithm_id)
+            return None
+
+    def save_algorithm_result(
+        self,
+        key: AlgorithmResultKey,
+        filename: str,
+        mask: Sequence[int] | np.ndarray,
+        ranges: Sequence[tuple[int, int]] | np.ndarray | None = None,
+    ) -> bool:
+        """Persist an algorithm result for a file window, evicting the least recently used entries."""
+        try:
+            with self._get_connection() as conn:
+                write_algorithm_result(conn, key, filename, mask, ranges)
+                conn.commit()
+                return True
+
+        except Exception:
+            logger.exception("Failed to cache %s result for %s", key.algorithm_id, filename)
+            return False
+
+    def _load_epoch_seconds(self, conn: sqlite3.Connection, filename: str) -> np.ndarray:
+        """Load a file's epoch timestamps as int64 seconds."""
+        block_data = read_activity_blocks(conn, filename, [])
+        if block_data is not None:
+            return block_data[0]
+        timestamps, _ = self._load_activity_rows(conn, filename, [], None, None)
+        return timestamps.astype(np.int64)
+
+    def save_epoch_scores(self, filename: str, scores: Sequence[EpochScores]) -> bool:
+        """Replace the whole-recording algorithm results stored for an imported file."""
+        try:
+            with self._get_connection() as conn:
+                write_epoch_scores(conn, filename, len(self._load_epoch_seconds(conn, filename)), scores)
+                conn.commit()
+                return True
+
+        except Exception:
+            logger.exception("Failed to save precomputed scores for %s", filename)
+            return False
+
+    def load_epoch_scores(
+        self,
+        filename: str,
+        algorithm_id: str,
+        parameters: dict[str, Any] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> tuple[np.ndarray, CachedAlgorithmResult] | None:
+        """
+        Load a precomputed algorithm result, optionally limited to [start_time, end_time).
+
+        Args:
+            filename: Imported file
+            algorithm_id: Algorithm identifier
+            parameters: Algorithm settings the result must have been computed with
+            start_time: Optional inclusive start (used together with end_time)
+            end_time: Optional exclusive end
+
+        Returns:
+            (datetime64[s] timestamps of the scored epochs, result), or None if no
+            result is stored for these settings or the file changed since
+
+        """
+        try:
+            with self._get_connection() as conn:
+                stored = read_epoch_scores(conn, filename, algorithm_id, canonical_parameters(parameters), self._load_epoch_seconds(conn, filename))
+            if stored is None:
+                return None
+
+            scored_seconds, result = stored
+            if start_time is not None and end_time is not None:
+                first = int(np.searchsorted(scored_seconds, datetime_to_epoch_seconds(start_time), side="left"))
+                last = int(np.searchsorted(scored_seconds, datetime_to_epoch_seconds(end_time), side="left"))
+                scored_seconds = scored_seconds[first:last]
+                result = slice_result(result, first, last - first)
+            return scored_seconds.astype("datetime64[s]"), result
+
+        except Exception:
+            logger.exception("Failed to load precomputed %s scores for %s", algorithm_id, filename)
+            return None
+
+    def load_precomputed_result(self, key: AlgorithmResultKey) -> CachedAlgorithmResult | None:
+        """Load the window identified by key from the file's precomputed scores, or None if not available."""
+        if not key.filename:
+            return None
+        try:
+            with self._get_connection() as conn:
+                stored = read_epoch_scores(conn, key.filename, key.algorithm_id, key.parameters, self._load_epoch_seconds(conn, key.filename))
+            return None if stored is None else slice_epoch_scores(*stored, key)
+
+        except Exception:
+            logger.exception("Failed to load precomputed %s scores for %s", key.algorithm_id, key.filename)
+            return None
+
+    def clear_algorithm_results(self) -> int:
+        """Delete all cached algorithm results."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(f"DELETE FROM {self._validate_table_name(DatabaseTable.ALGORITHM_RESULT_CACHE)}")
+                conn.commit()
+                return cursor.rowcount
+
+        except Exception:
+            logger.exception("Failed to clear algorithm result cache")
+            return 0
+
     def get_file_date_ranges(self, filename: str) -> list[date]:
         """Get available date ranges for a specific file."""
         # Validate inputs
         InputValidator.validate_string(filename, min_length=1, name="filename")
 
-        # Validate table and column names
-        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
-
         try:
             with self._get_connection() as conn:
-                # First check if file exists in database
-                check_cursor = conn.execute(
-                    f"SELECT COUNT(*) FROM {table_name} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
-                    (filename,),
-                )
-                record_count = check_cursor.fetchone()[0]
-
-                if record_count == 0:
-                    logger.warning("No activity records found for %s in database", filename)
-                    return []
-
+                date_col = self._validate_column_name(DatabaseColumn.ACTIVITY_DATE)
                 cursor = conn.execute(
                     f"""
-                    SELECT DISTINCT DATE({self._validate_column_name(DatabaseColumn.TIMESTAMP)}) as date
-                    FROM {table_name}
+                    SELECT {date_col} FROM {self._validate_table_name(DatabaseTable.FILE_DATES)}
                     WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?
-                    ORDER BY date
+                    ORDER BY {date_col}
                 """,
                     (filename,),
                 )
@@ -1125,6 +1348,10 @@ class DatabaseManager:
                         logger.warning("Skipping invalid date: %s", e)
                         continue
 
+                if not dates:
+                    logger.warning("No activity records found for %s in database", filename)
+                    return []
+
                 logger.debug("Found %s unique dates for %s", len(dates), filename)
                 return dates
 
@@ -1134,17 +1361,14 @@ class DatabaseManager:
 
     def get_all_file_date_ranges(self) -> dict[str, int]:
         """Get date ranges for ALL files in a single query - returns dict of filename -> date count."""
-        # Validate table and column names
-        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
-
         try:
             with self._get_connection() as conn:
                 cursor = conn.execute(
                     f"""
                     SELECT
                         {self._validate_column_name(DatabaseColumn.FILENAME)},
-                        COUNT(DISTINCT DATE({self._validate_column_name(DatabaseColumn.TIMESTAMP)})) as date_count
-                    FROM {table_name}
+                        COUNT(*) as date_count
+                    FROM {self._validate_table_name(DatabaseTable.FILE_DATES)}
                     GROUP BY {self._validate_column_name(DatabaseColumn.FILENAME)}
                     """,
                 )
@@ -1165,18 +1389,15 @@ class DatabaseManager:
 
     def get_all_file_date_ranges_batch(self) -> dict[str, tuple[str, str]]:
         """Get min/max date ranges for ALL files in a single query - returns dict of filename -> (start_date, end_date)."""
-        # Validate table and column names
-        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
-
         try:
             with self._get_connection() as conn:
                 cursor = conn.execute(
                     f"""
                     SELECT
                         {self._validate_column_name(DatabaseColumn.FILENAME)},
-                        MIN(DATE({self._validate_column_name(DatabaseColumn.TIMESTAMP)})) as start_date,
-                        MAX(DATE({self._validate_column_name(DatabaseColumn.TIMESTAMP)})) as end_date
-                    FROM {table_name}
+                        MIN({self._validate_column_name(DatabaseColumn.ACTIVITY_DATE)}) as start_date,
+                        MAX({self._validate_column_name(DatabaseColumn.ACTIVITY_DATE)}) as end_date
+                    FROM {self._validate_table_name(DatabaseTable.FILE_DATES)}
                     GROUP BY {self._validate_column_name(DatabaseColumn.FILENAME)}
                     """,
                 )
@@ -1184,8 +1405,8 @@ class DatabaseManager:
                 result = {}
                 for row in cursor:
                     filename = row[0]
-                    start_date = row[1]  # Already in YYYY-MM-DD format from SQLite DATE()
-                    end_date = row[2]  # Already in YYYY-MM-DD format from SQLite DATE()
+                    start_date = row[1]  # Stored in YYYY-MM-DD format
+                    end_date = row[2]
                     result[filename] = (start_date, end_date)
 
                 logger.info("Batch loaded date ranges for %s files", len(result))
@@ -1224,6 +1445,25 @@ class DatabaseManager:
 
                 activity_stats = cursor.fetchone()
 
+                # Columnar block stats (timestamps stored as epoch seconds, reported as ISO strings)
+                cursor = conn.execute(f"""
+                    SELECT
+                        SUM({self._validate_column_name(DatabaseColumn.EPOCH_COUNT)}),
+                        STRFTIME('%Y-%m-%dT%H:%M:%S', MIN({self._validate_column_name(DatabaseColumn.BLOCK_START)}), 'unixepoch'),
+                        STRFTIME('%Y-%m-%dT%H:%M:%S', MAX({self._validate_column_name(DatabaseColumn.BLOCK_END)}), 'unixepoch')
+                    FROM {self._validate_table_name(DatabaseTable.RAW_ACTIVITY_BLOCKS)}
+                """)
+
+                block_stats = cursor.fetchone()
+
+                cursor = conn.execute(
+                    f"SELECT COUNT(DISTINCT {self._validate_column_name(DatabaseColumn.FILENAME)}) FROM {self._validate_table_name(DatabaseTable.FILE_DATES)}"
+                )
+                files_with_data = cursor.fetchone()[0]
+
+                earliest_values = [value for value in (activity_stats[2], block_stats[1]) if value is not None]
+                latest_values = [value for value in (activity_stats[3], block_stats[2]) if value is not None]
+
                 # Sleep metrics stats
                 cursor = conn.execute(f"""
                     SELECT
@@ -1240,10 +1480,10 @@ class DatabaseManager:
                     "imported_files": file_stats[2] or 0,
                     "error_files": file_stats[3] or 0,
                     "unique_participants": file_stats[4] or 0,
-                    "total_activity_records": activity_stats[0] or 0,
-                    "files_with_data": activity_stats[1] or 0,
-                    "earliest_data": activity_stats[2],
-                    "latest_data": activity_stats[3],
+                    "total_activity_records": (activity_stats[0] or 0) + (block_stats[0] or 0),
+                    "files_with_data": files_with_data or 0,
+                    "earliest_data": min(earliest_values) if earliest_values else None,
+                    "latest_data": max(latest_values) if latest_values else None,
                     "sleep_metrics_records": sleep_stats[0] or 0,
                     "files_with_metrics": sleep_stats[1] or 0,
                 }
@@ -1300,6 +1540,9 @@ class DatabaseManager:
                 cursor = conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.RAW_ACTIVITY_DATA}")
                 raw_data_count = cursor.fetchone()[0]
 
+                cursor = conn.execute(f"SELECT COALESCE(SUM({DatabaseColumn.EPOCH_COUNT}), 0) FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS}")
+                raw_data_count += cursor.fetchone()[0]
+
                 cursor = conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.FILE_REGISTRY}")
                 file_count = cursor.fetchone()[0]
 
@@ -1309,6 +1552,10 @@ class DatabaseManager:
                 # Clear all activity-related tables
                 conn.execute(f"DELETE FROM {DatabaseTable.SLEEP_METRICS}")
                 conn.execute(f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_DATA}")
+                conn.execute(f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS}")
+                conn.execute(f"DELETE FROM {DatabaseTable.ALGORITHM_RESULT_CACHE}")
+                conn.execute(f"DELETE FROM {DatabaseTable.EPOCH_SCORES}")
+                conn.execute(f"DELETE FROM {DatabaseTable.FILE_DATES}")
                 conn.execute(f"DELETE FROM {DatabaseTable.FILE_REGISTRY}")
                 conn.execute(f"DELETE FROM {DatabaseTable.SLEEP_MARKERS_EXTENDED}")
                 if FeatureFlags.ENABLE_AUTOSAVE:
@@ -1331,6 +1578,45 @@ class DatabaseManager:
             msg = f"Failed to clear activity data: {e}"
             raise DatabaseError(msg, ErrorCodes.DB_QUERY_FAILED) from e
 
+    def migrate_activity_rows_to_blocks(self, progress_callback: Callable[[str, int, str | None], None] | None = None) -> dict[str, int]:
+        """
+        Move activity stored as legacy per-epoch rows into columnar blocks.
+
+        Each file is migrated in its own transaction and its rows are only deleted
+        once the blocks read back the same; a file that fails keeps its rows and
+        stays readable. progress_callback(filename, epochs, error) is called per file.
+        """
+        filename_col = self._validate_column_name(DatabaseColumn.FILENAME)
+        table_name = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
+        try:
+            with self._get_connection() as conn:
+                filenames = [row[0] for row in conn.execute(f"SELECT DISTINCT {filename_col} FROM {table_name}")]
+        except Exception as e:
+            logger.exception("Failed to list files to migrate")
+            msg = f"Failed to list files to migrate: {e}"
+            raise DatabaseError(msg, ErrorCodes.DB_QUERY_FAILED) from e
+
+        counts = {"files_migrated": 0, "files_failed": 0, "epochs_migrated": 0}
+        for filename in filenames:
+            error = None
+            epochs = 0
+            try:
+                with self._get_connection() as conn:
+                    epochs = migrate_rows_to_blocks(conn, filename)
+                    conn.commit()
+            except (DatabaseError, DataIntegrityError) as e:
+                logger.warning("Failed to migrate %s to columnar blocks: %s", filename, e)
+                error = str(e)
+                counts["files_failed"] += 1
+            else:
+                counts["files_migrated"] += 1
+                counts["epochs_migrated"] += epochs
+            if progress_callback:
+                progress_callback(filename, epochs, error)
+
+        logger.info("Migrated %d of %d files to columnar blocks", counts["files_migrated"], len(filenames))
+        return counts
+
     def clear_diary_data(self) -> dict[str, int]:
         """Clear all imported diary data."""
         try:
@@ -1484,6 +1770,27 @@ class DatabaseManager:
                     )
                     activity_deleted = cursor.rowcount
 
+                    # Delete columnar activity blocks
+                    cursor = conn.execute(
+                        f"DELETE FROM {self._validate_table_name(DatabaseTable.RAW_ACTIVITY_BLOCKS)} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
+                        (filename,),
+                    )
+                    activity_deleted += cursor.rowcount
+
+                    # Delete cached and precomputed algorithm results
+                    conn.execute(
+                        f"DELETE FROM {self._validate_table_name(DatabaseTable.ALGORITHM_RESULT_CACHE)} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
+                        (filename,),
+                    )
+                    conn.execute(
+                        f"DELETE FROM {self._validate_table_name(DatabaseTable.EPOCH_SCORES)} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
+                        (filename,),
+                    )
+                    conn.execute(
+                        f"DELETE FROM {self._validate_table_name(DatabaseTable.FILE_DATES)} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
+                        (filename,),
+                    )
+
                     # Delete file registry entry
                     cursor = conn.execute(
                         f"DELETE FROM {self._validate_table_name(DatabaseTable.FILE_REGISTRY)} WHERE {self._validate_column_name(DatabaseColumn.FILENAME)} = ?",
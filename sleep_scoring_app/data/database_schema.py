@@ -18,6 +18,7 @@ from sleep_scoring_app.core.constants import (
     FeatureFlags,
     ImportStatus,
 )
+from sleep_scoring_app.data.file_dates import rebuild_file_dates
 from sleep_scoring_app.utils.column_registry import (
     DataType,
     column_registry,
@@ -77,6 +78,7 @@ class DatabaseSchemaManager:
         sleep_table = self._validate_table_name(DatabaseTable.SLEEP_METRICS)
         autosave_table = self._validate_table_name(DatabaseTable.AUTOSAVE_METRICS)
         raw_activity_table = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_DATA)
+        raw_activity_blocks_table = self._validate_table_name(DatabaseTable.RAW_ACTIVITY_BLOCKS)
         file_registry_table = self._validate_table_name(DatabaseTable.FILE_REGISTRY)
         nonwear_sensor_table = self._validate_table_name(DatabaseTable.NONWEAR_SENSOR_PERIODS)
         choi_periods_table = self._validate_table_name(DatabaseTable.CHOI_ALGORITHM_PERIODS)
@@ -87,6 +89,9 @@ class DatabaseSchemaManager:
         diary_nonwear_periods_table = self._validate_table_name(DatabaseTable.DIARY_NONWEAR_PERIODS)
         sleep_markers_extended_table = self._validate_table_name(DatabaseTable.SLEEP_MARKERS_EXTENDED)
         manual_nwt_markers_table = self._validate_table_name(DatabaseTable.MANUAL_NWT_MARKERS)
+        algorithm_result_cache_table = self._validate_table_name(DatabaseTable.ALGORITHM_RESULT_CACHE)
+        epoch_scores_table = self._validate_table_name(DatabaseTable.EPOCH_SCORES)
+        file_dates_table = self._validate_table_name(DatabaseTable.FILE_DATES)
 
         # Create main table using column registry
         self._create_main_table(conn, sleep_table)
@@ -108,6 +113,15 @@ class DatabaseSchemaManager:
         # Add missing axis columns (for older databases that don't have them)
         self._migrate_raw_activity_add_axis_columns(conn, raw_activity_table)
 
+        # Create columnar activity block storage; legacy per-epoch rows stay readable until
+        # DatabaseManager.migrate_activity_rows_to_blocks is run explicitly
+        self._create_raw_activity_blocks_table(conn, raw_activity_blocks_table)
+        if FeatureFlags.ENABLE_COLUMNAR_ACTIVITY_STORAGE and conn.execute(f"SELECT 1 FROM {raw_activity_table} LIMIT 1").fetchone():
+            logger.info("%s holds per-epoch rows; run 'sleep-scoring-cli migrate-storage' to move them into columnar blocks", raw_activity_table)
+
+        # Create the per-file date index, filling it from already imported data
+        self._create_file_dates_table(conn, file_dates_table)
+
         # Create nonwear data tables
         self._create_nonwear_sensor_table(conn, nonwear_sensor_table)
         self._create_choi_periods_table(conn, choi_periods_table)
@@ -131,6 +145,12 @@ class DatabaseSchemaManager:
         self._create_manual_nwt_markers_table(conn, manual_nwt_markers_table)
         self._create_extended_markers_indexes(conn, sleep_markers_extended_table, manual_nwt_markers_table)
 
+        # Create persistent algorithm result cache
+        self._create_algorithm_result_cache_table(conn, algorithm_result_cache_table)
+
+        # Create whole-recording scores precomputed at import
+        self._create_epoch_scores_table(conn, epoch_scores_table)
+
     def _create_main_table(self, conn: sqlite3.Connection, table_name: str) -> None:
         """Create main sleep metrics table using column registry."""
         # Core columns that are always present
@@ -264,6 +284,50 @@ class DatabaseSchemaManager:
             )
         """)
 
+    def _create_raw_activity_blocks_table(self, conn: sqlite3.Connection, table_name: str) -> None:
+        """Create columnar raw activity table (one row of packed arrays per file per day)."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                {self._validate_column_name(DatabaseColumn.ID)} INTEGER PRIMARY KEY AUTOINCREMENT,
+                {self._validate_column_name(DatabaseColumn.FILENAME)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.BLOCK_DATE)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.BLOCK_START)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.BLOCK_END)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.EPOCH_COUNT)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.TIMESTAMP)} BLOB NOT NULL,
+                {self._validate_column_name(DatabaseColumn.AXIS_Y)} BLOB,
+                {self._validate_column_name(DatabaseColumn.AXIS_X)} BLOB,
+                {self._validate_column_name(DatabaseColumn.AXIS_Z)} BLOB,
+                {self._validate_column_name(DatabaseColumn.VECTOR_MAGNITUDE)} BLOB,
+                {self._validate_column_name(DatabaseColumn.IMPORT_DATE)} TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE({self._validate_column_name(DatabaseColumn.FILENAME)},
+                       {self._validate_column_name(DatabaseColumn.BLOCK_DATE)}),
+                FOREIGN KEY({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    REFERENCES {self._validate_table_name(DatabaseTable.FILE_REGISTRY)}({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    ON DELETE CASCADE
+            )
+        """)
+
+    def _create_file_dates_table(self, conn: sqlite3.Connection, table_name: str) -> None:
+        """Create the per-file activity date index (one row per file per day), indexing existing data when new."""
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                {self._validate_column_name(DatabaseColumn.FILENAME)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.ACTIVITY_DATE)} TEXT NOT NULL,
+                PRIMARY KEY({self._validate_column_name(DatabaseColumn.FILENAME)},
+                            {self._validate_column_name(DatabaseColumn.ACTIVITY_DATE)}),
+                FOREIGN KEY({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    REFERENCES {self._validate_table_name(DatabaseTable.FILE_REGISTRY)}({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        if exists is None:
+            try:
+                rebuild_file_dates(conn)
+            except sqlite3.Error as e:
+                logger.warning("Failed to index activity dates of imported files: %s", e)
+
     def _create_raw_activity_indexes(
         self,
         conn: sqlite3.Connection,
@@ -751,6 +815,60 @@ class DatabaseSchemaManager:
             )
         """)
 
+    def _create_algorithm_result_cache_table(self, conn: sqlite3.Connection, table_name: str) -> None:
+        """Create the bit-packed algorithm result cache (one row per file window and algorithm setting)."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                {self._validate_column_name(DatabaseColumn.FILENAME)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.FILE_HASH)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.WINDOW_START)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.EPOCH_COUNT)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.ALGORITHM_ID)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.ALGORITHM_PARAMETERS)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.RESULT_MASK)} BLOB NOT NULL,
+                {self._validate_column_name(DatabaseColumn.RESULT_RANGES)} BLOB,
+                {self._validate_column_name(DatabaseColumn.LAST_USED)} INTEGER NOT NULL,
+                PRIMARY KEY({self._validate_column_name(DatabaseColumn.FILE_HASH)},
+                            {self._validate_column_name(DatabaseColumn.WINDOW_START)},
+                            {self._validate_column_name(DatabaseColumn.EPOCH_COUNT)},
+                            {self._validate_column_name(DatabaseColumn.ALGORITHM_ID)},
+                            {self._validate_column_name(DatabaseColumn.ALGORITHM_PARAMETERS)}),
+                FOREIGN KEY({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    REFERENCES {self._validate_table_name(DatabaseTable.FILE_REGISTRY)}({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    ON DELETE CASCADE
+            )
+        """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table_name}_last_used
+            ON {table_name}({self._validate_column_name(DatabaseColumn.LAST_USED)})
+        """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table_name}_filename
+            ON {table_name}({self._validate_column_name(DatabaseColumn.FILENAME)})
+        """)
+
+    def _create_epoch_scores_table(self, conn: sqlite3.Connection, table_name: str) -> None:
+        """Create the precomputed epoch score table (one row per file, algorithm and setting)."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                {self._validate_column_name(DatabaseColumn.FILENAME)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.FILE_HASH)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.ALGORITHM_ID)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.ALGORITHM_PARAMETERS)} TEXT NOT NULL,
+                {self._validate_column_name(DatabaseColumn.EPOCH_COUNT)} INTEGER NOT NULL,
+                {self._validate_column_name(DatabaseColumn.VALID_MASK)} BLOB,
+                {self._validate_column_name(DatabaseColumn.RESULT_MASK)} BLOB NOT NULL,
+                {self._validate_column_name(DatabaseColumn.RESULT_RANGES)} BLOB,
+                {self._validate_column_name(DatabaseColumn.CREATED_AT)} TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY({self._validate_column_name(DatabaseColumn.FILENAME)},
+                            {self._validate_column_name(DatabaseColumn.ALGORITHM_ID)},
+                            {self._validate_column_name(DatabaseColumn.ALGORITHM_PARAMETERS)}),
+                FOREIGN KEY({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    REFERENCES {self._validate_table_name(DatabaseTable.FILE_REGISTRY)}({self._validate_column_name(DatabaseColumn.FILENAME)})
+                    ON DELETE CASCADE
+            )
+        """)
+
     def _migrate_diary_table_columns(self, conn: sqlite3.Connection, table_name: str) -> None:
         """Add missing columns to existing diary_data tables."""
         # Get existing columns
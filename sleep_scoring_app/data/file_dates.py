@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Per-file index of the calendar days that hold activity data.
+
+The file list shows each file's dates, date count and first/last day on every
+refresh. Deriving them means DISTINCT DATE(timestamp) over every epoch row and
+block of every file, so the dates are instead stored in the file_dates table
+when a file is imported, removed with the file, and read back with an indexed
+lookup.
+
+Dates are taken from the stored data itself (DATE(timestamp) for per-epoch
+rows, block_date for columnar blocks), so the index always agrees with what
+either storage holds.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Distinct (filename, date) pairs of the stored activity data; {where} narrows both storages to one file
+_STORED_DATES_SQL = f"""
+    SELECT {DatabaseColumn.FILENAME}, DATE({DatabaseColumn.TIMESTAMP}) AS {DatabaseColumn.ACTIVITY_DATE}
+    FROM {DatabaseTable.RAW_ACTIVITY_DATA}
+    {{where}}
+    UNION
+    SELECT {DatabaseColumn.FILENAME}, {DatabaseColumn.BLOCK_DATE}
+    FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS}
+    {{where}}
+"""
+
+# Rows whose timestamp is not a valid date are left out of the index
+_INSERT_DATES_SQL = f"""
+    INSERT INTO {DatabaseTable.FILE_DATES} ({DatabaseColumn.FILENAME}, {DatabaseColumn.ACTIVITY_DATE})
+    SELECT {DatabaseColumn.FILENAME}, {DatabaseColumn.ACTIVITY_DATE}
+    FROM ({{stored_dates}})
+    WHERE {DatabaseColumn.ACTIVITY_DATE} IS NOT NULL
+      AND {DatabaseColumn.FILENAME} IN (SELECT {DatabaseColumn.FILENAME} FROM {DatabaseTable.FILE_REGISTRY})
+"""
+
+
+def refresh_file_dates(conn: sqlite3.Connection, filename: str) -> int:
+    """
+    Replace a file's indexed dates with the dates of its stored activity data.
+
+    Must be called inside the caller's transaction, after the file's data is written; does not commit.
+
+    Returns:
+        Number of dates indexed for the file
+
+    """
+    conn.execute(f"DELETE FROM {DatabaseTable.FILE_DATES} WHERE {DatabaseColumn.FILENAME} = ?", (filename,))
+    stored_dates = _STORED_DATES_SQL.format(where=f"WHERE {DatabaseColumn.FILENAME} = ?")
+    return conn.execute(_INSERT_DATES_SQL.format(stored_dates=stored_dates), (filename, filename)).rowcount
+
+
+def rebuild_file_dates(conn: sqlite3.Connection) -> int:
+    """
+    Index the dates of every file's stored activity data, replacing the whole index.
+
+    Used to fill the index of databases imported before it existed; does not commit.
+
+    Returns:
+        Number of (file, date) pairs indexed
+
+    """
+    conn.execute(f"DELETE FROM {DatabaseTable.FILE_DATES}")
+    count = conn.execute(_INSERT_DATES_SQL.format(stored_dates=_STORED_DATES_SQL.format(where=""))).rowcount
+    logger.info("Indexed %d activity dates", count)
+    return count
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of decoded raw accelerometer samples.
+
+Decoding a GT3X file with pygt3x takes far longer than reading the samples
+back, and raw-mode consumers (van Hees nonwear, auto-calibration, time-gap
+imputation) need the same calibrated samples every time. RawSampleCache writes
+the decoded timestamps and calibrated X/Y/Z samples of a file once, as .npy
+arrays keyed by the file's content hash, and later loads memory-map them
+read-only instead of decoding again. The arrays can be passed straight to
+calibrate, impute_timegaps and VanHeesNonwearAlgorithm.detect, which never
+modify their input.
+
+The cache directory is size-bounded: after each write, the least recently used
+entries are removed until the total size is under the cap.
+
+Layout:
+    <cache_dir>/<file_hash>/timestamps.npy  float64 Unix seconds, (n_samples,)
+    <cache_dir>/<file_hash>/samples.npy     float32 X, Y, Z in g, (n_samples, 3)
+    <cache_dir>/<file_hash>/meta.json       sample rate and format version
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from sleep_scoring_app.core.algorithms.gt3x_datasource import RawSamples
+from sleep_scoring_app.core.constants import ConfigDefaults, FileName
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+TIMESTAMPS_FILE = "timestamps.npy"
+SAMPLES_FILE = "samples.npy"
+META_FILE = "meta.json"
+
+
+def file_content_hash(file_path: str | Path) -> str:
+    """SHA256 of a file's content, the key the cache uses for it."""
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
+
+class RawSampleCache:
+    """
+    Size-bounded, memory-mapped store of decoded raw samples keyed by file hash.
+
+    Example:
+        >>> cache = RawSampleCache()
+        >>> raw = cache.get(file_hash)
+        >>> if raw is None:
+        ...     raw = cache.put(file_hash, sample_rate, n_samples, chunks)
+        >>> calibrate(raw.samples, raw.sample_rate)
+
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None, max_bytes: int = ConfigDefaults.RAW_SAMPLE_CACHE_MAX_MB * 1024 * 1024) -> None:
+        """
+        Set up a cache in cache_dir; nothing is read or written until it is used.
+
+        Args:
+            cache_dir: Directory holding the entries (default: raw sample cache in the user data directory)
+            max_bytes: Total size the entries are evicted down to after each write
+
+        """
+        if cache_dir is None:
+            from sleep_scoring_app.utils.resource_resolver import ResourceResolver
+
+            cache_dir = ResourceResolver().get_user_data_path(FileName.RAW_SAMPLE_CACHE)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key_for(self, file_path: str | Path) -> str:
+        """The key a file's samples are stored under: its content hash."""
+        return file_content_hash(file_path)
+
+    def get(self, file_hash: str) -> RawSamples | None:
+        """
+        Map a file's cached samples read-only and mark them as recently used.
+
+        Returns:
+            RawSamples backed by the cache files, or None if the file is not cached
+
+        """
+        entry = self.cache_dir / file_hash
+        meta_path = entry / META_FILE
+        if not meta_path.exists():
+            return None
+
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("format_version") != FORMAT_VERSION:
+                self._remove(entry)
+                return None
+            timestamps = np.load(entry / TIMESTAMPS_FILE, mmap_mode="r")
+            samples = np.load(entry / SAMPLES_FILE, mmap_mode="r")
+            if samples.shape != (len(timestamps), 3):
+                msg = f"samples shape {samples.shape} does not match {len(timestamps)} timestamps"
+                raise ValueError(msg)
+            os.utime(meta_path)
+        except (OSError, ValueError) as e:
+            logger.warning("Discarding unreadable raw sample cache entry %s: %s", file_hash, e)
+            self._remove(entry)
+            return None
+
+        return RawSamples(timestamps=timestamps, samples=samples, sample_rate=float(meta["sample_rate"]))
+
+    def put(self, file_hash: str, sample_rate: float, n_samples: int, chunks: Iterable[tuple[np.ndarray, np.ndarray]]) -> RawSamples:
+        """
+        Write a file's samples chunk by chunk, then evict least recently used entries beyond the size cap.
+
+        Args:
+            file_hash: Content hash of the source file
+            sample_rate: Sample rate in Hz
+            n_samples: Total number of samples the chunks contain
+            chunks: (timestamps, X/Y/Z samples) chunks in order
+
+        Returns:
+            The stored samples, memory-mapped from the cache
+
+        Raises:
+            ValueError: If the chunks do not contain n_samples samples
+
+        """
+        entry = self.cache_dir / file_hash
+        staging = self.cache_dir / f"{file_hash}.tmp-{os.getpid()}"
+        self._remove(staging)
+        staging.mkdir(parents=True)
+
+        try:
+            timestamps = np.lib.format.open_memmap(staging / TIMESTAMPS_FILE, mode="w+", dtype=np.float64, shape=(n_samples,))
+            samples = np.lib.format.open_memmap(staging / SAMPLES_FILE, mode="w+", dtype=np.float32, shape=(n_samples, 3))
+            written = 0
+            for chunk_timestamps, chunk_samples in chunks:
+                end = written + len(chunk_timestamps)
+                if end > n_samples:
+                    msg = f"Chunks for {file_hash} contain more than {n_samples} samples"
+                    raise ValueError(msg)
+                timestamps[written:end] = chunk_timestamps
+                samples[written:end] = chunk_samples
+                written = end
+            if written != n_samples:
+                msg = f"Expected {n_samples} samples for {file_hash}, got {written}"
+                raise ValueError(msg)
+            timestamps.flush()
+            samples.flush()
+            del timestamps, samples
+
+            (staging / META_FILE).write_text(json.dumps({"format_version": FORMAT_VERSION, "sample_rate": sample_rate, "n_samples": n_samples}))
+            self._remove(entry)
+            staging.replace(entry)
+        except BaseException:
+            self._remove(staging)
+            raise
+
+        self.evict(keep=file_hash)
+        cached = self.get(file_hash)
+        if cached is None:
+            msg = f"Raw sample cache entry {file_hash} could not be read back"
+            raise OSError(msg)
+        return cached
+
+    def evict(self, keep: str | None = None) -> None:
+        """Remove least recently used entries until the cache is within max_bytes (never the entry keep)."""
+        entries = [(self._last_used(entry), self._size(entry), entry) for entry in self._entries()]
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            self._remove(entry)
+            total -= size
+            logger.debug("Evicted raw sample cache entry %s (%d bytes)", entry.name, size)
+
+    def size_bytes(self) -> int:
+        """Total size of the cached entries."""
+        return sum(self._size(entry) for entry in self._entries())
+
+    def __contains__(self, file_hash: str) -> bool:
+        return (self.cache_dir / file_hash / META_FILE).exists()
+
+    # === Entries ===
+
+    def _entries(self) -> list[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return [entry for entry in self.cache_dir.iterdir() if entry.is_dir() and (entry / META_FILE).exists()]
+
+    @staticmethod
+    def _last_used(entry: Path) -> float:
+        try:
+            return (entry / META_FILE).stat().st_mtime
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _size(entry: Path) -> int:
+        return sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+
+    @staticmethod
+    def _remove(entry: Path) -> None:
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,1032 @@
+#!/usr/bin/env python3
+"""
+Activity Importer for Sleep Scoring Application
+Handles bulk CSV import functionality with progress tracking and file change detection.
+
+Has no Qt dependency so it can run headless (see sleep_scoring_app.cli);
+ImportService wraps it with Qt signals for the GUI.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from sleep_scoring_app.core.constants import (
+    ConfigDefaults,
+    DatabaseColumn,
+    DatabaseTable,
+    FeatureFlags,
+    ImportStatus,
+)
+from sleep_scoring_app.core.exceptions import (
+    DatabaseError,
+    ErrorCodes,
+    SleepScoringImportError,
+    ValidationError,
+)
+from sleep_scoring_app.core.validation import InputValidator
+from sleep_scoring_app.data.activity_blocks import to_epoch_seconds, write_activity_blocks
+from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.data.file_dates import refresh_file_dates
+from sleep_scoring_app.services.import_parser import ActivityFileParser, PreparedImportFile
+from sleep_scoring_app.services.nonwear_service import NonwearDataService
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from os import stat_result
+    from pathlib import Path
+
+    from sleep_scoring_app.core.dataclasses import ParticipantInfo
+    from sleep_scoring_app.services.precompute_service import ScoringPrecomputeService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def default_import_workers() -> int:
+    """Default number of file-parsing worker processes for multi-file imports."""
+    return max(1, min(os.cpu_count() or 1, ConfigDefaults.IMPORT_WORKERS))
+
+
+def modified_time(file_stat: stat_result) -> str:
+    """A file's modification time as stored in the file registry."""
+    return datetime.fromtimestamp(file_stat.st_mtime).isoformat()
+
+
+@dataclass(frozen=True)
+class ImportDecision:
+    """Whether a file needs importing, as decided before the import starts."""
+
+    needs_import: bool
+    reason: str
+    file_hash: str | None = None  # Content hash, when the decision needed one
+
+
+class ImportProgress:
+    """Progress tracking for import operations."""
+
+    def __init__(self, total_files: int = 0, total_records: int = 0) -> None:
+        self.total_files = total_files
+        self.processed_files = 0
+        self.total_records = total_records
+        self.processed_records = 0
+        self.started_at = time.perf_counter()
+        self.current_file = ""
+        self.errors: list[str] = []
+        self.warnings: list[str] = []
+        self.skipped_files: list[str] = []
+        self.imported_files: list[str] = []
+        self.info_messages: list[str] = []
+
+        # Separate tracking for nonwear data
+        self.total_nonwear_files = 0
+        self.processed_nonwear_files = 0
+        self.current_nonwear_file = ""
+        self.imported_nonwear_files: list[str] = []
+
+    def add_info(self, message: str) -> None:
+        """Add an informational message to the progress."""
+        self.info_messages.append(message)
+
+    @property
+    def file_progress_percent(self) -> float:
+        try:
+            if self.total_files == 0:
+                return 0.0
+            return (self.processed_files / self.total_files) * 100
+        except (TypeError, AttributeError):
+            # Handle mock objects during testing
+            return 0.0
+
+    @property
+    def record_progress_percent(self) -> float:
+        try:
+            if self.total_records == 0:
+                return 0.0
+            return (self.processed_records / self.total_records) * 100
+        except (TypeError, AttributeError):
+            # Handle mock objects during testing
+            return 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Activity records imported per second since this progress tracker was created."""
+        try:
+            elapsed = time.perf_counter() - self.started_at
+            if elapsed <= 0:
+                return 0.0
+            return self.processed_records / elapsed
+        except (TypeError, AttributeError):
+            # Handle mock objects during testing
+            return 0.0
+
+    @property
+    def nonwear_progress_percent(self) -> float:
+        try:
+            if self.total_nonwear_files == 0:
+                return 0.0
+            return (self.processed_nonwear_files / self.total_nonwear_files) * 100
+        except (TypeError, AttributeError):
+            # Handle mock objects during testing
+            return 0.0
+
+    def add_error(self, error: str) -> None:
+        self.errors.append(error)
+        logger.error(error)
+
+    def add_warning(self, warning: str) -> None:
+        self.warnings.append(warning)
+        logger.warning(warning)
+
+
+class ActivityImporter:
+    """Imports CSV files into the database with progress tracking, without Qt."""
+
+    # Connection settings applied while importing a file
+    IMPORT_PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -65536",  # 64 MB page cache
+    )
+
+    def __init__(
+        self,
+        database_manager: DatabaseManager | None = None,
+        max_workers: int | None = None,
+        scoring_precomputer: ScoringPrecomputeService | None = None,
+    ) -> None:
+        super().__init__()
+        self.db_manager = database_manager or DatabaseManager()
+        self.nonwear_service = NonwearDataService(self.db_manager)
+        self.batch_size = 10000  # Records per executemany batch for large files
+        self.max_file_size = 100 * 1024 * 1024  # 100MB limit
+        # Worker processes parsing files during multi-file imports (1 = sequential)
+        self.max_workers = max_workers if max_workers is not None else default_import_workers()
+        # Optional stage scoring each imported file once so later views read stored results
+        self.scoring_precomputer = scoring_precomputer
+        self._cancel_requested = False
+
+    # Progress notifications; no-ops here, overridden by ImportService to emit Qt signals
+
+    def _on_progress_updated(self, progress: ImportProgress) -> None:
+        """Called as records are written."""
+
+    def _on_nonwear_progress_updated(self, progress: ImportProgress) -> None:
+        """Called as nonwear sensor files are imported."""
+
+    def _on_file_started(self, filename: str) -> None:
+        """Called when a file starts being written."""
+
+    def _on_file_completed(self, filename: str, success: bool) -> None:
+        """Called when a file has been imported or has failed."""
+
+    def _on_import_completed(self, progress: ImportProgress) -> None:
+        """Called when a multi-file import finishes."""
+
+    def _create_parser(self) -> ActivityFileParser:
+        """Create a picklable parser using this service's settings."""
+        return ActivityFileParser(self.max_file_size)
+
+    def cancel(self) -> None:
+        """Request cancellation of the running multi-file import; checked between files."""
+        self._cancel_requested = True
+
+    def calculate_file_hash(self, file_path: Path) -> str:
+        """Calculate SHA256 hash of file for change detection."""
+        return self._create_parser().calculate_file_hash(file_path)
+
+    def extract_participant_info(self, file_path: Path) -> ParticipantInfo:
+        """Extract participant information using centralized extractor - fail fast if configuration incomplete."""
+        from sleep_scoring_app.utils.participant_extractor import extract_participant_info
+
+        try:
+            return extract_participant_info(file_path)
+        except Exception as e:
+            # Convert extraction errors to import errors for proper error handling
+            msg = f"Failed to extract participant information from {file_path.name}: {e}"
+            raise SleepScoringImportError(
+                msg,
+                ErrorCodes.CONFIG_INVALID,
+            ) from e
+
+    # Group extraction is now handled by the centralized participant extractor
+    # This method has been removed to eliminate fallback patterns
+
+    def check_file_needs_import(self, file_path: Path) -> tuple[bool, str | None]:
+        """Check if file needs to be imported based on PARTICIPANT_KEY, size/modification time and hash comparison."""
+        try:
+            # Extract participant info to get PARTICIPANT_KEY
+            participant_key = self.extract_participant_info(file_path).participant_key
+            decision = self._decide_imports({file_path: participant_key})[file_path]
+        except (DatabaseError, OSError, ValidationError) as e:
+            logger.warning("Error checking import status for %s: %s", file_path, e)
+            return True, "Import check failed"
+        return decision.needs_import, decision.reason
+
+    def scan_for_import(self, file_paths: list[Path]) -> dict[Path, ImportDecision]:
+        """
+        Decide which of a batch of files need importing before any is imported.
+
+        Files whose participant cannot be identified are left out; importing them
+        reports the error.
+
+        Returns:
+            Decision per file path; empty if the file registry cannot be read
+
+        """
+        participant_keys: dict[Path, str] = {}
+        for file_path in file_paths:
+            try:
+                participant_keys[file_path] = self.extract_participant_info(file_path).participant_key
+            except SleepScoringImportError as e:
+                logger.debug("Not scanning %s: %s", file_path.name, e)
+
+        try:
+            return self._decide_imports(participant_keys)
+        except (DatabaseError, OSError, SleepScoringImportError, ValidationError) as e:
+            logger.warning("Error scanning import status: %s", e)
+            return {}
+
+    def _decide_imports(self, participant_keys: dict[Path, str]) -> dict[Path, ImportDecision]:
+        """
+        Compare files with the file registry, read in a single query.
+
+        A file whose registered size and modification time are unchanged is not read.
+        Files with the same size but a new modification time are hashed in a thread
+        pool; those whose content turns out unchanged get the new modification time
+        registered so the next scan skips them without hashing.
+        """
+        registry = self._load_file_registry()
+        decisions: dict[Path, ImportDecision] = {}
+        to_hash: dict[Path, tuple[str, str, str]] = {}
+
+        for file_path, participant_key in participant_keys.items():
+            entry = registry.get(participant_key)
+            if entry is None:
+                decisions[file_path] = ImportDecision(True, "New participant data")
+                continue
+
+            stored_hash, status, existing_filename, stored_size, stored_modified = entry
+
+            # If it's a different file for same participant, check if it's newer
+            if existing_filename != file_path.name:
+                logger.info("Found different file for participant %s: %s vs %s", participant_key, existing_filename, file_path.name)
+                decisions[file_path] = ImportDecision(True, "Different file for participant")
+                continue
+
+            file_stat = file_path.stat()
+            if stored_size is not None and file_stat.st_size != stored_size:
+                decisions[file_path] = ImportDecision(True, "File changed")
+            elif file_stat.st_size == stored_size and modified_time(file_stat) == stored_modified:
+                decisions[file_path] = self._unchanged_file_decision(status)
+            else:
+                to_hash[file_path] = (stored_hash, status, modified_time(file_stat))
+
+        hashes = self._hash_files(list(to_hash))
+        touched = []
+        for file_path, (stored_hash, status, current_modified) in to_hash.items():
+            current_hash = hashes[file_path]
+            if current_hash != stored_hash:
+                decisions[file_path] = ImportDecision(True, "File changed", current_hash)
+                continue
+            decisions[file_path] = self._unchanged_file_decision(status, current_hash)
+            touched.append((current_modified, file_path.name))
+
+        if touched:
+            with self.db_manager._get_connection() as conn:
+                conn.executemany(
+                    f"UPDATE {DatabaseTable.FILE_REGISTRY} SET {DatabaseColumn.LAST_MODIFIED} = ? WHERE {DatabaseColumn.FILENAME} = ?",
+                    touched,
+                )
+                conn.commit()
+
+        if to_hash:
+            logger.info("Checked %s files for changes: hashed %s, %s with unchanged content", len(participant_keys), len(to_hash), len(touched))
+        return decisions
+
+    @staticmethod
+    def _unchanged_file_decision(status: str, file_hash: str | None = None) -> ImportDecision:
+        if status == ImportStatus.ERROR:
+            return ImportDecision(True, "Previous import failed", file_hash)
+        return ImportDecision(False, "Already imported", file_hash)
+
+    def _load_file_registry(self) -> dict[str, tuple[str, str, str, int | None, str | None]]:
+        """Hash, status, filename, size and modification time of each participant's registered file."""
+        with self.db_manager._get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {DatabaseColumn.PARTICIPANT_KEY}, {DatabaseColumn.FILE_HASH}, {DatabaseColumn.STATUS},
+                       {DatabaseColumn.FILENAME}, {DatabaseColumn.FILE_SIZE}, {DatabaseColumn.LAST_MODIFIED}
+                FROM {DatabaseTable.FILE_REGISTRY}
+                ORDER BY rowid
+                """
+            ).fetchall()
+
+        # First registered file per participant, the row the per-file lookup returned
+        registry: dict[str, tuple[str, str, str, int | None, str | None]] = {}
+        for participant_key, *entry in rows:
+            registry.setdefault(participant_key, tuple(entry))
+        return registry
+
+    def _hash_files(self, file_paths: list[Path]) -> dict[Path, str]:
+        """Hash files concurrently; hashlib releases the GIL while digesting large reads."""
+        parser = self._create_parser()
+        if len(file_paths) <= 1:
+            return {file_path: parser.calculate_file_hash(file_path) for file_path in file_paths}
+        with ThreadPoolExecutor(max_workers=min(ConfigDefaults.IMPORT_HASH_THREADS, len(file_paths))) as executor:
+            return dict(zip(file_paths, executor.map(parser.calculate_file_hash, file_paths), strict=True))
+
+    def import_csv_file(
+        self,
+        file_path: Path,
+        progress: ImportProgress | None = None,
+        skip_rows: int = 10,
+        force_reimport: bool = False,
+        custom_columns: dict[str, str] | None = None,
+        decision: ImportDecision | None = None,
+    ) -> bool:
+        """Import a single CSV file into the database, using its decision from scan_for_import if given."""
+        try:
+            validated_path, result = self._validate_for_import(file_path, progress, force_reimport, decision)
+            if validated_path is None:
+                return result
+
+            filename = validated_path.name
+            if progress:
+                progress.current_file = filename
+                self._on_file_started(filename)
+
+            # Extract participant info
+            participant_info = self.extract_participant_info(validated_path)
+
+            # Hash, load and parse the CSV into per-axis arrays
+            file_hash = decision.file_hash if decision else None
+            prepared = self._create_parser().prepare_file(validated_path, skip_rows, custom_columns, file_hash)
+
+            return self._write_prepared_file(prepared, participant_info, progress)
+
+        except Exception as e:
+            self._report_file_failure(file_path, e, progress)
+            return False
+
+    def _validate_for_import(
+        self,
+        file_path: Path,
+        progress: ImportProgress | None,
+        force_reimport: bool,
+        decision: ImportDecision | None = None,
+    ) -> tuple[Path | None, bool]:
+        """
+        Validate a file and decide whether it needs importing.
+
+        Returns:
+            (validated path, True) if the file should be imported, otherwise (None, result)
+            where result is True for unchanged files that were skipped and False for rejected files
+
+        """
+        validated_path = InputValidator.validate_file_path(file_path, must_exist=True, allowed_extensions={".csv"})
+        filename = validated_path.name
+
+        # Check if import is needed
+        if not force_reimport:
+            if decision is not None:
+                needs_import, reason = decision.needs_import, decision.reason
+            else:
+                needs_import, reason = self.check_file_needs_import(validated_path)
+            if not needs_import:
+                if progress:
+                    progress.skipped_files.append(f"{filename}: {reason}")
+                logger.info("Skipping %s: %s", filename, reason)
+                return None, True
+
+        # Check file size
+        file_size = validated_path.stat().st_size
+        if file_size > self.max_file_size:
+            error_msg = f"File {filename} too large: {file_size / 1024 / 1024:.1f}MB > {self.max_file_size / 1024 / 1024:.1f}MB"
+            if progress:
+                progress.add_error(error_msg)
+            return None, False
+
+        return validated_path, True
+
+    def _write_prepared_file(self, prepared: PreparedImportFile, participant_info: ParticipantInfo, progress: ImportProgress | None) -> bool:
+        """Write a parsed file to the database and report the outcome."""
+        filename = prepared.filename
+        if prepared.error is not None:
+            if progress:
+                progress.add_error(prepared.error)
+            self._on_file_completed(filename, False)
+            return False
+
+        # Import data using transaction
+        success = self._import_data_transaction(prepared, participant_info, progress)
+
+        if success:
+            if progress:
+                progress.imported_files.append(filename)
+                progress.processed_files += 1
+            self._precompute_scores(filename, progress)
+            self._on_file_completed(filename, True)
+            logger.info("Successfully imported %s", filename)
+        else:
+            self._on_file_completed(filename, False)
+
+        return success
+
+    def _precompute_scores(self, filename: str, progress: ImportProgress | None) -> None:
+        """Run the optional scoring stage; failures only produce a warning since the data is imported."""
+        if self.scoring_precomputer is None:
+            return
+        try:
+            stored = self.scoring_precomputer.precompute_file(filename)
+        except Exception:
+            logger.exception("Failed to precompute scores for %s", filename)
+            stored = False
+        if not stored and progress:
+            progress.add_warning(f"{filename}: scores were not precomputed; they will be computed when viewed")
+
+    def _report_file_failure(self, file_path: Path, error: Exception, progress: ImportProgress | None) -> None:
+        """Record an unexpected per-file failure, logged with its traceback."""
+        error_msg = f"Failed to import {file_path}: {error}"
+        if progress:
+            progress.add_error(error_msg)
+        self._on_file_completed(str(file_path), False)
+        logger.error(error_msg, exc_info=error)
+
+    def _import_data_transaction(
+        self,
+        prepared: PreparedImportFile,
+        participant_info: ParticipantInfo,
+        progress: ImportProgress | None,
+    ) -> bool:
+        """Import data within a database transaction."""
+        filename = prepared.filename
+        timestamps = prepared.timestamps
+        try:
+            with self.db_manager._get_connection(pooled=False) as conn:
+                # Import-tuned settings for this connection only (WAL keeps NORMAL sync crash-safe)
+                for pragma in self.IMPORT_PRAGMAS:
+                    conn.execute(pragma)
+
+                # Begin transaction
+                conn.execute("BEGIN TRANSACTION")
+
+                try:
+                    # Register file first
+                    self._register_file(
+                        conn,
+                        filename,
+                        participant_info,
+                        prepared.file_hash,
+                        prepared.file_path,
+                        prepared.total_records,
+                        timestamps[0] if timestamps else None,
+                        timestamps[-1] if timestamps else None,
+                    )
+
+                    # Delete existing data if reimporting
+                    conn.execute(
+                        f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_DATA} WHERE {DatabaseColumn.FILENAME} = ?",
+                        (filename,),
+                    )
+                    conn.execute(
+                        f"DELETE FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS} WHERE {DatabaseColumn.FILENAME} = ?",
+                        (filename,),
+                    )
+
+                    if FeatureFlags.ENABLE_COLUMNAR_ACTIVITY_STORAGE:
+                        # Store activity data as per-day columnar blocks
+                        success = self._import_activity_data_blocks(conn, filename, timestamps, prepared.columns, progress)
+                    else:
+                        # Import activity data in batches
+                        success = self._import_activity_data_batched(
+                            conn,
+                            filename,
+                            participant_info,  # Pass full participant info for composite key
+                            prepared.file_hash,
+                            timestamps,
+                            prepared.columns,
+                            progress,
+                        )
+
+                    if success:
+                        if not FeatureFlags.ENABLE_COLUMNAR_ACTIVITY_STORAGE:
+                            # Index the file's dates for the file list (block writes index their own)
+                            refresh_file_dates(conn, filename)
+
+                        # Update file status
+                        conn.execute(
+                            f"""
+                            UPDATE {DatabaseTable.FILE_REGISTRY}
+                            SET {DatabaseColumn.STATUS} = ?, {DatabaseColumn.IMPORT_DATE} = ?
+                            WHERE {DatabaseColumn.FILENAME} = ?
+                            """,
+                            (
+                                ImportStatus.IMPORTED,
+                                datetime.now().isoformat(),
+                                filename,
+                            ),
+                        )
+                        conn.commit()
+                        return True
+                    conn.rollback()
+                    return False
+
+                except Exception:
+                    conn.rollback()
+                    logger.exception("Transaction failed for %s", filename)
+                    return False
+
+        except Exception:
+            logger.exception("Database connection failed for %s", filename)
+            return False
+
+    def _register_file(
+        self,
+        conn: Any,
+        filename: str,
+        participant_info: ParticipantInfo,
+        file_hash: str,
+        file_path: Path,
+        total_records: int,
+        date_start: str | None,
+        date_end: str | None,
+    ) -> None:
+        """Register file in file registry."""
+        file_stat = file_path.stat()
+
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {DatabaseTable.FILE_REGISTRY} (
+                {DatabaseColumn.FILENAME}, {DatabaseColumn.ORIGINAL_PATH},
+                {DatabaseColumn.PARTICIPANT_KEY}, {DatabaseColumn.PARTICIPANT_ID},
+                {DatabaseColumn.PARTICIPANT_GROUP}, {DatabaseColumn.PARTICIPANT_TIMEPOINT},
+                {DatabaseColumn.FILE_SIZE}, {DatabaseColumn.FILE_HASH},
+                {DatabaseColumn.DATE_RANGE_START}, {DatabaseColumn.DATE_RANGE_END},
+                {DatabaseColumn.TOTAL_RECORDS}, {DatabaseColumn.LAST_MODIFIED},
+                {DatabaseColumn.STATUS}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                filename,
+                str(file_path),
+                participant_info.participant_key,  # Add composite key
+                participant_info.numerical_id,
+                participant_info.group,
+                participant_info.timepoint,
+                file_stat.st_size,
+                file_hash,
+                date_start,
+                date_end,
+                total_records,
+                modified_time(file_stat),
+                ImportStatus.IMPORTING,
+            ),
+        )
+
+    def _import_activity_data_blocks(
+        self,
+        conn: Any,
+        filename: str,
+        timestamps: list[str],
+        columns: dict[str, np.ndarray | None],
+        progress: ImportProgress | None,
+    ) -> bool:
+        """Import activity data as one columnar block per calendar day."""
+        try:
+            record_count = min(len(columns[DatabaseColumn.AXIS_Y]), len(timestamps))
+            values = {column: None if array is None else array[:record_count] for column, array in columns.items()}
+
+            block_count = write_activity_blocks(conn, filename, to_epoch_seconds(timestamps[:record_count]), values)
+            logger.debug("Stored %s epochs for %s in %s blocks", record_count, filename, block_count)
+
+            if progress:
+                progress.processed_records += record_count
+                self._on_progress_updated(progress)
+
+            return True
+
+        except Exception:
+            logger.exception("Failed to import activity data for %s", filename)
+            return False
+
+    def _import_activity_data_batched(
+        self,
+        conn: Any,
+        filename: str,
+        participant_info: ParticipantInfo,
+        file_hash: str,
+        timestamps: list[str],
+        columns: dict[str, np.ndarray | None],
+        progress: ImportProgress | None,
+    ) -> bool:
+        """Import activity data in batches for memory efficiency."""
+        try:
+            total_rows = min(len(columns[DatabaseColumn.AXIS_Y]), len(timestamps))
+
+            # Per-column Python lists, built once: floats with None for missing values
+            axis_y_values = columns[DatabaseColumn.AXIS_Y][:total_rows].tolist()
+            optional_values = [
+                self._nullable_values(columns[column], total_rows)
+                for column in (DatabaseColumn.AXIS_X, DatabaseColumn.AXIS_Z, DatabaseColumn.VECTOR_MAGNITUDE)
+            ]
+            # Base record with PARTICIPANT_KEY and individual components
+            record_prefix = (
+                file_hash,
+                filename,
+                participant_info.participant_key,  # Add composite key
+                participant_info.numerical_id,
+                participant_info.group,
+                participant_info.timepoint,
+            )
+
+            def batch_records(start_idx: int, end_idx: int) -> Iterator[tuple]:
+                for i in range(start_idx, end_idx):
+                    yield (
+                        *record_prefix,
+                        timestamps[i],
+                        axis_y_values[i],  # AXIS_Y (vertical - primary for Sadeh algorithm)
+                        optional_values[0][i],  # AXIS_X (lateral)
+                        optional_values[1][i],  # AXIS_Z (forward)
+                        optional_values[2][i],  # Vector Magnitude
+                    )
+
+            # Process in batches
+            for start_idx in range(0, total_rows, self.batch_size):
+                end_idx = min(start_idx + self.batch_size, total_rows)
+
+                # Insert batch with PARTICIPANT_KEY and all axis columns
+                conn.executemany(
+                    f"""
+                    INSERT INTO {DatabaseTable.RAW_ACTIVITY_DATA} (
+                        {DatabaseColumn.FILE_HASH}, {DatabaseColumn.FILENAME},
+                        {DatabaseColumn.PARTICIPANT_KEY}, {DatabaseColumn.PARTICIPANT_ID},
+                        {DatabaseColumn.PARTICIPANT_GROUP}, {DatabaseColumn.PARTICIPANT_TIMEPOINT},
+                        {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y},
+                        {DatabaseColumn.AXIS_X}, {DatabaseColumn.AXIS_Z},
+                        {DatabaseColumn.VECTOR_MAGNITUDE}
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    batch_records(start_idx, end_idx),
+                )
+
+                if progress:
+                    progress.processed_records += end_idx - start_idx
+                    self._on_progress_updated(progress)
+
+            return True
+
+        except Exception:
+            logger.exception("Failed to import activity data for %s", filename)
+            return False
+
+    @staticmethod
+    def _nullable_values(values: np.ndarray | None, length: int) -> list[float | None]:
+        """Convert a float array to a list with None in place of NaN (SQL NULL)."""
+        if values is None:
+            return [None] * length
+        values = values[:length]
+        return np.where(np.isnan(values), None, values).tolist()
+
+    def import_directory(
+        self,
+        directory_path: Path,
+        skip_rows: int = 10,
+        force_reimport: bool = False,
+        progress_callback: Callable[[ImportProgress], None] | None = None,
+        include_nonwear: bool = False,
+        custom_columns: dict[str, str] | None = None,
+    ) -> ImportProgress:
+        """Import all CSV files from a directory."""
+        self._cancel_requested = False
+        try:
+            # Validate directory
+            validated_dir = InputValidator.validate_directory_path(directory_path, must_exist=True, create_if_missing=False)
+
+            # Find CSV files
+            csv_files = list(validated_dir.rglob("*.csv"))
+            logger.info("Found %s CSV files in %s", len(csv_files), validated_dir)
+
+            # Estimate total records for progress tracking
+            total_records = 0
+            valid_files = []
+
+            for csv_file in csv_files:
+                try:
+                    # Quick row count estimation
+                    with open(csv_file) as f:
+                        # Skip header rows and count remaining
+                        for _ in range(skip_rows):
+                            next(f, None)
+                        row_count = sum(1 for _ in f)
+
+                    total_records += max(0, row_count)
+                    valid_files.append(csv_file)
+
+                except (OSError, PermissionError, ValueError) as e:
+                    logger.warning("Skipping %s: %s", csv_file, e)
+
+            # Initialize progress
+            progress = ImportProgress(total_files=len(valid_files), total_records=total_records)
+
+            # Import files
+            self._import_file_list(valid_files, progress, skip_rows, force_reimport, custom_columns, progress_callback)
+
+            # Import nonwear sensor and Choi algorithm data (only if requested)
+            if include_nonwear and not self._cancel_requested:
+                try:
+                    self.import_nonwear_data(validated_dir, progress)
+                except (DatabaseError, OSError, ValidationError) as e:
+                    progress.add_error(f"Failed to import nonwear data: {e}")
+
+            # Complete
+            progress.processed_files = len(valid_files)
+            self._on_import_completed(progress)
+
+            logger.info(
+                "Import completed: %s files imported, %s skipped, %s errors",
+                len(progress.imported_files),
+                len(progress.skipped_files),
+                len(progress.errors),
+            )
+
+            return progress
+
+        except (OSError, DatabaseError, ValidationError) as e:
+            error_progress = ImportProgress()
+            error_progress.add_error(f"Failed to import directory {directory_path}: {e}")
+            return error_progress
+
+    def import_files(
+        self,
+        file_paths: list[Path],
+        skip_rows: int = 10,
+        force_reimport: bool = False,
+        progress_callback: Callable[[ImportProgress], None] | None = None,
+        custom_columns: dict[str, str] | None = None,
+    ) -> ImportProgress:
+        """Import a list of CSV files directly."""
+        self._cancel_requested = False
+        try:
+            # Validate and filter files
+            valid_files = []
+            total_records = 0
+
+            for file_path in file_paths:
+                try:
+                    validated_file = InputValidator.validate_file_path(file_path, must_exist=True)
+                    # Quick row count estimation
+                    with open(validated_file) as f:
+                        for _ in range(skip_rows):
+                            next(f, None)
+                        row_count = sum(1 for _ in f)
+
+                    total_records += max(0, row_count)
+                    valid_files.append(validated_file)
+
+                except (OSError, PermissionError, ValueError, ValidationError) as e:
+                    logger.warning("Skipping %s: %s", file_path, e)
+
+            logger.info("Importing %s CSV files (%s total records)", len(valid_files), total_records)
+
+            # Initialize progress
+            progress = ImportProgress(total_files=len(valid_files), total_records=total_records)
+
+            # Import files
+            self._import_file_list(valid_files, progress, skip_rows, force_reimport, custom_columns, progress_callback)
+
+            # Complete
+            progress.processed_files = len(valid_files)
+            self._on_import_completed(progress)
+
+            logger.info(
+                "Import completed: %s files imported, %s skipped, %s errors",
+                len(progress.imported_files),
+                len(progress.skipped_files),
+                len(progress.errors),
+            )
+
+            return progress
+
+        except (OSError, DatabaseError, ValidationError) as e:
+            error_progress = ImportProgress()
+            error_progress.add_error(f"Failed to import files: {e}")
+            return error_progress
+
+    def _import_file_list(
+        self,
+        files: list[Path],
+        progress: ImportProgress,
+        skip_rows: int,
+        force_reimport: bool,
+        custom_columns: dict[str, str] | None,
+        progress_callback: Callable[[ImportProgress], None] | None,
+    ) -> None:
+        """Import files one at a time, or parse them in worker processes when several workers are configured."""
+        # Decide what changed for the whole batch up front instead of querying and hashing per file
+        decisions = {} if force_reimport else self.scan_for_import(files)
+
+        workers = min(self.max_workers, len(files))
+        if workers > 1:
+            self._import_files_parallel(files, progress, skip_rows, force_reimport, custom_columns, progress_callback, workers, decisions)
+            return
+
+        for index, csv_file in enumerate(files):
+            if self._cancel_requested:
+                self._report_cancelled(progress, len(files) - index)
+                return
+            try:
+                self.import_csv_file(csv_file, progress, skip_rows, force_reimport, custom_columns, decisions.get(csv_file))
+
+                if progress_callback:
+                    progress_callback(progress)
+
+            except (DatabaseError, OSError, ValidationError, ValueError) as e:
+                progress.add_error(f"Failed to import {csv_file}: {e}")
+
+    def _import_files_parallel(
+        self,
+        files: list[Path],
+        progress: ImportProgress,
+        skip_rows: int,
+        force_reimport: bool,
+        custom_columns: dict[str, str] | None,
+        progress_callback: Callable[[ImportProgress], None] | None,
+        workers: int,
+        decisions: dict[Path, ImportDecision],
+    ) -> None:
+        """
+        Parse files in a process pool while this thread writes them to SQLite.
+
+        Validation and participant extraction run here before a file is submitted, using
+        the batch's change decisions; worker processes only parse (and hash files the
+        scan did not). Parsed files are written one
+        at a time in completion order, so the database only ever sees a single writer.
+        """
+        parser = self._create_parser()
+        # Spawned workers do not inherit Qt or database state from this process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            pending: dict[Future[PreparedImportFile], tuple[Path, ParticipantInfo]] = {}
+            for csv_file in files:
+                try:
+                    decision = decisions.get(csv_file)
+                    validated_path, _ = self._validate_for_import(csv_file, progress, force_reimport, decision)
+                    if validated_path is None:
+                        continue
+                    participant_info = self.extract_participant_info(validated_path)
+                except Exception as e:
+                    self._report_file_failure(csv_file, e, progress)
+                    continue
+                file_hash = decision.file_hash if decision else None
+                future = executor.submit(parser.prepare_file, validated_path, skip_rows, custom_columns, file_hash)
+                pending[future] = (validated_path, participant_info)
+
+            logger.info("Parsing %s files with %s worker processes", len(pending), workers)
+            if progress_callback:
+                progress_callback(progress)
+
+            for written, future in enumerate(as_completed(pending)):
+                if self._cancel_requested:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._report_cancelled(progress, len(pending) - written)
+                    return
+
+                file_path, participant_info = pending[future]
+                progress.current_file = file_path.name
+                self._on_file_started(file_path.name)
+                try:
+                    self._write_prepared_file(future.result(), participant_info, progress)
+                except Exception as e:
+                    self._report_file_failure(file_path, e, progress)
+
+                if progress_callback:
+                    progress_callback(progress)
+
+    def _report_cancelled(self, progress: ImportProgress, remaining: int) -> None:
+        """Record that an import was cancelled with files left unimported."""
+        progress.add_warning(f"Import cancelled: {remaining} file(s) not imported")
+
+    def get_import_summary(self) -> dict[str, Any]:
+        """Get summary of imported files."""
+        try:
+            with self.db_manager._get_connection() as conn:
+                cursor = conn.execute(
+                    f"""
+                    SELECT
+                        COUNT(*) as total_files,
+                        SUM({DatabaseColumn.TOTAL_RECORDS}) as total_records,
+                        COUNT(CASE WHEN {DatabaseColumn.STATUS} = ? THEN 1 END) as imported_files,
+                        COUNT(CASE WHEN {DatabaseColumn.STATUS} = ? THEN 1 END) as error_files
+                    FROM {DatabaseTable.FILE_REGISTRY}
+                """,
+                    (ImportStatus.IMPORTED, ImportStatus.ERROR),
+                )
+
+                result = cursor.fetchone()
+                if result:
+                    return {
+                        "total_files": result[0],
+                        "total_records": result[1] or 0,
+                        "imported_files": result[2],
+                        "error_files": result[3],
+                    }
+                return {
+                    "total_files": 0,
+                    "total_records": 0,
+                    "imported_files": 0,
+                    "error_files": 0,
+                }
+
+        except Exception:
+            logger.exception("Failed to get import summary")
+            return {
+                "total_files": 0,
+                "total_records": 0,
+                "imported_files": 0,
+                "error_files": 0,
+            }
+
+    def import_nonwear_data(self, data_directory: Path, progress: ImportProgress | None = None) -> None:
+        """Import nonwear sensor data (Choi algorithm results are generated on-demand)."""
+        try:
+            # Import nonwear sensor data only
+            nonwear_files = self.nonwear_service.find_nonwear_sensor_files(data_directory)
+
+            # Setup separate nonwear progress tracking
+            if progress:
+                progress.total_nonwear_files = len(nonwear_files)
+                progress.processed_nonwear_files = 0
+
+            for nonwear_file in nonwear_files:
+                try:
+                    if progress:
+                        progress.current_nonwear_file = nonwear_file.name
+                        self._on_nonwear_progress_updated(progress)
+
+                    periods = self.nonwear_service.load_nonwear_sensor_periods(nonwear_file)
+                    filename = nonwear_file.name
+                    self.nonwear_service.save_nonwear_periods(periods, filename)
+
+                    if progress:
+                        progress.imported_nonwear_files.append(nonwear_file.name)
+                        progress.processed_nonwear_files += 1
+                        progress.add_info(f"Imported {len(periods)} nonwear sensor periods from {nonwear_file.name}")
+                        self._on_nonwear_progress_updated(progress)
+
+                except (OSError, PermissionError, pd.errors.ParserError, ValueError) as e:
+                    if progress:
+                        progress.processed_nonwear_files += 1
+                        progress.add_error(f"Failed to import nonwear sensor file {nonwear_file.name}: {e}")
+                        self._on_nonwear_progress_updated(progress)
+
+            logger.info("Nonwear sensor data import completed: %s sensor files", len(nonwear_files))
+
+        except Exception:
+            logger.exception("Failed to import nonwear sensor data")
+            raise
+
+    def import_nonwear_files(self, file_paths: list[Path], progress: ImportProgress | None = None) -> None:
+        """Import specific nonwear sensor files."""
+        try:
+            # Setup separate nonwear progress tracking
+            if progress:
+                progress.total_nonwear_files = len(file_paths)
+                progress.processed_nonwear_files = 0
+
+            for nonwear_file in file_paths:
+                try:
+                    if progress:
+                        progress.current_nonwear_file = nonwear_file.name
+                        self._on_nonwear_progress_updated(progress)
+
+                    periods = self.nonwear_service.load_nonwear_sensor_periods(nonwear_file)
+                    filename = nonwear_file.name
+                    self.nonwear_service.save_nonwear_periods(periods, filename)
+
+                    if progress:
+                        progress.imported_nonwear_files.append(nonwear_file.name)
+                        progress.processed_nonwear_files += 1
+                        progress.add_info(f"Imported {len(periods)} nonwear sensor periods from {nonwear_file.name}")
+                        self._on_nonwear_progress_updated(progress)
+
+                except (OSError, PermissionError, pd.errors.ParserError, ValueError) as e:
+                    if progress:
+                        progress.processed_nonwear_files += 1
+                        progress.add_error(f"Failed to import nonwear sensor file {nonwear_file.name}: {e}")
+                        self._on_nonwear_progress_updated(progress)
+
+            logger.info("Nonwear sensor file import completed: %s files", len(file_paths))
+
+        except Exception:
+            logger.exception("Failed to import nonwear sensor files")
+            raise
@@ -13,6 +13,7 @@ from typing import Any
 import numpy as np
 import pandas as pd
 
+from sleep_scoring_app.core.algorithms.period_metrics import SleepMetricsEngine
 from sleep_scoring_app.core.constants import ActivityDataPreference, AlgorithmType
 from sleep_scoring_app.core.dataclasses import DailySleepMarkers, ParticipantInfo, SleepMetrics, SleepPeriod
 from sleep_scoring_app.core.exceptions import (
@@ -45,6 +46,9 @@ class DataManager:
         self.preferred_activity_column: ActivityDataPreference = ActivityDataPreference.AXIS_Y
         self.choi_activity_column: ActivityDataPreference = ActivityDataPreference.AXIS_Y
 
+        # Prefix-sum metrics engine for the most recently passed window (see _get_metrics_engine)
+        self._metrics_engine: SleepMetricsEngine | None = None
+
     def set_activity_column_preferences(
         self, preferred_activity_column: ActivityDataPreference, choi_activity_column: ActivityDataPreference
     ) -> None:
@@ -354,22 +358,7 @@ class DataManager:
     ) -> tuple[list[datetime], list[float]]:
         """Load activity data from database with configurable activity column."""
         try:
-            # Convert date to datetime if needed
-            if isinstance(target_date, date) and not isinstance(target_date, datetime):
-                # Convert date to datetime at midnight
-                target_datetime = datetime.combine(target_date, datetime.min.time())
-            else:
-                target_datetime = target_date
-
-            # Calculate time range
-            if hours == 24:
-                # 24h: noon to noon (12:00 PM current day to 12:00 PM next day)
-                start_time = target_datetime.replace(hour=12, minute=0, second=0, microsecond=0)
-                end_time = start_time + timedelta(hours=24)
-            else:
-                # 48h: midnight to midnight + 48h
-                start_time = target_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_time = start_time + timedelta(hours=48)
+            start_time, end_time = self._database_window_bounds(target_date, hours)
 
             # Load from database with specified activity column
             timestamps, activities = self.db_manager.load_raw_activity_data(filename, start_time, end_time, activity_column=activity_column)
@@ -387,6 +376,57 @@ class DataManager:
             logger.exception("Failed to load database activity data")
             raise
 
+    def _database_window_bounds(self, target_date: datetime, hours: int) -> tuple[datetime, datetime]:
+        """Get the [start, end) bounds of a 24h (noon to noon) or 48h (midnight to midnight + 48h) window."""
+        # Convert date to datetime if needed
+        if isinstance(target_date, date) and not isinstance(target_date, datetime):
+            # Convert date to datetime at midnight
+            target_datetime = datetime.combine(target_date, datetime.min.time())
+        else:
+            target_datetime = target_date
+
+        # Calculate time range
+        if hours == 24:
+            # 24h: noon to noon (12:00 PM current day to 12:00 PM next day)
+            start_time = target_datetime.replace(hour=12, minute=0, second=0, microsecond=0)
+            end_time = start_time + timedelta(hours=24)
+        else:
+            # 48h: midnight to midnight + 48h
+            start_time = target_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
+            end_time = start_time + timedelta(hours=48)
+
+        return start_time, end_time
+
+    def load_activity_window(
+        self, filename: str, target_date: datetime, hours: int, columns: list[ActivityDataPreference]
+    ) -> tuple[np.ndarray, dict[ActivityDataPreference, np.ndarray]] | None:
+        """
+        Load several activity columns for a date window from the database in a single query.
+
+        Args:
+            filename: Name of the file to load from
+            target_date: Target date for data loading
+            hours: Number of hours to load (24 or 48)
+            columns: Activity columns to load
+
+        Returns:
+            Tuple of (datetime64[s] timestamps, {column: float64 values}), or None if
+            database mode is off or the window has no data
+
+        """
+        if not filename or not self.use_database:
+            return None
+
+        start_time, end_time = self._database_window_bounds(target_date, hours)
+        timestamps, values = self.db_manager.load_activity_window(filename, start_time, end_time, columns=columns)
+
+        if len(timestamps) == 0:
+            logger.warning("No data found in database for %s in time range %s to %s", filename, start_time, end_time)
+            return None
+
+        logger.debug("Loaded %s epochs of %s from database for %s", len(timestamps), columns, filename)
+        return timestamps, values
+
     def _load_csv_activity_data(
         self, target_date: datetime, hours: int, activity_column: ActivityDataPreference | None = None
     ) -> tuple[list[datetime], list[float]]:
@@ -657,9 +697,12 @@ class DataManager:
             onset_dt = datetime.fromtimestamp(onset_timestamp)
             offset_dt = datetime.fromtimestamp(offset_timestamp)
 
+            # Prefix sums over the loaded window, reused while the same arrays are passed in
+            engine = self._get_metrics_engine(sadeh_results, choi_results, activity_data, x_data, nwt_sensor_results)
+
             # Find indices for onset and offset
-            onset_idx = self._find_closest_data_index(x_data, onset_timestamp)
-            offset_idx = self._find_closest_data_index(x_data, offset_timestamp)
+            onset_idx = engine.index_of(onset_timestamp)
+            offset_idx = engine.index_of(offset_timestamp)
 
             # Algorithm values at markers
             sadeh_onset = sadeh_results[onset_idx] if onset_idx is not None and onset_idx < len(sadeh_results) else 0
@@ -675,80 +718,24 @@ class DataManager:
 
             # Initialize all variables
             total_activity = 0
-            movement_events = 0
 
             # Calculate sleep period metrics from Sadeh results
             if onset_idx is not None and offset_idx is not None and sadeh_results:
-                sleep_minutes = 0
-                awakenings = 0
-                awakening_lengths = []
-                current_awakening_length = 0
-
-                # Find first and last actual sleep epochs for WASO calculation (ActiLife-compatible)
-                first_sleep_idx = None
-                last_sleep_idx = None
-                for i in range(onset_idx, min(offset_idx, len(sadeh_results))):
-                    if sadeh_results[i] == 1:
-                        if first_sleep_idx is None:
-                            first_sleep_idx = i
-                        last_sleep_idx = i
-
-                for i in range(onset_idx, min(offset_idx, len(sadeh_results))):
-                    if i < len(activity_data):
-                        activity = activity_data[i]
-                        total_activity += activity
-
-                        if activity > 0:
-                            movement_events += 1
-
-                    if sadeh_results[i] == 1:  # Sleep
-                        sleep_minutes += 1
-                        if current_awakening_length > 0:
-                            awakening_lengths.append(current_awakening_length)
-                            current_awakening_length = 0
-                    # Only count awakenings AFTER first sleep epoch (ActiLife-compatible)
-                    elif first_sleep_idx is not None and i > first_sleep_idx and i <= last_sleep_idx:
-                        current_awakening_length += 1
-                        if current_awakening_length == 1:  # Start of new awakening
-                            awakenings += 1
-
-                # Handle case where sleep period ends during an awakening
-                if current_awakening_length > 0 and last_sleep_idx is not None:
-                    awakening_lengths.append(current_awakening_length)
-
-                # Calculate TIB from epoch count (exclusive range)
-                total_minutes_in_bed = offset_idx - onset_idx
-
-                # Calculate derived metrics
-
-                if first_sleep_idx is not None and last_sleep_idx is not None:
-                    total_sleep_time = sum(1 for i in range(first_sleep_idx, last_sleep_idx + 1) if sadeh_results[i] == 1)
-                else:
-                    total_sleep_time = 0
+                period = engine.evaluate(onset_idx, offset_idx)
 
+                total_activity = period.total_activity
+                total_minutes_in_bed = period.total_minutes_in_bed
+                total_sleep_time = period.total_sleep_time
                 # WASO: Wake time between first and last sleep epochs (ActiLife-compatible)
-                # This excludes sleep latency and terminal wake
-                if first_sleep_idx is not None and last_sleep_idx is not None:
-                    sleep_period_length = last_sleep_idx - first_sleep_idx + 1
-                    waso = sleep_period_length - sleep_minutes
-                else:
-                    waso = total_minutes_in_bed - total_sleep_time
-
-                efficiency = (total_sleep_time / total_minutes_in_bed * 100) if total_minutes_in_bed > 0 else 0
-                avg_awakening_length = sum(awakening_lengths) / len(awakening_lengths) if awakening_lengths else 0
-                movement_index = movement_events / total_minutes_in_bed if total_minutes_in_bed > 0 else 0
-                fragmentation_index = (awakenings / total_sleep_time * 100) if total_sleep_time > 0 else 0
-                sleep_fragmentation_index = ((waso + movement_events) / total_minutes_in_bed * 100) if total_minutes_in_bed > 0 else 0
-
-                # Count Choi algorithm results over sleep period
-                total_choi_counts = sum(choi_results[onset_idx : offset_idx + 1]) if onset_idx is not None and offset_idx is not None else 0
-
-                # Count NWT sensor results over sleep period
-                total_nwt_sensor_counts = (
-                    sum(nwt_sensor_results[onset_idx : offset_idx + 1])
-                    if nwt_sensor_results and onset_idx is not None and offset_idx is not None
-                    else 0
-                )
+                waso = period.waso
+                efficiency = period.efficiency
+                awakenings = period.awakenings
+                avg_awakening_length = period.average_awakening_length
+                movement_index = period.movement_index
+                fragmentation_index = period.fragmentation_index
+                sleep_fragmentation_index = period.sleep_fragmentation_index
+                total_choi_counts = period.total_choi_counts
+                total_nwt_sensor_counts = period.total_nwt_counts if nwt_sensor_results else 0
             else:
                 # No algorithm data available - use None for all calculated metrics
                 # Still calculate TIB from timestamps as fallback when no epoch data
@@ -803,21 +790,13 @@ class DataManager:
             logger.exception("Error calculating sleep metrics")
             return None
 
-    def _find_closest_data_index(self, x_data, timestamp):
-        """Find the index of the closest data point to the given timestamp."""
-        if x_data is None or len(x_data) == 0:
-            return None
-
-        min_diff = float("inf")
-        closest_idx = None
-
-        for i, data_timestamp in enumerate(x_data):
-            diff = abs(data_timestamp - timestamp)
-            if diff < min_diff:
-                min_diff = diff
-                closest_idx = i
-
-        return closest_idx
+    def _get_metrics_engine(self, sadeh_results, choi_results, activity_data, x_data, nwt_sensor_results=None) -> SleepMetricsEngine:
+        """Return the metrics engine for these arrays, building it only when they change."""
+        engine = self._metrics_engine
+        if engine is None or not engine.built_from(sadeh_results, activity_data, x_data, choi_results, nwt_sensor_results):
+            engine = SleepMetricsEngine(sadeh_results, activity_data, x_data, choi_results, nwt_sensor_results)
+            self._metrics_engine = engine
+        return engine
 
     def _dict_to_sleep_metrics(self, metrics_dict: dict, file_path: str | None = None) -> SleepMetrics:
         """Convert dictionary metrics to SleepMetrics object."""
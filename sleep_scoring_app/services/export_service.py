@@ -9,36 +9,90 @@ import hashlib
 import logging
 import os
 import shutil
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
 
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
 from sleep_scoring_app.core.constants import (
     ActivityDataPreference,
     AlgorithmType,
+    ConfigDefaults,
     DirectoryName,
+    ExportColumn,
     FeatureFlags,
     get_backup_filename,
     sanitize_filename_component,
 )
 from sleep_scoring_app.core.exceptions import DatabaseError, ErrorCodes, ValidationError
+from sleep_scoring_app.data.activity_blocks import datetime_to_epoch_seconds
 from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.services.data_service import DataManager
+from sleep_scoring_app.services.export_writer import ExportWriter, sanitize_csv_cell
+from sleep_scoring_app.services.nonwear_service import NonwearDataService
 
 if TYPE_CHECKING:
-    from sleep_scoring_app.core.dataclasses import SleepMetrics
+    from collections.abc import Callable, Iterator
+
+    from sleep_scoring_app.core.dataclasses import SleepMetrics, SleepPeriod
+    from sleep_scoring_app.services.nonwear_service import NonwearSensorResolver
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Epochs either side of a sleep period passed with it when its metrics are recalculated
+_PERIOD_WINDOW_PADDING = timedelta(minutes=5)
+
+_EXPORT_NOTE_LINE = "# Note: Each row represents one sleep period (main sleep or nap)"
+
+
+def _night_sort_key(metrics: SleepMetrics) -> tuple:
+    """Order of a night's export rows by participant ID and sleep date, missing values last."""
+    participant_id = metrics.participant.numerical_id
+    return (participant_id is None, participant_id or "", metrics.analysis_date is None, metrics.analysis_date or "")
+
+
+def _marker_index_sort_key(row: dict[str, Any]) -> tuple:
+    marker_index = row.get(ExportColumn.MARKER_INDEX)
+    return (marker_index is None, marker_index or 0)
+
+
+@dataclass(frozen=True)
+class _ActivitySeries:
+    """One activity column of a whole file, holding only the epochs that have a value."""
+
+    timestamps: np.ndarray  # datetime64[s]
+    values: np.ndarray
+    epoch_seconds: np.ndarray
+
+    @classmethod
+    def from_column(cls, timestamps: np.ndarray, values: np.ndarray) -> _ActivitySeries:
+        valid = ~np.isnan(values)
+        return cls(timestamps[valid], values[valid], timestamps[valid].astype(np.int64))
+
+    def window(self, start_time: datetime, end_time: datetime) -> slice:
+        """Epochs from start_time up to (excluding) end_time, as load_raw_activity_data selects them."""
+        first = int(np.searchsorted(self.epoch_seconds, datetime_to_epoch_seconds(start_time), side="left"))
+        last = int(np.searchsorted(self.epoch_seconds, datetime_to_epoch_seconds(end_time), side="left"))
+        return slice(first, max(first, last))
+
 
 class ExportManager:
     """Handles all export operations."""
 
-    def __init__(self, database_manager: DatabaseManager = None) -> None:
+    def __init__(self, database_manager: DatabaseManager = None, max_workers: int | None = None) -> None:
         self.db_manager = database_manager or DatabaseManager()
         self.max_backups = 10
+        # Threads recalculating the sleep period metrics of one file each before an export
+        self.max_workers = max(1, max_workers if max_workers is not None else ConfigDefaults.EXPORT_WORKERS)
+        self._cancel_requested = False
 
     def _atomic_csv_write(self, df: pd.DataFrame, csv_path: Path, **kwargs) -> None:
         """Write CSV atomically to prevent corruption."""
@@ -60,13 +114,24 @@ class ExportManager:
 
     def _sanitize_csv_cell(self, value):
         """Prevent CSV formula injection."""
-        if not isinstance(value, str):
-            return value
+        return sanitize_csv_cell(value)
 
-        if value and value[0] in ("=", "+", "-", "@", "\t", "\r"):
-            return "'" + value
+    def _iter_export_rows(self, sleep_metrics_list: list[SleepMetrics], nwt_resolver: NonwearSensorResolver) -> Iterator[dict[str, Any]]:
+        """
+        Export rows sorted by participant ID, sleep date and marker index.
 
-        return value
+        Metrics are ordered by participant and night first, so only one night's
+        rows are built and held at a time while their marker indices are sorted.
+        """
+        for _, night_metrics in groupby(sorted(sleep_metrics_list, key=_night_sort_key), key=_night_sort_key):
+            rows = [row for metrics in night_metrics for row in metrics.to_export_dict_list(nwt_resolver)]
+            rows.sort(key=_marker_index_sort_key)
+            yield from rows
+
+    @staticmethod
+    def _count_export_rows(sleep_metrics_list: list[SleepMetrics]) -> int:
+        """Rows to_export_dict_list gives for the metrics: one per complete period, or one for a night without any."""
+        return sum(len(metrics.daily_sleep_markers.get_complete_periods()) or 1 for metrics in sleep_metrics_list)
 
     def autosave_sleep_metrics(
         self,
@@ -138,8 +203,15 @@ class ExportManager:
         self,
         sleep_metrics_list: list[SleepMetrics],
         algorithm_name: AlgorithmType = AlgorithmType.SADEH_1994_ACTILIFE,
+        progress_callback: Callable[[int, int], None] | None = None,
     ) -> str | None:
-        """Create CSV file for export dialog WITHOUT saving to database (to avoid duplicates)."""
+        """
+        Create CSV file for export dialog WITHOUT saving to database (to avoid duplicates).
+
+        progress_callback receives (files done, total files) while metrics are
+        recalculated; returns None without writing if the export is cancelled.
+        """
+        self._cancel_requested = False
         if not sleep_metrics_list:
             return None
 
@@ -150,7 +222,8 @@ class ExportManager:
 
         try:
             # CRITICAL: Ensure all metrics (including naps) are calculated before export
-            self._ensure_metrics_calculated_for_export(sleep_metrics_list)
+            if not self._ensure_metrics_calculated_for_export(sleep_metrics_list, progress_callback):
+                return None
 
             # Create export file path
             export_dir = Path.cwd() / "sleep_data_exports"
@@ -159,71 +232,25 @@ class ExportManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             export_filepath = export_dir / f"export_temp_{safe_algorithm_name}_{timestamp}.csv"
 
-            # Create new data DataFrame from SleepMetrics objects - multiple periods per participant
-            new_data = []
-            for metrics in sleep_metrics_list:
-                # Get all sleep periods for this participant/date
-                period_rows = metrics.to_export_dict_list()
-                new_data.extend(period_rows)
-
-            export_df = pd.DataFrame(new_data)
-
-            # Sanitize string columns to prevent formula injection
-            for col in export_df.select_dtypes(include=["object"]).columns:
-                export_df[col] = export_df[col].apply(self._sanitize_csv_cell)
-
-            # Sort by Participant ID, Sleep Date, and Marker Index for consistent ordering
-            sort_columns = []
-            if "Numerical Participant ID" in export_df.columns:
-                sort_columns.append("Numerical Participant ID")
-            if "Sleep Date" in export_df.columns:
-                sort_columns.append("Sleep Date")
-            if "Marker Index" in export_df.columns:
-                sort_columns.append("Marker Index")
-
-            if sort_columns:
-                export_df = export_df.sort_values(by=sort_columns, ascending=True)
-
             # Count total sleep periods exported
-            total_periods = len(new_data)
+            total_periods = self._count_export_rows(sleep_metrics_list)
             total_participants = len(sleep_metrics_list)
 
-            # Write CSV file with header comments atomically
-            temp_path = export_filepath.with_suffix(f".tmp.{os.getpid()}")
-            try:
-                with open(temp_path, "w", newline="", encoding="utf-8") as f:
-                    f.write("#\n")
-                    f.write("# Sleep Scoring Export Data (Multiple Periods)\n")
-                    f.write("# Algorithm: ")
-                    f.write(safe_algorithm_name)
-                    f.write("\n")
-                    f.write("# Generated: ")
-                    f.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                    f.write("\n")
-                    f.write("# Participants: ")
-                    f.write(str(total_participants))
-                    f.write("\n")
-                    f.write("# Sleep Periods: ")
-                    f.write(str(total_periods))
-                    f.write("\n")
-                    f.write("# Note: Each row represents one sleep period (main sleep or nap)\n")
-                    f.write("#\n")
-
-                    export_df.to_csv(f, index=False, float_format="%.4f")
-
-                    f.flush()
-                    os.fsync(f.fileno())
-
-                if temp_path.stat().st_size == 0:
-                    msg = "CSV write produced empty file"
-                    raise OSError(msg)
-
-                temp_path.replace(export_filepath)
-
-            except Exception:
-                if temp_path.exists():
-                    temp_path.unlink()
-                raise
+            metadata_lines = [
+                "#",
+                "# Sleep Scoring Export Data (Multiple Periods)",
+                f"# Algorithm: {safe_algorithm_name}",
+                f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"# Participants: {total_participants}",
+                f"# Sleep Periods: {total_periods}",
+                _EXPORT_NOTE_LINE,
+                "#",
+            ]
+
+            # Stream rows from SleepMetrics objects - multiple periods per participant - into the CSV atomically
+            nwt_resolver = NonwearDataService(self.db_manager).load_sensor_resolver()
+            with ExportWriter(export_filepath, "csv", metadata_lines=metadata_lines) as writer:
+                writer.write_rows(self._iter_export_rows(sleep_metrics_list, nwt_resolver))
 
             logger.debug("Export CSV created: %s (%s participants, %s periods, NO database save)", export_filepath, total_participants, total_periods)
             return str(export_filepath)
@@ -243,106 +270,66 @@ class ExportManager:
         include_config_in_metadata: bool = False,
         export_config_sidecar: bool = False,
         config_manager: any | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        output_format: str = "csv",
     ) -> bool:
-        """Perform direct export from UI tab without modal dialog."""
+        """
+        Perform direct export from UI tab without modal dialog.
+
+        progress_callback receives (files done, total files) while metrics are
+        recalculated; returns False without writing if the export is cancelled.
+        Each group's file (output_format is one of ExportWriter.FORMATS) is streamed
+        and written in parallel.
+        """
+        self._cancel_requested = False
         if not sleep_metrics_list:
             return False
 
         try:
+            if output_format not in ExportWriter.FORMATS:
+                msg = f"Unsupported export format '{output_format}'. Supported: {', '.join(ExportWriter.FORMATS)}"
+                raise ValueError(msg)
+
             # Create output directory if it doesn't exist
             output_path = Path(output_directory)
             output_path.mkdir(parents=True, exist_ok=True)
 
             # CRITICAL FIX: Ensure metrics are calculated before export
-            self._ensure_metrics_calculated_for_export(sleep_metrics_list)
+            if not self._ensure_metrics_calculated_for_export(sleep_metrics_list, progress_callback):
+                return False
 
             # Filter data based on grouping option
             grouped_data = self._group_export_data(sleep_metrics_list, grouping_option)
 
+            config_lines = []
+            if include_metadata and include_config_in_metadata and config_manager is not None:
+                config_lines = [*config_manager.get_config_metadata_header(), "#"]
+
             # Export each group
-            for group_name, metrics in grouped_data.items():
-                # Create filename based on group
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"sleep_data_{group_name}_{timestamp}.csv"
-                filepath = output_path / filename
-
-                # Convert to export format - multiple periods per participant
-                export_data = []
-                for metric in metrics:
-                    period_rows = metric.to_export_dict_list()
-                    export_data.extend(period_rows)
-
-                export_df = pd.DataFrame(export_data)
-
-                # Sanitize string columns
-                for col in export_df.select_dtypes(include=["object"]).columns:
-                    export_df[col] = export_df[col].apply(self._sanitize_csv_cell)
-
-                # Sort by Participant ID, Sleep Date, and Marker Index for consistent ordering
-                sort_columns = []
-                if "Numerical Participant ID" in export_df.columns:
-                    sort_columns.append("Numerical Participant ID")
-                if "Sleep Date" in export_df.columns:
-                    sort_columns.append("Sleep Date")
-                if "Marker Index" in export_df.columns:
-                    sort_columns.append("Marker Index")
-
-                if sort_columns:
-                    export_df = export_df.sort_values(by=sort_columns, ascending=True)
-
-                # Filter columns if specified
-                if selected_columns:
-                    available_columns = [col for col in selected_columns if col in export_df.columns]
-                    if available_columns:
-                        export_df = export_df[available_columns]
-
-                # Count totals for metadata
-                total_periods = len(export_data)
-                total_participants = len(metrics)
-
-                # Write to CSV atomically
-                temp_path = filepath.with_suffix(f".tmp.{os.getpid()}")
-                try:
-                    with open(temp_path, "w", newline="", encoding="utf-8") as f:
-                        if include_metadata:
-                            f.write("#\n")
-                            f.write("# Sleep Scoring Export Data (Multiple Periods)\n")
-                            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                            f.write(f"# Group: {group_name}\n")
-                            f.write(f"# Participants: {total_participants}\n")
-                            f.write(f"# Sleep Periods: {total_periods}\n")
-                            f.write("# Note: Each row represents one sleep period (main sleep or nap)\n")
-                            f.write("#\n")
-
-                            # Include configuration in metadata if requested
-                            if include_config_in_metadata and config_manager is not None:
-                                config_lines = config_manager.get_config_metadata_header()
-                                f.writelines(line + "\n" for line in config_lines)
-                                f.write("#\n")
-
-                        export_df.to_csv(f, index=False, header=include_headers, float_format="%.4f")
-
-                        f.flush()
-                        os.fsync(f.fileno())
-
-                    if temp_path.stat().st_size == 0:
-                        msg = "CSV write produced empty file"
-                        raise OSError(msg)
-
-                    temp_path.replace(filepath)
-
-                except Exception:
-                    if temp_path.exists():
-                        temp_path.unlink()
-                    raise
-
-                logger.debug("Exported %s participants (%s periods) to %s", total_participants, total_periods, filepath)
-
-                # Export config sidecar file if requested
-                if export_config_sidecar and config_manager is not None:
-                    config_sidecar_path = filepath.with_suffix(".config.csv")
-                    config_manager.export_config_csv(config_sidecar_path)
-                    logger.debug("Exported config sidecar to %s", config_sidecar_path)
+            nwt_resolver = NonwearDataService(self.db_manager).load_sensor_resolver()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(grouped_data))) as executor:
+                futures = [
+                    executor.submit(
+                        self._write_export_group,
+                        group_name,
+                        metrics,
+                        output_path / f"sleep_data_{group_name}_{timestamp}.{output_format}",
+                        nwt_resolver,
+                        selected_columns,
+                        include_headers,
+                        config_lines if include_metadata else None,
+                    )
+                    for group_name, metrics in grouped_data.items()
+                ]
+                for future in as_completed(futures):
+                    filepath = future.result()
+
+                    # Export config sidecar file if requested
+                    if export_config_sidecar and config_manager is not None:
+                        config_sidecar_path = filepath.with_suffix(".config.csv")
+                        config_manager.export_config_csv(config_sidecar_path)
+                        logger.debug("Exported config sidecar to %s", config_sidecar_path)
 
             return True
 
@@ -350,190 +337,264 @@ class ExportManager:
             logger.warning("Error in direct export: %s", e)
             return False
 
-    def _ensure_metrics_calculated_for_export(self, sleep_metrics_list: list[SleepMetrics]) -> None:
-        """Ensure all sleep metrics have calculated values before export."""
-        from datetime import datetime, timedelta
+    def _write_export_group(
+        self,
+        group_name: str,
+        metrics: list[SleepMetrics],
+        filepath: Path,
+        nwt_resolver: NonwearSensorResolver,
+        selected_columns: list[str],
+        include_headers: bool,
+        config_lines: list[str] | None,
+    ) -> Path:
+        """Stream one group's export rows to its file; config_lines of None leaves out the metadata header."""
+        total_periods = self._count_export_rows(metrics)
+        total_participants = len(metrics)
+
+        metadata_lines = []
+        if config_lines is not None:
+            metadata_lines = [
+                "#",
+                "# Sleep Scoring Export Data (Multiple Periods)",
+                f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"# Group: {group_name}",
+                f"# Participants: {total_participants}",
+                f"# Sleep Periods: {total_periods}",
+                _EXPORT_NOTE_LINE,
+                "#",
+                *config_lines,
+            ]
+
+        with ExportWriter(filepath, selected_columns=selected_columns, metadata_lines=metadata_lines, include_headers=include_headers) as writer:
+            writer.write_rows(self._iter_export_rows(metrics, nwt_resolver))
+
+        logger.debug("Exported %s participants (%s periods) to %s", total_participants, total_periods, filepath)
+        return filepath
+
+    def _load_precomputed_mask(
+        self,
+        filename: str,
+        algorithm_id: str,
+        parameters: dict[str, Any],
+        timestamps: list[datetime] | np.ndarray,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> list[int] | None:
+        """Per-epoch results stored at import for exactly these epochs, or None if they must be computed."""
+        stored = self.db_manager.load_epoch_scores(filename, algorithm_id, parameters, start_time, end_time)
+        if stored is None:
+            return None
+        stored_timestamps, result = stored
+        if len(stored_timestamps) != len(timestamps) or not np.array_equal(stored_timestamps, np.asarray(timestamps, dtype="datetime64[s]")):
+            return None
+        logger.debug("Using precomputed %s results for %s", algorithm_id, filename)
+        return result.mask.tolist()
+
+    def cancel(self) -> None:
+        """Request cancellation of the running export's metric recalculation; checked between files, reset when an export starts."""
+        self._cancel_requested = True
+
+    def _ensure_metrics_calculated_for_export(
+        self,
+        sleep_metrics_list: list[SleepMetrics],
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> bool:
+        """
+        Ensure all sleep metrics have calculated values before export.
 
-        import pandas as pd
+        Sleep periods are grouped by file and each file is recalculated in a
+        worker thread (see _calculate_file_metrics). Results are stored on the
+        metrics here as files complete, so the database only sees one writer.
 
-        from sleep_scoring_app.core.algorithms.factory import AlgorithmFactory
-        from sleep_scoring_app.core.algorithms.nonwear_factory import NonwearAlgorithmFactory
-        from sleep_scoring_app.core.constants import NonwearDataSource
-        from sleep_scoring_app.services.data_service import DataManager
-        from sleep_scoring_app.services.nonwear_service import NonwearDataService
+        Args:
+            sleep_metrics_list: Metrics to recalculate, updated in place
+            progress_callback: Called with (files done, total files) after each file
 
-        # Get service instances
-        data_manager = DataManager(database_manager=self.db_manager)
-        nonwear_service = NonwearDataService(database_manager=self.db_manager)
+        Returns:
+            False if the export was cancelled before every file was recalculated
 
+        """
+        metrics_by_file: dict[str, list[SleepMetrics]] = {}
         for metrics in sleep_metrics_list:
-            # Get all complete sleep periods
-            complete_periods = metrics.daily_sleep_markers.get_complete_periods()
-            if not complete_periods:
-                continue
+            if metrics.daily_sleep_markers.get_complete_periods():
+                metrics_by_file.setdefault(metrics.filename, []).append(metrics)
+        if not metrics_by_file:
+            return True
+
+        nwt_resolver = NonwearDataService(database_manager=self.db_manager).load_sensor_resolver()
+        total_files = len(metrics_by_file)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total_files)) as executor:
+            pending = {
+                executor.submit(self._calculate_file_metrics, filename, file_metrics, nwt_resolver): filename
+                for filename, file_metrics in metrics_by_file.items()
+            }
+            for files_done, future in enumerate(as_completed(pending), start=1):
+                if self._cancel_requested:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.info("Export cancelled: metrics of %d file(s) not recalculated", total_files - files_done + 1)
+                    return False
+
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning("Error calculating metrics for %s: %s", pending[future], e)
+                    results = []
+                for metrics, period, period_metrics in results:
+                    try:
+                        self._store_period_metrics(metrics, period, period_metrics)
+                    except Exception as e:
+                        logger.warning("Error storing metrics for %s: %s", metrics.filename, e)
+
+                if progress_callback:
+                    progress_callback(files_done, total_files)
 
+        return True
+
+    def _calculate_file_metrics(
+        self,
+        filename: str,
+        file_metrics: list[SleepMetrics],
+        nwt_resolver: NonwearSensorResolver,
+    ) -> list[tuple[SleepMetrics, SleepPeriod, dict[str, Any]]]:
+        """
+        Calculate the metrics of every complete sleep period scored on one file.
+
+        The file's axis_y and vector magnitude are loaded once and scored once
+        over the whole recording, from the stored precomputed results when they
+        cover it, so each epoch is scored with its full surrounding context.
+        Every period is then evaluated on the slices of its window (the period
+        plus 5 minutes either side), as a load of that window would return them.
+        Only reads the database, so it can run in a worker thread.
+        """
+        data_manager = DataManager(database_manager=self.db_manager)
+        timestamps, values = self.db_manager.load_activity_window(
+            filename, columns=[ActivityDataPreference.AXIS_Y, ActivityDataPreference.VECTOR_MAGNITUDE]
+        )
+        axis_y = _ActivitySeries.from_column(timestamps, values[ActivityDataPreference.AXIS_Y])
+        vector_magnitude = _ActivitySeries.from_column(timestamps, values[ActivityDataPreference.VECTOR_MAGNITUDE])
+
+        axis_y_times = axis_y.timestamps.tolist()
+        axis_y_values = axis_y.values.tolist()
+        unix_timestamps = [ts.timestamp() for ts in axis_y_times]
+        choi_results = self._score_nonwear(filename, vector_magnitude)
+        sleep_results: dict[str, list[int]] = {}
+
+        results = []
+        for metrics in file_metrics:
             try:
-                # Calculate metrics for ALL periods - same logic for main sleep and naps
-                for period in complete_periods:
-                    # Load activity data for the period's date
-                    filename = metrics.filename
-                    analysis_date = metrics.analysis_date
-
-                    # Load activity data from database using correct method
-                    # Use the actual sleep period timestamps to get the exact data window
-                    # Add minimal buffer (5 minutes) for Sadeh algorithm context (needs 5 min before/after)
+                algorithm_id = metrics.sleep_algorithm_name or AlgorithmFactory.get_default_algorithm_id()
+                if algorithm_id not in sleep_results:
+                    sleep_results[algorithm_id] = self._score_sleep(filename, algorithm_id, axis_y)
+
+                for period in metrics.daily_sleep_markers.get_complete_periods():
                     period_start = datetime.fromtimestamp(period.onset_timestamp)
                     period_end = datetime.fromtimestamp(period.offset_timestamp)
-                    start_time = period_start - timedelta(minutes=5)  # 5 min buffer for Sadeh algorithm
-                    end_time = period_end + timedelta(minutes=5)  # 5 min buffer for Sadeh algorithm
+                    start_time = period_start - _PERIOD_WINDOW_PADDING
+                    end_time = period_end + _PERIOD_WINDOW_PADDING
 
-                    # Load AXIS_Y data for Sadeh
-                    timestamps, axis_y_values = self.db_manager.load_raw_activity_data(
-                        filename=filename, start_time=start_time, end_time=end_time, activity_column=ActivityDataPreference.AXIS_Y
-                    )
-
-                    if not timestamps or not axis_y_values:
+                    window = axis_y.window(start_time, end_time)
+                    if window.start == window.stop:
                         logger.debug("No activity data found for %s", filename)
                         continue
 
-                    # Also load vector magnitude for Choi algorithm
-                    _, vector_magnitude = self.db_manager.load_raw_activity_data(
-                        filename=filename, start_time=start_time, end_time=end_time, activity_column=ActivityDataPreference.VECTOR_MAGNITUDE
-                    )
-
-                    # Convert datetime timestamps to Unix timestamps for compatibility
-                    unix_timestamps = [ts.timestamp() if isinstance(ts, datetime) else ts for ts in timestamps]
-
-                    # Get the algorithm from metrics or use default
-                    algorithm_id = metrics.sleep_algorithm_name or AlgorithmFactory.get_default_algorithm_id()
-                    sleep_algorithm = AlgorithmFactory.create(algorithm_id)
-
-                    # Run sleep scoring algorithm using DI pattern
-                    sadeh_results = sleep_algorithm.score_array(axis_y_values)
-
-                    # Run REAL Choi algorithm for nonwear detection
-                    choi_results = []
-                    if vector_magnitude:
-                        # Create DataFrame for Choi algorithm
-                        df = pd.DataFrame(
-                            {
-                                "datetime": timestamps,
-                                ActivityDataPreference.AXIS_Y: axis_y_values,
-                                ActivityDataPreference.VECTOR_MAGNITUDE: vector_magnitude,
-                            }
-                        )
-
-                        # Run Choi nonwear detection using DI pattern
-                        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
-                        choi_results = choi_algorithm.detect_mask(vector_magnitude)
-                    else:
-                        choi_results = [0] * len(sadeh_results)
-
-                    # Get NWT sensor data from database
-                    nwt_sensor_results = []
-                    try:
-                        # Get nonwear periods from sensor - convert timestamps to datetime
-                        from datetime import datetime as dt
-
-                        onset_dt = (
-                            dt.fromtimestamp(period.onset_timestamp) if isinstance(period.onset_timestamp, int | float) else period.onset_timestamp
-                        )
-                        offset_dt = (
-                            dt.fromtimestamp(period.offset_timestamp) if isinstance(period.offset_timestamp, int | float) else period.offset_timestamp
-                        )
-
-                        sensor_periods = nonwear_service.get_nonwear_periods_for_file(
-                            filename=filename, source=NonwearDataSource.NONWEAR_SENSOR, start_time=onset_dt, end_time=offset_dt
-                        )
-
-                        # Convert to per-minute results
-                        nwt_sensor_results = [0] * len(timestamps)
-                        for nw_period in sensor_periods:
-                            for i, ts in enumerate(timestamps):
-                                # Convert timestamp to datetime if needed
-                                ts_dt = datetime.fromtimestamp(ts) if isinstance(ts, int | float) else ts
-                                # Access attributes of NonwearPeriod object
-                                if nw_period.start_time <= ts_dt <= nw_period.end_time:
-                                    nwt_sensor_results[i] = 1
-                    except Exception as e:
-                        logger.debug("Could not get NWT sensor data: %s", e)
-                        nwt_sensor_results = [0] * len(timestamps)
-
-                    # Calculate metrics for this period with REAL algorithm results
+                    choi_window = choi_results[vector_magnitude.window(start_time, end_time)]
                     period_metrics = data_manager.calculate_sleep_metrics(
                         sleep_markers=[period.onset_timestamp, period.offset_timestamp],
-                        sadeh_results=sadeh_results,
-                        choi_results=choi_results,  # REAL Choi results
-                        activity_data=axis_y_values,
-                        x_data=unix_timestamps,
+                        sadeh_results=sleep_results[algorithm_id][window],
+                        choi_results=choi_window or [0] * (window.stop - window.start),
+                        activity_data=axis_y_values[window],
+                        x_data=unix_timestamps[window],
                         file_path=filename,
-                        nwt_sensor_results=nwt_sensor_results,  # REAL NWT sensor data
+                        nwt_sensor_results=nwt_resolver.nonwear_mask(filename, axis_y_times[window], period_start, period_end),
                     )
-
                     if period_metrics:
                         if not isinstance(period_metrics, dict):
                             logger.warning(f"period_metrics is {type(period_metrics)} instead of dict: {period_metrics}")
                             continue
-
-                        # Store calculated metrics for this specific period
-                        period_metrics_for_storage = {
-                            "total_sleep_time": period_metrics.get("Total Sleep Time (TST)"),
-                            "sleep_efficiency": period_metrics.get("Efficiency"),
-                            "total_minutes_in_bed": period_metrics.get("Total Minutes in Bed"),
-                            "waso": period_metrics.get("Wake After Sleep Onset (WASO)"),
-                            "awakenings": period_metrics.get("Number of Awakenings"),
-                            "average_awakening_length": period_metrics.get("Average Awakening Length"),
-                            "total_activity": period_metrics.get("Total Counts"),
-                            "movement_index": period_metrics.get("Movement Index"),
-                            "fragmentation_index": period_metrics.get("Fragmentation Index"),
-                            "sleep_fragmentation_index": period_metrics.get("Sleep Fragmentation Index"),
-                            "sadeh_onset": period_metrics.get("Sadeh Algorithm Value at Sleep Onset"),
-                            "sadeh_offset": period_metrics.get("Sadeh Algorithm Value at Sleep Offset"),
-                            "choi_onset": period_metrics.get("Choi Algorithm Value at Sleep Onset"),
-                            "choi_offset": period_metrics.get("Choi Algorithm Value at Sleep Offset"),
-                            "total_choi_counts": period_metrics.get("Total Choi Algorithm Counts over the Sleep Period"),
-                            "nwt_onset": period_metrics.get("NWT Sensor Value at Sleep Onset"),
-                            "nwt_offset": period_metrics.get("NWT Sensor Value at Sleep Offset"),
-                            "total_nwt_counts": period_metrics.get("Total NWT Sensor Counts over the Sleep Period"),
-                        }
-
-                        # Store metrics for this period (works for both main sleep and naps)
-                        metrics.store_period_metrics(period, period_metrics_for_storage)
-
-                        # If this is the main sleep period, also update the top-level metrics fields
-                        main_sleep_period = metrics.daily_sleep_markers.get_main_sleep()
-                        if period == main_sleep_period:
-                            metrics.total_sleep_time = period_metrics.get("Total Sleep Time (TST)")
-                            metrics.sleep_efficiency = period_metrics.get("Efficiency")
-                            metrics.total_minutes_in_bed = period_metrics.get("Total Minutes in Bed")
-                            metrics.waso = period_metrics.get("Wake After Sleep Onset (WASO)")
-                            metrics.awakenings = period_metrics.get("Number of Awakenings")
-                            metrics.average_awakening_length = period_metrics.get("Average Awakening Length")
-                            metrics.total_activity = period_metrics.get("Total Counts")
-                            metrics.movement_index = period_metrics.get("Movement Index")
-                            metrics.fragmentation_index = period_metrics.get("Fragmentation Index")
-                            metrics.sleep_fragmentation_index = period_metrics.get("Sleep Fragmentation Index")
-                            metrics.sadeh_onset = period_metrics.get("Sadeh Algorithm Value at Sleep Onset")
-                            metrics.sadeh_offset = period_metrics.get("Sadeh Algorithm Value at Sleep Offset")
-                            metrics.choi_onset = period_metrics.get("Choi Algorithm Value at Sleep Onset")
-                            metrics.choi_offset = period_metrics.get("Choi Algorithm Value at Sleep Offset")
-                            metrics.total_choi_counts = period_metrics.get("Total Choi Algorithm Counts over the Sleep Period")
-                            metrics.nwt_onset = period_metrics.get("NWT Sensor Value at Sleep Onset")
-                            metrics.nwt_offset = period_metrics.get("NWT Sensor Value at Sleep Offset")
-                            metrics.total_nwt_counts = period_metrics.get("Total NWT Sensor Counts over the Sleep Period")
-
-                            # Store calculated values back to database for future exports
-                            self.db_manager.save_sleep_metrics(metrics, is_autosave=False)
-                            logger.debug("Calculated and saved metrics for %s on %s", filename, analysis_date)
+                        results.append((metrics, period, period_metrics))
 
             except Exception as e:
-                import traceback
-
-                logger.warning("Error calculating metrics for %s: %s", metrics.filename, e)
-                logger.warning("Full traceback: %s", traceback.format_exc())
-                # Continue with export even if calculation fails for one file
+                logger.warning("Error calculating metrics for %s on %s: %s", filename, metrics.analysis_date, e)
+                # Continue with the file's other nights even if calculation fails for one
                 continue
 
+        return results
+
+    def _score_sleep(self, filename: str, algorithm_id: str, axis_y: _ActivitySeries) -> list[int]:
+        """Sleep scores of a whole file's axis_y epochs."""
+        if len(axis_y.values) == 0:
+            return []
+        sleep_algorithm = AlgorithmFactory.create(algorithm_id)
+        # Use scores precomputed at import when they cover exactly these epochs
+        results = self._load_precomputed_mask(filename, sleep_algorithm.identifier, sleep_algorithm.get_parameters(), axis_y.timestamps)
+        return results if results is not None else sleep_algorithm.score_array(axis_y.values.tolist())
+
+    def _score_nonwear(self, filename: str, vector_magnitude: _ActivitySeries) -> list[int]:
+        """Choi nonwear mask of a whole file's vector magnitude epochs."""
+        if len(vector_magnitude.values) == 0:
+            return []
+        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+        results = self._load_precomputed_mask(
+            filename,
+            choi_algorithm.identifier,
+            nonwear_parameters(choi_algorithm, ActivityDataPreference.VECTOR_MAGNITUDE),
+            vector_magnitude.timestamps,
+        )
+        return results if results is not None else choi_algorithm.detect_mask(vector_magnitude.values.tolist())
+
+    def _store_period_metrics(self, metrics: SleepMetrics, period: SleepPeriod, period_metrics: dict[str, Any]) -> None:
+        """Store a sleep period's calculated metrics, saving them when it is the main sleep."""
+        # Store calculated metrics for this specific period
+        period_metrics_for_storage = {
+            "total_sleep_time": period_metrics.get("Total Sleep Time (TST)"),
+            "sleep_efficiency": period_metrics.get("Efficiency"),
+            "total_minutes_in_bed": period_metrics.get("Total Minutes in Bed"),
+            "waso": period_metrics.get("Wake After Sleep Onset (WASO)"),
+            "awakenings": period_metrics.get("Number of Awakenings"),
+            "average_awakening_length": period_metrics.get("Average Awakening Length"),
+            "total_activity": period_metrics.get("Total Counts"),
+            "movement_index": period_metrics.get("Movement Index"),
+            "fragmentation_index": period_metrics.get("Fragmentation Index"),
+            "sleep_fragmentation_index": period_metrics.get("Sleep Fragmentation Index"),
+            "sadeh_onset": period_metrics.get("Sadeh Algorithm Value at Sleep Onset"),
+            "sadeh_offset": period_metrics.get("Sadeh Algorithm Value at Sleep Offset"),
+            "choi_onset": period_metrics.get("Choi Algorithm Value at Sleep Onset"),
+            "choi_offset": period_metrics.get("Choi Algorithm Value at Sleep Offset"),
+            "total_choi_counts": period_metrics.get("Total Choi Algorithm Counts over the Sleep Period"),
+            "nwt_onset": period_metrics.get("NWT Sensor Value at Sleep Onset"),
+            "nwt_offset": period_metrics.get("NWT Sensor Value at Sleep Offset"),
+            "total_nwt_counts": period_metrics.get("Total NWT Sensor Counts over the Sleep Period"),
+        }
+
+        # Store metrics for this period (works for both main sleep and naps)
+        metrics.store_period_metrics(period, period_metrics_for_storage)
+
+        # If this is the main sleep period, also update the top-level metrics fields
+        main_sleep_period = metrics.daily_sleep_markers.get_main_sleep()
+        if period == main_sleep_period:
+            metrics.total_sleep_time = period_metrics.get("Total Sleep Time (TST)")
+            metrics.sleep_efficiency = period_metrics.get("Efficiency")
+            metrics.total_minutes_in_bed = period_metrics.get("Total Minutes in Bed")
+            metrics.waso = period_metrics.get("Wake After Sleep Onset (WASO)")
+            metrics.awakenings = period_metrics.get("Number of Awakenings")
+            metrics.average_awakening_length = period_metrics.get("Average Awakening Length")
+            metrics.total_activity = period_metrics.get("Total Counts")
+            metrics.movement_index = period_metrics.get("Movement Index")
+            metrics.fragmentation_index = period_metrics.get("Fragmentation Index")
+            metrics.sleep_fragmentation_index = period_metrics.get("Sleep Fragmentation Index")
+            metrics.sadeh_onset = period_metrics.get("Sadeh Algorithm Value at Sleep Onset")
+            metrics.sadeh_offset = period_metrics.get("Sadeh Algorithm Value at Sleep Offset")
+            metrics.choi_onset = period_metrics.get("Choi Algorithm Value at Sleep Onset")
+            metrics.choi_offset = period_metrics.get("Choi Algorithm Value at Sleep Offset")
+            metrics.total_choi_counts = period_metrics.get("Total Choi Algorithm Counts over the Sleep Period")
+            metrics.nwt_onset = period_metrics.get("NWT Sensor Value at Sleep Onset")
+            metrics.nwt_offset = period_metrics.get("NWT Sensor Value at Sleep Offset")
+            metrics.total_nwt_counts = period_metrics.get("Total NWT Sensor Counts over the Sleep Period")
+
+            # Store calculated values back to database for future exports
+            self.db_manager.save_sleep_metrics(metrics, is_autosave=False)
+            logger.debug("Calculated and saved metrics for %s on %s", metrics.filename, metrics.analysis_date)
+
     def _group_export_data(self, sleep_metrics_list: list[SleepMetrics], grouping_option: int) -> dict[str, list[SleepMetrics]]:
         """Group sleep metrics based on grouping option."""
         if grouping_option == 0:  # All data in one file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Export Worker for Sleep Scoring Application
+Provides threaded sleep data export with progress tracking and cancellation.
+
+Uses the recommended QThread + Worker Object pattern instead of subclassing QThread.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.core.dataclasses import SleepMetrics
+    from sleep_scoring_app.services.export_service import ExportManager
+
+logger = logging.getLogger(__name__)
+
+
+class ExportWorkerObject(QObject):
+    """
+    Worker object that performs a direct export.
+
+    This object is moved to a QThread to perform work off the main thread.
+    Uses the recommended worker-object pattern for PyQt6 threading.
+    """
+
+    progress_updated = pyqtSignal(int, int)  # Files recalculated, total files
+    export_completed = pyqtSignal(bool, str)  # Success, error message
+    finished = pyqtSignal()  # Signals work is complete
+
+    def __init__(
+        self,
+        export_manager: ExportManager,
+        sleep_metrics_list: list[SleepMetrics],
+        **export_options: Any,
+    ) -> None:
+        super().__init__()
+        self.export_manager = export_manager
+        self.sleep_metrics_list = sleep_metrics_list
+        self.export_options = export_options
+        self.is_cancelled = False
+
+    def run(self) -> None:
+        """Run the export operation. Called when thread starts."""
+        try:
+            success = self.export_manager.perform_direct_export(
+                self.sleep_metrics_list,
+                progress_callback=self._on_progress,
+                **self.export_options,
+            )
+            self.export_completed.emit(success and not self.is_cancelled, "")
+        except Exception as e:
+            logger.exception("Export worker error")
+            self.export_completed.emit(False, str(e))
+        finally:
+            self.finished.emit()
+
+    def _on_progress(self, files_done: int, total_files: int) -> None:
+        # A cancel requested before the export reset its flag would otherwise be lost
+        if self.is_cancelled:
+            self.export_manager.cancel()
+        self.progress_updated.emit(files_done, total_files)
+
+    def cancel(self) -> None:
+        """Request cooperative cancellation; the export stops before recalculating the next file."""
+        self.is_cancelled = True
+        self.export_manager.cancel()
+
+
+class ExportWorker:
+    """
+    Manager for threaded export operations.
+
+    Uses the recommended QThread + Worker Object pattern.
+    The worker object is moved to a thread for execution.
+    """
+
+    def __init__(
+        self,
+        export_manager: ExportManager,
+        sleep_metrics_list: list[SleepMetrics],
+        **export_options: Any,
+    ) -> None:
+        # Create thread and worker
+        self._thread = QThread()
+        self._worker = ExportWorkerObject(export_manager, sleep_metrics_list, **export_options)
+
+        # Move worker to thread
+        self._worker.moveToThread(self._thread)
+
+        # Connect thread started signal to worker run method
+        self._thread.started.connect(self._worker.run)
+
+        # Clean up when worker finishes
+        self._worker.finished.connect(self._thread.quit)
+        self._worker.finished.connect(self._worker.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+
+    @property
+    def progress_updated(self) -> pyqtSignal:
+        """Signal emitted with (files recalculated, total files) while metrics are recalculated."""
+        return self._worker.progress_updated
+
+    @property
+    def export_completed(self) -> pyqtSignal:
+        """Signal emitted with (success, error message) when the export ends."""
+        return self._worker.export_completed
+
+    def start(self) -> None:
+        """Start the export in the background thread."""
+        self._thread.start()
+
+    def isRunning(self) -> bool:
+        """Check if the export is currently running."""
+        return self._thread.isRunning()
+
+    def cancel(self) -> None:
+        """Request cooperative cancellation without blocking the caller."""
+        self._worker.cancel()
+
+    def wait(self, timeout: int = -1) -> bool:
+        """Wait for the thread to finish."""
+        return self._thread.wait(timeout)
@@ -0,0 +1,293 @@
+"""
+Streaming writer for sleep data exports and command-line results.
+
+Export rows are consumed from any iterable and written in bounded chunks, so
+memory stays flat regardless of how many rows an export has. Output goes to a
+temporary file that is synced and renamed into place when the writer closes
+successfully, and removed if the export fails.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import json
+import logging
+import math
+import os
+from itertools import count, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered before each write
+DEFAULT_CHUNK_ROWS = 1000
+
+# Leading characters spreadsheet applications treat as the start of a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def sanitize_csv_cell(value: Any) -> Any:
+    """Prevent CSV formula injection."""
+    if isinstance(value, str) and value and value[0] in _FORMULA_PREFIXES:
+        return "'" + value
+    return value
+
+
+def _format_csv_cell(value: Any, float_format: str | None) -> Any:
+    """Format a value as pandas' to_csv(float_format=...) writes it, with None and NaN empty."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        return float_format % value if float_format else value
+    return sanitize_csv_cell(value)
+
+
+def _json_value(value: Any) -> Any:
+    """NaN as null, which JSON has no literal for."""
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _string_array(values: list[Any]) -> Any:
+    """Values as a Parquet text column, None and NaN kept null."""
+    import pyarrow as pa
+
+    return pa.array([None if value is None or (isinstance(value, float) and math.isnan(value)) else str(value) for value in values], type=pa.string())
+
+
+def _widen_parquet_type(current: Any, incoming: Any) -> Any:
+    """The narrowest Parquet column type holding both: the other type for an empty column, float for numbers, otherwise text."""
+    import pyarrow as pa
+
+    if current == incoming or pa.types.is_null(incoming):
+        return current
+    if pa.types.is_null(current):
+        return incoming
+    if all(pa.types.is_integer(kind) or pa.types.is_floating(kind) for kind in (current, incoming)):
+        return pa.float64()
+    return pa.string()
+
+
+class ExportWriter:
+    """Streams export rows (dicts) to a CSV, JSON or Parquet file."""
+
+    FORMATS: ClassVar[tuple[str, ...]] = ("csv", "json", "parquet")
+
+    def __init__(
+        self,
+        output_path: Path,
+        output_format: str | None = None,
+        *,
+        selected_columns: Sequence[str] | None = None,
+        metadata_lines: Sequence[str] = (),
+        include_headers: bool = True,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        float_format: str | None = "%.4f",
+    ) -> None:
+        """
+        Set up a writer for output_path; nothing is written until it is entered.
+
+        Columns are fixed by the first row: selected_columns that it has, in
+        that order, or all of its keys if none match. Metadata lines are written
+        as CSV comments before the header, or stored in the Parquet file's
+        metadata; JSON output has no place for them. CSV floats are written
+        with float_format, or in full when it is None. Parquet column types
+        follow the rows: a chunk that does not fit them widens the column, to
+        float for numbers and to text for mixed values, copying what was
+        already written. An output that receives no rows is still written,
+        with selected_columns as its columns.
+        """
+        self.output_path = Path(output_path)
+        self.output_format = output_format or self.infer_format(self.output_path)
+        if self.output_format not in self.FORMATS:
+            msg = f"Unsupported output format '{self.output_format}'. Supported: {', '.join(self.FORMATS)}"
+            raise ValueError(msg)
+
+        self.selected_columns = list(selected_columns or [])
+        self.metadata_lines = list(metadata_lines)
+        self.include_headers = include_headers
+        self.chunk_rows = max(1, chunk_rows)
+        self.float_format = float_format
+
+        self.columns: list[str] | None = None
+        self.rows_written = 0
+        self._temp_path = self.output_path.with_suffix(f".tmp.{os.getpid()}")
+        self._file: Any = None
+        self._csv_writer: Any = None
+        self._parquet_writer: Any = None
+        self._parquet_schema: Any = None
+        self._widenings = count(1)
+        self._warn_new_columns = False
+        self._ignored_columns: set[str] = set()
+
+    @classmethod
+    def infer_format(cls, output_path: Path) -> str:
+        """Infer the output format from the file extension, defaulting to CSV."""
+        suffix = output_path.suffix.lower().lstrip(".")
+        return suffix if suffix in cls.FORMATS else "csv"
+
+    def __enter__(self) -> Self:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.output_format == "parquet":
+            if importlib.util.find_spec("pyarrow") is None:
+                msg = "Parquet export requires pyarrow (pip install sleep-scoring-demo[parquet])"
+                raise ValueError(msg)
+        elif self.output_format == "json":
+            self._file = open(self._temp_path, "w", encoding="utf-8")
+            self._file.write("[")
+        else:
+            self._file = open(self._temp_path, "w", newline="", encoding="utf-8")
+            self._file.writelines(line + "\n" for line in self.metadata_lines)
+            self._csv_writer = csv.writer(self._file)
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close(success=exc_type is None)
+
+    def write_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Consume rows, writing them a chunk at a time."""
+        iterator = iter(rows)
+        while chunk := list(islice(iterator, self.chunk_rows)):
+            if self.columns is None:
+                self._set_columns(chunk[0])
+            self._check_columns(chunk)
+            if self.output_format == "csv":
+                self._write_csv(chunk)
+            elif self.output_format == "json":
+                self._write_json(chunk)
+            else:
+                self._write_parquet(chunk)
+            self.rows_written += len(chunk)
+
+    def _set_columns(self, first_row: dict[str, Any]) -> None:
+        selected = [column for column in self.selected_columns if column in first_row]
+        self.columns = selected or list(first_row)
+        self._warn_new_columns = not selected
+        if self.output_format == "csv" and self.include_headers:
+            self._csv_writer.writerow(self.columns)
+
+    def _check_columns(self, chunk: list[dict[str, Any]]) -> None:
+        """Warn once about columns that first appear after the first row fixed them."""
+        if not self._warn_new_columns:
+            return
+        known = set(self.columns)
+        for row in chunk:
+            if not known.issuperset(row):
+                new_columns = set(row) - known - self._ignored_columns
+                if new_columns:
+                    logger.warning(
+                        "Export %s: columns %s are missing from its first row and were not written", self.output_path.name, sorted(new_columns)
+                    )
+                    self._ignored_columns.update(new_columns)
+
+    def _write_csv(self, chunk: list[dict[str, Any]]) -> None:
+        columns, float_format = self.columns, self.float_format
+        self._csv_writer.writerows([_format_csv_cell(row.get(column), float_format) for column in columns] for row in chunk)
+
+    def _write_json(self, chunk: list[dict[str, Any]]) -> None:
+        columns = self.columns
+        for index, row in enumerate(chunk, start=self.rows_written):
+            self._file.write(",\n" if index else "\n")
+            self._file.write(json.dumps({column: _json_value(row.get(column)) for column in columns}, default=str))
+
+    def _write_parquet(self, chunk: list[dict[str, Any]]) -> None:
+        import pyarrow as pa
+
+        arrays = [self._parquet_array([row.get(column) for row in chunk], index) for index, column in enumerate(self.columns)]
+        if self._parquet_writer is None:
+            self._open_parquet([pa.field(column, array.type) for column, array in zip(self.columns, arrays, strict=True)])
+        self._parquet_writer.write_table(pa.Table.from_arrays(arrays, schema=self._parquet_schema))
+
+    def _parquet_array(self, values: list[Any], index: int) -> Any:
+        """Convert a column of a chunk, widening the file's column type if the chunk does not fit it."""
+        import pyarrow as pa
+
+        if self._parquet_schema is not None:
+            current = self._parquet_schema.field(index).type
+            try:
+                return pa.array(values, type=current)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                pass
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array = _string_array(values)
+        if pa.types.is_integer(array.type):
+            # Whole numbers in one chunk may be fractions in the next
+            array = array.cast(pa.float64())
+        if self._parquet_schema is None:
+            return array
+
+        widened = _widen_parquet_type(current, array.type)
+        if widened != current:
+            self._rewrite_parquet(self._parquet_schema.set(index, self._parquet_schema.field(index).with_type(widened)))
+        return _string_array(values) if pa.types.is_string(widened) and not pa.types.is_string(array.type) else array.cast(widened)
+
+    def _open_parquet(self, fields: list[Any]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        metadata = {"export_metadata": "\n".join(self.metadata_lines)} if self.metadata_lines else None
+        self._parquet_schema = pa.schema(fields, metadata=metadata)
+        self._parquet_writer = pq.ParquetWriter(self._temp_path, self._parquet_schema)
+
+    def _rewrite_parquet(self, schema: Any) -> None:
+        """Copy what was written so far into a new file with the widened schema, one row group at a time, and continue there."""
+        import pyarrow.parquet as pq
+
+        self._parquet_writer.close()
+        self._parquet_writer = None
+        written_path = self._temp_path
+        self._temp_path = self.output_path.with_suffix(f".tmp.{os.getpid()}.{next(self._widenings)}")
+        try:
+            self._parquet_writer = pq.ParquetWriter(self._temp_path, schema)
+            with pq.ParquetFile(written_path) as written:
+                for group in range(written.num_row_groups):
+                    self._parquet_writer.write_table(written.read_row_group(group).cast(schema))
+        finally:
+            written_path.unlink()
+        self._parquet_schema = schema
+        logger.debug("Export %s: widened Parquet schema to %s", self.output_path.name, schema)
+
+    def _write_without_rows(self) -> None:
+        """Give an output that received no rows the selected columns: a CSV header or an empty Parquet table of text columns."""
+        if self.output_format == "csv" and self.include_headers and self.selected_columns:
+            self._csv_writer.writerow(self.selected_columns)
+        elif self.output_format == "parquet":
+            import pyarrow as pa
+
+            self._open_parquet([pa.field(column, pa.string()) for column in self.selected_columns])
+
+    def close(self, success: bool = True) -> None:
+        """Finish the file and move it into place, or discard it if the export failed."""
+        try:
+            if success and self.columns is None:
+                self._write_without_rows()
+            if self._file is not None:
+                if self.output_format == "json":
+                    self._file.write("\n]\n" if self.rows_written else "]\n")
+                self._file.flush()
+                if success:
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+                self._parquet_writer = None
+
+            if success and self._temp_path.exists():
+                if self.rows_written and self._temp_path.stat().st_size == 0:
+                    msg = "Export write produced empty file"
+                    raise OSError(msg)
+                self._temp_path.replace(self.output_path)
+                logger.debug("Wrote %s rows to %s", self.rows_written, self.output_path)
+        finally:
+            if self._temp_path.exists():
+                self._temp_path.unlink()
@@ -5,13 +5,25 @@ from __future__ import annotations
 import csv
 import logging
 from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
 from sleep_scoring_app.core.constants import DevicePreset
+from sleep_scoring_app.services.memory_service import BoundedCache
 
 logger = logging.getLogger(__name__)
 
+# How much of a file each detection looks at
+HEADER_SCAN_ROWS = 50
+HEADER_SNIFF_CHARS = 4096
+EPOCH_SCAN_ROWS = 100
+DATA_SNIFF_CHARS = 8192
+DEVICE_SCAN_LINES = 20
+DETECTION_CACHE_SIZE = 2048
+
 # Common datetime formats to try
 DATETIME_FORMATS = [
     "%Y-%m-%d %H:%M:%S",
@@ -25,6 +37,14 @@ DATETIME_FORMATS = [
     "%d/%m/%Y %I:%M:%S %p",
 ]
 
+# Formats tried first for each device's exports (ambiguous samples take the first format that fits)
+DEVICE_DATETIME_FORMATS = {
+    DevicePreset.ACTIGRAPH: ["%m/%d/%Y %H:%M:%S", "%m/%d/%Y %I:%M:%S %p"],
+    DevicePreset.ACTIWATCH: ["%m/%d/%Y %H:%M:%S", "%m/%d/%Y %I:%M:%S %p"],
+    DevicePreset.GENEACTIV: ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S:%f", "%Y-%m-%d %H:%M:%S"],
+    DevicePreset.AXIVITY: ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"],
+}
+
 # Device signatures based on column names
 DEVICE_SIGNATURES = {
     DevicePreset.ACTIGRAPH: {"Axis1", "Axis2", "Axis3", "Vector Magnitude", "Activity"},
@@ -35,6 +55,39 @@ DEVICE_SIGNATURES = {
 }
 
 
+@lru_cache(maxsize=4096)
+def _parse_datetime_string(value: str) -> datetime | None:
+    """Parse with the first common format that fits (cached: dates and times repeat across rows)."""
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass(frozen=True)
+class FormatDetection:
+    """Everything detect_all found out about one file, with a confidence (0.0-1.0) per value."""
+
+    skip_rows: int
+    skip_rows_confidence: float
+    epoch_length: int
+    epoch_confidence: float
+    delimiter: str
+    device: DevicePreset
+    device_confidence: float
+
+    @property
+    def confidence(self) -> float:
+        """Confidence of the least certain value."""
+        return min(self.skip_rows_confidence, self.epoch_confidence, self.device_confidence)
+
+
+# Shared by all detectors: (resolved path, size, mtime_ns) -> detection
+_detection_cache: BoundedCache[tuple[str, int, int], FormatDetection] = BoundedCache(max_size=DETECTION_CACHE_SIZE)
+
+
 class FormatDetector:
     """Service for detecting CSV file formats and data parameters."""
 
@@ -46,13 +99,33 @@ class FormatDetector:
         else:
             combined = date_str
 
-        combined = combined.strip()
+        return _parse_datetime_string(combined.strip())
 
-        for fmt in DATETIME_FORMATS:
+    def detect_datetime_format(self, samples: list[str], device: DevicePreset | None = None) -> str | None:
+        """
+        Find one strptime format that parses every sample datetime string.
+
+        Args:
+            samples: Datetime strings from the first data rows (date and time already combined)
+            device: Detected device; its usual formats are tried first
+
+        Returns:
+            The format, or None if no known format fits all samples
+
+        """
+        samples = [sample.strip() for sample in samples if sample and sample.strip()]
+        if not samples:
+            return None
+
+        candidates = list(DEVICE_DATETIME_FORMATS.get(device, [])) if device else []
+        candidates += [fmt for fmt in DATETIME_FORMATS if fmt not in candidates]
+        for fmt in candidates:
             try:
-                return datetime.strptime(combined, fmt)
+                for sample in samples:
+                    datetime.strptime(sample, fmt)
             except ValueError:
                 continue
+            return fmt
         return None
 
     def _is_data_row(self, row: list[str]) -> bool:
@@ -108,43 +181,13 @@ class FormatDetector:
         try:
             with open(file_path, encoding="utf-8", errors="ignore") as f:
                 # Try to detect delimiter
-                sample = f.read(4096)
+                sample = f.read(HEADER_SNIFF_CHARS)
                 f.seek(0)
 
-                try:
-                    dialect = csv.Sniffer().sniff(sample, delimiters=",\t;")
-                except csv.Error:
-                    dialect = csv.excel
-
-                reader = csv.reader(f, dialect)
-                lines = []
-                for i, row in enumerate(reader):
-                    if i >= 50:  # Read first 50 lines
-                        break
-                    lines.append(row)
-
-            # Find first data row
-            first_data_row = -1
-            for i, row in enumerate(lines):
-                if self._is_data_row(row):
-                    first_data_row = i
-                    break
-
-            if first_data_row == -1:
-                return (10, 0.5)  # Default fallback
-
-            # Calculate confidence based on consistency of subsequent rows
-            data_rows_found = 0
-            for row in lines[first_data_row : first_data_row + 10]:
-                if self._is_data_row(row):
-                    data_rows_found += 1
+                reader = csv.reader(f, self._sniff_dialect(sample))
+                rows = list(islice(reader, HEADER_SCAN_ROWS))  # Read first 50 lines
 
-            confidence = data_rows_found / 10.0 if data_rows_found > 0 else 0.5
-
-            # skip_rows = rows to skip BEFORE the column header row
-            # first_data_row - 1 = header row index, so skip everything before it
-            skip_rows = max(0, first_data_row - 1)
-            return (skip_rows, confidence)
+            return self._header_rows_from_rows(rows)
 
         except Exception as e:
             logger.warning("Error detecting header rows: %s", e)
@@ -177,53 +220,15 @@ class FormatDetector:
                 for _ in range(skip_rows):
                     f.readline()
 
-                sample = f.read(8192)
+                sample = f.read(DATA_SNIFF_CHARS)
                 f.seek(0)
                 for _ in range(skip_rows):
                     f.readline()
 
-                try:
-                    dialect = csv.Sniffer().sniff(sample, delimiters=",\t;")
-                except csv.Error:
-                    dialect = csv.excel
-
-                reader = csv.reader(f, dialect)
-
-                timestamps = []
-                for i, row in enumerate(reader):
-                    if i >= 100:  # Read first 100 data rows
-                        break
-                    if len(row) < 2:
-                        continue
-
-                    # Try to parse datetime
-                    dt = self._try_parse_datetime(row[0])
-                    if dt is None and len(row) > 1:
-                        dt = self._try_parse_datetime(row[0], row[1])
-
-                    if dt:
-                        timestamps.append(dt)
-
-            if len(timestamps) < 2:
-                return (60, 0.3)  # Default fallback
+                reader = csv.reader(f, self._sniff_dialect(sample))
+                rows = list(islice(reader, EPOCH_SCAN_ROWS))  # Read first 100 data rows
 
-            # Calculate time differences
-            diffs = []
-            for i in range(1, len(timestamps)):
-                diff = (timestamps[i] - timestamps[i - 1]).total_seconds()
-                if 0 < diff <= 300:  # Ignore gaps > 5 minutes
-                    diffs.append(int(diff))
-
-            if not diffs:
-                return (60, 0.3)
-
-            # Find mode (most common interval)
-            counter = Counter(diffs)
-            most_common = counter.most_common(1)[0]
-            epoch_length = most_common[0]
-            confidence = most_common[1] / len(diffs)
-
-            return (epoch_length, confidence)
+            return self._epoch_length_from_rows(rows)
 
         except Exception as e:
             logger.warning("Error detecting epoch length: %s", e)
@@ -251,46 +256,205 @@ class FormatDetector:
         try:
             with open(file_path, encoding="utf-8", errors="ignore") as f:
                 # Read enough lines to find column headers
-                lines = []
-                for i, line in enumerate(f):
-                    if i >= 20:
-                        break
-                    lines.append(line)
-
-            # Find potential header row (row with column names)
-            columns = set()
-            for line in lines:
-                # Try to parse as CSV
-                try:
-                    reader = csv.reader([line])
-                    row = next(reader)
-                    # Check if this looks like a header row (has non-numeric strings)
-                    non_numeric = [c for c in row if c and not c.replace(".", "").replace("-", "").isdigit()]
-                    if len(non_numeric) >= 3:
-                        columns.update(c.strip() for c in row if c.strip())
-                except Exception:
-                    continue
-
-            # Match against device signatures
-            best_match = DevicePreset.GENERIC_CSV
-            best_score = 0.0
-
-            for device, signature in DEVICE_SIGNATURES.items():
-                # Case-insensitive matching
-                columns_lower = {c.lower() for c in columns}
-                signature_lower = {s.lower() for s in signature}
-
-                matches = len(columns_lower & signature_lower)
-                score = matches / len(signature) if signature else 0
-
-                if score > best_score:
-                    best_score = score
-                    best_match = device
-
-            confidence = min(best_score * 1.2, 1.0)  # Boost confidence slightly
-
-            return (best_match, confidence)
+                lines = list(islice(f, DEVICE_SCAN_LINES))
+
+            return self._device_from_lines(lines)
 
         except Exception as e:
             logger.warning("Error detecting device format: %s", e)
             return (DevicePreset.GENERIC_CSV, 0.3)
+
+    def detect_all(self, file_path: str | Path) -> FormatDetection:
+        """
+        Detect header rows, epoch length, delimiter and device from one read of the file head.
+
+        Gives the same answers as detect_header_rows, detect_epoch_length (with the
+        detected header rows) and detect_device_format, which each reopen the file.
+        Results are cached by (path, size, modification time), so previewing an
+        unchanged folder again does not touch the files.
+
+        Args:
+            file_path: Path to the CSV file
+
+        Returns:
+            FormatDetection with each value and its confidence
+
+        """
+        file_path = Path(file_path)
+        try:
+            stat = file_path.stat()
+        except OSError as e:
+            logger.warning("Error detecting format of %s: %s", file_path, e)
+            return FormatDetection(10, 0.3, 60, 0.3, ",", DevicePreset.GENERIC_CSV, 0.3)
+
+        key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        cached = _detection_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            lines = self._read_head_lines(file_path)
+        except OSError as e:
+            logger.warning("Error detecting format of %s: %s", file_path, e)
+            return FormatDetection(10, 0.3, 60, 0.3, ",", DevicePreset.GENERIC_CSV, 0.3)
+
+        try:
+            rows = list(islice(csv.reader(lines, self._sniff_dialect("".join(lines)[:HEADER_SNIFF_CHARS])), HEADER_SCAN_ROWS))
+            skip_rows, skip_rows_confidence = self._header_rows_from_rows(rows)
+        except Exception as e:
+            logger.warning("Error detecting header rows: %s", e)
+            skip_rows, skip_rows_confidence = 10, 0.3
+
+        data_lines = lines[skip_rows:]
+        dialect = self._sniff_dialect("".join(data_lines)[:DATA_SNIFF_CHARS])
+        try:
+            epoch_length, epoch_confidence = self._epoch_length_from_rows(list(islice(csv.reader(data_lines, dialect), EPOCH_SCAN_ROWS)))
+        except Exception as e:
+            logger.warning("Error detecting epoch length: %s", e)
+            epoch_length, epoch_confidence = 60, 0.3
+
+        try:
+            device, device_confidence = self._device_from_lines(lines[:DEVICE_SCAN_LINES])
+        except Exception as e:
+            logger.warning("Error detecting device format: %s", e)
+            device, device_confidence = DevicePreset.GENERIC_CSV, 0.3
+
+        detection = FormatDetection(
+            skip_rows=skip_rows,
+            skip_rows_confidence=skip_rows_confidence,
+            epoch_length=epoch_length,
+            epoch_confidence=epoch_confidence,
+            delimiter=dialect.delimiter,
+            device=device,
+            device_confidence=device_confidence,
+        )
+        _detection_cache.put(key, detection)
+        return detection
+
+    # === Detection from file content ===
+
+    @staticmethod
+    def _sniff_dialect(sample: str) -> type[csv.Dialect] | csv.Dialect:
+        """Dialect of a text sample (comma, tab or semicolon delimited), Excel CSV if unclear."""
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=",\t;")
+        except csv.Error:
+            return csv.excel
+
+    @staticmethod
+    def _read_head_lines(file_path: Path) -> list[str]:
+        """
+        Lines from the start of the file, as many as the three detections read.
+
+        Header rows are at most HEADER_SCAN_ROWS - 2, so every line from index
+        HEADER_SCAN_ROWS on is past them: reading EPOCH_SCAN_ROWS lines and
+        DATA_SNIFF_CHARS characters beyond it covers the epoch rows and the
+        dialect sample whatever the header length turns out to be.
+        """
+        lines: list[str] = []
+        chars_after_scan = 0
+        with open(file_path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                lines.append(line)
+                if len(lines) > HEADER_SCAN_ROWS:
+                    chars_after_scan += len(line)
+                if len(lines) >= HEADER_SCAN_ROWS + EPOCH_SCAN_ROWS and chars_after_scan >= DATA_SNIFF_CHARS:
+                    break
+        return lines
+
+    def _header_rows_from_rows(self, lines: list[list[str]]) -> tuple[int, float]:
+        """Header rows and confidence from the first 50 parsed rows of the file."""
+        # Find first data row
+        first_data_row = -1
+        for i, row in enumerate(lines):
+            if self._is_data_row(row):
+                first_data_row = i
+                break
+
+        if first_data_row == -1:
+            return (10, 0.5)  # Default fallback
+
+        # Calculate confidence based on consistency of subsequent rows
+        data_rows_found = 0
+        for row in lines[first_data_row : first_data_row + 10]:
+            if self._is_data_row(row):
+                data_rows_found += 1
+
+        confidence = data_rows_found / 10.0 if data_rows_found > 0 else 0.5
+
+        # skip_rows = rows to skip BEFORE the column header row
+        # first_data_row - 1 = header row index, so skip everything before it
+        skip_rows = max(0, first_data_row - 1)
+        return (skip_rows, confidence)
+
+    def _epoch_length_from_rows(self, rows: list[list[str]]) -> tuple[int, float]:
+        """Epoch length and confidence from the first 100 parsed rows after the header rows."""
+        timestamps = []
+        for row in rows:
+            if len(row) < 2:
+                continue
+
+            # Try to parse datetime
+            dt = self._try_parse_datetime(row[0])
+            if dt is None and len(row) > 1:
+                dt = self._try_parse_datetime(row[0], row[1])
+
+            if dt:
+                timestamps.append(dt)
+
+        if len(timestamps) < 2:
+            return (60, 0.3)  # Default fallback
+
+        # Calculate time differences
+        diffs = []
+        for i in range(1, len(timestamps)):
+            diff = (timestamps[i] - timestamps[i - 1]).total_seconds()
+            if 0 < diff <= 300:  # Ignore gaps > 5 minutes
+                diffs.append(int(diff))
+
+        if not diffs:
+            return (60, 0.3)
+
+        # Find mode (most common interval)
+        counter = Counter(diffs)
+        most_common = counter.most_common(1)[0]
+        epoch_length = most_common[0]
+        confidence = most_common[1] / len(diffs)
+
+        return (epoch_length, confidence)
+
+    def _device_from_lines(self, lines: list[str]) -> tuple[DevicePreset, float]:
+        """Device and confidence from the column names in the first 20 lines."""
+        # Find potential header row (row with column names)
+        columns = set()
+        for line in lines:
+            # Try to parse as CSV
+            try:
+                reader = csv.reader([line])
+                row = next(reader)
+                # Check if this looks like a header row (has non-numeric strings)
+                non_numeric = [c for c in row if c and not c.replace(".", "").replace("-", "").isdigit()]
+                if len(non_numeric) >= 3:
+                    columns.update(c.strip() for c in row if c.strip())
+            except Exception:
+                continue
+
+        # Match against device signatures
+        best_match = DevicePreset.GENERIC_CSV
+        best_score = 0.0
+
+        for device, signature in DEVICE_SIGNATURES.items():
+            # Case-insensitive matching
+            columns_lower = {c.lower() for c in columns}
+            signature_lower = {s.lower() for s in signature}
+
+            matches = len(columns_lower & signature_lower)
+            score = matches / len(signature) if signature else 0
+
+            if score > best_score:
+                best_score = score
+                best_match = device
+
+        confidence = min(best_score * 1.2, 1.0)  # Boost confidence slightly
+
+        return (best_match, confidence)
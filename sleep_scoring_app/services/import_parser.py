@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Activity file parsing for the import pipeline.
+
+Parses and validates CSV activity files into ready-to-insert arrays without
+touching the database or Qt, so files can be prepared in worker processes while
+ActivityImporter writes the results to SQLite from a single connection.
+
+Files are read with a typed plan (only the identified columns, explicit dtypes
+and one detected datetime format, see csv_ingest); files the plan does not fit
+are read again with full type inference.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from sleep_scoring_app.core.algorithms.csv_ingest import combine_datetime_strings, parse_datetimes, plan_typed_read, read_csv_typed, read_header
+from sleep_scoring_app.core.constants import ActivityColumn, ActivityDataPreference, DatabaseColumn
+from sleep_scoring_app.core.exceptions import ErrorCodes, SleepScoringImportError
+from sleep_scoring_app.services.format_detector import FormatDetector
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from sleep_scoring_app.core.algorithms.csv_ingest import CSVReadPlan, IngestStats
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024  # Large reads keep hashing I/O-bound rather than call-bound
+
+
+@dataclass
+class PreparedImportFile:
+    """A parsed activity file ready to be written, or the reason it could not be parsed."""
+
+    file_path: Path
+    file_hash: str = ""
+    timestamps: list[str] = field(default_factory=list)
+    columns: dict[str, np.ndarray | None] = field(default_factory=dict)  # column name -> float array (NaN = missing)
+    total_records: int = 0  # Data rows in the file, including rows without a timestamp
+    rows_per_second: float | None = None  # Parse throughput of the typed read (None for the inferring read)
+    error: str | None = None
+
+    @property
+    def filename(self) -> str:
+        return self.file_path.name
+
+
+class ActivityFileParser:
+    """Parses CSV activity files into per-axis arrays; picklable for use in worker processes."""
+
+    def __init__(self, max_file_size: int = 100 * 1024 * 1024, fast_ingest: bool = True) -> None:
+        self.max_file_size = max_file_size
+        self.fast_ingest = fast_ingest
+
+    def prepare_file(
+        self,
+        file_path: Path,
+        skip_rows: int = 10,
+        custom_columns: dict[str, str] | None = None,
+        file_hash: str | None = None,
+    ) -> PreparedImportFile:
+        """Hash (unless the hash is given), load and parse a file into ready-to-insert arrays; failures are returned in the error field."""
+        filename = file_path.name
+        try:
+            file_hash = file_hash or self.calculate_file_hash(file_path)
+
+            # Load and validate CSV, typed when the file fits a read plan
+            typed = self.load_csv_typed(file_path, skip_rows, custom_columns) if self.fast_ingest else None
+            if typed is not None:
+                df, plan, stats = typed
+            else:
+                df, plan, stats = self.load_csv(file_path, skip_rows), None, None
+            if df is None or df.empty:
+                return PreparedImportFile(file_path, error=f"Failed to load CSV data from {filename}")
+
+            # Find required columns (use custom columns if provided)
+            date_col, time_col, activity_col, extra_cols = self.identify_columns(df, custom_columns)
+            if not all([date_col, activity_col]):  # time_col can be None if datetime is combined
+                logger.error("Column identification failed for %s:", filename)
+                logger.error("  Available columns: %s", list(df.columns))
+                logger.error("  Found date_col: %s", date_col)
+                logger.error("  Found time_col: %s", time_col)
+                logger.error("  Found activity_col: %s", activity_col)
+                return PreparedImportFile(file_path, error=f"Required columns not found in {filename}")
+
+            # Type guard: ensure required columns are not None after validation
+            # Note: time_col can be None if datetime is combined in date_col
+            assert date_col is not None
+            assert activity_col is not None
+
+            # Process timestamps
+            timestamps = self.process_timestamps(df, date_col, time_col, plan.datetime_format if plan else None)
+            if timestamps is None:
+                return PreparedImportFile(file_path, error=f"Failed to process timestamps in {filename}")
+
+            record_count = min(len(df), len(timestamps))
+            columns = {
+                column: None if array is None else array[:record_count]
+                for column, array in self.build_activity_columns(df, activity_col, extra_cols).items()
+            }
+            return PreparedImportFile(
+                file_path,
+                file_hash=file_hash,
+                timestamps=timestamps[:record_count],
+                columns=columns,
+                total_records=len(df),
+                rows_per_second=stats.rows_per_second if stats else None,
+            )
+
+        except Exception as e:
+            logger.exception("Failed to parse %s", file_path)
+            return PreparedImportFile(file_path, error=f"Failed to import {file_path}: {e}")
+
+    def calculate_file_hash(self, file_path: Path) -> str:
+        """Calculate SHA256 hash of file for change detection."""
+        try:
+            hash_sha256 = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                    hash_sha256.update(chunk)
+            return hash_sha256.hexdigest()
+        except Exception as e:
+            msg = f"Failed to calculate hash for {file_path}: {e}"
+            raise SleepScoringImportError(
+                msg,
+                ErrorCodes.FILE_CORRUPTED,
+            ) from e
+
+    def load_csv(self, file_path: Path, skip_rows: int) -> pd.DataFrame | None:
+        """Load and validate CSV file."""
+        try:
+            file_size = file_path.stat().st_size
+            if file_size > self.max_file_size:
+                logger.error("CSV file too large: %.1f MB > %.1f MB", file_size / 1024 / 1024, self.max_file_size / 1024 / 1024)
+                return None
+
+            df = pd.read_csv(file_path, skiprows=skip_rows)
+
+            if df.empty:
+                return None
+
+            if len(df) > 100000:
+                logger.warning("Large CSV file %s: %s rows", file_path.name, len(df))
+
+            return df
+
+        except pd.errors.EmptyDataError:
+            logger.exception("CSV file %s is empty", file_path.name)
+            return None
+        except pd.errors.ParserError:
+            logger.exception("CSV parsing error in %s", file_path.name)
+            return None
+        except Exception:
+            logger.exception("Error loading CSV %s", file_path.name)
+            return None
+
+    def load_csv_typed(
+        self, file_path: Path, skip_rows: int, custom_columns: dict[str, str] | None = None
+    ) -> tuple[pd.DataFrame, CSVReadPlan, IngestStats] | None:
+        """
+        Read only the identified columns with explicit dtypes.
+
+        Returns:
+            Tuple of (DataFrame, read plan, parse throughput), or None when the file
+            should be read with full type inference instead
+
+        """
+        try:
+            if file_path.stat().st_size > self.max_file_size:
+                return None
+
+            header = pd.DataFrame(columns=read_header(file_path, skip_rows))
+            date_col, time_col, activity_col, extra_cols = self.identify_columns(header, custom_columns)
+            if not all([date_col, activity_col]):
+                return None
+
+            datetime_columns = [date_col] if time_col is None else [date_col, time_col]
+            plan = plan_typed_read(file_path, skip_rows, datetime_columns, [activity_col, *extra_cols.values()], FormatDetector())
+            if plan is None:
+                return None
+
+            df, stats = read_csv_typed(file_path, skip_rows, plan)
+            if df.empty:
+                return None
+            return df, plan, stats
+
+        except Exception as e:
+            logger.debug("Typed read of %s failed, using inferred read: %s", file_path.name, e)
+            return None
+
+    def identify_columns(
+        self, df: pd.DataFrame, custom_columns: dict[str, str] | None = None
+    ) -> tuple[str | None, str | None, str | None, dict[str, str]]:
+        """
+        Identify required and optional columns in CSV.
+
+        Args:
+            df: DataFrame to identify columns in
+            custom_columns: Optional dict with keys 'date', 'time', 'activity', 'datetime_combined'
+                          If provided and datetime_combined is True, time will be None
+
+        Returns:
+            Tuple of (date_col, time_col, activity_col, extra_cols)
+
+        """
+        # Note: Do NOT strip columns here - we need to preserve the exact column names
+        columns = list(df.columns)
+
+        logger.debug("Available columns (raw): %s", columns)
+        logger.debug("Available columns (repr): %s", [repr(col) for col in columns])
+
+        # Use custom columns if provided
+        if custom_columns:
+            date_col = custom_columns.get("date")
+            time_col = custom_columns.get("time")  # Will be None if datetime_combined
+            activity_col = custom_columns.get("activity")
+            datetime_combined = custom_columns.get("datetime_combined", False)
+
+            # Validate custom columns exist in dataframe
+            if date_col and date_col not in columns:
+                logger.warning("Custom date column '%s' not found in CSV columns", date_col)
+                date_col = None
+            if time_col and time_col not in columns:
+                logger.warning("Custom time column '%s' not found in CSV columns", time_col)
+                time_col = None
+            if activity_col and activity_col not in columns:
+                logger.warning("Custom activity column '%s' not found in CSV columns", activity_col)
+                activity_col = None
+
+            # If datetime is combined, time_col should be None
+            if datetime_combined:
+                time_col = None
+
+            logger.info("Using custom columns: date=%s, time=%s, activity=%s, combined=%s", date_col, time_col, activity_col, datetime_combined)
+
+            # Use custom axis column mappings if provided, otherwise use standard detection
+            extra_cols = {}
+
+            # Get custom axis columns from the custom_columns dict
+            # User specifies which CSV column maps to each axis (Y=vertical, X=lateral, Z=forward)
+            custom_axis_y = custom_columns.get(ActivityDataPreference.AXIS_Y)
+            custom_axis_x = custom_columns.get(ActivityDataPreference.AXIS_X)
+            custom_axis_z = custom_columns.get(ActivityDataPreference.AXIS_Z)
+            custom_vm = custom_columns.get(ActivityDataPreference.VECTOR_MAGNITUDE)
+
+            # Validate and add custom axis columns
+            if custom_axis_y and custom_axis_y in columns:
+                extra_cols[DatabaseColumn.AXIS_Y] = custom_axis_y
+                logger.info("Using custom Y-Axis (vertical) column: %s", custom_axis_y)
+            if custom_axis_x and custom_axis_x in columns:
+                extra_cols[DatabaseColumn.AXIS_X] = custom_axis_x
+                logger.info("Using custom X-Axis (lateral) column: %s", custom_axis_x)
+            if custom_axis_z and custom_axis_z in columns:
+                extra_cols[DatabaseColumn.AXIS_Z] = custom_axis_z
+                logger.info("Using custom Z-Axis (forward) column: %s", custom_axis_z)
+            if custom_vm and custom_vm in columns:
+                extra_cols[DatabaseColumn.VECTOR_MAGNITUDE] = custom_vm
+                logger.info("Using custom Vector Magnitude column: %s", custom_vm)
+
+            # If no custom axis columns provided, fall back to standard detection
+            if not extra_cols:
+                extra_cols = self.find_extra_columns(columns)
+
+            return date_col, time_col, activity_col, extra_cols
+
+        # Find DATE column - try multiple variations
+        # First check for combined datetime column (exact match)
+        date_col = None
+        time_col = None
+        datetime_combined = False
+
+        for col in columns:
+            col_lower = col.lower().strip()
+            if col_lower in ("datetime", "timestamp"):
+                date_col = col
+                datetime_combined = True
+                logger.debug("Found combined datetime column: '%s'", col)
+                break
+
+        # If no combined datetime, look for separate date column
+        if date_col is None:
+            date_patterns = ["date", "datum", "day"]
+            for col in columns:
+                col_lower = col.lower().strip()
+                for pattern in date_patterns:
+                    if pattern in col_lower:
+                        date_col = col
+                        logger.debug("Found date column: '%s' (repr: %r, matched pattern: '%s')", col, col, pattern)
+                        break
+                if date_col:
+                    break
+
+        # Find TIME column - only if not using combined datetime
+        if not datetime_combined:
+            time_patterns = [
+                "time",
+                "tijd",
+                "hour",
+            ]  # Removed the space pattern since we check stripped versions
+            for col in columns:
+                col_lower = col.lower().strip()
+                for pattern in time_patterns:
+                    if pattern in col_lower:
+                        time_col = col
+                        logger.debug("Found time column: '%s' (repr: %r, matched pattern: '%s')", col, col, pattern)
+                        break
+                if time_col:
+                    break
+
+        # Find activity column (prioritize vector magnitude)
+        activity_col = None
+        for col in columns:
+            col_lower = col.lower().strip()
+            if any(
+                keyword in col_lower
+                for keyword in [
+                    ActivityColumn.VECTOR,
+                    ActivityColumn.MAGNITUDE,
+                    ActivityColumn.VM,
+                    ActivityColumn.VECTORMAGNITUDE,
+                ]
+            ):
+                activity_col = col
+                logger.debug("Found activity column: '%s' (repr: %r, vector magnitude)", col, col)
+                break
+
+        # Fallback to other activity columns (only generic patterns, not axis-specific)
+        if activity_col is None:
+            for col in columns:
+                col_lower = col.lower().strip()
+                if any(
+                    keyword in col_lower
+                    for keyword in [
+                        ActivityColumn.ACTIVITY,
+                        ActivityColumn.COUNT,
+                    ]
+                ):
+                    activity_col = col
+                    logger.debug("Found activity column: '%s' (repr: %r, fallback)", col, col)
+                    break
+
+        # Find extra columns (only vector magnitude - axis columns must be user-specified)
+        extra_cols = self.find_extra_columns(columns)
+
+        return date_col, time_col, activity_col, extra_cols
+
+    def find_extra_columns(self, columns: list[str]) -> dict[str, str]:
+        """
+        Find axis and vector magnitude columns with common naming patterns.
+
+        Auto-detects columns with standard naming conventions:
+        - Y-Axis (vertical): axis_y, axis1, y
+        - X-Axis (lateral): axis_x, axis2, x
+        - Z-Axis (forward): axis_z, axis3, z
+        - Vector Magnitude: vector_magnitude, vm, vector magnitude
+        """
+        extra_cols = {}
+        for col in columns:
+            col_lower = col.lower().strip()
+
+            # Auto-detect Y-Axis (vertical) - ActiGraph Axis1
+            if DatabaseColumn.AXIS_Y not in extra_cols:
+                if col_lower in ("axis_y", "axis1", "y") or col_lower == "axis 1":
+                    extra_cols[DatabaseColumn.AXIS_Y] = col
+
+            # Auto-detect X-Axis (lateral) - ActiGraph Axis2
+            if DatabaseColumn.AXIS_X not in extra_cols:
+                if col_lower in ("axis_x", "axis2", "x") or col_lower == "axis 2":
+                    extra_cols[DatabaseColumn.AXIS_X] = col
+
+            # Auto-detect Z-Axis (forward) - ActiGraph Axis3
+            if DatabaseColumn.AXIS_Z not in extra_cols:
+                if col_lower in ("axis_z", "axis3", "z") or col_lower == "axis 3":
+                    extra_cols[DatabaseColumn.AXIS_Z] = col
+
+            # Auto-detect Vector Magnitude
+            if DatabaseColumn.VECTOR_MAGNITUDE not in extra_cols:
+                if any(keyword in col_lower for keyword in [ActivityColumn.VECTOR, ActivityColumn.MAGNITUDE, "vm", "vectormagnitude"]):
+                    extra_cols[DatabaseColumn.VECTOR_MAGNITUDE] = col
+
+        return extra_cols
+
+    def process_timestamps(self, df: pd.DataFrame, date_col: str, time_col: str | None, datetime_format: str | None = None) -> list[str] | None:
+        """
+        Process date and time columns into ISO timestamps.
+
+        Args:
+            df: DataFrame containing the data
+            date_col: Column name for date (or combined datetime if time_col is None)
+            time_col: Column name for time, or None if datetime is combined in date_col
+            datetime_format: Detected strptime format of the combined strings (inferred if None or not matching)
+
+        """
+        try:
+            # Verify date column exists
+            if date_col not in df.columns:
+                logger.error("Date column '%s' not found in DataFrame. Available columns: %s", date_col, list(df.columns))
+                return None
+
+            # Handle combined datetime vs separate date/time columns
+            if time_col is None:
+                # Combined datetime in single column
+                datetime_columns = [date_col]
+                logger.debug("Using combined datetime column: %s", date_col)
+            else:
+                # Separate date and time columns
+                if time_col not in df.columns:
+                    logger.error("Time column '%s' not found in DataFrame. Available columns: %s", time_col, list(df.columns))
+                    return None
+                datetime_columns = [date_col, time_col]
+
+            # Debug: show sample data
+            logger.debug("Sample datetime strings: %s", combine_datetime_strings(df.head(3), datetime_columns).tolist())
+
+            # Parse with the detected format (date and time parsed once per distinct value)
+            timestamps = None
+            if datetime_format is not None:
+                try:
+                    timestamps = parse_datetimes(df, datetime_columns, datetime_format)
+                except (ValueError, TypeError, AttributeError) as format_error:
+                    logger.debug("Datetime format %s did not match all rows: %s", datetime_format, format_error)
+
+            # Otherwise try different datetime parsing methods
+            if timestamps is None:
+                datetime_strings = combine_datetime_strings(df, datetime_columns)
+                try:
+                    timestamps = pd.to_datetime(datetime_strings)
+                except (ValueError, TypeError, pd.errors.ParserError) as parse_error:
+                    logger.warning("Standard datetime parsing failed: %s", parse_error)
+                    # Try with different format inference
+                    try:
+                        timestamps = pd.to_datetime(datetime_strings, infer_datetime_format=True)
+                    except Exception as infer_error:
+                        logger.exception("Inferred datetime parsing also failed: %s", infer_error)
+                        return None
+
+            # Convert to ISO format strings
+            iso_timestamps = self.format_iso_timestamps(timestamps)
+
+            # Validate intervals (should be roughly 1 minute)
+            if len(iso_timestamps) > 1:
+                first_interval = timestamps.iloc[1] - timestamps.iloc[0]
+                if abs(first_interval.total_seconds() - 60) > 30:  # Allow 30s tolerance
+                    logger.warning("Data intervals may not be exactly 1 minute: %s", first_interval)
+
+            logger.debug("Successfully processed %s timestamps", len(iso_timestamps))
+            return iso_timestamps
+
+        except Exception:
+            logger.exception("Failed to process timestamps")
+            return None
+
+    def format_iso_timestamps(self, timestamps: pd.Series) -> list[str]:
+        """Format parsed timestamps as ISO strings identical to Timestamp.isoformat(), vectorized for naive times."""
+        if getattr(timestamps.dt, "tz", None) is not None:
+            # Timezone-aware timestamps carry a UTC offset suffix
+            return [ts.isoformat() for ts in timestamps]
+
+        values = timestamps.to_numpy(dtype="datetime64[ns]")
+        nanoseconds = values.astype(np.int64) % 1_000_000_000
+        if (nanoseconds % 1000).any():
+            # Sub-microsecond precision (never produced by activity devices)
+            return [ts.isoformat() for ts in timestamps]
+
+        # isoformat() omits the fractional part when microseconds are zero
+        unit = "us" if nanoseconds.any() else "s"
+        iso_array = np.datetime_as_string(values, unit=unit)
+        if unit == "us":
+            whole_seconds = nanoseconds == 0
+            iso_array[whole_seconds] = np.datetime_as_string(values[whole_seconds], unit="s")
+        return iso_array.tolist()
+
+    def build_activity_columns(
+        self,
+        df: pd.DataFrame,
+        activity_col: str,
+        extra_cols: dict[str, str],
+    ) -> dict[str, np.ndarray | None]:
+        """
+        Build per-axis float arrays for storage, with NaN marking missing values.
+
+        AXIS_Y falls back to the activity column (missing values stored as 0), and vector
+        magnitude is computed from X, Y, Z when the file has no vector magnitude column.
+        A non-numeric value fails the file, as it is not stored as missing.
+        """
+
+        def numeric_values(source: str) -> np.ndarray:
+            try:
+                return pd.to_numeric(df[source], errors="raise").to_numpy(dtype=np.float64)
+            except (ValueError, TypeError) as e:
+                msg = f"Column '{source}' has non-numeric values: {e}"
+                raise SleepScoringImportError(msg, ErrorCodes.INVALID_FORMAT) from e
+
+        def column_values(db_column: str) -> np.ndarray | None:
+            source = extra_cols.get(db_column)
+            if source is None or source not in df.columns:
+                return None
+            return numeric_values(source)
+
+        axis_y = column_values(DatabaseColumn.AXIS_Y)
+        if axis_y is None:
+            axis_y = np.nan_to_num(numeric_values(activity_col), nan=0.0)
+        else:
+            axis_y = np.nan_to_num(axis_y, nan=0.0)
+
+        axis_x = column_values(DatabaseColumn.AXIS_X)
+        axis_z = column_values(DatabaseColumn.AXIS_Z)
+
+        vector_magnitude = column_values(DatabaseColumn.VECTOR_MAGNITUDE)
+        if vector_magnitude is None and axis_x is not None and axis_z is not None:
+            # Calculate vector magnitude from X, Y, Z: sqrt(x^2 + y^2 + z^2); NaN where X or Z is missing
+            vector_magnitude = np.sqrt(axis_x**2 + axis_y**2 + axis_z**2)
+
+        return {
+            DatabaseColumn.AXIS_Y: axis_y,
+            DatabaseColumn.AXIS_X: axis_x,
+            DatabaseColumn.AXIS_Z: axis_z,
+            DatabaseColumn.VECTOR_MAGNITUDE: vector_magnitude,
+        }
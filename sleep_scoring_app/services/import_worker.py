@@ -90,8 +90,9 @@ class ImportWorkerObject(QObject):
             self.finished.emit()
 
     def cancel(self) -> None:
-        """Request cooperative cancellation."""
+        """Request cooperative cancellation; the service stops before the next file."""
         self.is_cancelled = True
+        self.import_service.cancel()
 
 
 class ImportWorker:
@@ -7,6 +7,8 @@ Handles loading and processing of nonwear time (NWT) sensor data and Choi algori
 from __future__ import annotations
 
 import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -26,12 +28,93 @@ from sleep_scoring_app.core.validation import InputValidator
 from sleep_scoring_app.data.database import DatabaseManager
 
 if TYPE_CHECKING:
-    from datetime import datetime
+    from collections.abc import Sequence
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+class NonwearSensorResolver:
+    """
+    In-memory NWT sensor lookups for exporting many sleep periods at once.
+
+    Each participant's sensor nonwear periods are kept sorted by start time with
+    a running maximum of their end times, plus a sorted list of end times, so
+    whether a moment falls in nonwear and how many periods overlap a sleep
+    period are answered by binary search instead of one query per value.
+    Lookups give the same values as querying get_nonwear_periods_for_file for
+    the sleep period and checking the returned periods.
+    """
+
+    def __init__(self, periods_by_participant: dict[str, list[tuple[datetime, datetime]]]) -> None:
+        self._starts: dict[str, list[datetime]] = {}
+        self._covered_until: dict[str, list[datetime]] = {}
+        self._ends: dict[str, list[datetime]] = {}
+        for participant_id, periods in periods_by_participant.items():
+            sorted_periods = sorted(periods)
+            covered_until = []
+            for _, end in sorted_periods:
+                covered_until.append(end if not covered_until or end > covered_until[-1] else covered_until[-1])
+            self._starts[participant_id] = [start for start, _ in sorted_periods]
+            self._covered_until[participant_id] = covered_until
+            self._ends[participant_id] = sorted(end for _, end in sorted_periods)
+        self._participant_ids: dict[str, str] = {}
+
+    def _participant_id(self, filename: str) -> str:
+        """Participant ID the sensor periods of a file are stored under, as in get_nonwear_periods_for_file."""
+        participant_id = self._participant_ids.get(filename)
+        if participant_id is None:
+            from sleep_scoring_app.utils.participant_extractor import extract_participant_info
+
+            participant_id = extract_participant_info(Path(filename)).numerical_id
+            self._participant_ids[filename] = participant_id
+        return participant_id
+
+    def _covered(self, participant_id: str, starts_by: datetime, ends_by: datetime) -> bool:
+        """Whether a period starts at or before starts_by and ends at or after ends_by."""
+        count = bisect_right(self._starts.get(participant_id, []), starts_by)
+        return count > 0 and self._covered_until[participant_id][count - 1] >= ends_by
+
+    def nwt_value(self, filename: str, start_time: datetime, end_time: datetime, metric_type: str) -> int | None:
+        """
+        NWT sensor value of a sleep period from start_time to end_time.
+
+        Args:
+            filename: Activity file the sleep period was scored on
+            start_time: Sleep onset
+            end_time: Sleep offset
+            metric_type: "onset" or "offset" for 1 if that moment is in nonwear
+                else 0, "total" for the number of nonwear periods overlapping
+                the sleep period
+
+        Returns:
+            The value, or None for an unknown metric type
+
+        """
+        participant_id = self._participant_id(filename)
+        if metric_type == "onset":
+            return int(self._covered(participant_id, start_time, start_time))
+        if metric_type == "offset":
+            return int(self._covered(participant_id, end_time, end_time))
+        if metric_type == "total":
+            starts = self._starts.get(participant_id, [])
+            # Periods ending before the onset all start before the offset, so they are subtracted from those starting by the offset
+            return bisect_right(starts, end_time) - bisect_left(self._ends.get(participant_id, []), start_time)
+        return None
+
+    def nonwear_mask(self, filename: str, timestamps: Sequence[datetime], start_time: datetime, end_time: datetime) -> list[int]:
+        """
+        Per-epoch NWT sensor values around a sleep period.
+
+        An epoch is 1 when it lies in a nonwear period that overlaps the sleep
+        period from start_time to end_time, else 0.
+        """
+        participant_id = self._participant_id(filename)
+        if not self._starts.get(participant_id):
+            return [0] * len(timestamps)
+        return [int(self._covered(participant_id, min(ts, end_time), max(ts, start_time))) for ts in timestamps]
+
+
 class NonwearDataService:
     """Service for loading and managing nonwear sensor data."""
 
@@ -321,6 +404,32 @@ class NonwearDataService:
             logger.exception("Failed to get nonwear periods for %s", filename)
             return []
 
+    def load_sensor_resolver(self) -> NonwearSensorResolver:
+        """Load the sensor nonwear periods of every participant with one query for batched NWT lookups."""
+        periods_by_participant: dict[str, list[tuple[datetime, datetime]]] = {}
+        try:
+            with self.db_manager._get_connection() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT {DatabaseColumn.PARTICIPANT_ID}, {DatabaseColumn.START_TIME}, {DatabaseColumn.END_TIME}
+                    FROM {DatabaseTable.NONWEAR_SENSOR_PERIODS}
+                    """
+                ).fetchall()
+        except Exception:
+            logger.exception("Failed to load nonwear sensor periods")
+            return NonwearSensorResolver({})
+
+        for participant_id, start_time, end_time in rows:
+            try:
+                period = (datetime.fromisoformat(str(start_time)), datetime.fromisoformat(str(end_time)))
+            except ValueError as e:
+                logger.warning("Skipping nonwear sensor period for %s: %s", participant_id, e)
+                continue
+            periods_by_participant.setdefault(participant_id, []).append(period)
+
+        logger.debug("Loaded %d nonwear sensor periods for %d participants", len(rows), len(periods_by_participant))
+        return NonwearSensorResolver(periods_by_participant)
+
     def save_nonwear_periods(self, periods: list[NonwearPeriod], filename: str) -> bool:
         """Save nonwear periods to database."""
         try:
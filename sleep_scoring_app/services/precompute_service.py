@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Scoring Precompute Service for Sleep Scoring Application
+Runs the sleep scoring algorithm and Choi nonwear detection once over a whole
+imported recording and stores the per-epoch results.
+
+The plot, marker table and export then read slices of the stored results (see
+sleep_scoring_app.data.algorithm_cache) instead of rerunning the algorithms for
+every date and sleep period. Results are stored with the algorithm settings and
+the file hash and are ignored once either changes. Has no Qt dependency.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
+from sleep_scoring_app.core.constants import ActivityDataPreference
+from sleep_scoring_app.data.algorithm_cache import CachedAlgorithmResult, EpochScores
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sleep_scoring_app.core.algorithms.sleep_scoring_protocol import SleepScoringAlgorithm
+    from sleep_scoring_app.core.dataclasses import AppConfig
+    from sleep_scoring_app.data.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringPrecomputeService:
+    """Scores whole recordings after import and stores the per-epoch results."""
+
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        sleep_algorithm: SleepScoringAlgorithm | None = None,
+        nonwear_columns: Sequence[ActivityDataPreference] | None = None,
+    ) -> None:
+        """
+        Set up precomputation for the files of one study database.
+
+        Args:
+            database_manager: Study database holding the imported files
+            sleep_algorithm: Sleep scoring algorithm (default: the factory default), run on axis_y
+            nonwear_columns: Columns to run Choi on (default: every activity column, so any
+                display or Choi axis setting can be served)
+
+        """
+        self.db_manager = database_manager
+        self.sleep_algorithm = sleep_algorithm or AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+        self.nonwear_columns = list(nonwear_columns) if nonwear_columns is not None else list(ActivityDataPreference)
+
+    @classmethod
+    def from_config(cls, database_manager: DatabaseManager, config: AppConfig) -> ScoringPrecomputeService:
+        """Create a service scoring with the algorithm selected in the application config."""
+        algorithm_id = config.sleep_algorithm_id or AlgorithmFactory.get_default_algorithm_id()
+        return cls(database_manager, AlgorithmFactory.create(algorithm_id, config))
+
+    def precompute_file(self, filename: str) -> bool:
+        """
+        Score an imported file and replace its stored results.
+
+        Each algorithm only sees the epochs where its input column has a value,
+        matching how the plot loads each column.
+
+        Returns:
+            True if the results were stored
+
+        """
+        columns = list(dict.fromkeys([ActivityDataPreference.AXIS_Y, *self.nonwear_columns]))
+        timestamps, values = self.db_manager.load_activity_window(filename, columns=columns)
+        if len(timestamps) == 0:
+            logger.warning("No activity data to score for %s", filename)
+            return False
+
+        scores = []
+        axis_y_valid = ~np.isnan(values[ActivityDataPreference.AXIS_Y])
+        if axis_y_valid.any():
+            sleep_scores = self.sleep_algorithm.score_array(
+                values[ActivityDataPreference.AXIS_Y][axis_y_valid].tolist(),
+                timestamps[axis_y_valid].tolist(),
+            )
+            scores.append(
+                EpochScores(
+                    algorithm_id=self.sleep_algorithm.identifier,
+                    parameters=self.sleep_algorithm.get_parameters(),
+                    result=CachedAlgorithmResult(mask=np.asarray(sleep_scores, dtype=np.uint8)),
+                    valid=None if axis_y_valid.all() else axis_y_valid,
+                )
+            )
+
+        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+        for column in self.nonwear_columns:
+            valid = ~np.isnan(values[column])
+            if not valid.any():
+                continue
+            periods = choi_algorithm.detect(values[column][valid].tolist(), timestamps[valid].tolist(), activity_column=column)
+            ranges = np.array([(period.start_index, period.end_index) for period in periods], dtype=np.int32).reshape(-1, 2)
+            mask = np.zeros(int(valid.sum()), dtype=np.uint8)
+            for start, end in ranges:
+                mask[start : end + 1] = 1
+            scores.append(
+                EpochScores(
+                    algorithm_id=choi_algorithm.identifier,
+                    parameters=nonwear_parameters(choi_algorithm, column),
+                    result=CachedAlgorithmResult(mask=mask, ranges=ranges),
+                    valid=None if valid.all() else valid,
+                )
+            )
+
+        if not self.db_manager.save_epoch_scores(filename, scores):
+            return False
+        logger.info("Stored precomputed scores for %s (%d epochs, %d results)", filename, len(timestamps), len(scores))
+        return True
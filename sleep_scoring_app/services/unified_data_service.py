@@ -11,11 +11,13 @@ import traceback
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import numpy as np
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 
 from sleep_scoring_app.core.constants import ActivityDataPreference, UIColors
 from sleep_scoring_app.core.nonwear_data import ActivityDataView, NonwearDataFactory
+from sleep_scoring_app.data.algorithm_cache import AlgorithmResultCache
 from sleep_scoring_app.services.data_service import DataManager
 from sleep_scoring_app.services.diary_service import DiaryService
 from sleep_scoring_app.services.memory_service import BoundedCache, estimate_object_size_mb
@@ -104,7 +106,7 @@ class UnifiedDataService:
     def _init_nonwear_service(self) -> None:
         """Initialize nonwear data service."""
         self.nonwear_service = NonwearDataService(self.db_manager)
-        self.nonwear_data_factory = NonwearDataFactory(self.nonwear_service)
+        self.nonwear_data_factory = NonwearDataFactory(self.nonwear_service, AlgorithmResultCache(self.db_manager, memory_entries=0))
 
     def _init_diary_service(self) -> None:
         """Initialize diary data service."""
@@ -700,6 +702,37 @@ class UnifiedDataService:
         if 0 <= current_selection < len(available_dates):
             date_dropdown.setCurrentIndex(current_selection)
 
+    def _load_48h_window(self, current_date: datetime, filename: str | None) -> tuple[list | None, list | None, list | None, list | None]:
+        """
+        Load the 48h main dataset, plus the axis_y series for Sadeh when reading from the database.
+
+        Both columns come from a single window query instead of one query per axis.
+
+        Returns:
+            Tuple of (timestamps, activity, axis_y_timestamps, axis_y); the axis_y pair is None
+            when it was not loaded alongside the main data
+
+        """
+        preferred_column = self.data_manager.preferred_activity_column
+        columns = list(dict.fromkeys([preferred_column, ActivityDataPreference.AXIS_Y]))
+        window = self.data_manager.load_activity_window(filename, current_date, 48, columns)
+        if window is None:
+            timestamps, activity_data = self.data_manager.load_real_data(current_date, 48, filename)
+            return timestamps, activity_data, None, None
+
+        window_timestamps, window_values = window
+        series = {}
+        for column, values in window_values.items():
+            # Epochs without a value for a column are dropped from that series only
+            valid = ~np.isnan(values)
+            series[column] = (window_timestamps[valid].tolist(), values[valid].tolist())
+
+        timestamps, activity_data = series[preferred_column]
+        axis_y_timestamps, axis_y_data = series[ActivityDataPreference.AXIS_Y]
+        if not timestamps:
+            return None, None, None, None
+        return timestamps, activity_data, axis_y_timestamps or None, axis_y_data or None
+
     def load_current_date(self) -> None:
         """Load data for current date - always loads 48h as main dataset."""
         logger.info(
@@ -737,11 +770,12 @@ class UnifiedDataService:
         cache_key = current_date.strftime("%Y-%m-%d")
         cached_data = self.main_window.current_date_48h_cache.get(cache_key)
 
+        axis_y_timestamps_48h, axis_y_data_48h = None, None
         if cached_data is None:
             # Get filename for database queries
             filename = self.main_window.current_file_info.get("filename") if hasattr(self.main_window, "current_file_info") else None
             logger.info("LOAD_CURRENT_DATE: Loading real data for date %s, filename: %s", current_date, filename)
-            timestamps_48h, activity_data_48h = self.data_manager.load_real_data(current_date, 48, filename)
+            timestamps_48h, activity_data_48h, axis_y_timestamps_48h, axis_y_data_48h = self._load_48h_window(current_date, filename)
             logger.info(
                 "LOAD_CURRENT_DATE: Loaded %s timestamps and %s activity values",
                 len(timestamps_48h) if timestamps_48h else 0,
@@ -770,13 +804,14 @@ class UnifiedDataService:
         if timestamps_48h and activity_data_48h and hasattr(self.main_window, "plot_widget") and self.main_window.plot_widget:
             self.main_window.plot_widget.main_48h_timestamps = timestamps_48h
             self.main_window.plot_widget.main_48h_activity = activity_data_48h
-            # CRITICAL FIX: Clear stale axis_y data cache when loading new date
-            # This prevents Sadeh algorithm from using axis_y data from previous dates
-            self.main_window.plot_widget.main_48h_axis_y_data = None
-            # Also clear axis_y timestamps to prevent alignment issues
-            if hasattr(self.main_window.plot_widget, "main_48h_axis_y_timestamps"):
-                self.main_window.plot_widget.main_48h_axis_y_timestamps = None
-            logger.debug("Cleared stale axis_y cache and set new 48hr data in plot widget: %d points", len(timestamps_48h))
+            # CRITICAL FIX: Replace stale axis_y data cache when loading new date
+            # This prevents Sadeh algorithm from using axis_y data from previous dates.
+            # axis_y is only present when it came from the same window query; otherwise
+            # it is cleared and loaded on demand for Sadeh.
+            self.main_window.plot_widget.main_48h_axis_y_data = axis_y_data_48h
+            # Also replace axis_y timestamps to prevent alignment issues
+            self.main_window.plot_widget.main_48h_axis_y_timestamps = axis_y_timestamps_48h
+            logger.debug("Set new 48hr data in plot widget: %d points", len(timestamps_48h))
             # Also ensure we have the actual timestamps and activity data set
             self.main_window.plot_widget.timestamps = timestamps_48h
             self.main_window.plot_widget.activity_data = activity_data_48h
@@ -1196,6 +1231,7 @@ class UnifiedDataService:
             # Priority: Use main_48h_timestamps with matching main_48h_activity
             timestamps_to_use = None
             axis_y_data = None
+            source_column = None  # Database column of the counts, when known
 
             # First try: Use 48hr timestamps with 48hr activity (most reliable pair)
             if (
@@ -1210,6 +1246,8 @@ class UnifiedDataService:
                 if len(ts_48h) == len(act_48h):
                     timestamps_to_use = ts_48h
                     axis_y_data = act_48h
+                    if self.get_database_mode():
+                        source_column = self.data_manager.preferred_activity_column
                     logger.debug("Using matched 48hr timestamps/activity: %d points", len(timestamps_to_use))
 
             # Second try: Use current view timestamps with current activity_data
@@ -1247,7 +1285,7 @@ class UnifiedDataService:
             )
 
             # Get nonwear data using the factory (handles caching and computation)
-            nonwear_data = self.nonwear_data_factory.get_nonwear_data(activity_view)
+            nonwear_data = self.nonwear_data_factory.get_nonwear_data(activity_view, activity_column=source_column)
 
             # Set the nonwear data on the activity plot using new interface
             self.main_window.plot_widget.set_nonwear_data(nonwear_data)
@@ -703,6 +703,12 @@ class AnalysisTab(QWidget):
         self.total_duration_label.setMinimumWidth(120)
         row2.addWidget(self.total_duration_label)
 
+        # Live sleep metrics for the selected period (updated while markers are dragged)
+        self.live_metrics_label = QLabel("")
+        self.live_metrics_label.setStyleSheet("font-size: 12px; color: #333; padding-left: 5px;")
+        self.live_metrics_label.setMinimumWidth(120)
+        row2.addWidget(self.live_metrics_label)
+
         row2.addSpacing(30)
 
         # Save markers button
@@ -742,6 +748,7 @@ class AnalysisTab(QWidget):
         self.parent.no_sleep_btn = self.no_sleep_btn
         self.parent.clear_markers_btn = self.clear_markers_btn
         self.parent.total_duration_label = self.total_duration_label
+        self.parent.live_metrics_label = self.live_metrics_label
 
         return panel
 
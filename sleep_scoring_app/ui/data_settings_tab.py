@@ -1131,7 +1131,8 @@ class DataSettingsTab(QWidget):
         detector = FormatDetector()
 
         try:
-            device_preset, confidence = detector.detect_device_format(sample_file)
+            detection = detector.detect_all(sample_file)
+            device_preset, confidence = detection.device, detection.device_confidence
 
             confidence_pct = int(confidence * 100)
             color = "#27ae60" if confidence >= 0.7 else "#f39c12" if confidence >= 0.5 else "#e74c3c"
@@ -1219,7 +1220,8 @@ class DataSettingsTab(QWidget):
         detector = FormatDetector()
 
         try:
-            skip_rows, confidence = detector.detect_header_rows(sample_file)
+            detection = detector.detect_all(sample_file)
+            skip_rows, confidence = detection.skip_rows, detection.skip_rows_confidence
 
             confidence_pct = int(confidence * 100)
             color = "#27ae60" if confidence >= 0.9 else "#f39c12" if confidence >= 0.7 else "#e74c3c"
@@ -1257,10 +1259,11 @@ class DataSettingsTab(QWidget):
         results = []
 
         try:
-            # Detect all three
-            skip_rows, skip_conf = detector.detect_header_rows(sample_file)
-            epoch_length, epoch_conf = detector.detect_epoch_length(sample_file, skip_rows)
-            device_preset, device_conf = detector.detect_device_format(sample_file)
+            # Detect all three from one read of the file head
+            detection = detector.detect_all(sample_file)
+            skip_rows, skip_conf = detection.skip_rows, detection.skip_rows_confidence
+            epoch_length, epoch_conf = detection.epoch_length, detection.epoch_confidence
+            device_preset, device_conf = detection.device, detection.device_confidence
 
             # Get device display name
             device_names = {
@@ -14,6 +14,7 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QButtonGroup,
     QCheckBox,
+    QComboBox,
     QGroupBox,
     QHBoxLayout,
     QLabel,
@@ -24,6 +25,7 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from sleep_scoring_app.core.algorithms.csv_ingest import pyarrow_available
 from sleep_scoring_app.core.constants import ButtonText
 from sleep_scoring_app.ui.column_selection_dialog import ColumnSelectionDialog
 from sleep_scoring_app.utils.column_registry import column_registry
@@ -85,7 +87,7 @@ class ExportTab(QWidget):
         # Export button
         self.export_btn = QPushButton("Export Data")
         self.export_btn.clicked.connect(self.parent.perform_direct_export)
-        self.export_btn.setToolTip("Export sleep markers and metrics to CSV with selected options")
+        self.export_btn.setToolTip("Export sleep markers and metrics to CSV or Parquet with selected options")
         self.export_btn.setStyleSheet("font-weight: bold; padding: 12px; font-size: 14px; background-color: #2c3e50; color: white;")
         content_layout.addWidget(self.export_btn)
 
@@ -278,7 +280,20 @@ class ExportTab(QWidget):
         self.include_headers_checkbox.stateChanged.connect(self.parent.save_export_options)
         layout.addWidget(self.include_headers_checkbox)
 
+        # Parquet needs the optional pyarrow dependency
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("File format:"))
+        self.export_format_combo = QComboBox()
+        self.export_format_combo.addItem("CSV", "csv")
+        if pyarrow_available():
+            self.export_format_combo.addItem("Parquet", "parquet")
+        self.export_format_combo.setToolTip("Parquet keeps column types and is smaller for large exports (requires pyarrow)")
+        format_layout.addWidget(self.export_format_combo)
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+
         # Store reference in parent for backward compatibility
         self.parent.include_headers_checkbox = self.include_headers_checkbox
+        self.parent.export_format_combo = self.export_format_combo
 
         return group
@@ -21,11 +21,14 @@ from PyQt6.QtWidgets import (
     QLabel,
     QMainWindow,
     QMessageBox,
+    QProgressDialog,
     QTabWidget,
     QVBoxLayout,
     QWidget,
 )
 
+from sleep_scoring_app.core.algorithms.period_metrics import SleepMetricsEngine
+from sleep_scoring_app.core.algorithms.time_index import EpochTimeIndex
 from sleep_scoring_app.core.constants import (
     AlgorithmType,
     ButtonStyle,
@@ -42,6 +45,7 @@ from sleep_scoring_app.data.database import DatabaseManager
 from sleep_scoring_app.services.export_service import (
     ExportManager as EnhancedExportManager,
 )
+from sleep_scoring_app.services.export_worker import ExportWorker
 from sleep_scoring_app.services.import_worker import ImportWorker
 from sleep_scoring_app.services.memory_service import (
     BoundedCache,
@@ -49,6 +53,7 @@ from sleep_scoring_app.services.memory_service import (
     resource_manager,
 )
 from sleep_scoring_app.services.nonwear_service import NonwearDataService
+from sleep_scoring_app.services.precompute_service import ScoringPrecomputeService
 from sleep_scoring_app.services.unified_data_service import UnifiedDataService
 from sleep_scoring_app.ui.analysis_tab import AnalysisTab
 from sleep_scoring_app.ui.data_settings_tab import DataSettingsTab
@@ -588,6 +593,9 @@ class SleepScoringMainWindow(QMainWindow):
 
     def update_sleep_info(self, markers) -> None:
         """Update sleep information display with protection against update loops."""
+        # Live metrics are cheap to evaluate and follow the markers even while fields are synced
+        self.update_live_sleep_metrics(markers)
+
         # Check if we're in the middle of a field-to-marker update to prevent loops
         if getattr(self, "_updating_from_fields", False):
             logger.debug("Skipping field update - currently updating from fields to prevent loop")
@@ -640,6 +648,40 @@ class SleepScoringMainWindow(QMainWindow):
             # Always clear the flag
             self._updating_from_markers = False
 
+    def update_live_sleep_metrics(self, markers) -> None:
+        """Show TST, WASO, efficiency and awakenings for the marker pair, fast enough to follow a drag."""
+        if not hasattr(self, "live_metrics_label"):
+            return
+
+        metrics = None
+        if len(markers) == 2:
+            engine = self._get_live_metrics_engine()
+            if engine is not None:
+                metrics = engine.evaluate_timestamps(markers[0], markers[1])
+
+        if metrics is None:
+            self.live_metrics_label.setText("")
+            return
+        self.live_metrics_label.setText(
+            f"TST: {metrics.total_sleep_time} min | WASO: {metrics.waso} min | SE: {metrics.efficiency:.1f}% | Awakenings: {metrics.awakenings}"
+        )
+
+    def _get_live_metrics_engine(self) -> SleepMetricsEngine | None:
+        """Metrics engine for the plotted sleep scores, rebuilt only when the plot loads new results."""
+        sadeh_results = getattr(self.plot_widget, "sadeh_results", None)
+        x_data = getattr(self.plot_widget, "x_data", None)
+        try:
+            if sadeh_results is None or x_data is None or len(sadeh_results) == 0 or len(x_data) == 0:
+                return None
+            engine = getattr(self, "_live_metrics_engine", None)
+            if engine is None or not engine.built_from(sadeh_results, None, x_data):
+                engine = SleepMetricsEngine(sadeh_results, None, x_data)
+                self._live_metrics_engine = engine
+        except (TypeError, ValueError):
+            logger.debug("Sleep scores not available for live metrics")
+            return None
+        return engine
+
     def _is_user_editing_time_fields(self) -> bool:
         """Check if user is actively editing either time field."""
         # Check if either field has focus
@@ -925,20 +967,11 @@ class SleepScoringMainWindow(QMainWindow):
         if not timestamps:
             return None
 
-        target_dt = datetime.fromtimestamp(target_timestamp)
-        best_idx = None
-        min_diff = float("inf")
-
-        for i, ts in enumerate(timestamps):
-            time_diff = abs((target_dt - ts).total_seconds())
-            if time_diff < min_diff:
-                min_diff = time_diff
-                best_idx = i
-            # Stop if very close match found
-            if time_diff < 30:
-                break
-
-        return best_idx
+        time_index = getattr(self, "_table_time_index", None)
+        if time_index is None or time_index.source is not timestamps:
+            time_index = EpochTimeIndex(timestamps)
+            self._table_time_index = time_index
+        return time_index.nearest(target_timestamp)
 
     def _force_table_update(self) -> None:
         """Force a final table update after marker dragging completes."""
@@ -1473,6 +1506,11 @@ class SleepScoringMainWindow(QMainWindow):
                     "vector_magnitude": config.custom_vector_magnitude_column,
                 }
 
+        # Optionally score each imported file once with the configured algorithms
+        tab.import_service.scoring_precomputer = None
+        if self.config_manager.config.precompute_scores_on_import:
+            tab.import_service.scoring_precomputer = ScoringPrecomputeService.from_config(self.db_manager, self.config_manager.config)
+
         # Start worker thread with selected files
         self.import_worker = ImportWorker(
             tab.import_service,
@@ -1540,7 +1578,10 @@ class SleepScoringMainWindow(QMainWindow):
         if hasattr(self, "data_settings_tab"):
             tab = self.data_settings_tab
             tab.activity_progress_bar.setValue(int(progress.file_progress_percent))
-            tab.activity_progress_label.setText(f"Files: {progress.processed_files}/{progress.total_files}")
+            label = f"Files: {progress.processed_files}/{progress.total_files}"
+            if progress.processed_records:
+                label += f" ({progress.rows_per_second:,.0f} rows/s)"
+            tab.activity_progress_label.setText(label)
 
     def update_nonwear_progress(self, progress) -> None:
         """Update nonwear import progress."""
@@ -1682,7 +1723,7 @@ class SleepScoringMainWindow(QMainWindow):
             self.config_manager.update_export_directory(directory)
 
     def perform_direct_export(self) -> None:
-        """Perform export directly from the tab without modal dialog."""
+        """Export from the tab in a worker thread, with a progress dialog whose Cancel stops the export."""
         # Ensure export directory exists
         Path(self.export_output_path).mkdir(parents=True, exist_ok=True)
 
@@ -1718,36 +1759,76 @@ class SleepScoringMainWindow(QMainWindow):
                 )
                 return
 
-        try:
-            # Save current preferences
-            self.config_manager.update_export_grouping(self.export_grouping_group.checkedId())
-
-            # Perform the export directly with data
-            success = self.export_manager.perform_direct_export(
-                all_sleep_metrics,
-                self.export_grouping_group.checkedId(),
-                self.export_output_path,
-                self.selected_export_columns,
-                self.include_headers_checkbox.isChecked(),
-                self.include_metadata_checkbox.isChecked(),
-            )
-
-            if success:
-                data_source = "database" if self.data_manager.use_database else "CSV markers"
-                QMessageBox.information(
-                    self,
-                    "Export Complete",
-                    f"Successfully exported {len(all_sleep_metrics)} records from {data_source} to:\n{self.export_output_path}",
-                )
-            else:
-                QMessageBox.warning(
-                    self,
-                    "Export Failed",
-                    "Export operation failed. Check the console for details.",
-                )
+        # Save current preferences
+        self.config_manager.update_export_grouping(self.export_grouping_group.checkedId())
+
+        # Recalculate and write the export in a worker thread; Cancel stops the recalculation between files
+        self._export_record_count = len(all_sleep_metrics)
+        self.export_progress_dialog = QProgressDialog("Recalculating sleep metrics...", "Cancel", 0, 0, self)
+        self.export_progress_dialog.setWindowTitle("Exporting")
+        self.export_progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress_dialog.setAutoClose(False)
+        self.export_progress_dialog.setAutoReset(False)
+        self.export_progress_dialog.setMinimumDuration(0)
+
+        self.export_worker = ExportWorker(
+            self.export_manager,
+            all_sleep_metrics,
+            grouping_option=self.export_grouping_group.checkedId(),
+            output_directory=self.export_output_path,
+            selected_columns=self.selected_export_columns,
+            include_headers=self.include_headers_checkbox.isChecked(),
+            include_metadata=self.config_manager.config.include_metadata,
+            output_format=self.export_format_combo.currentData(),
+        )
 
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", f"Export failed with error: {e}")
+        # Connect worker signals with thread-safe queued connections
+        self.export_worker.progress_updated.connect(self.update_export_progress, Qt.ConnectionType.QueuedConnection)
+        self.export_worker.export_completed.connect(self.direct_export_finished, Qt.ConnectionType.QueuedConnection)
+        self.export_progress_dialog.canceled.connect(self.export_worker.cancel)
+
+        self._export_running = True
+        self.export_progress_dialog.show()
+        self.export_worker.start()
+
+    def update_export_progress(self, files_done: int, total_files: int) -> None:
+        """Show metric recalculation progress of the running export."""
+        dialog = getattr(self, "export_progress_dialog", None)
+        if dialog is None:
+            return
+        dialog.setMaximum(total_files)
+        dialog.setValue(files_done)
+        if files_done >= total_files:
+            dialog.setLabelText("Writing export files...")
+
+    def direct_export_finished(self, success: bool, error: str) -> None:
+        """Close the export progress dialog and report the result."""
+        dialog = getattr(self, "export_progress_dialog", None)
+        cancelled = dialog is not None and dialog.wasCanceled()
+        if dialog is not None:
+            # Closing a progress dialog emits canceled
+            dialog.canceled.disconnect()
+            dialog.close()
+            self.export_progress_dialog = None
+        self._export_running = False
+
+        if error:
+            QMessageBox.critical(self, "Export Error", f"Export failed with error: {error}")
+        elif success:
+            data_source = "database" if self.data_manager.use_database else "CSV markers"
+            QMessageBox.information(
+                self,
+                "Export Complete",
+                f"Successfully exported {self._export_record_count} records from {data_source} to:\n{self.export_output_path}",
+            )
+        elif cancelled:
+            QMessageBox.information(self, "Export Cancelled", "Export cancelled. No files were written.")
+        else:
+            QMessageBox.warning(
+                self,
+                "Export Failed",
+                "Export operation failed. Check the console for details.",
+            )
 
     def _cleanup_old_temp_files(self) -> None:
         """Clean up old temporary export files."""
@@ -1834,6 +1915,11 @@ class SleepScoringMainWindow(QMainWindow):
             # Auto-save current markers
             self.auto_save_current_markers()
 
+            # Stop a running export before its database connections are closed
+            if getattr(self, "_export_running", False):
+                self.export_worker.cancel()
+                self.export_worker.wait(5000)
+
             # Clean up resources
             self._cleanup_resources()
 
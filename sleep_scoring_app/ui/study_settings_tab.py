@@ -1829,9 +1829,10 @@ class StudySettingsTab(QWidget):
                                 logger.info("Loaded %d points for Choi column %s", len(choi_data), axis)
 
                     # Use loaded data or fall back to current activity_data
-                    data_for_choi = choi_data if choi_data else getattr(pw, "activity_data", None)
-                    if data_for_choi and hasattr(pw, "update_choi_overlay_only"):
-                        pw.update_choi_overlay_only(data_for_choi)
+                    if choi_data and hasattr(pw, "update_choi_overlay_only"):
+                        pw.update_choi_overlay_only(choi_data, activity_column=axis)
+                    elif getattr(pw, "activity_data", None) and hasattr(pw, "update_choi_overlay_only"):
+                        pw.update_choi_overlay_only(pw.activity_data)
 
                     pw.update()
                     logger.info("Recalculated Choi algorithm with new activity column: %s", axis)
@@ -14,7 +14,7 @@ import pyqtgraph as pg
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QFont
 
-from sleep_scoring_app.core.algorithms import NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms import EpochTimeIndex, NonwearAlgorithmFactory
 from sleep_scoring_app.core.constants import MarkerLimits, NonwearDataSource, UIColors
 from sleep_scoring_app.core.dataclasses import DailySleepMarkers, SleepPeriod
 from sleep_scoring_app.ui.widgets.plot_algorithm_manager import PlotAlgorithmManager
@@ -1113,31 +1113,23 @@ class ActivityPlotWidget(pg.PlotWidget):
         return onset_data, offset_data
 
     def _find_closest_data_index(self, target_timestamp):
-        """Find the data index closest to the target timestamp using efficient search."""
-        if not hasattr(self, "timestamps") or not self.timestamps:
+        """Find the data index closest to the target timestamp using the window's time index."""
+        time_index = self.get_time_index()
+        if time_index is None:
             return None
+        # Unix timestamps are compared as naive local datetimes, as the timestamps were converted
+        return time_index.nearest(target_timestamp)
 
-        # Convert Unix timestamp back to naive datetime in local timezone
-        # (matches how the original timestamps were converted to Unix time)
-        target_dt = datetime.fromtimestamp(target_timestamp)
-
-        # Simple linear search comparing FULL timestamps, not just time-of-day
-        best_idx = None
-        min_diff = float("inf")
-
-        for i, timestamp in enumerate(self.timestamps):
-            # Calculate difference in total seconds between full timestamps
-            time_diff = abs((target_dt - timestamp).total_seconds())
-
-            if time_diff < min_diff:
-                min_diff = time_diff
-                best_idx = i
-
-            # If we found a very close match (within 30 seconds), stop searching
-            if time_diff < 30:
-                break
-
-        return best_idx
+    def get_time_index(self) -> EpochTimeIndex | None:
+        """Time index of the loaded timestamps, rebuilt only when a new window is loaded."""
+        timestamps = getattr(self, "timestamps", None)
+        if not timestamps:
+            return None
+        time_index = getattr(self, "_time_index", None)
+        if time_index is None or time_index.source is not timestamps:
+            time_index = EpochTimeIndex(timestamps)
+            self._time_index = time_index
+        return time_index
 
     def get_choi_results_per_minute(self) -> list[int]:
         """Get Choi nonwear periods as per-minute results (1=nonwear, 0=wear)."""
@@ -1342,21 +1334,21 @@ class ActivityPlotWidget(pg.PlotWidget):
         """Plot nonwear periods using the same per-minute data as table/mouseover."""
         self.overlay_renderer.plot_nonwear_periods()
 
-    def update_choi_overlay_only(self, new_activity_data: list[float]) -> None:
+    def update_choi_overlay_only(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
         """Recalculate Choi algorithm with new data while preserving Sadeh algorithm state."""
-        self.overlay_renderer.update_choi_overlay_only(new_activity_data)
+        self.overlay_renderer.update_choi_overlay_only(new_activity_data, activity_column)
 
-    def update_choi_overlay_async(self, new_activity_data: list[float]) -> None:
+    def update_choi_overlay_async(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
         """Asynchronously recalculate Choi algorithm with new data."""
-        self.overlay_renderer.update_choi_overlay_async(new_activity_data)
+        self.overlay_renderer.update_choi_overlay_async(new_activity_data, activity_column)
 
-    def _update_choi_cache_key(self, new_activity_data: list[float]) -> None:
+    def _update_choi_cache_key(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
         """Update cache key for Choi results while preserving Sadeh cache."""
-        self.overlay_renderer._update_choi_cache_key(new_activity_data)
+        self.overlay_renderer._update_choi_cache_key(new_activity_data, activity_column)
 
-    def restore_choi_from_cache(self, activity_data: list[float]) -> bool:
+    def restore_choi_from_cache(self, activity_data: list[float], activity_column: str | None = None) -> bool:
         """Attempt to restore Choi results from cache for quick switching."""
-        return self.overlay_renderer.restore_choi_from_cache(activity_data)
+        return self.overlay_renderer.restore_choi_from_cache(activity_data, activity_column)
 
     def clear_choi_cache(self) -> None:
         """Clear the Choi algorithm results cache."""
@@ -9,7 +9,6 @@ and algorithm result caching.
 
 from __future__ import annotations
 
-import hashlib
 import logging
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
@@ -19,7 +18,11 @@ import pyqtgraph as pg
 from sleep_scoring_app.core.algorithms import AlgorithmFactory, NonwearAlgorithmFactory, SleepScoringAlgorithm
 from sleep_scoring_app.core.algorithms.onset_offset_factory import OnsetOffsetRuleFactory
 from sleep_scoring_app.core.algorithms.onset_offset_protocol import OnsetOffsetRule
+from sleep_scoring_app.core.algorithms.run_length import SleepWakeRunIndex
+from sleep_scoring_app.core.algorithms.time_index import EpochTimeIndex
 from sleep_scoring_app.core.constants import ActivityDataPreference, UIColors
+from sleep_scoring_app.data.algorithm_cache import AlgorithmResultCache
+from sleep_scoring_app.ui.widgets.plot_data_manager import plot_study_database
 
 if TYPE_CHECKING:
     from sleep_scoring_app.core.dataclasses import SleepPeriod
@@ -40,10 +43,13 @@ class PlotAlgorithmManager:
 
         """
         self.parent = parent
-        self._algorithm_cache: dict[str, dict[str, Any]] = {}
+        self._algorithm_cache = AlgorithmResultCache(db_manager=None)
         self._sleep_pattern_cache: dict[tuple, tuple] = {}
         self._sleep_scoring_algorithm: SleepScoringAlgorithm | None = None
         self._onset_offset_rule: OnsetOffsetRule | None = None
+        self._sleep_run_index: SleepWakeRunIndex | None = None
+        self._rule_timestamps: tuple[Any, list[datetime]] | None = None
+        self._axis_y_time_index: EpochTimeIndex | None = None
 
     # ========== Property Accessors ==========
 
@@ -243,41 +249,6 @@ class PlotAlgorithmManager:
             algorithm_activity = self.activity_data
             logger.debug("Using current view data for algorithms: %d points", len(algorithm_timestamps))
 
-        # Create cache key based on main data hash for efficient caching
-        column_type = getattr(self.parent, "activity_column_type", "unknown")
-        data_type = "vm" if column_type == "VECTOR_MAGNITUDE" else "axis_y" if column_type else "unknown"
-        data_hash = hashlib.md5(repr(algorithm_activity).encode()).hexdigest()[:16]
-
-        # Include timestamp hash for proper cache invalidation
-        timestamp_hash = ""
-        sadeh_axis_y_hash = ""
-
-        if hasattr(self.parent, "main_48h_axis_y_timestamps") and self.parent.main_48h_axis_y_timestamps:
-            timestamp_str = repr([ts.isoformat() if hasattr(ts, "isoformat") else str(ts) for ts in self.parent.main_48h_axis_y_timestamps[:10]])
-            sadeh_axis_y_hash = hashlib.md5(timestamp_str.encode()).hexdigest()[:8]
-
-        if data_type == "axis_y":
-            timestamp_hash = sadeh_axis_y_hash
-        elif algorithm_timestamps:
-            timestamp_str = repr([ts.isoformat() if hasattr(ts, "isoformat") else str(ts) for ts in algorithm_timestamps[:10]])
-            timestamp_hash = hashlib.md5(timestamp_str.encode()).hexdigest()[:8]
-
-        # Include algorithm parameters in cache key so changing settings invalidates cache
-        algorithm = self.get_sleep_scoring_algorithm()
-        algorithm_id = algorithm.identifier
-        choi_activity_col = self._get_choi_activity_column()
-        cache_key = f"48h_{column_type}_{data_type}_{len(algorithm_activity)}_{data_hash}_{timestamp_hash}_sadeh_{sadeh_axis_y_hash}_algo{algorithm_id}_choi{choi_activity_col}"
-
-        # Check if results are already cached
-        if cache_key in self._algorithm_cache:
-            cached_results = self._algorithm_cache[cache_key]
-            self.main_48h_sadeh_results = cached_results["sadeh"]
-            logger.debug("Using cached 48hr algorithm results for %s", cache_key)
-            self._extract_view_subset_from_main_results()
-            return
-
-        logger.debug("Running algorithms on 48hr main data")
-
         # Get axis_y data specifically for Sadeh algorithm
         if self.main_48h_axis_y_data is not None:
             axis_y_data = self.main_48h_axis_y_data
@@ -287,18 +258,6 @@ class PlotAlgorithmManager:
             self.main_48h_axis_y_data = axis_y_data
             logger.debug("AXIS_Y CACHE MISS: Loaded fresh axis_y data with %d points for Sadeh", len(axis_y_data) if axis_y_data else 0)
 
-        # Run Choi algorithm (nonwear detection) with configured activity column using DI pattern
-        choi_activity_column = self._get_choi_activity_column()
-        logger.debug("Running Choi algorithm with activity_column: %s", choi_activity_column)
-        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
-        choi_periods = choi_algorithm.detect(
-            activity_data=algorithm_activity,
-            timestamps=self.parent.timestamps if hasattr(self.parent, "timestamps") else [],
-            activity_column=choi_activity_column,
-        )
-        logger.debug("Choi algorithm returned %d periods", len(choi_periods))
-        logger.debug("Choi algorithm completed - plotting handled by NonwearData system")
-
         # Validate Sadeh input data
         if axis_y_data:
             logger.debug("Sadeh algorithm using axis_y_data with %d points", len(axis_y_data))
@@ -325,20 +284,43 @@ class PlotAlgorithmManager:
             self._extract_view_subset_from_main_results()
             return
 
-        # Use DI pattern to get sleep scoring algorithm
+        # Cache key: imported file hash + window + algorithm settings (no hashing of the data itself)
         algorithm = self.get_sleep_scoring_algorithm()
+        filename = getattr(self.parent, "current_filename", None)
+        self._algorithm_cache.db_manager = plot_study_database(self.parent)
+        cache_key = self._algorithm_cache.make_key(filename, sadeh_timestamps, algorithm.identifier, algorithm.get_parameters(), axis_y_data)
+
+        # Check if results are already cached (in memory or in the study database)
+        cached_result = self._algorithm_cache.get(cache_key) if cache_key is not None else None
+        if cached_result is not None:
+            self.main_48h_sadeh_results = cached_result.mask.tolist()
+            logger.debug("Using cached 48hr %s results for %s", algorithm.identifier, filename)
+            self._extract_view_subset_from_main_results()
+            return
+
+        logger.debug("Running algorithms on 48hr main data")
+
+        # Run Choi algorithm (nonwear detection) with configured activity column using DI pattern
+        choi_activity_column = self._get_choi_activity_column()
+        logger.debug("Running Choi algorithm with activity_column: %s", choi_activity_column)
+        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+        choi_periods = choi_algorithm.detect(
+            activity_data=algorithm_activity,
+            timestamps=self.parent.timestamps if hasattr(self.parent, "timestamps") else [],
+            activity_column=choi_activity_column,
+        )
+        logger.debug("Choi algorithm returned %d periods", len(choi_periods))
+        logger.debug("Choi algorithm completed - plotting handled by NonwearData system")
+
+        # Use DI pattern to get sleep scoring algorithm
         logger.debug("Running sleep scoring algorithm: %s", algorithm.name)
         self.main_48h_sadeh_results = algorithm.score_array(axis_y_data, sadeh_timestamps)
         logger.debug("Sleep scoring algorithm returned %d results", len(self.main_48h_sadeh_results) if self.main_48h_sadeh_results else 0)
 
         self._extract_view_subset_from_main_results()
 
-        # Cache results (limit to 5)
-        if len(self._algorithm_cache) >= 5:
-            oldest_key = next(iter(self._algorithm_cache))
-            del self._algorithm_cache[oldest_key]
-
-        self._algorithm_cache[cache_key] = {"sadeh": self.main_48h_sadeh_results}
+        if cache_key is not None and len(self.main_48h_sadeh_results) == len(sadeh_timestamps):
+            self._algorithm_cache.put(cache_key, filename, self.main_48h_sadeh_results)
 
     def _extract_view_subset_from_main_results(self) -> None:
         """Extract the current view subset from main 48hr algorithm results."""
@@ -371,38 +353,23 @@ class PlotAlgorithmManager:
 
         # Use fuzzy timestamp matching with tolerance for microsecond differences
         tolerance = timedelta(seconds=30)  # 30 second tolerance for timestamp matching
-
-        def find_closest_timestamp_index(target_ts, timestamp_list, tolerance_delta):
-            """Find the closest timestamp within tolerance."""
-            for i, ts in enumerate(timestamp_list):
-                if abs((target_ts - ts).total_seconds()) <= tolerance_delta.total_seconds():
-                    return i
-            return None
+        indices = self._get_axis_y_time_index(main_axis_y_timestamps).nearest_indices(self.timestamps, tolerance)
 
         # Map each current timestamp to its corresponding Sadeh result
+        result_count = min(len(self.main_48h_sadeh_results), len(main_axis_y_timestamps))
         subset_results = []
-        for ts in self.timestamps:
-            # First try exact match for performance
-            try:
-                idx = main_axis_y_timestamps.index(ts)
-            except ValueError:
-                # Fall back to fuzzy matching with tolerance
-                idx = find_closest_timestamp_index(ts, main_axis_y_timestamps, tolerance)
-
-            if idx is not None:
-                # Comprehensive bounds checking
-                if 0 <= idx < len(self.main_48h_sadeh_results) and idx < len(main_axis_y_timestamps):
-                    subset_results.append(self.main_48h_sadeh_results[idx])
-                else:
-                    logger.warning(
-                        f"Index {idx} out of bounds for Sadeh results at timestamp {ts} (results length: {len(self.main_48h_sadeh_results)})"
-                    )
-                    subset_results.append(0)  # Default to Wake if out of bounds
+        missing = 0
+        for idx in indices.tolist():
+            if 0 <= idx < result_count:
+                subset_results.append(self.main_48h_sadeh_results[idx])
             else:
-                # Timestamp not found in main axis_y data even with tolerance
-                logger.warning(f"Timestamp {ts} not found in main axis_y timestamps (even with {tolerance} tolerance)")
+                # Timestamp not found in main axis_y data even with tolerance, or no result for it
+                missing += 1
                 subset_results.append(0)  # Default to Wake if timestamp not found
 
+        if missing:
+            logger.warning("%d of %d timestamps have no main axis_y Sadeh result (within %s tolerance)", missing, len(indices), tolerance)
+
         self.sadeh_results = subset_results
 
         # Verify alignment
@@ -452,15 +419,12 @@ class PlotAlgorithmManager:
         sleep_start_time = datetime.fromtimestamp(selected_period.onset_timestamp)
         sleep_end_time = datetime.fromtimestamp(selected_period.offset_timestamp)
 
-        # Convert x_data (Unix timestamps) to datetime objects
-        timestamps = [datetime.fromtimestamp(ts) for ts in self.x_data]
-
         # Apply rule via protocol
         onset_idx, offset_idx = rule.apply_rules(
-            sleep_scores=self.sadeh_results,
+            sleep_scores=self._get_sleep_run_index(),
             sleep_start_marker=sleep_start_time,
             sleep_end_marker=sleep_end_time,
-            timestamps=timestamps,
+            timestamps=self._get_rule_timestamps(),
         )
 
         # Create visual markers
@@ -470,6 +434,25 @@ class PlotAlgorithmManager:
         if offset_idx is not None:
             self.create_sleep_offset_marker(self.x_data[offset_idx], rule)
 
+    def _get_sleep_run_index(self) -> SleepWakeRunIndex:
+        """Run-length index of the current sleep scores, rebuilt only when the scores are replaced."""
+        if self._sleep_run_index is None or self._sleep_run_index.scores is not self.sadeh_results:
+            self._sleep_run_index = SleepWakeRunIndex(self.sadeh_results)
+        return self._sleep_run_index
+
+    def _get_axis_y_time_index(self, main_axis_y_timestamps: list[datetime]) -> EpochTimeIndex:
+        """Time index of the main 48hr axis_y timestamps, rebuilt only when a new file is loaded."""
+        if self._axis_y_time_index is None or self._axis_y_time_index.source is not main_axis_y_timestamps:
+            self._axis_y_time_index = EpochTimeIndex(main_axis_y_timestamps)
+        return self._axis_y_time_index
+
+    def _get_rule_timestamps(self) -> list[datetime]:
+        """x_data (Unix timestamps) as datetime objects, converted once per loaded view."""
+        x_data = self.x_data
+        if self._rule_timestamps is None or self._rule_timestamps[0] is not x_data:
+            self._rule_timestamps = (x_data, [datetime.fromtimestamp(ts) for ts in x_data])
+        return self._rule_timestamps[1]
+
     def create_sleep_onset_marker(self, timestamp, rule: OnsetOffsetRule | None = None) -> None:
         """Create sleep onset marker with arrow and axis label."""
         custom_arrow_colors = getattr(self.parent, "custom_arrow_colors", {})
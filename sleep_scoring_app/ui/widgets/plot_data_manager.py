@@ -20,11 +20,23 @@ import numpy as np
 if TYPE_CHECKING:
     from datetime import datetime
 
+    from sleep_scoring_app.data.database import DatabaseManager
     from sleep_scoring_app.ui.widgets.activity_plot import ActivityPlotWidget
 
 logger = logging.getLogger(__name__)
 
 
+def plot_study_database(plot_widget: Any) -> DatabaseManager | None:
+    """Study database of the main window a plot belongs to (None when activity data is read from CSV files)."""
+    main_window = getattr(plot_widget, "main_window", None)
+    if main_window is None and hasattr(plot_widget, "parent") and callable(plot_widget.parent):
+        main_window = plot_widget.parent()
+    data_service = getattr(main_window, "data_service", None)
+    if data_service is None or not data_service.get_database_mode():
+        return None
+    return getattr(main_window, "db_manager", None)
+
+
 class PlotDataManager:
     """
     Manages data operations for the activity plot widget.
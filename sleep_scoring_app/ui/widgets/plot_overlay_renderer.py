@@ -10,19 +10,22 @@ Manages all overlay rendering operations for the activity plot including:
 
 from __future__ import annotations
 
-import hashlib
 import logging
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pyqtgraph as pg
 from PyQt6.QtCore import QTimer
 
 from sleep_scoring_app.core.algorithms import NonwearAlgorithmFactory
-from sleep_scoring_app.core.constants import NonwearDataSource, UIColors
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
+from sleep_scoring_app.core.constants import UIColors
+from sleep_scoring_app.data.algorithm_cache import AlgorithmResultCache
 from sleep_scoring_app.services.nonwear_service import NonwearPeriod
+from sleep_scoring_app.ui.widgets.plot_data_manager import plot_study_database
 
 if TYPE_CHECKING:
+    from sleep_scoring_app.data.algorithm_cache import AlgorithmResultKey
     from sleep_scoring_app.ui.widgets.activity_plot import ActivityPlotWidget
 
 logger = logging.getLogger(__name__)
@@ -42,7 +45,7 @@ class PlotOverlayRenderer:
     def __init__(self, parent: ActivityPlotWidget) -> None:
         """Initialize the plot overlay renderer."""
         self.parent = parent
-        self._choi_cache: dict[str, dict[str, Any]] = {}
+        self._choi_cache = AlgorithmResultCache(db_manager=None, memory_entries=3)
         logger.info("PlotOverlayRenderer initialized")
 
     def _get_choi_activity_column(self) -> str:
@@ -257,8 +260,16 @@ class PlotOverlayRenderer:
 
     # ========== Choi Overlay Updates ==========
 
-    def update_choi_overlay_only(self, new_activity_data: list[float]) -> None:
-        """Recalculate Choi algorithm with new data while preserving Sadeh algorithm state."""
+    def update_choi_overlay_only(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
+        """
+        Recalculate Choi algorithm with new data while preserving Sadeh algorithm state.
+
+        Args:
+            new_activity_data: Counts aligned with the plot timestamps
+            activity_column: Database column the counts were loaded from; when given,
+                results are cached in the study database instead of only in memory
+
+        """
         logger.debug("Updating Choi overlay with new activity data")
 
         if not new_activity_data or not hasattr(self.parent, "timestamps"):
@@ -267,7 +278,7 @@ class PlotOverlayRenderer:
 
         logger.debug("Updating Choi overlay with %d data points (preserving Sadeh state)", len(new_activity_data))
 
-        if self.restore_choi_from_cache(new_activity_data):
+        if self.restore_choi_from_cache(new_activity_data, activity_column):
             logger.debug("Successfully used cached Choi results")
             return
 
@@ -307,7 +318,7 @@ class PlotOverlayRenderer:
             logger.debug("Plotting updated Choi overlay")
             self.plot_nonwear_periods()
 
-            self._update_choi_cache_key(new_activity_data)
+            self._update_choi_cache_key(new_activity_data, activity_column)
 
             logger.info("Successfully updated Choi overlay with new data (Sadeh state preserved)")
 
@@ -319,8 +330,8 @@ class PlotOverlayRenderer:
                 except Exception:
                     logger.exception("Failed to restore previous nonwear visualization")
 
-    def update_choi_overlay_async(self, new_activity_data: list[float]) -> None:
-        """Asynchronously recalculate Choi algorithm with new data."""
+    def update_choi_overlay_async(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
+        """Asynchronously recalculate Choi algorithm with new data (see update_choi_overlay_only)."""
         logger.debug("Starting async Choi overlay update")
 
         if not new_activity_data or not hasattr(self.parent, "timestamps"):
@@ -329,7 +340,7 @@ class PlotOverlayRenderer:
 
         logger.debug("Starting async Choi overlay update with %d data points", len(new_activity_data))
 
-        if self.restore_choi_from_cache(new_activity_data):
+        if self.restore_choi_from_cache(new_activity_data, activity_column):
             logger.debug("Used cached Choi results for immediate update")
             return
 
@@ -375,7 +386,7 @@ class PlotOverlayRenderer:
                 self.parent._algorithm_cache = preserved_algorithm_cache
 
                 self.plot_nonwear_periods()
-                self._update_choi_cache_key(new_activity_data)
+                self._update_choi_cache_key(new_activity_data, activity_column)
 
                 logger.info("Async Choi overlay update completed successfully")
             except Exception:
@@ -390,43 +401,57 @@ class PlotOverlayRenderer:
 
     # ========== Choi Cache Management ==========
 
-    def _update_choi_cache_key(self, new_activity_data: list[float]) -> None:
-        """Update cache key for Choi results while preserving Sadeh cache."""
-        try:
-            choi_data_hash = hashlib.md5(str(new_activity_data).encode()).hexdigest()[:8]
-            choi_cache_key = f"choi_{len(new_activity_data)}_{choi_data_hash}"
+    def _choi_cache_key(self, activity_data: list[float], activity_column: str | None) -> AlgorithmResultKey | None:
+        """
+        Build the Choi result key for the current plot window.
 
+        Counts from a known database column are keyed by the imported file's hash;
+        otherwise the key is derived from the counts and kept in memory only.
+        """
+        choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+        self._choi_cache.db_manager = plot_study_database(self.parent) if activity_column else None
+        return self._choi_cache.make_key(
+            getattr(self.parent, "current_filename", None),
+            self.parent.timestamps,
+            choi_algorithm.identifier,
+            nonwear_parameters(choi_algorithm, activity_column),
+            activity_data,
+        )
+
+    def _update_choi_cache_key(self, new_activity_data: list[float], activity_column: str | None = None) -> None:
+        """Cache the current Choi results while preserving Sadeh cache."""
+        try:
             if hasattr(self.parent, "nonwear_data") and self.parent.nonwear_data:
-                if len(self._choi_cache) >= 3:
-                    oldest_key = next(iter(self._choi_cache))
-                    del self._choi_cache[oldest_key]
+                choi_cache_key = self._choi_cache_key(new_activity_data, activity_column)
+                if choi_cache_key is None:
+                    return
 
-                self._choi_cache[choi_cache_key] = {
-                    "choi_periods": list(self.parent.nonwear_data.choi_periods),
-                    "choi_mask": list(self.parent.nonwear_data.choi_mask),
-                }
+                nonwear_data = self.parent.nonwear_data
+                ranges = [(period.start_index, period.end_index) for period in nonwear_data.choi_periods]
+                self._choi_cache.put(choi_cache_key, getattr(self.parent, "current_filename", None), nonwear_data.choi_mask, ranges)
 
-                logger.debug("Cached Choi results with key: %s", choi_cache_key)
+                logger.debug("Cached Choi results for window starting %s", choi_cache_key.window_start)
         except Exception:
             logger.exception("Error updating Choi cache key")
 
-    def restore_choi_from_cache(self, activity_data: list[float]) -> bool:
+    def restore_choi_from_cache(self, activity_data: list[float], activity_column: str | None = None) -> bool:
         """Attempt to restore Choi results from cache for quick switching."""
         try:
-            choi_data_hash = hashlib.md5(str(activity_data).encode()).hexdigest()[:8]
-            choi_cache_key = f"choi_{len(activity_data)}_{choi_data_hash}"
+            choi_cache_key = self._choi_cache_key(activity_data, activity_column)
+            cached_data = self._choi_cache.get(choi_cache_key) if choi_cache_key is not None else None
+
+            if cached_data is not None and cached_data.ranges is not None:
+                from sleep_scoring_app.core.nonwear_data import ActivityDataView, NonwearData, choi_periods_from_ranges
 
-            if choi_cache_key in self._choi_cache:
-                cached_data = self._choi_cache[choi_cache_key]
+                timestamps = list(self.parent.timestamps)
+                choi_periods = choi_periods_from_ranges(cached_data.ranges, timestamps)
 
                 preserved_sadeh_results = getattr(self.parent, "sadeh_results", None)
                 preserved_algorithm_cache = getattr(self.parent, "_algorithm_cache", {}).copy()
 
-                from sleep_scoring_app.core.nonwear_data import ActivityDataView, NonwearData
-
                 current_filename = getattr(self.parent, "current_filename", "unknown")
                 activity_view = ActivityDataView.create(
-                    timestamps=list(self.parent.timestamps),
+                    timestamps=timestamps,
                     counts=activity_data,
                     filename=current_filename,
                 )
@@ -437,9 +462,9 @@ class PlotOverlayRenderer:
 
                 new_nonwear_data = NonwearData(
                     sensor_periods=tuple(raw_sensor_periods),
-                    choi_periods=tuple(cached_data["choi_periods"]),
+                    choi_periods=tuple(choi_periods),
                     sensor_mask=tuple(getattr(self.parent.nonwear_data, "sensor_mask", [])) if hasattr(self.parent, "nonwear_data") else (),
-                    choi_mask=tuple(cached_data["choi_mask"]),
+                    choi_mask=tuple(cached_data.mask.tolist()),
                     activity_view=activity_view,
                 )
 
@@ -452,7 +477,7 @@ class PlotOverlayRenderer:
 
                 self.plot_nonwear_periods()
 
-                logger.debug("Successfully restored Choi results from cache: %s", choi_cache_key)
+                logger.debug("Successfully restored Choi results from cache for window starting %s", choi_cache_key.window_start)
                 return True
         except Exception:
             logger.exception("Error restoring Choi results from cache")
@@ -465,8 +490,8 @@ class PlotOverlayRenderer:
         logger.debug("Cleared Choi algorithm cache")
 
     def get_choi_cache_info(self) -> dict[str, int]:
-        """Get information about the current Choi cache state."""
-        total_entries = sum(len(data.get("choi_periods", [])) for data in self._choi_cache.values())
+        """Get information about the in-memory Choi cache state."""
+        total_entries = sum(len(result.ranges) for result in self._choi_cache.values() if result.ranges is not None)
         return {"cache_size": len(self._choi_cache), "total_entries": total_entries}
 
     def validate_choi_overlay_state(self) -> bool:
@@ -223,6 +223,7 @@ def mock_data_manager():
     mock_manager.data_folder = "/test/data"
     mock_manager.discover_files = Mock(return_value=[])
     mock_manager.load_real_data = Mock(return_value=([], []))
+    mock_manager.load_activity_window = Mock(return_value=None)
     mock_manager.extract_enhanced_participant_info = Mock(
         return_value={
             "numerical_participant_id": "4000",
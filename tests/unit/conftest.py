@@ -0,0 +1,78 @@
+"""
+Shared fixtures and helpers for unit tests that use a study database.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable, FeatureFlags
+from sleep_scoring_app.data import database as database_module
+from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.services.import_service import ImportService
+
+if TYPE_CHECKING:
+    import sqlite3
+    from pathlib import Path
+
+
+@pytest.fixture
+def db_manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> DatabaseManager:
+    """Fresh database with its own schema initialization."""
+    monkeypatch.setattr(database_module, "_database_initialized", False)
+    return DatabaseManager(tmp_path / "study.db")
+
+
+@pytest.fixture
+def import_service(db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> ImportService:
+    """ImportService writing legacy per-epoch rows into the fresh database, in-process."""
+    monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", False)
+    return ImportService(db_manager, max_workers=1)
+
+
+def register_file(conn: sqlite3.Connection, filename: str, participant_id: str = "1000", file_hash: str = "hash") -> None:
+    """Add a file to the file registry, as import does before storing its activity."""
+    conn.execute(
+        f"""
+        INSERT INTO {DatabaseTable.FILE_REGISTRY} (
+            {DatabaseColumn.FILENAME}, {DatabaseColumn.ORIGINAL_PATH}, {DatabaseColumn.PARTICIPANT_ID}, {DatabaseColumn.FILE_HASH}
+        ) VALUES (?, ?, ?, ?)
+        """,
+        (filename, f"/data/{filename}", participant_id, file_hash),
+    )
+
+
+def activity_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """ActiGraph count columns with about 5% missing values in each."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Axis1": rng.integers(0, 500, size=n_rows).astype(float),
+            "Axis2": rng.integers(0, 500, size=n_rows).astype(float),
+            "Axis3": rng.integers(0, 500, size=n_rows).astype(float),
+            "Vector Magnitude": rng.random(n_rows) * 700,
+        }
+    )
+    for column in df.columns:
+        df.loc[rng.random(n_rows) < 0.05, column] = np.nan
+    return df
+
+
+def write_activity_csv(path: Path, n_rows: int = 600, seed: int = 0) -> Path:
+    """Write a minute-epoch CSV without header rows."""
+    df = activity_frame(n_rows, seed)
+    times = pd.date_range("2024-01-01", periods=n_rows, freq="60s")
+    df.insert(0, "Date", times.strftime("%m/%d/%Y"))
+    df.insert(1, " Time", times.strftime("%H:%M:%S"))
+    df.to_csv(path, index=False)
+    return path
+
+
+def write_activity_csv_files(directory: Path, count: int) -> list[Path]:
+    """Write minute-epoch CSV files of different lengths for consecutive participants."""
+    directory.mkdir()
+    return [write_activity_csv(directory / f"DEMO-{100 + index}_T1_G1_actigraph.csv", 600 + 100 * index, seed=index) for index in range(count)]
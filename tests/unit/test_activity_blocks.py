@@ -0,0 +1,229 @@
+"""
+Unit tests for columnar activity block storage.
+
+Verifies that epochs stored as per-day BLOB blocks load identically to the legacy
+one-row-per-epoch table, that windowed reads slice correctly across day boundaries,
+and that existing row data is migrated into blocks, after verification, on request.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.constants import ActivityDataPreference, DatabaseColumn, DatabaseTable, FeatureFlags
+from sleep_scoring_app.data import activity_blocks as activity_blocks_module
+from sleep_scoring_app.data import database as database_module
+from sleep_scoring_app.data.activity_blocks import (
+    decode_array,
+    encode_array,
+    has_activity_blocks,
+    read_activity_blocks,
+    split_into_day_blocks,
+    to_epoch_seconds,
+    write_activity_blocks,
+)
+from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.services.import_service import ImportService
+from tests.unit.conftest import register_file
+
+DEMO_ACTIGRAPH_FILE = Path(__file__).parent.parent.parent / "demo_data" / "activity" / "DEMO-001_T1_G1_actigraph.csv"
+
+
+def _minute_epochs(start: datetime, n_epochs: int) -> np.ndarray:
+    return to_epoch_seconds([start + timedelta(minutes=i) for i in range(n_epochs)])
+
+
+class TestBlockEncoding:
+    """Block splitting and BLOB encoding."""
+
+    def test_split_on_calendar_days(self) -> None:
+        """Test epochs are grouped into one block per calendar day."""
+        timestamps = _minute_epochs(datetime(2024, 1, 1, 22, 0), 3 * 1440)
+        blocks = split_into_day_blocks(timestamps, {DatabaseColumn.AXIS_Y: np.arange(len(timestamps), dtype=float)})
+
+        assert [block.block_date for block in blocks] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+        assert [block.epoch_count for block in blocks] == [120, 1440, 1440, 1320]
+        assert sum(block.epoch_count for block in blocks) == len(timestamps)
+
+    def test_all_nan_column_is_stored_as_null(self) -> None:
+        """Test an axis without any values encodes to NULL and decodes to NaN."""
+        assert encode_array(np.full(5, np.nan)) is None
+        assert encode_array(None) is None
+        assert np.isnan(decode_array(None, 5)).all()
+
+        values = np.array([1.0, np.nan, 3.5])
+        np.testing.assert_array_equal(decode_array(encode_array(values), 3), values.astype(np.float32))
+
+
+class TestBlockStorage:
+    """Reading and writing blocks through DatabaseManager."""
+
+    def test_windowed_read_across_midnight(self, db_manager: DatabaseManager) -> None:
+        """Test a 48h window read matches an exact [start, end) slice of the stored epochs."""
+        start = datetime(2024, 3, 1, 0, 0)
+        timestamps = _minute_epochs(start, 5 * 1440)
+        rng = np.random.default_rng(0)
+        axis_y = rng.integers(0, 500, size=len(timestamps)).astype(float)
+        vm = axis_y * 1.5
+
+        with db_manager._get_connection() as conn:
+            register_file(conn, "P1.csv")
+            write_activity_blocks(conn, "P1.csv", timestamps, {DatabaseColumn.AXIS_Y: axis_y, DatabaseColumn.VECTOR_MAGNITUDE: vm})
+            conn.commit()
+
+        window_start = datetime(2024, 3, 2, 12, 0)
+        window_end = window_start + timedelta(hours=48)
+        loaded_times, loaded_values = db_manager.load_raw_activity_data(
+            "P1.csv", window_start, window_end, activity_column=ActivityDataPreference.AXIS_Y
+        )
+
+        window = slice(1440 + 720, 1440 + 720 + 2880)
+        assert len(loaded_times) == 2880
+        assert loaded_times[0] == window_start
+        assert loaded_times[-1] == window_end - timedelta(minutes=1)
+        assert loaded_values == axis_y[window].tolist()
+
+        _, loaded_vm = db_manager.load_raw_activity_data("P1.csv", window_start, window_end)
+        np.testing.assert_allclose(loaded_vm, vm[window], rtol=1e-6)
+
+    def test_missing_axis_is_not_available(self, db_manager: DatabaseManager) -> None:
+        """Test columns stored as NULL are not reported as available."""
+        timestamps = _minute_epochs(datetime(2024, 3, 1), 100)
+        with db_manager._get_connection() as conn:
+            register_file(conn, "P2.csv")
+            write_activity_blocks(conn, "P2.csv", timestamps, {DatabaseColumn.AXIS_Y: np.ones(100), DatabaseColumn.AXIS_X: None})
+            conn.commit()
+
+        assert db_manager.get_available_activity_columns("P2.csv") == [ActivityDataPreference.AXIS_Y]
+        assert db_manager.load_raw_activity_data("P2.csv", activity_column=ActivityDataPreference.AXIS_X) == ([], [])
+
+    def test_delete_removes_blocks(self, db_manager: DatabaseManager) -> None:
+        """Test deleting an imported file removes its blocks and dates."""
+        with db_manager._get_connection() as conn:
+            register_file(conn, "P3.csv")
+            write_activity_blocks(conn, "P3.csv", _minute_epochs(datetime(2024, 3, 1), 2000), {DatabaseColumn.AXIS_Y: np.ones(2000)})
+            conn.commit()
+
+        assert len(db_manager.get_file_date_ranges("P3.csv")) == 2
+        assert db_manager.delete_imported_file("P3.csv")
+        assert db_manager.get_file_date_ranges("P3.csv") == []
+        with db_manager._get_connection() as conn:
+            assert not has_activity_blocks(conn, "P3.csv")
+
+
+def _insert_legacy_rows(db_manager: DatabaseManager, filename: str, start: datetime, n_epochs: int) -> None:
+    rows = [
+        ("hash", filename, "1000", (start + timedelta(minutes=i)).isoformat(), float(i % 50), None, None, float(i % 50) * 2) for i in range(n_epochs)
+    ]
+    with db_manager._get_connection() as conn:
+        register_file(conn, filename)
+        conn.executemany(
+            f"""
+            INSERT INTO {DatabaseTable.RAW_ACTIVITY_DATA} (
+                {DatabaseColumn.FILE_HASH}, {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_ID},
+                {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y}, {DatabaseColumn.AXIS_X},
+                {DatabaseColumn.AXIS_Z}, {DatabaseColumn.VECTOR_MAGNITUDE}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+
+
+def _legacy_row_count(db_manager: DatabaseManager) -> int:
+    with db_manager._get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.RAW_ACTIVITY_DATA}").fetchone()[0]
+
+
+class TestRowMigration:
+    """Legacy per-epoch rows are migrated into blocks on request."""
+
+    def test_rows_kept_on_init(self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test initializing a database with legacy rows leaves them in place."""
+        _insert_legacy_rows(db_manager, "P4.csv", datetime(2024, 5, 1, 18, 0), 1440)
+
+        monkeypatch.setattr(database_module, "_database_initialized", False)
+        DatabaseManager(db_manager.db_path)
+
+        assert _legacy_row_count(db_manager) == 1440
+        with db_manager._get_connection() as conn:
+            assert not has_activity_blocks(conn, "P4.csv")
+
+    def test_rows_migrated(self, db_manager: DatabaseManager) -> None:
+        """Test existing raw_activity_data rows are moved into blocks with identical loads."""
+        _insert_legacy_rows(db_manager, "P4.csv", datetime(2024, 5, 1, 18, 0), 1440)
+        expected = db_manager.load_raw_activity_data("P4.csv", activity_column=ActivityDataPreference.AXIS_Y)
+        reported = []
+
+        counts = db_manager.migrate_activity_rows_to_blocks(lambda *args: reported.append(args))
+
+        assert counts == {"files_migrated": 1, "files_failed": 0, "epochs_migrated": 1440}
+        assert reported == [("P4.csv", 1440, None)]
+        assert _legacy_row_count(db_manager) == 0
+        with db_manager._get_connection() as conn:
+            assert has_activity_blocks(conn, "P4.csv")
+            epochs, values = read_activity_blocks(conn, "P4.csv", [DatabaseColumn.AXIS_X])
+            assert len(epochs) == 1440
+            assert np.isnan(values[DatabaseColumn.AXIS_X]).all()
+
+        assert db_manager.load_raw_activity_data("P4.csv", activity_column=ActivityDataPreference.AXIS_Y) == expected
+        # Rows inserted directly are not in the date index until the file is migrated
+        assert db_manager.get_file_date_ranges("P4.csv") == [date(2024, 5, 1), date(2024, 5, 2)]
+        assert db_manager.get_import_statistics()["total_activity_records"] == 1440
+
+    def test_unverified_blocks_keep_rows(self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a file whose blocks do not read back as its rows keeps its rows, while other files migrate."""
+        _insert_legacy_rows(db_manager, "P4.csv", datetime(2024, 5, 1, 18, 0), 600)
+        _insert_legacy_rows(db_manager, "P5.csv", datetime(2024, 5, 1, 18, 0), 600)
+        read = activity_blocks_module.read_activity_blocks
+
+        def corrupted_read(conn, filename, columns, *args):
+            epochs, values = read(conn, filename, columns, *args)
+            if filename == "P4.csv":
+                values[DatabaseColumn.AXIS_Y][10] += 1
+            return epochs, values
+
+        monkeypatch.setattr(activity_blocks_module, "read_activity_blocks", corrupted_read)
+        counts = db_manager.migrate_activity_rows_to_blocks()
+
+        assert counts == {"files_migrated": 1, "files_failed": 1, "epochs_migrated": 600}
+        assert _legacy_row_count(db_manager) == 600
+        with db_manager._get_connection() as conn:
+            assert not has_activity_blocks(conn, "P4.csv")
+            assert has_activity_blocks(conn, "P5.csv")
+
+
+class TestImportParity:
+    """CSV import into blocks loads the same data as the row table."""
+
+    @pytest.mark.skipif(not DEMO_ACTIGRAPH_FILE.exists(), reason="Demo data not available")
+    def test_actigraph_import_matches_row_storage(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test block and row storage return the same epochs for every activity column."""
+        loaded = {}
+        for columnar in (False, True):
+            monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", columnar)
+            monkeypatch.setattr(database_module, "_database_initialized", False)
+            manager = DatabaseManager(tmp_path / f"import_{columnar}.db")
+            assert ImportService(manager).import_csv_file(DEMO_ACTIGRAPH_FILE)
+
+            with manager._get_connection() as conn:
+                assert has_activity_blocks(conn, DEMO_ACTIGRAPH_FILE.name) is columnar
+
+            loaded[columnar] = {
+                preference: manager.load_raw_activity_data(DEMO_ACTIGRAPH_FILE.name, activity_column=preference)
+                for preference in ActivityDataPreference
+            }
+            loaded[columnar]["dates"] = manager.get_file_date_ranges(DEMO_ACTIGRAPH_FILE.name)
+            loaded[columnar]["columns"] = manager.get_available_activity_columns(DEMO_ACTIGRAPH_FILE.name)
+
+        assert loaded[True]["dates"] == loaded[False]["dates"]
+        assert loaded[True]["columns"] == loaded[False]["columns"]
+        for preference in ActivityDataPreference:
+            row_times, row_values = loaded[False][preference]
+            block_times, block_values = loaded[True][preference]
+            assert block_times == row_times
+            np.testing.assert_allclose(block_values, row_values, rtol=1e-6)
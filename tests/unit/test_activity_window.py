@@ -0,0 +1,189 @@
+"""
+Unit tests for the NumPy activity window API.
+
+Verifies that DatabaseManager.load_activity_window returns every requested column
+from one query for both block and legacy row storage, and that the analysis-tab
+48h load path takes the main series and the Sadeh axis_y series from that window.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.constants import ActivityDataPreference, DatabaseColumn, DatabaseTable, FeatureFlags
+from sleep_scoring_app.data import database as database_module
+from sleep_scoring_app.data.activity_blocks import to_epoch_seconds, write_activity_blocks
+from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.services.unified_data_service import UnifiedDataService
+from tests.unit.conftest import register_file
+
+FILENAME = "P1.csv"
+START = datetime(2024, 3, 1, 0, 0)
+N_EPOCHS = 4 * 1440
+
+
+def _activity() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(5)
+    axis_y = rng.integers(0, 400, size=N_EPOCHS).astype(float)
+    axis_x = rng.integers(0, 400, size=N_EPOCHS).astype(float)
+    axis_x[100:200] = np.nan
+    return {
+        DatabaseColumn.AXIS_Y: axis_y,
+        DatabaseColumn.AXIS_X: axis_x,
+        DatabaseColumn.AXIS_Z: None,
+        DatabaseColumn.VECTOR_MAGNITUDE: axis_y + 0.5,
+    }
+
+
+def _write_rows(conn, activity: dict[str, np.ndarray]) -> None:
+    def value(column: str, index: int) -> float | None:
+        array = activity[column]
+        return None if array is None or np.isnan(array[index]) else float(array[index])
+
+    conn.executemany(
+        f"""
+        INSERT INTO {DatabaseTable.RAW_ACTIVITY_DATA} (
+            {DatabaseColumn.FILE_HASH}, {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_ID},
+            {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y}, {DatabaseColumn.AXIS_X},
+            {DatabaseColumn.AXIS_Z}, {DatabaseColumn.VECTOR_MAGNITUDE}
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                "hash",
+                FILENAME,
+                "1000",
+                (START + timedelta(minutes=i)).isoformat(),
+                value(DatabaseColumn.AXIS_Y, i),
+                value(DatabaseColumn.AXIS_X, i),
+                value(DatabaseColumn.AXIS_Z, i),
+                value(DatabaseColumn.VECTOR_MAGNITUDE, i),
+            )
+            for i in range(N_EPOCHS)
+        ],
+    )
+
+
+@pytest.fixture(params=["blocks", "rows"])
+def db_manager(request: pytest.FixtureRequest, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> DatabaseManager:
+    """Database holding the same recording in block or legacy row storage."""
+    monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", request.param == "blocks")
+
+    activity = _activity()
+    with db_manager._get_connection() as conn:
+        register_file(conn, FILENAME)
+        if request.param == "blocks":
+            timestamps = to_epoch_seconds([START + timedelta(minutes=i) for i in range(N_EPOCHS)])
+            write_activity_blocks(conn, FILENAME, timestamps, activity)
+        else:
+            _write_rows(conn, activity)
+        conn.commit()
+
+    return db_manager
+
+
+class TestLoadActivityWindow:
+    """DatabaseManager.load_activity_window."""
+
+    def test_returns_all_columns_as_arrays(self, db_manager: DatabaseManager) -> None:
+        """Test one call returns aligned datetime64/float64 arrays for each requested column."""
+        start = START + timedelta(days=1)
+        timestamps, values = db_manager.load_activity_window(
+            FILENAME, start, start + timedelta(hours=48), columns=[ActivityDataPreference.AXIS_Y, ActivityDataPreference.AXIS_X]
+        )
+
+        assert timestamps.dtype == np.dtype("datetime64[s]")
+        assert len(timestamps) == 2880
+        assert timestamps[0] == np.datetime64(start, "s")
+        assert set(values) == {ActivityDataPreference.AXIS_Y, ActivityDataPreference.AXIS_X}
+
+        expected = _activity()
+        window = slice(1440, 1440 + 2880)
+        assert values[ActivityDataPreference.AXIS_Y].dtype == np.float64
+        np.testing.assert_array_equal(values[ActivityDataPreference.AXIS_Y], expected[DatabaseColumn.AXIS_Y][window])
+        np.testing.assert_array_equal(values[ActivityDataPreference.AXIS_X], expected[DatabaseColumn.AXIS_X][window])
+
+    def test_missing_values_are_nan(self, db_manager: DatabaseManager) -> None:
+        """Test missing epochs and absent axes come back as NaN."""
+        timestamps, values = db_manager.load_activity_window(FILENAME)
+
+        assert len(timestamps) == N_EPOCHS
+        assert set(values) == set(ActivityDataPreference)
+        assert np.isnan(values[ActivityDataPreference.AXIS_X][100:200]).all()
+        assert np.isnan(values[ActivityDataPreference.AXIS_Z]).all()
+
+    def test_matches_list_api(self, db_manager: DatabaseManager) -> None:
+        """Test load_raw_activity_data is the list view of the same window."""
+        start, end = START + timedelta(hours=6), START + timedelta(hours=54)
+        timestamps, values = db_manager.load_activity_window(FILENAME, start, end, columns=[ActivityDataPreference.AXIS_X])
+        list_timestamps, list_values = db_manager.load_raw_activity_data(FILENAME, start, end, activity_column=ActivityDataPreference.AXIS_X)
+
+        valid = ~np.isnan(values[ActivityDataPreference.AXIS_X])
+        assert list_timestamps == timestamps[valid].tolist()
+        assert list_values == values[ActivityDataPreference.AXIS_X][valid].tolist()
+
+    def test_unknown_file_is_empty(self, db_manager: DatabaseManager) -> None:
+        """Test an unknown file returns empty arrays for each column."""
+        timestamps, values = db_manager.load_activity_window("missing.csv", START, START + timedelta(hours=48))
+        assert len(timestamps) == 0
+        assert all(len(array) == 0 for array in values.values())
+
+    def test_invalid_timestamp_skips_only_its_row(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+        """Test a legacy row with a malformed or empty timestamp is skipped and logged, keeping the rest of the window."""
+        monkeypatch.setattr(database_module, "_database_initialized", False)
+        monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", False)
+        db_manager = DatabaseManager(tmp_path / "rows.db")
+        rows = [(f"2024-03-01T00:0{i}:00.5", float(i)) for i in range(5)]
+        rows[2] = ("not a timestamp", 2.0)
+        rows[3] = ("", 3.0)
+        with db_manager._get_connection() as conn:
+            register_file(conn, FILENAME)
+            conn.executemany(
+                f"""
+                INSERT INTO {DatabaseTable.RAW_ACTIVITY_DATA} (
+                    {DatabaseColumn.FILE_HASH}, {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_ID},
+                    {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y}
+                ) VALUES ('hash', ?, '1000', ?, ?)
+                """,
+                [(FILENAME, timestamp, value) for timestamp, value in rows],
+            )
+            conn.commit()
+
+        timestamps, values = db_manager.load_activity_window(FILENAME, columns=[ActivityDataPreference.AXIS_Y])
+
+        assert timestamps.tolist() == [datetime(2024, 3, 1, 0, minute) for minute in (0, 1, 4)]
+        assert values[ActivityDataPreference.AXIS_Y].tolist() == [0.0, 1.0, 4.0]
+        assert "Skipping 2 rows" in caplog.text
+
+
+class TestLoadCurrentDateWindow:
+    """The analysis-tab 48h load uses a single window query."""
+
+    def test_main_and_axis_y_series_from_one_query(self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the 48h load returns both series and matches the per-axis loaders."""
+        service = UnifiedDataService(Mock(), db_manager)
+        service.data_manager.preferred_activity_column = ActivityDataPreference.VECTOR_MAGNITUDE
+        current_date = date(2024, 3, 2)
+
+        calls = []
+        original = db_manager.load_activity_window
+        monkeypatch.setattr(db_manager, "load_activity_window", lambda *args, **kwargs: calls.append(kwargs) or original(*args, **kwargs))
+
+        timestamps, activity, axis_y_timestamps, axis_y = service._load_48h_window(current_date, FILENAME)
+
+        assert len(calls) == 1
+        assert calls[0]["columns"] == [ActivityDataPreference.VECTOR_MAGNITUDE, ActivityDataPreference.AXIS_Y]
+
+        monkeypatch.setattr(db_manager, "load_activity_window", original)
+        assert (timestamps, activity) == service.data_manager.load_real_data(current_date, 48, FILENAME)
+        assert (axis_y_timestamps, axis_y) == service.data_manager.load_axis_y_data_for_sadeh(FILENAME, current_date, hours=48)
+
+    def test_empty_window_falls_back(self, db_manager: DatabaseManager) -> None:
+        """Test a date without data yields no main or axis_y series."""
+        service = UnifiedDataService(Mock(), db_manager)
+        assert service._load_48h_window(date(2025, 1, 1), FILENAME) == (None, None, None, None)
@@ -0,0 +1,180 @@
+"""
+Unit tests for the persistent algorithm result cache.
+
+Verifies bit-packed mask storage, keying by imported file hash and algorithm
+settings, LRU eviction, cleanup with the file, and that the plot reuses a stored
+sleep scoring result without rerunning the algorithm.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import AlgorithmFactory
+from sleep_scoring_app.core.constants import DatabaseTable
+from sleep_scoring_app.data.algorithm_cache import (
+    AlgorithmResultCache,
+    AlgorithmResultKey,
+    pack_mask,
+    read_algorithm_result,
+    unpack_mask,
+    write_algorithm_result,
+)
+from sleep_scoring_app.ui.widgets.plot_algorithm_manager import PlotAlgorithmManager
+from tests.unit.conftest import register_file
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.data.database import DatabaseManager
+
+FILENAME = "P1.csv"
+FILE_HASH = "abc123"
+START = datetime(2024, 3, 1, 12, 0)
+N_EPOCHS = 2880
+
+
+def _timestamps(start: datetime = START, count: int = N_EPOCHS) -> list[datetime]:
+    return [start + timedelta(minutes=i) for i in range(count)]
+
+
+def _mask(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 2, size=N_EPOCHS).astype(np.uint8)
+
+
+@pytest.fixture
+def db_manager(db_manager: DatabaseManager) -> DatabaseManager:
+    """Database with one registered file."""
+    with db_manager._get_connection() as conn:
+        register_file(conn, FILENAME, file_hash=FILE_HASH)
+        conn.commit()
+    return db_manager
+
+
+@pytest.mark.parametrize("length", [0, 1, 7, 8, 9, N_EPOCHS + 3])
+def test_mask_round_trip(length: int) -> None:
+    """Test masks pack to one bit per epoch and unpack unchanged."""
+    mask = np.random.default_rng(length).integers(0, 2, size=length)
+
+    blob = pack_mask(mask)
+
+    assert len(blob) == -(-length // 8)
+    np.testing.assert_array_equal(unpack_mask(blob, length), mask)
+
+
+class TestDatabaseCache:
+    """DatabaseManager algorithm result storage."""
+
+    def test_round_trip(self, db_manager: DatabaseManager) -> None:
+        """Test a stored mask and its ranges load back for the same key only."""
+        key = AlgorithmResultKey.create(FILE_HASH, _timestamps(), "choi_2011", {"activity_column": "vector_magnitude"})
+        ranges = [(10, 99), (500, 620)]
+
+        assert db_manager.save_algorithm_result(key, FILENAME, _mask(), ranges)
+        result = db_manager.load_algorithm_result(key)
+
+        np.testing.assert_array_equal(result.mask, _mask())
+        assert result.ranges.tolist() == [list(pair) for pair in ranges]
+        assert (
+            db_manager.load_algorithm_result(AlgorithmResultKey.create(FILE_HASH, _timestamps(), "choi_2011", {"activity_column": "axis_y"})) is None
+        )
+        assert db_manager.load_algorithm_result(AlgorithmResultKey.create(FILE_HASH, _timestamps(START + timedelta(days=1)), "choi_2011")) is None
+
+    def test_least_recently_used_entries_evicted(self, db_manager: DatabaseManager) -> None:
+        """Test the table is bounded and a lookup keeps an entry alive."""
+        keys = [AlgorithmResultKey.create(FILE_HASH, _timestamps(START + timedelta(days=day)), "sadeh_1994_actilife") for day in range(4)]
+
+        with db_manager._get_connection() as conn:
+            for key in keys[:3]:
+                write_algorithm_result(conn, key, FILENAME, _mask(), max_entries=3)
+            assert read_algorithm_result(conn, keys[0]) is not None
+            write_algorithm_result(conn, keys[3], FILENAME, _mask(), max_entries=3)
+
+            assert read_algorithm_result(conn, keys[1]) is None
+            assert all(read_algorithm_result(conn, key) is not None for key in (keys[0], keys[2], keys[3]))
+
+    def test_results_deleted_with_file(self, db_manager: DatabaseManager) -> None:
+        """Test deleting an imported file removes its cached results."""
+        key = AlgorithmResultKey.create(FILE_HASH, _timestamps(), "sadeh_1994_actilife")
+        db_manager.save_algorithm_result(key, FILENAME, _mask())
+
+        assert db_manager.delete_imported_file(FILENAME)
+
+        assert db_manager.load_algorithm_result(key) is None
+
+    def test_length_mismatch_rejected(self, db_manager: DatabaseManager) -> None:
+        """Test a result that does not cover the window is not stored."""
+        key = AlgorithmResultKey.create(FILE_HASH, _timestamps(), "sadeh_1994_actilife")
+
+        assert not db_manager.save_algorithm_result(key, FILENAME, _mask()[:-1])
+
+
+class TestAlgorithmResultCache:
+    """Two-level cache used by the plot."""
+
+    def test_results_survive_new_cache_instance(self, db_manager: DatabaseManager) -> None:
+        """Test a result stored by one session is found by the next using only the file hash."""
+        first = AlgorithmResultCache(db_manager)
+        key = first.make_key(FILENAME, _timestamps(), "sadeh_1994_actilife", {"threshold": -4})
+        first.put(key, FILENAME, _mask())
+
+        second = AlgorithmResultCache(db_manager)
+        restarted_key = second.make_key(FILENAME, _timestamps(), "sadeh_1994_actilife", {"threshold": -4})
+
+        assert restarted_key == key
+        np.testing.assert_array_equal(second.get(restarted_key).mask, _mask())
+
+    def test_unregistered_file_kept_in_memory(self, db_manager: DatabaseManager) -> None:
+        """Test files without a recorded hash fall back to a value digest and are not persisted."""
+        cache = AlgorithmResultCache(db_manager)
+        values = np.arange(N_EPOCHS, dtype=float)
+
+        key = cache.make_key("not_imported.csv", _timestamps(), "choi_2011", values=values)
+        cache.put(key, "not_imported.csv", _mask())
+
+        assert not key.persistent
+        assert cache.get(key) is not None
+        assert cache.make_key("not_imported.csv", _timestamps(), "choi_2011", values=values + 1) != key
+        assert cache.make_key("not_imported.csv", _timestamps(), "choi_2011") is None
+        with db_manager._get_connection() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.ALGORITHM_RESULT_CACHE}").fetchone()[0] == 0
+
+
+def _plot_parent(db_manager: DatabaseManager) -> Mock:
+    timestamps = _timestamps()
+    axis_y = np.random.default_rng(1).integers(0, 300, size=N_EPOCHS).astype(float).tolist()
+    parent = Mock()
+    parent.main_window.config_manager.config.sleep_algorithm_id = None
+    parent.main_window.config_manager.config.choi_axis = "vector_magnitude"
+    parent.main_window.data_service.get_database_mode.return_value = True
+    parent.main_window.db_manager = db_manager
+    parent.current_filename = FILENAME
+    parent.current_view_hours = 48
+    parent.timestamps = timestamps
+    parent.activity_data = axis_y
+    parent.main_48h_timestamps = timestamps
+    parent.main_48h_activity = axis_y
+    parent.main_48h_axis_y_data = axis_y
+    parent.main_48h_axis_y_timestamps = timestamps
+    return parent
+
+
+def test_plot_reuses_persisted_sleep_scores(db_manager: DatabaseManager) -> None:
+    """Test revisiting a window after a restart loads the stored scores instead of rescoring."""
+    parent = _plot_parent(db_manager)
+    PlotAlgorithmManager(parent).plot_algorithms()
+    expected = list(parent.main_48h_sadeh_results)
+
+    restarted = PlotAlgorithmManager(parent)
+    algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+    algorithm.score_array = Mock(side_effect=AssertionError("algorithm should not rerun"))
+    restarted._sleep_scoring_algorithm = algorithm
+    parent.main_48h_sadeh_results = None
+
+    restarted.plot_algorithms()
+
+    assert parent.main_48h_sadeh_results == expected
+    assert sum(expected) > 0
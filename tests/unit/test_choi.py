@@ -0,0 +1,186 @@
+"""
+Unit tests for the linear-time Choi (2011) nonwear engine.
+
+Verifies that the prefix-sum engine produces exactly the same periods and masks
+as the original window-rescanning loop, and benchmarks both on a 30-day recording.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.algorithms.choi import (
+    MIN_PERIOD_LENGTH,
+    SPIKE_TOLERANCE,
+    WINDOW_SIZE,
+    _merge_adjacent_periods,
+    choi_detect_nonwear,
+    detect_nonwear,
+    detect_nonwear_mask,
+)
+from sleep_scoring_app.core.algorithms.choi_algorithm import ChoiAlgorithm
+from sleep_scoring_app.core.algorithms.types import ActivityColumn
+from sleep_scoring_app.core.constants import NonwearDataSource
+from sleep_scoring_app.core.dataclasses import NonwearPeriod
+
+
+def _reference_choi_loop(counts: np.ndarray, timestamps: list[datetime]) -> list[NonwearPeriod]:
+    """Original quadratic Choi scan, kept as the parity reference."""
+    nonwear_periods: list[NonwearPeriod] = []
+    i = 0
+    while i < len(counts):
+        if counts[i] > 0:
+            i += 1
+            continue
+
+        start_idx = i
+        end_idx = i
+        nonwear_continuation = i
+        while nonwear_continuation < len(counts):
+            if counts[nonwear_continuation] == 0:
+                end_idx = nonwear_continuation
+                nonwear_continuation += 1
+                continue
+            window_start = max(0, nonwear_continuation - WINDOW_SIZE)
+            window_end = min(len(counts), nonwear_continuation + WINDOW_SIZE)
+            if np.sum(counts[window_start:window_end] > 0) > SPIKE_TOLERANCE:
+                break
+            nonwear_continuation += 1
+
+        if end_idx - start_idx + 1 >= MIN_PERIOD_LENGTH:
+            nonwear_periods.append(
+                NonwearPeriod(
+                    start_time=timestamps[start_idx],
+                    end_time=timestamps[end_idx],
+                    participant_id="",
+                    source=NonwearDataSource.CHOI_ALGORITHM,
+                    duration_minutes=end_idx - start_idx + 1,
+                    start_index=start_idx,
+                    end_index=end_idx,
+                )
+            )
+            i = end_idx + 1
+        else:
+            i += 1
+
+    return _merge_adjacent_periods(nonwear_periods)
+
+
+def _period_tuples(periods: list[NonwearPeriod]) -> list[tuple]:
+    return [(p.start_time, p.end_time, p.start_index, p.end_index, p.duration_minutes) for p in periods]
+
+
+def _minute_timestamps(n_epochs: int) -> list[datetime]:
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    return [base + timedelta(minutes=i) for i in range(n_epochs)]
+
+
+def _simulated_recording(n_epochs: int, seed: int = 0) -> np.ndarray:
+    """Wear periods interleaved with zero runs of varied length and isolated spikes."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 500, size=n_epochs).astype(np.float64)
+    position = 0
+    while position < n_epochs:
+        position += int(rng.integers(5, 400))
+        run_length = int(rng.choice([3, 20, 60, 89, 90, 91, 150, 400]))
+        counts[position : position + run_length] = 0
+        # Sprinkle a few tolerated or breaking spikes inside the run
+        for _ in range(int(rng.integers(0, 4))):
+            spike = position + int(rng.integers(0, max(run_length, 1)))
+            if spike < n_epochs:
+                counts[spike] = float(rng.integers(1, 50))
+        position += run_length
+    return counts
+
+
+class TestChoiEngineParity:
+    """Prefix-sum engine must reproduce the original scan exactly."""
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_periods_match_reference(self, seed: int) -> None:
+        """Test NonwearPeriod lists match on randomized recordings."""
+        counts = _simulated_recording(5000, seed=seed)
+        timestamps = _minute_timestamps(len(counts))
+        assert _period_tuples(detect_nonwear(counts, timestamps)) == _period_tuples(_reference_choi_loop(counts, timestamps))
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_mask_matches_reference(self, seed: int) -> None:
+        """Test detect_mask matches the mask painted from reference periods."""
+        counts = _simulated_recording(4000, seed=100 + seed)
+        timestamps = _minute_timestamps(len(counts))
+        expected = np.zeros(len(counts), dtype=int)
+        for period in _reference_choi_loop(counts, timestamps):
+            expected[period.start_index : period.end_index + 1] = 1
+        assert ChoiAlgorithm().detect_mask(counts) == expected.tolist()
+        assert detect_nonwear_mask(counts).tolist() == expected.tolist()
+
+    def test_spikes_within_tolerance_are_bridged(self) -> None:
+        """Test a zero run with two isolated spikes is a single period."""
+        counts = np.zeros(200)
+        counts[50] = 10
+        counts[120] = 10
+        periods = detect_nonwear(counts, _minute_timestamps(len(counts)))
+        assert [(p.start_index, p.end_index) for p in periods] == [(0, 199)]
+
+    def test_spike_burst_breaks_period(self) -> None:
+        """Test a burst of more than SPIKE_TOLERANCE epochs splits the zero run."""
+        counts = np.zeros(300)
+        counts[100:104] = 50
+        timestamps = _minute_timestamps(len(counts))
+        assert _period_tuples(detect_nonwear(counts, timestamps)) == _period_tuples(_reference_choi_loop(counts, timestamps))
+
+    def test_run_shorter_than_minimum(self) -> None:
+        """Test zero runs shorter than MIN_PERIOD_LENGTH produce nothing."""
+        counts = np.full(300, 100.0)
+        counts[10 : 10 + MIN_PERIOD_LENGTH - 1] = 0
+        assert detect_nonwear(counts, _minute_timestamps(len(counts))) == []
+        assert not detect_nonwear_mask(counts).any()
+
+    def test_dataframe_api_matches_reference(self) -> None:
+        """Test choi_detect_nonwear column matches reference mask."""
+        counts = _simulated_recording(3000, seed=42)
+        timestamps = _minute_timestamps(len(counts))
+        df = pd.DataFrame({"datetime": pd.to_datetime(timestamps), "Vector Magnitude": counts})
+        expected = np.zeros(len(counts), dtype=int)
+        for period in _reference_choi_loop(counts, timestamps):
+            expected[period.start_index : period.end_index + 1] = 1
+        result = choi_detect_nonwear(df, ActivityColumn.VECTOR_MAGNITUDE)
+        assert result["Choi Nonwear"].tolist() == expected.tolist()
+
+    def test_mask_rejects_invalid_values(self) -> None:
+        """Test detect_mask keeps validating NaN and negative counts."""
+        with pytest.raises(ValueError, match="NaN"):
+            ChoiAlgorithm().detect_mask([0.0, float("nan")])
+        with pytest.raises(ValueError, match="negative"):
+            ChoiAlgorithm().detect_mask([0.0, -1.0])
+
+    def test_empty_input(self) -> None:
+        """Test empty input returns empty results."""
+        assert detect_nonwear([], []) == []
+        assert ChoiAlgorithm().detect_mask([]) == []
+
+
+@pytest.mark.slow
+class TestChoiBenchmark:
+    """Benchmark the engine against the original scan."""
+
+    def test_benchmark_30_day_recording(self) -> None:
+        """Time a simulated 30-day, 1-minute-epoch recording with the scan and with the engine, which must agree."""
+        counts = _simulated_recording(30 * 1440, seed=2024)
+        timestamps = _minute_timestamps(len(counts))
+
+        start = time.perf_counter()
+        reference = _reference_choi_loop(counts, timestamps)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        periods = detect_nonwear(counts, timestamps)
+        engine_time = time.perf_counter() - start
+
+        assert _period_tuples(periods) == _period_tuples(reference)
+        print(f"\nChoi {len(counts)} epochs: loop {loop_time * 1000:.1f} ms, engine {engine_time * 1000:.1f} ms")
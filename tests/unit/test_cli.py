@@ -0,0 +1,198 @@
+"""
+Unit tests for the headless sleep-scoring command-line interface.
+
+Verifies that each subcommand writes the same results in-process and through the
+process pool, that results stream through ExportWriter with atomic completion,
+and that the CLI runs without PyQt.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.cli.app import main
+from sleep_scoring_app.cli.commands import NONWEAR_RESULT_COLUMNS
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, detect_nonwear, iter_auto_score_activity_epoch_files
+from sleep_scoring_app.core.constants import DatabaseTable, FeatureFlags
+from sleep_scoring_app.data import database as database_module
+from sleep_scoring_app.data.activity_blocks import has_activity_blocks
+from sleep_scoring_app.data.database import DatabaseManager
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEMO_ACTIGRAPH_FILE = PROJECT_ROOT / "demo_data" / "activity" / "DEMO-001_T1_G1_actigraph.csv"
+N_PARTICIPANTS = 3
+
+
+@pytest.fixture
+def study(tmp_path: Path) -> tuple[Path, Path]:
+    """Directory of epoch CSV files (one night each) and a matching sleep diary."""
+    activity_dir = tmp_path / "study"
+    activity_dir.mkdir()
+    rng = np.random.default_rng(0)
+    for index in range(N_PARTICIPANTS):
+        times = pd.date_range("2024-01-01 12:00", periods=1440, freq="60s")
+        axis1 = rng.integers(0, 300, size=len(times)).astype(float)
+        night = (times.hour >= 22) | (times.hour < 7)
+        axis1[night] = rng.integers(0, 5, size=night.sum())
+        vector_magnitude = axis1 * 1.3
+        vector_magnitude[200 + 20 * index : 340 + 20 * index] = 0  # Nonwear block
+        pd.DataFrame({"datetime": times, "Axis1": axis1, "Vector Magnitude": vector_magnitude}).to_csv(
+            activity_dir / f"DEMO-00{index + 1}_2024-01-01.csv", index=False
+        )
+
+    diary_file = tmp_path / "diary.csv"
+    pd.DataFrame(
+        {
+            "participant_id": [f"DEMO-00{index + 1}" for index in range(N_PARTICIPANTS)],
+            "date": ["2024-01-01"] * N_PARTICIPANTS,
+            "sleep_onset_time": ["22:00"] * N_PARTICIPANTS,
+            "sleep_offset_time": ["07:00"] * N_PARTICIPANTS,
+        }
+    ).to_csv(diary_file, index=False)
+    return activity_dir, diary_file
+
+
+def _read_csv_rows(path: Path) -> list[dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestCommands:
+    """Subcommands give the same results in-process and in the process pool."""
+
+    @pytest.mark.slow
+    def test_score_parallel_matches_sequential(self, study: tuple[Path, Path], tmp_path: Path) -> None:
+        """Test scoring with workers writes the same periods as the in-process run."""
+        activity_dir, diary_file = study
+        outputs = {}
+        for workers in (1, 2):
+            output = tmp_path / f"scores_{workers}.csv"
+            assert main(["score", str(activity_dir), "--diary", str(diary_file), "-o", str(output), "--workers", str(workers)]) == 0
+            rows = _read_csv_rows(output)
+            for row in rows:
+                row.pop("Saved At", None)
+            outputs[workers] = sorted(rows, key=lambda row: row["filename"])
+
+        assert len(outputs[1]) == N_PARTICIPANTS
+        assert outputs[2] == outputs[1]
+
+    def test_iter_auto_score_reports_per_file_errors(self, study: tuple[Path, Path]) -> None:
+        """Test a broken file is reported in its result while the others are scored."""
+        activity_dir, diary_file = study
+        (activity_dir / "DEMO-009_2024-01-01.csv").write_text("no datetime here\n1\n")
+
+        results = {result.activity_file.name: result for result in iter_auto_score_activity_epoch_files(str(activity_dir), str(diary_file))}
+
+        assert len(results) == N_PARTICIPANTS + 1
+        assert results["DEMO-009_2024-01-01.csv"].sleep_metrics is None
+        assert all(results[f"DEMO-00{index + 1}_2024-01-01.csv"].sleep_metrics for index in range(N_PARTICIPANTS))
+        assert all(results[f"DEMO-00{index + 1}_2024-01-01.csv"].epochs == 1440 for index in range(N_PARTICIPANTS))
+
+    def test_iter_auto_score_reports_pool_errors(self, study: tuple[Path, Path]) -> None:
+        """Test work that cannot be sent to a worker is reported per file instead of ending the run."""
+        activity_dir, diary_file = study
+        sleep_algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+        sleep_algorithm.unpicklable = lambda: None
+
+        results = list(iter_auto_score_activity_epoch_files(str(activity_dir), str(diary_file), sleep_algorithm=sleep_algorithm, max_workers=2))
+
+        assert len(results) == N_PARTICIPANTS
+        assert all(result.sleep_metrics is None and result.error for result in results)
+
+    def test_score_reports_epoch_throughput(self, study: tuple[Path, Path], tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test the score summary includes epochs per second."""
+        activity_dir, diary_file = study
+        assert main(["score", str(activity_dir), "--diary", str(diary_file), "-o", str(tmp_path / "scores.csv"), "--workers", "1"]) == 0
+        assert "epochs/s" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_detect_nonwear_matches_algorithm(self, study: tuple[Path, Path], tmp_path: Path, workers: int) -> None:
+        """Test nonwear periods written by the CLI equal detect_nonwear on each file."""
+        activity_dir, _ = study
+        output = tmp_path / "nonwear.json"
+        assert main(["detect-nonwear", str(activity_dir), "-o", str(output), "--workers", str(workers)]) == 0
+
+        expected = []
+        for path in sorted(activity_dir.glob("*.csv")):
+            df = pd.read_csv(path, parse_dates=["datetime"])
+            for period in detect_nonwear(df["Vector Magnitude"].to_numpy(), df["datetime"].tolist()):
+                expected.append((path.name, period.start_time.isoformat(), period.end_time.isoformat(), period.duration_minutes))
+
+        rows = json.loads(output.read_text())
+        assert sorted((row["filename"], row["start_time"], row["end_time"], row["duration_minutes"]) for row in rows) == expected
+        assert len(expected) == N_PARTICIPANTS
+
+    def test_no_nonwear_writes_empty_parquet(self, tmp_path: Path) -> None:
+        """Test a run that finds no nonwear still writes a Parquet file with the result columns."""
+        pytest.importorskip("pyarrow")
+        activity_file = tmp_path / "DEMO-001_2024-01-01.csv"
+        times = pd.date_range("2024-01-01 12:00", periods=600, freq="60s")
+        pd.DataFrame({"datetime": times, "Axis1": 50.0, "Vector Magnitude": 80.0}).to_csv(activity_file, index=False)
+        output = tmp_path / "nonwear.parquet"
+
+        assert main(["detect-nonwear", str(activity_file), "-o", str(output), "--workers", "1"]) == 0
+
+        table = pd.read_parquet(output)
+        assert table.columns.tolist() == list(NONWEAR_RESULT_COLUMNS)
+        assert table.empty
+
+    @pytest.mark.skipif(not DEMO_ACTIGRAPH_FILE.exists(), reason="Demo data not available")
+    def test_import_then_export(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test import stores the file and its precomputed scores in the database and a rerun skips it."""
+        monkeypatch.setattr(database_module, "_database_initialized", False)
+        db_path = tmp_path / "study.db"
+
+        assert main(["import", str(DEMO_ACTIGRAPH_FILE), "--db", str(db_path), "--precompute-scoring"]) == 0
+        db_manager = DatabaseManager(db_path)
+        filename = db_manager.get_available_files()[0]["filename"]
+        assert DEMO_ACTIGRAPH_FILE.name in filename
+        algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+        assert db_manager.load_epoch_scores(filename, algorithm.identifier, algorithm.get_parameters()) is not None
+        assert main(["import", str(DEMO_ACTIGRAPH_FILE), "--db", str(db_path)]) == 0
+
+        output = tmp_path / "export.csv"
+        assert main(["export", "--db", str(db_path), "-o", str(output)]) == 0
+
+    @pytest.mark.skipif(not DEMO_ACTIGRAPH_FILE.exists(), reason="Demo data not available")
+    def test_migrate_storage(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test migrate-storage moves a file imported as per-epoch rows into columnar blocks."""
+        monkeypatch.setattr(database_module, "_database_initialized", False)
+        monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", False)
+        db_path = tmp_path / "study.db"
+        assert main(["import", str(DEMO_ACTIGRAPH_FILE), "--db", str(db_path)]) == 0
+        monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", True)
+        capsys.readouterr()
+
+        assert main(["migrate-storage", "--db", str(db_path)]) == 0
+
+        assert "Migrated 1/1 files" in capsys.readouterr().out
+        with DatabaseManager(db_path)._get_connection() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.RAW_ACTIVITY_DATA}").fetchone()[0] == 0
+            assert has_activity_blocks(conn, DEMO_ACTIGRAPH_FILE.name)
+
+    def test_missing_input_fails(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test a missing input reports an error and a non-zero exit code."""
+        assert main(["detect-nonwear", str(tmp_path / "missing"), "-o", str(tmp_path / "out.csv")]) == 2
+        assert "Input not found" in capsys.readouterr().err
+
+
+def test_runs_without_pyqt(study: tuple[Path, Path], tmp_path: Path) -> None:
+    """Test the CLI imports and runs with PyQt unavailable."""
+    activity_dir, _ = study
+    script = (
+        "import sys; sys.modules['PyQt6'] = None\n"
+        "from sleep_scoring_app.cli.app import main\n"
+        f"sys.exit(main(['detect-nonwear', {str(activity_dir)!r}, '-o', {str(tmp_path / 'nonwear.csv')!r}, '--workers', '1']))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True, check=False)
+
+    assert result.returncode == 0, result.stderr
+    assert len(_read_csv_rows(tmp_path / "nonwear.csv")) == N_PARTICIPANTS
@@ -0,0 +1,144 @@
+"""
+Unit tests for the convolution-based Cole-Kripke (1992) scoring kernel.
+
+Verifies that the correlation implementation is identical to the original
+per-epoch loop (zero padding at both ends), through the array and DataFrame
+APIs, that generic weighted-window kernels register with the factory, and
+benchmarks the kernel against the loop.
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, WeightedWindowKernel, weighted_window_sum
+from sleep_scoring_app.core.algorithms.cole_kripke import (
+    ACTIVITY_CAP,
+    ACTIVITY_SCALE,
+    COLE_KRIPKE_KERNEL,
+    SCALING_FACTOR,
+    THRESHOLD,
+    WINDOW_SIZE,
+    ColeKripkeAlgorithm,
+    cole_kripke_score,
+    score_activity_cole_kripke,
+)
+
+
+def _reference_cole_kripke_loop(activity_data: np.ndarray) -> list[int]:
+    """Original per-epoch Cole-Kripke loop, kept as the parity reference."""
+    scaled_activity = np.minimum(np.asarray(activity_data, dtype=np.float64) / ACTIVITY_SCALE, ACTIVITY_CAP)
+    sleep_wake_scores = np.zeros(len(scaled_activity), dtype=int)
+    padded_activity = np.pad(scaled_activity, pad_width=(4, 2), mode="constant", constant_values=0)
+    coefficients = np.array([106, 54, 58, 76, 230, 74, 67])
+
+    for i in range(len(scaled_activity)):
+        window = padded_activity[i : i + WINDOW_SIZE]
+        sleep_index = SCALING_FACTOR * np.dot(coefficients, window)
+        sleep_wake_scores[i] = 1 if sleep_index < THRESHOLD else 0
+
+    return sleep_wake_scores.tolist()
+
+
+def _simulated_counts(n_epochs: int, seed: int = 42) -> np.ndarray:
+    """Generate integer counts with long quiet stretches and active bursts."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(0, 60, size=n_epochs).astype(np.float64)
+    active = rng.random(n_epochs) < 0.3
+    counts[active] = rng.integers(100, 40000, size=int(active.sum()))
+    return counts
+
+
+class TestColeKripkeConvolutionParity:
+    """Correlation kernel must reproduce the loop implementation exactly."""
+
+    @pytest.mark.parametrize("n_epochs", [1, 2, 3, 6, 7, 8, 100, 2881])
+    def test_parity_integer_counts(self, n_epochs: int) -> None:
+        """Test parity on integer counts at and around the window size (boundary padding)."""
+        counts = _simulated_counts(n_epochs)
+        assert score_activity_cole_kripke(counts) == _reference_cole_kripke_loop(counts)
+
+    def test_parity_fractional_and_capped_counts(self) -> None:
+        """Test parity for non-integer counts and counts above the cap."""
+        rng = np.random.default_rng(123)
+        counts = rng.random(10000) * rng.choice([1.0, 150.0, 500.0, 50000.0], size=10000)
+        assert score_activity_cole_kripke(counts) == _reference_cole_kripke_loop(counts)
+
+    def test_dataframe_api_matches_reference(self) -> None:
+        """Test cole_kripke_score column matches the loop reference."""
+        counts = _simulated_counts(1440, seed=3)
+        df = pd.DataFrame({"datetime": pd.date_range("2024-01-01 12:00:00", periods=len(counts), freq="60s"), "Axis1": counts})
+
+        assert cole_kripke_score(df)["Sleep Score"].tolist() == _reference_cole_kripke_loop(counts)
+
+    def test_score_array_matches_reference(self) -> None:
+        """Test ColeKripkeAlgorithm.score_array and the generic kernel match the reference."""
+        counts = _simulated_counts(3000, seed=11)
+        expected = _reference_cole_kripke_loop(counts)
+
+        assert ColeKripkeAlgorithm().score_array(counts) == expected
+        assert COLE_KRIPKE_KERNEL.score(counts).tolist() == expected
+
+    def test_invalid_counts_rejected(self) -> None:
+        """Test NaN and negative counts are still rejected."""
+        with pytest.raises(ValueError, match="NaN"):
+            score_activity_cole_kripke([1.0, np.nan])
+        with pytest.raises(ValueError, match="negative values at indices: \\[1\\]"):
+            score_activity_cole_kripke([1.0, -1.0])
+        assert score_activity_cole_kripke([]) == []
+
+
+class TestWeightedWindowKernel:
+    """Generic kernel for linear-filter algorithms."""
+
+    def test_window_sum_zero_pads_both_ends(self) -> None:
+        """Test each epoch's sum covers lags before and leads after it, with zeros past the ends."""
+        values = np.array([1.0, 2.0, 3.0, 4.0])
+
+        result = weighted_window_sum(values, np.array([10.0, 1.0, 100.0]), lags=1)
+
+        assert result.tolist() == [0 + 1 + 200, 10 + 2 + 300, 20 + 3 + 400, 30 + 4 + 0]
+
+    def test_invalid_lags_rejected(self) -> None:
+        """Test a window without the current epoch is rejected."""
+        with pytest.raises(ValueError, match="lags"):
+            WeightedWindowKernel(weights=(1.0, 2.0), lags=2)
+
+    def test_registered_kernel_scores_through_factory(self) -> None:
+        """Test a kernel registered with the factory is created and scores like the kernel itself."""
+        kernel = WeightedWindowKernel(weights=(0.5, 1.0, 0.5), lags=1, scale=0.01, threshold=1.0)
+        AlgorithmFactory.register_weighted_window_algorithm("test_linear_filter", "Test Linear Filter", kernel)
+        try:
+            algorithm = AlgorithmFactory.create("test_linear_filter")
+            counts = _simulated_counts(500)
+
+            assert algorithm.identifier == "test_linear_filter"
+            assert algorithm.name == "Test Linear Filter"
+            assert algorithm.score_array(counts) == kernel.score(counts).tolist()
+            assert algorithm.get_parameters()["weights"] == (0.5, 1.0, 0.5)
+        finally:
+            AlgorithmFactory._registry.pop("test_linear_filter", None)
+
+
+@pytest.mark.slow
+class TestColeKripkeBenchmark:
+    """Benchmark the correlation kernel against the loop reference."""
+
+    def test_benchmark_against_loop(self) -> None:
+        """Time scoring a 3-week recording with the loop and with the correlation, which must agree."""
+        counts = _simulated_counts(21 * 1440)
+
+        start = time.perf_counter()
+        loop_scores = _reference_cole_kripke_loop(counts)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        kernel_scores = score_activity_cole_kripke(counts)
+        vectorized_time = time.perf_counter() - start
+
+        assert kernel_scores == loop_scores
+        print(f"\nCole-Kripke {len(counts)} epochs: loop {loop_time * 1000:.1f} ms, convolution {vectorized_time * 1000:.1f} ms")
@@ -0,0 +1,217 @@
+"""
+Unit tests for the per-thread SQLite connection pool.
+
+Verifies that DatabaseManager._get_connection, which reuses one connection per
+thread, behaves like the original fresh connection per call: PRAGMAs are set,
+uncommitted work is rolled back and row factories are reset when an operation
+ends, nested operations get their own connection and transaction, threads do
+not share connections, a connection is replaced after an error, and closing the
+pool leaves connections in use open until their operation ends. Also benchmarks
+the per-call overhead of both.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable
+from sleep_scoring_app.core.exceptions import DatabaseError
+from tests.unit.conftest import register_file
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from sleep_scoring_app.data.database import DatabaseManager
+
+
+@contextmanager
+def _reference_connection(db_path: Path) -> Generator[sqlite3.Connection, None, None]:
+    """Original _get_connection: a new connection with its PRAGMAs on every call, kept as the benchmark reference."""
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        yield conn
+    finally:
+        if conn:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
+
+
+def _registered(db_manager: DatabaseManager) -> list[str]:
+    with db_manager._get_connection() as conn:
+        return [row[0] for row in conn.execute(f"SELECT {DatabaseColumn.FILENAME} FROM {DatabaseTable.FILE_REGISTRY} ORDER BY 1")]
+
+
+class TestConnectionReuse:
+    """A thread's operations share one connection set up once."""
+
+    def test_reused_with_pragmas(self, db_manager: DatabaseManager) -> None:
+        """Test consecutive operations get the same connection with the pool's settings."""
+        opened = db_manager.connection_pool_stats().opened
+        with db_manager._get_connection() as first:
+            assert first.execute("PRAGMA foreign_keys").fetchone() == (1,)
+            assert first.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+            assert first.execute("PRAGMA cache_size").fetchone()[0] < 0
+        with db_manager._get_connection() as second:
+            pass
+
+        assert second is first
+        stats = db_manager.connection_pool_stats()
+        assert stats.opened == opened
+        assert stats.open == 1
+
+    def test_uncommitted_work_rolled_back(self, db_manager: DatabaseManager) -> None:
+        """Test an operation's uncommitted changes are discarded and its row factory reset, as closing did."""
+        with db_manager._get_connection() as conn:
+            register_file(conn, "kept.csv")
+            conn.commit()
+            register_file(conn, "dropped.csv")
+            conn.row_factory = sqlite3.Row
+
+        with db_manager._get_connection() as conn:
+            assert conn.row_factory is None
+            assert not conn.in_transaction
+        assert _registered(db_manager) == ["kept.csv"]
+
+    def test_nested_operation_has_own_transaction(self, db_manager: DatabaseManager) -> None:
+        """Test a nested operation gets its own connection, outside the outer transaction, which stays open."""
+        with db_manager._get_connection() as outer:
+            register_file(outer, "outer.csv")
+            assert _registered(db_manager) == []
+            assert outer.in_transaction
+            outer.commit()
+
+        assert _registered(db_manager) == ["outer.csv"]
+        assert db_manager.connection_pool_stats().overflow == 1
+
+    def test_error_replaces_connection(self, db_manager: DatabaseManager) -> None:
+        """Test a failed operation rolls back, is reported as a DatabaseError and gets a new connection next time."""
+        used: list[sqlite3.Connection] = []
+
+        def failing_operation() -> None:
+            with db_manager._get_connection() as conn:
+                used.append(conn)
+                register_file(conn, "partial.csv")
+                conn.execute("SELECT * FROM missing_table")
+
+        with pytest.raises(DatabaseError):
+            failing_operation()
+
+        with db_manager._get_connection() as conn:
+            assert conn is not used[0]
+        assert _registered(db_manager) == []
+        assert db_manager.connection_pool_stats().discarded == 1
+
+    def test_unpooled_and_closed_connections(self, db_manager: DatabaseManager) -> None:
+        """Test unpooled connections are closed on exit and closed pools reopen on demand."""
+        with db_manager._get_connection(pooled=False) as dedicated:
+            dedicated.execute("PRAGMA synchronous = OFF")
+        with pytest.raises(sqlite3.ProgrammingError):
+            dedicated.execute("SELECT 1")
+
+        with db_manager._get_connection() as pooled:
+            assert pooled.execute("PRAGMA synchronous").fetchone() != (0,)
+        db_manager.close_connections()
+        assert db_manager.connection_pool_stats().open == 0
+        assert _registered(db_manager) == []
+        assert db_manager.connection_pool_stats().open == 1
+
+
+class TestThreadConnections:
+    """Threads never share a connection."""
+
+    def test_one_connection_per_thread(self, db_manager: DatabaseManager) -> None:
+        """Test concurrent writers each use and reuse their own connection."""
+        connections: dict[int, set[int]] = {}
+        barrier = threading.Barrier(4)
+
+        def work(index: int) -> None:
+            barrier.wait()
+            for n in range(20):
+                with db_manager._get_connection() as conn:
+                    connections.setdefault(index, set()).add(id(conn))
+                    register_file(conn, f"t{index}_{n}.csv")
+                    conn.commit()
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(len(ids) == 1 for ids in connections.values())
+        assert len(set().union(*connections.values())) == 4
+        assert len(_registered(db_manager)) == 80
+
+    def test_close_during_query(self, db_manager: DatabaseManager) -> None:
+        """Test closing the pool while another thread runs a query closes that connection only once the query ends."""
+        in_query = threading.Event()
+        closed = threading.Event()
+        results: dict[str, object] = {}
+
+        def query() -> None:
+            with db_manager._get_connection() as conn:
+                register_file(conn, "before.csv")
+                in_query.set()
+                closed.wait()
+                register_file(conn, "after.csv")
+                conn.commit()
+                results["connection"] = conn
+            with db_manager._get_connection() as reopened:
+                results["reopened"] = reopened
+
+        with db_manager._get_connection() as idle:
+            pass
+        thread = threading.Thread(target=query)
+        thread.start()
+        in_query.wait()
+        db_manager.close_connections()
+        closed.set()
+        thread.join()
+
+        assert _registered(db_manager) == ["after.csv", "before.csv"]
+        with pytest.raises(sqlite3.ProgrammingError):
+            idle.execute("SELECT 1")
+        with pytest.raises(sqlite3.ProgrammingError):
+            results["connection"].execute("SELECT 1")
+        assert results["reopened"] is not results["connection"]
+
+
+@pytest.mark.slow
+class TestConnectionPoolBenchmark:
+    """Benchmark the per-call overhead of getting a connection."""
+
+    def test_benchmark_per_call_overhead(self, db_manager: DatabaseManager) -> None:
+        """Time 2000 single-query operations on fresh connections and on the pool, which must read the same rows."""
+        with db_manager._get_connection() as conn:
+            for index in range(10):
+                register_file(conn, f"P{index}.csv")
+            conn.commit()
+        query = f"SELECT {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_ID} FROM {DatabaseTable.FILE_REGISTRY} ORDER BY 1"
+
+        start = time.perf_counter()
+        for _ in range(2000):
+            with _reference_connection(db_manager.db_path) as conn:
+                reference_rows = conn.execute(query).fetchall()
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(2000):
+            with db_manager._get_connection() as conn:
+                pooled_rows = conn.execute(query).fetchall()
+        pooled_time = time.perf_counter() - start
+
+        print(f"\nPer operation: fresh connection {reference_time * 500:.0f} us, pooled {pooled_time * 500:.0f} us")
+        print(db_manager.connection_pool_stats())
+        assert len(reference_rows) == 10
+        assert pooled_rows == reference_rows
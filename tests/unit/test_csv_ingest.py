@@ -0,0 +1,290 @@
+"""
+Unit tests for typed CSV ingest.
+
+Verifies that the typed read (planned columns, explicit dtypes, one detected
+datetime format) gives exactly what the original inferring read gave, both for
+CSVDataSourceLoader.load_file and ActivityFileParser.prepare_file, that files
+the plan does not fit fall back to the inferring read, and that parse
+throughput is reported. Also benchmarks the typed read against the inferring read.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.algorithms.csv_datasource import CSVDataSourceLoader
+from sleep_scoring_app.core.algorithms.csv_ingest import parse_datetimes, plan_typed_read, pyarrow_available, read_csv_typed
+from sleep_scoring_app.core.constants import DatabaseColumn, DevicePreset
+from sleep_scoring_app.services.format_detector import FormatDetector
+from sleep_scoring_app.services.import_parser import ActivityFileParser
+
+DEMO_ACTIGRAPH_FILE = Path(__file__).parent.parent.parent / "demo_data" / "activity" / "DEMO-001_T1_G1_actigraph.csv"
+
+ACTIGRAPH_HEADER = [
+    "------------ Data File Created By ActiGraph GT3X+ ActiLife v6.13.3 Firmware v2.5.0 date format M/d/yyyy at 30 Hz  Filter Normal -----------",
+    "Serial Number: TEST123",
+    "Start Time 08:00:00",
+    "Start Date 1/15/2024",
+    "Epoch Period (hh:mm:ss) 00:01:00",
+    "Download Time 08:30:00",
+    "Download Date 1/16/2024",
+    "Current Memory Address: 0",
+    "Current Battery Voltage: 4.22     Mode = 12",
+    "--------------------------------------------------",
+]
+
+
+def _actigraph_csv(path: Path, n_rows: int, seed: int = 0, header: bool = True) -> Path:
+    """ActiGraph-style export with M/d/yyyy dates, unused columns and a few missing counts."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-15 08:00", periods=n_rows, freq="60s")
+    df = pd.DataFrame({"Date": [f"{t.month}/{t.day}/{t.year}" for t in times], " Time": times.strftime("%H:%M:%S")})
+    for column in ("Axis1", "Axis2", "Axis3", "Steps", "Lux", "Inclinometer Off"):
+        df[column] = rng.integers(0, 500, size=n_rows).astype(float)
+    df["Vector Magnitude"] = np.round(rng.random(n_rows) * 700, 2)
+    for column in ("Axis2", "Vector Magnitude"):
+        df.loc[rng.random(n_rows) < 0.02, column] = np.nan
+    with open(path, "w") as f:
+        if header:
+            f.write("\n".join(ACTIGRAPH_HEADER) + "\n")
+        df.to_csv(f, index=False)
+    return path
+
+
+def _combined_csv(path: Path, values: list[str], column: str = "timestamp") -> Path:
+    pd.DataFrame({column: values, "Vector Magnitude": np.arange(len(values), dtype=float)}).to_csv(path, index=False)
+    return path
+
+
+def _assert_prepared_equal(fast, legacy) -> None:
+    assert fast.error == legacy.error
+    assert fast.timestamps == legacy.timestamps
+    assert fast.total_records == legacy.total_records
+    assert fast.columns.keys() == legacy.columns.keys()
+    for column, values in legacy.columns.items():
+        if values is None:
+            assert fast.columns[column] is None
+        else:
+            np.testing.assert_array_equal(fast.columns[column], values)
+
+
+def _assert_loaded_equal(fast: dict, legacy: dict) -> None:
+    pd.testing.assert_frame_equal(fast["activity_data"], legacy["activity_data"])
+    assert fast["column_mapping"] == legacy["column_mapping"]
+
+
+class TestDatetimeFormatDetection:
+    """One format for the whole sample, with the device's usual formats first."""
+
+    def test_device_formats_tried_first(self) -> None:
+        """Test ambiguous ActiGraph dates read month first and GENEActiv millisecond timestamps are recognised."""
+        detector = FormatDetector()
+
+        assert detector.detect_datetime_format(["01/02/2024 08:00:00"], DevicePreset.ACTIGRAPH) == "%m/%d/%Y %H:%M:%S"
+        assert detector.detect_datetime_format(["2024-01-15 08:00:00:500"], DevicePreset.GENEACTIV) == "%Y-%m-%d %H:%M:%S:%f"
+        assert detector.detect_datetime_format(["1/15/2024 8:00:00 AM"]) == "%m/%d/%Y %I:%M:%S %p"
+
+    def test_all_samples_must_parse(self) -> None:
+        """Test a later day-first sample rules out the month-first format, and unknown formats give None."""
+        detector = FormatDetector()
+
+        assert detector.detect_datetime_format(["01/02/2024 08:00:00", "13/02/2024 08:00:00"]) == "%d/%m/%Y %H:%M:%S"
+        assert detector.detect_datetime_format(["2024.01.15 08:00"]) is None
+        assert detector.detect_datetime_format([]) is None
+
+
+class TestParseDatetimes:
+    """Parsing distinct date and time values matches parsing every combined string."""
+
+    @pytest.mark.parametrize(
+        ("values", "fmt"),
+        [
+            (["1/15/2024 23:59:00", "1/16/2024 00:00:00", None, "1/16/2024 00:01:00"], "%m/%d/%Y %H:%M:%S"),
+            (["1/15/2024 11:59:00 PM", "1/16/2024 12:00:00 AM"], "%m/%d/%Y %I:%M:%S %p"),
+            (["2024-01-15 08:00:00.250000", "2024-01-15 08:00:01.000000"], "%Y-%m-%d %H:%M:%S.%f"),
+            (["2024-01-15T08:00:00", "2024-01-15T08:01:00"], "%Y-%m-%dT%H:%M:%S"),
+        ],
+        ids=["date_time", "am_pm", "fractional", "iso_t"],
+    )
+    def test_matches_combined_parse(self, values: list[str | None], fmt: str) -> None:
+        """Test combined and split date/time columns give the same timestamps as to_datetime on the strings."""
+        combined = pd.DataFrame({"timestamp": values}, dtype=object)
+        expected = pd.Series(pd.to_datetime(combined["timestamp"], format=fmt))
+
+        pd.testing.assert_series_equal(parse_datetimes(combined, ["timestamp"], fmt), expected, check_names=False)
+        if " " in fmt:
+            split = combined["timestamp"].str.split(" ", n=1, expand=True)
+            separate = pd.DataFrame({"Date": split[0], "Time": split[1]})
+            pd.testing.assert_series_equal(parse_datetimes(separate, ["Date", "Time"], fmt), expected, check_names=False)
+
+    def test_mismatch_raises(self) -> None:
+        """Test a value outside the format raises instead of being guessed."""
+        df = pd.DataFrame({"Date": ["01/02/2024", "13/02/2024"], "Time": ["08:00:00", "08:01:00"]})
+
+        with pytest.raises(ValueError, match="doesn't match format"):
+            parse_datetimes(df, ["Date", "Time"], "%m/%d/%Y %H:%M:%S")
+
+
+class TestTypedRead:
+    """Planned columns and dtypes."""
+
+    def test_plan_and_read(self, tmp_path: Path) -> None:
+        """Test only the planned columns are read, values as float64, regardless of chunk size or engine."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 500)
+
+        plan = plan_typed_read(path, 10, ["Date", " Time"], ["Axis1", "Vector Magnitude"], FormatDetector())
+        df, stats = read_csv_typed(path, 10, plan)
+        chunked, _ = read_csv_typed(path, 10, plan, chunk_rows=7, use_pyarrow=False)
+        auto, auto_stats = read_csv_typed(path, 10, plan, use_pyarrow=True)
+
+        assert plan.device == DevicePreset.ACTIGRAPH
+        assert plan.datetime_format == "%m/%d/%Y %H:%M:%S"
+        assert list(df.columns) == ["Date", " Time", "Axis1", "Vector Magnitude"]
+        assert df["Axis1"].dtype == np.float64
+        assert stats.rows == 500
+        assert stats.rows_per_second > 0
+        pd.testing.assert_frame_equal(chunked, df)
+        pd.testing.assert_frame_equal(auto[df.columns], df)
+        assert auto_stats.engine == ("pyarrow" if pyarrow_available() else "c")
+
+    def test_no_plan_without_known_format(self, tmp_path: Path) -> None:
+        """Test files whose datetimes fit no known format get no plan."""
+        path = _combined_csv(tmp_path / "dots.csv", ["2024.01.15 08:00", "2024.01.15 08:01"])
+
+        assert plan_typed_read(path, 0, ["timestamp"], ["Vector Magnitude"], FormatDetector()) is None
+
+
+class TestIngestParity:
+    """The typed read loads exactly what the inferring read loaded."""
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_parser_actigraph(self, tmp_path: Path, seed: int) -> None:
+        """Test prepared arrays and ISO timestamps match for ActiGraph exports, and throughput is reported."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 3000, seed)
+
+        fast = ActivityFileParser().prepare_file(path, 10)
+        legacy = ActivityFileParser(fast_ingest=False).prepare_file(path, 10)
+
+        _assert_prepared_equal(fast, legacy)
+        assert fast.rows_per_second > 0
+        assert legacy.rows_per_second is None
+
+    def test_loader_actigraph(self, tmp_path: Path) -> None:
+        """Test the standardized frame matches and metadata reports rows per second."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 3000)
+
+        fast = CSVDataSourceLoader(format_detector=FormatDetector()).load_file(path)
+        legacy = CSVDataSourceLoader(fast_ingest=False).load_file(path)
+
+        _assert_loaded_equal(fast, legacy)
+        assert fast["metadata"]["rows_per_second"] > 0
+
+    def test_loader_without_detector(self, tmp_path: Path) -> None:
+        """Test a loader given no format detector reads with full type inference."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 300)
+
+        loaded = CSVDataSourceLoader().load_file(path)
+
+        _assert_loaded_equal(loaded, CSVDataSourceLoader(fast_ingest=False).load_file(path))
+        assert "rows_per_second" not in loaded["metadata"]
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            [f"2024-01-15 {h:02d}:{m:02d}:00" for h in range(24) for m in range(0, 60, 10)],
+            [f"2024-01-15T{h:02d}:{m:02d}:00" for h in range(24) for m in range(0, 60, 10)],
+            [f"1/15/2024 {h % 12 or 12}:{m:02d}:00 {'AM' if h < 12 else 'PM'}" for h in range(24) for m in range(0, 60, 10)],
+        ],
+        ids=["iso_space", "iso_t", "am_pm"],
+    )
+    def test_combined_datetime_column(self, tmp_path: Path, values: list[str]) -> None:
+        """Test files with a single datetime column load identically through both paths."""
+        path = _combined_csv(tmp_path / "combined.csv", values)
+
+        _assert_prepared_equal(ActivityFileParser().prepare_file(path, 0), ActivityFileParser(fast_ingest=False).prepare_file(path, 0))
+        _assert_loaded_equal(
+            CSVDataSourceLoader(format_detector=FormatDetector()).load_file(path, 0), CSVDataSourceLoader(fast_ingest=False).load_file(path, 0)
+        )
+
+    def test_custom_columns(self, tmp_path: Path) -> None:
+        """Test user-mapped columns are read and stored identically."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 1000, header=False)
+        custom = {"date": "Date", "time": " Time", "activity": "Axis1", "axis_y": "Axis1", "axis_x": "Axis2", "axis_z": "Axis3"}
+
+        _assert_prepared_equal(
+            ActivityFileParser().prepare_file(path, 0, custom),
+            ActivityFileParser(fast_ingest=False).prepare_file(path, 0, custom),
+        )
+        _assert_loaded_equal(
+            CSVDataSourceLoader(format_detector=FormatDetector()).load_file(path, 0, custom),
+            CSVDataSourceLoader(fast_ingest=False).load_file(path, 0, custom),
+        )
+
+    @pytest.mark.skipif(not DEMO_ACTIGRAPH_FILE.exists(), reason="Demo data not available")
+    def test_demo_file(self) -> None:
+        """Test the bundled ActiGraph demo export takes the typed path with identical results."""
+        fast = ActivityFileParser().prepare_file(DEMO_ACTIGRAPH_FILE, 10)
+
+        _assert_prepared_equal(fast, ActivityFileParser(fast_ingest=False).prepare_file(DEMO_ACTIGRAPH_FILE, 10))
+        assert fast.rows_per_second is not None
+
+
+class TestFallback:
+    """Files the typed read does not fit load through the inferring read."""
+
+    def test_non_numeric_counts(self, tmp_path: Path) -> None:
+        """Test a text value in a count column falls back and fails the file, as the inferring read did."""
+        path = _actigraph_csv(tmp_path / "P1.csv", 200, header=False)
+        df = pd.read_csv(path, dtype=str)
+        df.loc[50, "Vector Magnitude"] = "--"
+        df.to_csv(path, index=False)
+
+        fast = ActivityFileParser().prepare_file(path, 0)
+
+        _assert_prepared_equal(fast, ActivityFileParser(fast_ingest=False).prepare_file(path, 0))
+        assert fast.rows_per_second is None
+        assert "Column 'Vector Magnitude' has non-numeric values" in fast.error
+
+    def test_format_change_after_sample(self, tmp_path: Path) -> None:
+        """Test timestamps that stop matching the sampled format fall back and fail exactly as the inferring read did."""
+        times = pd.date_range("2024-01-01", periods=200, freq="60min")
+        values = [t.strftime("%Y-%m-%d %H:%M:%S") for t in times[:100]] + [t.strftime("%Y-%m-%dT%H:%M:%S") for t in times[100:]]
+        path = _combined_csv(tmp_path / "mixed.csv", values)
+
+        fast = ActivityFileParser().prepare_file(path, 0)
+
+        _assert_prepared_equal(fast, ActivityFileParser(fast_ingest=False).prepare_file(path, 0))
+        assert fast.error == "Failed to process timestamps in mixed.csv"
+        with pytest.raises(ValueError, match="doesn't match format"):
+            CSVDataSourceLoader(format_detector=FormatDetector()).load_file(path, 0)
+
+
+@pytest.mark.slow
+class TestIngestBenchmark:
+    """Benchmark the typed read against the inferring read."""
+
+    def test_benchmark_year_of_epochs(self, tmp_path: Path) -> None:
+        """Time loading a year of minute epochs with the inferring read and with the typed read, which must agree."""
+        path = _actigraph_csv(tmp_path / "year.csv", 525_600)
+        legacy_loader = CSVDataSourceLoader(fast_ingest=False)
+        fast_loader = CSVDataSourceLoader(format_detector=FormatDetector())
+        legacy_loader.max_file_size = fast_loader.max_file_size = path.stat().st_size + 1
+
+        start = time.perf_counter()
+        legacy = legacy_loader.load_file(path)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = fast_loader.load_file(path)
+        fast_time = time.perf_counter() - start
+
+        print(
+            f"\nLoad 525600 epochs: inferred {legacy_time:.2f} s, typed {fast_time:.2f} s "
+            f"({fast['metadata']['rows_per_second']:.0f} rows/s CSV parse)"
+        )
+        _assert_loaded_equal(fast, legacy)
@@ -0,0 +1,181 @@
+"""
+Unit tests for the joined sleep data export query.
+
+Verifies that DatabaseManager.get_all_sleep_data_for_export, which reads sleep
+metrics and diary nap fields with one joined query, returns the same records as
+the original per-night diary lookups, including nights without a diary entry and
+participant dates covered by more than one diary file, and that the export
+command streams the same records. Also benchmarks the joined query against the
+per-night lookups.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from sleep_scoring_app.cli.app import main
+from sleep_scoring_app.core.constants import AlgorithmType, DatabaseColumn, DatabaseTable, MarkerType, ParticipantGroup, ParticipantTimepoint
+from sleep_scoring_app.core.dataclasses import DailySleepMarkers, ParticipantInfo, SleepMetrics, SleepPeriod
+from sleep_scoring_app.data.database import DatabaseManager
+
+
+def _reference_integrate(db_manager: DatabaseManager, metric: SleepMetrics) -> None:
+    """Original per-night diary lookup over a fresh connection, kept as the parity reference."""
+    if not metric.analysis_date:
+        return
+    with db_manager._get_connection(pooled=False) as conn:
+        row = conn.execute(
+            f"""SELECT {DatabaseColumn.NAP_OCCURRED}, {DatabaseColumn.NAP_ONSET_TIME}, {DatabaseColumn.NAP_OFFSET_TIME},
+                       {DatabaseColumn.NAP_ONSET_TIME_2}, {DatabaseColumn.NAP_OFFSET_TIME_2}
+                FROM {DatabaseTable.DIARY_DATA}
+                WHERE {DatabaseColumn.PARTICIPANT_KEY} = ? AND {DatabaseColumn.DIARY_DATE} = ?""",
+            (metric.participant.participant_key, metric.analysis_date),
+        ).fetchone()
+    if row:
+        for field, value in zip(("nap_occurred", "nap_onset_time", "nap_offset_time", "nap_onset_time_2", "nap_offset_time_2"), row, strict=True):
+            metric.set_dynamic_field(field, value)
+
+
+def _reference_export(db_manager: DatabaseManager) -> list[dict]:
+    """Original export: load every metric, then look up its diary entry."""
+    records = []
+    for metric in db_manager.load_sleep_metrics():
+        _reference_integrate(db_manager, metric)
+        records.extend(metric.to_export_dict_list())
+    return records
+
+
+def _save_nights(db_manager: DatabaseManager, n_participants: int, n_nights: int) -> None:
+    """Save one scored night per participant per day, each with a distinct update time."""
+    start = datetime(2024, 3, 1, 22, 30)
+    for participant_index in range(n_participants):
+        participant = ParticipantInfo(
+            numerical_id=str(4000 + participant_index),
+            full_id=f"{4000 + participant_index} T1 G1",
+            group=ParticipantGroup.GROUP_1,
+            timepoint=ParticipantTimepoint.T1,
+        )
+        for night in range(n_nights):
+            onset = start + timedelta(days=night, minutes=participant_index)
+            markers = DailySleepMarkers()
+            markers.period_1 = SleepPeriod(
+                onset_timestamp=onset.timestamp(),
+                offset_timestamp=(onset + timedelta(hours=8)).timestamp(),
+                marker_index=1,
+                marker_type=MarkerType.MAIN_SLEEP,
+            )
+            assert db_manager.save_sleep_metrics(
+                SleepMetrics(
+                    participant=participant,
+                    filename=f"{participant.numerical_id} T1 G1.csv",
+                    analysis_date=(start + timedelta(days=night)).strftime("%Y-%m-%d"),
+                    algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+                    daily_sleep_markers=markers,
+                    onset_time=onset.strftime("%H:%M"),
+                    offset_time=(onset + timedelta(hours=8)).strftime("%H:%M"),
+                    total_sleep_time=420.0 + night,
+                    sleep_efficiency=88.0,
+                    updated_at=(datetime(2024, 6, 1) + timedelta(seconds=participant_index * n_nights + night)).isoformat(),
+                )
+            )
+
+
+def _save_diary(db_manager: DatabaseManager, diary_file: str, entries: list[tuple[str, str, int, str | None]]) -> None:
+    """Store diary rows of (participant id, date, nap occurred, nap onset) from one diary file."""
+    with db_manager._get_connection() as conn:
+        conn.execute(
+            f"""
+            INSERT INTO {DatabaseTable.DIARY_FILE_REGISTRY} (
+                {DatabaseColumn.FILENAME}, {DatabaseColumn.ORIGINAL_PATH}, {DatabaseColumn.PARTICIPANT_ID}, {DatabaseColumn.FILE_HASH}
+            ) VALUES (?, ?, 'all', 'hash')
+            """,
+            (diary_file, f"/diaries/{diary_file}"),
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO {DatabaseTable.DIARY_DATA} (
+                {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_KEY}, {DatabaseColumn.PARTICIPANT_ID},
+                {DatabaseColumn.DIARY_DATE}, {DatabaseColumn.NAP_OCCURRED}, {DatabaseColumn.NAP_ONSET_TIME},
+                {DatabaseColumn.NAP_OFFSET_TIME}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(diary_file, f"{pid}_G1_T1", pid, day, nap, onset, "15:00" if onset else None) for pid, day, nap, onset in entries],
+        )
+        conn.commit()
+
+
+class TestExportParity:
+    """The joined export returns the per-night lookup's records."""
+
+    def test_matches_reference(self, db_manager: DatabaseManager) -> None:
+        """Test nights with, without and with duplicated diary entries export identically."""
+        _save_nights(db_manager, n_participants=3, n_nights=4)
+        _save_diary(
+            db_manager, "diary_a.csv", [("4000", "2024-03-01", 1, "13:00"), ("4000", "2024-03-02", 0, None), ("4001", "2024-03-03", 1, "14:10")]
+        )
+        _save_diary(db_manager, "diary_b.csv", [("4000", "2024-03-01", 1, "12:00"), ("4002", "2024-03-09", 1, "13:30")])
+
+        records = db_manager.get_all_sleep_data_for_export()
+
+        assert records == _reference_export(db_manager)
+        assert len(records) == 12
+        with_naps = [record for record in records if record.get("Nap Onset Time")]
+        assert sorted(record["Nap Onset Time"] for record in with_naps) == ["13:00", "14:10"]
+
+    def test_empty_database(self, db_manager: DatabaseManager) -> None:
+        """Test an export without saved nights is empty."""
+        assert db_manager.get_all_sleep_data_for_export() == []
+
+    def test_cli_export_streams_records(self, db_manager: DatabaseManager, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the export command streams the same records without building the full export list."""
+        _save_nights(db_manager, n_participants=2, n_nights=3)
+        _save_diary(db_manager, "diary_a.csv", [("4000", "2024-03-01", 1, "13:00")])
+        expected = json.loads(json.dumps(db_manager.get_all_sleep_data_for_export(), default=str))
+        monkeypatch.setattr(DatabaseManager, "get_all_sleep_data_for_export", Mock(side_effect=AssertionError("export list built")))
+        output = tmp_path / "export.json"
+
+        assert main(["export", "--db", str(db_manager.db_path), "-o", str(output)]) == 0
+
+        assert json.loads(output.read_text()) == expected
+
+    def test_streamed_metrics(self, db_manager: DatabaseManager) -> None:
+        """Test the metrics are streamed most recently updated first with diary fields attached."""
+        _save_nights(db_manager, n_participants=1, n_nights=2)
+        _save_diary(db_manager, "diary_a.csv", [("4000", "2024-03-02", 1, "13:00")])
+
+        metrics = list(db_manager.iter_sleep_metrics_for_export())
+
+        assert [metric.analysis_date for metric in metrics] == ["2024-03-02", "2024-03-01"]
+        assert metrics[0].get_dynamic_field("nap_onset_time") == "13:00"
+        assert metrics[1].get_dynamic_field("nap_onset_time") is None
+
+
+@pytest.mark.slow
+class TestExportBenchmark:
+    """Benchmark gathering the nights of a study with thousands of scored nights."""
+
+    def test_benchmark_joined_query(self, db_manager: DatabaseManager) -> None:
+        """Time loading 3000 nights with their diary fields with one diary query per night and with one joined query, which must agree."""
+        _save_nights(db_manager, n_participants=100, n_nights=30)
+        entries = [(str(4000 + p), f"2024-03-{night + 1:02d}", night % 2, "13:00" if night % 2 else None) for p in range(100) for night in range(30)]
+        _save_diary(db_manager, "diary.csv", entries)
+
+        start = time.perf_counter()
+        reference = db_manager.load_sleep_metrics()
+        for metric in reference:
+            _reference_integrate(db_manager, metric)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed = list(db_manager.iter_sleep_metrics_for_export())
+        joined_time = time.perf_counter() - start
+
+        print(f"\nLoad 3000 nights with diary fields: per-night lookups {reference_time * 1000:.0f} ms, joined {joined_time * 1000:.0f} ms")
+        expected_rows = [row for metric in reference for row in metric.to_export_dict_list()]
+        assert [row for metric in streamed for row in metric.to_export_dict_list()] == expected_rows
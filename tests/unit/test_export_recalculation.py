@@ -0,0 +1,302 @@
+"""
+Unit tests for recalculating sleep period metrics before an export.
+
+Verifies that ExportManager._ensure_metrics_calculated_for_export, which loads
+and scores each file once and evaluates every sleep period on slices of it,
+stores the same period metrics as the original per-period loads when scores
+were precomputed at import, scores files without stored scores over the whole
+recording, and reports progress and stops when cancelled, including from
+the export worker. Also benchmarks recalculating per file against per period.
+"""
+
+from __future__ import annotations
+
+import copy
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
+from sleep_scoring_app.core.constants import ActivityDataPreference, AlgorithmType, DatabaseColumn, MarkerType, NonwearDataSource
+from sleep_scoring_app.core.dataclasses import DailySleepMarkers, NonwearPeriod, ParticipantInfo, SleepMetrics, SleepPeriod
+from sleep_scoring_app.data.activity_blocks import to_epoch_seconds, write_activity_blocks
+from sleep_scoring_app.services.data_service import DataManager
+from sleep_scoring_app.services.export_service import ExportManager
+from sleep_scoring_app.services.export_worker import ExportWorkerObject
+from sleep_scoring_app.services.nonwear_service import NonwearDataService
+from sleep_scoring_app.services.precompute_service import ScoringPrecomputeService
+from tests.unit.conftest import register_file
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.data.database import DatabaseManager
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+def _reference_ensure(export_manager: ExportManager, sleep_metrics_list: list[SleepMetrics]) -> None:
+    """Original recalculation: two window loads, fresh algorithms and a sensor query per sleep period."""
+    data_manager = DataManager(database_manager=export_manager.db_manager)
+    nonwear_service = NonwearDataService(database_manager=export_manager.db_manager)
+    for metrics in sleep_metrics_list:
+        for period in metrics.daily_sleep_markers.get_complete_periods():
+            filename = metrics.filename
+            period_start = datetime.fromtimestamp(period.onset_timestamp)
+            period_end = datetime.fromtimestamp(period.offset_timestamp)
+            start_time = period_start - timedelta(minutes=5)
+            end_time = period_end + timedelta(minutes=5)
+
+            timestamps, axis_y_values = export_manager.db_manager.load_raw_activity_data(
+                filename=filename, start_time=start_time, end_time=end_time, activity_column=ActivityDataPreference.AXIS_Y
+            )
+            if not timestamps or not axis_y_values:
+                continue
+            vector_magnitude_timestamps, vector_magnitude = export_manager.db_manager.load_raw_activity_data(
+                filename=filename, start_time=start_time, end_time=end_time, activity_column=ActivityDataPreference.VECTOR_MAGNITUDE
+            )
+            unix_timestamps = [ts.timestamp() for ts in timestamps]
+
+            sleep_algorithm = AlgorithmFactory.create(metrics.sleep_algorithm_name or AlgorithmFactory.get_default_algorithm_id())
+            sadeh_results = export_manager._load_precomputed_mask(
+                filename, sleep_algorithm.identifier, sleep_algorithm.get_parameters(), timestamps, start_time, end_time
+            )
+            if sadeh_results is None:
+                sadeh_results = sleep_algorithm.score_array(axis_y_values)
+
+            if vector_magnitude:
+                choi_algorithm = NonwearAlgorithmFactory.create("choi_2011")
+                choi_results = export_manager._load_precomputed_mask(
+                    filename,
+                    choi_algorithm.identifier,
+                    nonwear_parameters(choi_algorithm, ActivityDataPreference.VECTOR_MAGNITUDE),
+                    vector_magnitude_timestamps,
+                    start_time,
+                    end_time,
+                )
+                if choi_results is None:
+                    choi_results = choi_algorithm.detect_mask(vector_magnitude)
+            else:
+                choi_results = [0] * len(sadeh_results)
+
+            sensor_periods = nonwear_service.get_nonwear_periods_for_file(
+                filename=filename, source=NonwearDataSource.NONWEAR_SENSOR, start_time=period_start, end_time=period_end
+            )
+            nwt_sensor_results = [0] * len(timestamps)
+            for nw_period in sensor_periods:
+                for i, ts in enumerate(timestamps):
+                    if nw_period.start_time <= ts <= nw_period.end_time:
+                        nwt_sensor_results[i] = 1
+
+            period_metrics = data_manager.calculate_sleep_metrics(
+                sleep_markers=[period.onset_timestamp, period.offset_timestamp],
+                sadeh_results=sadeh_results,
+                choi_results=choi_results,
+                activity_data=axis_y_values,
+                x_data=unix_timestamps,
+                file_path=filename,
+                nwt_sensor_results=nwt_sensor_results,
+            )
+            if period_metrics:
+                export_manager._store_period_metrics(metrics, period, period_metrics)
+
+
+def _filename(index: int) -> str:
+    return f"DEMO-{100 + index}_T1_G1_actigraph.csv"
+
+
+def _store_recording(db_manager: DatabaseManager, filename: str, n_days: int, seed: int) -> None:
+    """Store minute epochs with sleep-like quiet nights, an axis_y gap and a zero-count nonwear block."""
+    n_epochs = n_days * 1440
+    timestamps = np.array([START + timedelta(minutes=i) for i in range(n_epochs)], dtype="datetime64[s]")
+    rng = np.random.default_rng(seed)
+    minute_of_day = (np.arange(n_epochs) + START.hour * 60) % 1440
+    night = (minute_of_day >= 22 * 60) | (minute_of_day < 7 * 60)
+    axis_y = np.where(night, rng.integers(0, 40, size=n_epochs), rng.integers(0, 400, size=n_epochs)).astype(float)
+    axis_y[rng.random(n_epochs) < 0.1] = 0
+    axis_y[1500:1620] = 0
+    vector_magnitude = axis_y * 1.3
+    axis_y[3000:3010] = np.nan
+    with db_manager._get_connection() as conn:
+        register_file(conn, filename, filename.split("_", maxsplit=1)[0], f"hash-{seed}")
+        write_activity_blocks(
+            conn, filename, to_epoch_seconds(timestamps), {DatabaseColumn.AXIS_Y: axis_y, DatabaseColumn.VECTOR_MAGNITUDE: vector_magnitude}
+        )
+        conn.commit()
+
+
+def _store_sensor_periods(db_manager: DatabaseManager, filename: str) -> None:
+    service = NonwearDataService(db_manager)
+    participant_id = service.extract_participant_from_filename(Path(filename))
+    periods = [
+        NonwearPeriod(
+            start_time=START + timedelta(days=day, hours=10, minutes=50),
+            end_time=START + timedelta(days=day, hours=11, minutes=20),
+            participant_id=participant_id,
+            source=NonwearDataSource.NONWEAR_SENSOR,
+        )
+        for day in range(0, 7, 2)
+    ]
+    assert service.save_nonwear_periods(periods, f"{participant_id}_nonwear.csv")
+
+
+def _nights(filename: str, n_nights: int) -> list[SleepMetrics]:
+    """One main sleep and one nap per night; the second night's nap spans the axis_y gap."""
+    metrics_list = []
+    for night in range(n_nights):
+        onset = START + timedelta(days=night, hours=10, minutes=7 * night % 60)
+        markers = DailySleepMarkers()
+        markers.period_1 = SleepPeriod(onset.timestamp(), (onset + timedelta(hours=8, minutes=13)).timestamp(), 1, MarkerType.MAIN_SLEEP)
+        markers.period_2 = SleepPeriod((onset + timedelta(hours=16)).timestamp(), (onset + timedelta(hours=17)).timestamp(), 2, MarkerType.NAP)
+        metrics_list.append(
+            SleepMetrics(
+                participant=ParticipantInfo(numerical_id=filename.split("_", maxsplit=1)[0]),
+                filename=filename,
+                analysis_date=onset.strftime("%Y-%m-%d"),
+                algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+                daily_sleep_markers=markers,
+            )
+        )
+    return metrics_list
+
+
+def _stored_metrics(metrics_list: list[SleepMetrics]) -> list[tuple]:
+    return [
+        (metrics.analysis_date, period.marker_index, metrics._get_stored_period_metrics(period), metrics.total_sleep_time, metrics.choi_onset)
+        for metrics in metrics_list
+        for period in metrics.daily_sleep_markers.get_complete_periods()
+    ]
+
+
+def _study(db_manager: DatabaseManager, n_files: int, n_nights: int, precompute: bool) -> list[SleepMetrics]:
+    metrics_list = []
+    for index in range(n_files):
+        _store_recording(db_manager, _filename(index), n_nights + 1, seed=index)
+        _store_sensor_periods(db_manager, _filename(index))
+        if precompute:
+            assert ScoringPrecomputeService(db_manager).precompute_file(_filename(index))
+        metrics_list.extend(_nights(_filename(index), n_nights))
+    return metrics_list
+
+
+class TestRecalculationParity:
+    """Per-file recalculation stores the per-period recalculation's metrics."""
+
+    def test_precomputed_files_match_reference(self, db_manager: DatabaseManager) -> None:
+        """Test files scored at import give the original per-period results for every sleep period."""
+        metrics_list = _study(db_manager, n_files=3, n_nights=3, precompute=True)
+        reference = copy.deepcopy(metrics_list)
+
+        assert ExportManager(db_manager)._ensure_metrics_calculated_for_export(metrics_list)
+        _reference_ensure(ExportManager(db_manager), reference)
+
+        assert _stored_metrics(metrics_list) == _stored_metrics(reference)
+        assert any(stored[2].get("total_nwt_counts") for stored in _stored_metrics(metrics_list))
+        assert all(stored[2].get("total_sleep_time") is not None for stored in _stored_metrics(metrics_list))
+
+    def test_unscored_file_scored_over_whole_recording(self, db_manager: DatabaseManager) -> None:
+        """Test a file without stored scores gives the results of scoring the whole recording."""
+        metrics_list = _study(db_manager, n_files=1, n_nights=3, precompute=False)
+        whole_recording = copy.deepcopy(metrics_list)
+
+        assert ExportManager(db_manager, max_workers=1)._ensure_metrics_calculated_for_export(metrics_list)
+        assert ScoringPrecomputeService(db_manager).precompute_file(_filename(0))
+        _reference_ensure(ExportManager(db_manager), whole_recording)
+
+        assert _stored_metrics(metrics_list) == _stored_metrics(whole_recording)
+
+    def test_metrics_without_periods_untouched(self, db_manager: DatabaseManager) -> None:
+        """Test metrics without complete periods or without activity data are left as they were."""
+        _store_recording(db_manager, _filename(0), 2, seed=0)
+        without_periods = SleepMetrics(
+            participant=ParticipantInfo(),
+            filename=_filename(0),
+            analysis_date="2024-03-01",
+            algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+            daily_sleep_markers=DailySleepMarkers(),
+        )
+        without_data = _nights(_filename(5), 1)
+
+        assert ExportManager(db_manager)._ensure_metrics_calculated_for_export([without_periods, *without_data])
+
+        assert without_periods.total_sleep_time is None
+        assert _stored_metrics(without_data) == _stored_metrics(_nights(_filename(5), 1))
+
+
+class TestProgressAndCancellation:
+    """Files report progress as they complete and cancellation stops before the next file."""
+
+    def test_progress_per_file(self, db_manager: DatabaseManager) -> None:
+        """Test the callback receives each completed file out of the total."""
+        metrics_list = _study(db_manager, n_files=3, n_nights=1, precompute=True)
+        progress = []
+
+        assert ExportManager(db_manager)._ensure_metrics_calculated_for_export(metrics_list, lambda done, total: progress.append((done, total)))
+
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    def test_cancel_stops_export(self, db_manager: DatabaseManager, tmp_path: Path) -> None:
+        """Test cancelling after the first file leaves the rest unrecalculated and writes no export."""
+        metrics_list = _study(db_manager, n_files=3, n_nights=1, precompute=True)
+        export_manager = ExportManager(db_manager, max_workers=1)
+        progress = []
+
+        def cancel_after_first(done: int, total: int) -> None:
+            progress.append((done, total))
+            export_manager.cancel()
+
+        exported = export_manager.perform_direct_export(metrics_list, 0, str(tmp_path / "out"), [], progress_callback=cancel_after_first)
+
+        assert exported is False
+        assert progress == [(1, 3)]
+        assert sum(metrics.total_sleep_time is not None for metrics in metrics_list) == 1
+        assert not list((tmp_path / "out").glob("*.csv"))
+
+    def test_cancel_reset_when_export_starts(self, db_manager: DatabaseManager, tmp_path: Path) -> None:
+        """Test a cancel left over from an earlier export does not stop the next one."""
+        metrics_list = _study(db_manager, n_files=2, n_nights=1, precompute=True)
+        export_manager = ExportManager(db_manager)
+        export_manager.cancel()
+
+        assert export_manager.perform_direct_export(metrics_list, 0, str(tmp_path / "out"), [])
+        assert len(list((tmp_path / "out").glob("*.csv"))) == 1
+
+    def test_worker_cancelled_before_first_file(self, db_manager: DatabaseManager, tmp_path: Path) -> None:
+        """Test the export worker keeps a cancel requested before the export reset its flag."""
+        metrics_list = _study(db_manager, n_files=3, n_nights=1, precompute=True)
+        worker = ExportWorkerObject(
+            ExportManager(db_manager, max_workers=1), metrics_list, grouping_option=0, output_directory=str(tmp_path / "out"), selected_columns=[]
+        )
+        completed = []
+        worker.export_completed.connect(lambda success, error: completed.append((success, error)))
+
+        worker.cancel()
+        worker.run()
+
+        assert completed == [(False, "")]
+        assert sum(metrics.total_sleep_time is not None for metrics in metrics_list) == 1
+        assert not list((tmp_path / "out").glob("*.csv"))
+
+
+@pytest.mark.slow
+class TestRecalculationBenchmark:
+    """Benchmark recalculating a study's metrics before export."""
+
+    def test_benchmark_per_file_against_per_period(self, db_manager: DatabaseManager) -> None:
+        """Time recalculating 8 files of 14 nights with a nap each per period and per file, which must store the same metrics."""
+        metrics_list = _study(db_manager, n_files=8, n_nights=14, precompute=True)
+        reference = copy.deepcopy(metrics_list)
+
+        start = time.perf_counter()
+        _reference_ensure(ExportManager(db_manager), reference)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ExportManager(db_manager)._ensure_metrics_calculated_for_export(metrics_list)
+        per_file_time = time.perf_counter() - start
+
+        print(f"\nRecalculate 224 sleep periods: per period {reference_time * 1000:.0f} ms, per file {per_file_time * 1000:.0f} ms")
+        assert _stored_metrics(metrics_list) == _stored_metrics(reference)
@@ -0,0 +1,336 @@
+"""
+Unit tests for the streaming export writer.
+
+Verifies that ExportManager.create_export_csv_only and perform_direct_export,
+which stream sorted rows through ExportWriter in bounded chunks, write the same
+values, order and metadata as the original DataFrame exports, including grouped
+outputs written in parallel, selected columns, formula sanitization and NO_SLEEP
+nights, and that a failed export leaves neither the target nor a temporary file.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core import dataclasses as dataclasses_module
+from sleep_scoring_app.core.algorithms.csv_ingest import pyarrow_available
+from sleep_scoring_app.core.constants import AlgorithmType, MarkerType, ParticipantGroup, ParticipantTimepoint
+from sleep_scoring_app.core.dataclasses import DailySleepMarkers, ParticipantInfo, SleepMetrics, SleepPeriod
+from sleep_scoring_app.services.export_service import ExportManager
+from sleep_scoring_app.services.export_writer import ExportWriter
+from sleep_scoring_app.services.nonwear_service import NonwearDataService
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.data.database import DatabaseManager
+
+START = datetime(2024, 3, 1, 22, 0)
+SORT_COLUMNS = ["Numerical Participant ID", "Sleep Date", "Marker Index"]
+
+
+def _reference_frame(
+    export_manager: ExportManager, sleep_metrics_list: list[SleepMetrics], selected_columns: list[str] | None = None
+) -> pd.DataFrame:
+    """Original in-memory export: every row in a list, then a sanitized, sorted DataFrame."""
+    nwt_resolver = NonwearDataService(export_manager.db_manager).load_sensor_resolver()
+    export_data = []
+    for metrics in sleep_metrics_list:
+        export_data.extend(metrics.to_export_dict_list(nwt_resolver))
+    export_df = pd.DataFrame(export_data)
+    for col in export_df.select_dtypes(include=["object"]).columns:
+        export_df[col] = export_df[col].apply(export_manager._sanitize_csv_cell)
+    export_df = export_df.sort_values(by=SORT_COLUMNS, ascending=True)
+    if selected_columns:
+        available_columns = [col for col in selected_columns if col in export_df.columns]
+        if available_columns:
+            export_df = export_df[available_columns]
+    return export_df
+
+
+def _written(export_df: pd.DataFrame) -> pd.DataFrame:
+    """The reference frame as read back from its original to_csv output."""
+    buffer = io.StringIO()
+    export_df.to_csv(buffer, index=False, float_format="%.4f")
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def _assert_same_values(path: Path, expected: pd.DataFrame) -> None:
+    actual = pd.read_csv(path, comment="#")
+    pd.testing.assert_frame_equal(actual, _written(expected), check_dtype=False)
+
+
+@pytest.fixture
+def export_manager(db_manager: DatabaseManager, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ExportManager:
+    """ExportManager over a fresh database, also used for per-period NWT lookups."""
+    monkeypatch.setattr(dataclasses_module, "_cached_db_manager", db_manager)
+    monkeypatch.chdir(tmp_path)
+    return ExportManager(db_manager, max_workers=3)
+
+
+def _night(participant: ParticipantInfo, night: int, rng: random.Random) -> SleepMetrics:
+    """A scored night: main sleep with a nap, a NO_SLEEP night, or markers without complete periods."""
+    day = START + timedelta(days=night)
+    filename = f"{'@' if participant.numerical_id.endswith('1') else ''}{participant.numerical_id}_T1_G1.csv"
+    metrics = SleepMetrics(
+        participant=participant,
+        filename=filename,
+        analysis_date=day.strftime("%Y-%m-%d"),
+        algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+        daily_sleep_markers=DailySleepMarkers(),
+    )
+    kind = night % 5
+    if kind == 3:
+        metrics.onset_time = metrics.offset_time = "NO_SLEEP"
+        return metrics
+    if kind == 4:
+        return metrics
+
+    onset = day + timedelta(minutes=rng.randrange(0, 120))
+    main = SleepPeriod(onset.timestamp(), (onset + timedelta(hours=8)).timestamp(), marker_index=2, marker_type=MarkerType.MAIN_SLEEP)
+    nap = SleepPeriod((onset - timedelta(hours=6)).timestamp(), (onset - timedelta(hours=5)).timestamp(), marker_index=1, marker_type=MarkerType.NAP)
+    metrics.daily_sleep_markers.period_1 = main
+    metrics.daily_sleep_markers.period_2 = nap
+    for period in (main, nap):
+        metrics.store_period_metrics(
+            period,
+            {
+                "total_sleep_time": rng.uniform(30, 480),
+                "sleep_efficiency": rng.uniform(60, 100),
+                "awakenings": rng.randrange(0, 20) if kind else None,
+                "movement_index": rng.uniform(0, 10) if kind != 1 else None,
+            },
+        )
+    return metrics
+
+
+def _study(n_participants: int, n_nights: int, seed: int = 0) -> list[SleepMetrics]:
+    """Nights of several participants and groups in shuffled order."""
+    rng = random.Random(seed)
+    metrics = []
+    for index in range(n_participants):
+        participant = ParticipantInfo(
+            numerical_id=str(4000 + index),
+            full_id=f"{4000 + index} T1 G1",
+            group=ParticipantGroup.GROUP_1 if index % 2 else ParticipantGroup.ISSUE,
+            timepoint=ParticipantTimepoint.T1,
+        )
+        metrics.extend(_night(participant, night, rng) for night in range(n_nights))
+    rng.shuffle(metrics)
+    return metrics
+
+
+class TestExportParity:
+    """Streamed exports hold the DataFrame exports' rows."""
+
+    def test_csv_only_matches_reference(self, export_manager: ExportManager) -> None:
+        """Test the export dialog CSV has the reference values, order and metadata."""
+        metrics = _study(n_participants=4, n_nights=10)
+
+        export_path = Path(export_manager.create_export_csv_only(metrics, AlgorithmType.SADEH_1994_ACTILIFE))
+
+        expected = _reference_frame(export_manager, metrics)
+        _assert_same_values(export_path, expected)
+        lines = export_path.read_text(encoding="utf-8").splitlines()
+        assert f"# Participants: {len(metrics)}" in lines[:8]
+        assert f"# Sleep Periods: {len(expected)}" in lines[:8]
+        assert lines[8].startswith("Full Participant ID,")
+        assert list(export_path.parent.glob("*.tmp.*")) == []
+
+    def test_grouped_exports_match_reference(self, export_manager: ExportManager, tmp_path: Path) -> None:
+        """Test each participant's file, written in parallel, holds that participant's reference rows."""
+        metrics = _study(n_participants=5, n_nights=6, seed=1)
+        output_dir = tmp_path / "grouped"
+
+        assert export_manager.perform_direct_export(metrics, 1, str(output_dir), [])
+
+        files = sorted(output_dir.glob("sleep_data_*.csv"))
+        assert len(files) == 5
+        for path in files:
+            participant_id = path.name.split("_")[2]
+            expected = _reference_frame(export_manager, [metric for metric in metrics if metric.participant.numerical_id == participant_id])
+            _assert_same_values(path, expected)
+            assert f"# Group: {participant_id}" in path.read_text(encoding="utf-8")
+
+    def test_selected_columns_without_headers(self, export_manager: ExportManager, tmp_path: Path) -> None:
+        """Test selected columns are written in their order, skipping unknown ones, and headers can be left out."""
+        metrics = _study(n_participants=3, n_nights=5, seed=2)
+        selected = ["Sleep Date", "Unknown Column", "Numerical Participant ID", "Marker Index", "filename"]
+
+        assert export_manager.perform_direct_export(metrics, 0, str(tmp_path / "out"), selected, include_headers=False, include_metadata=False)
+
+        (path,) = (tmp_path / "out").glob("sleep_data_all_data_*.csv")
+        expected = _reference_frame(export_manager, metrics, selected)
+        actual = pd.read_csv(path, header=None, names=list(expected.columns))
+        pd.testing.assert_frame_equal(actual, _written(expected), check_dtype=False)
+        assert "'@4001_T1_G1.csv" in path.read_text(encoding="utf-8")
+
+    def test_unsupported_format(self, export_manager: ExportManager, tmp_path: Path) -> None:
+        """Test an unknown output format fails without writing."""
+        assert not export_manager.perform_direct_export(_study(1, 2), 0, str(tmp_path / "out"), [], output_format="xlsx")
+        assert not (tmp_path / "out").exists()
+
+
+class TestExportWriter:
+    """Chunked writes, column handling and atomic completion."""
+
+    def test_chunk_size_does_not_change_output(self, tmp_path: Path) -> None:
+        """Test writing one row per chunk gives the same file as one chunk."""
+        rows = [{"a": i, "b": i / 3, "c": None if i % 2 else f"=x{i}"} for i in range(25)]
+        for chunk_rows, name in ((1, "small.csv"), (1000, "large.csv")):
+            with ExportWriter(tmp_path / name, metadata_lines=["# one", "#"], chunk_rows=chunk_rows) as writer:
+                writer.write_rows(iter(rows))
+            assert writer.rows_written == 25
+
+        text = (tmp_path / "small.csv").read_text(encoding="utf-8")
+        assert text == (tmp_path / "large.csv").read_text(encoding="utf-8")
+        assert text.splitlines()[:4] == ["# one", "#", "a,b,c", "0,0.0000,'=x0"]
+
+    @pytest.mark.parametrize("suffix", [".csv", ".json"])
+    def test_rows_appended_across_batches(self, tmp_path: Path, suffix: str) -> None:
+        """Test rows written in several batches read back in order, floats in full without a float format."""
+        output = tmp_path / f"rows{suffix}"
+        batches = [[{"file": "a", "value": 1 / 3}, {"file": "a", "value": 2}], [], [{"file": "b", "value": float("nan")}]]
+
+        with ExportWriter(output, float_format=None) as writer:
+            for batch in batches:
+                writer.write_rows(batch)
+
+        assert writer.rows_written == 3
+        if suffix == ".json":
+            assert json.loads(output.read_text()) == [{"file": "a", "value": 1 / 3}, {"file": "a", "value": 2}, {"file": "b", "value": None}]
+        else:
+            assert output.read_text().splitlines() == ["file,value", f"a,{1 / 3!r}", "a,2", "b,"]
+
+    @pytest.mark.parametrize(("suffix", "selected", "expected"), [(".csv", [], ""), (".csv", ["a", "b"], "a,b\n"), (".json", ["a"], "[]\n")])
+    def test_no_rows(self, tmp_path: Path, suffix: str, selected: list[str], expected: str) -> None:
+        """Test an output without rows is still written, with a header of the selected columns."""
+        with ExportWriter(tmp_path / f"rows{suffix}", selected_columns=selected) as writer:
+            writer.write_rows([])
+
+        assert (tmp_path / f"rows{suffix}").read_text() == expected
+
+    def test_no_rows_parquet(self, tmp_path: Path) -> None:
+        """Test a Parquet output without rows holds an empty table of the selected columns."""
+        pytest.importorskip("pyarrow")
+        with ExportWriter(tmp_path / "rows.parquet", selected_columns=["a", "b"]) as writer:
+            writer.write_rows([])
+
+        table = pd.read_parquet(tmp_path / "rows.parquet")
+        assert table.columns.tolist() == ["a", "b"]
+        assert table.empty
+
+    def test_columns_fixed_by_first_row(self, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        """Test later rows missing columns are left empty and unseen columns are reported."""
+        rows = [{"a": 1, "b": 2}, {"a": 3}, {"a": 4, "b": 5, "c": 6}]
+
+        with caplog.at_level(logging.WARNING), ExportWriter(tmp_path / "out.csv", chunk_rows=2) as writer:
+            writer.write_rows(rows)
+
+        assert (tmp_path / "out.csv").read_text(encoding="utf-8").splitlines() == ["a,b", "1,2", "3,", "4,5"]
+        assert "['c']" in caplog.text
+
+    def test_failure_leaves_no_files(self, tmp_path: Path) -> None:
+        """Test an error while rows are produced discards the partial export."""
+        target = tmp_path / "out.csv"
+        target.write_text("previous export", encoding="utf-8")
+
+        def rows():
+            for i in range(5000):
+                if i == 3000:
+                    msg = "row failed"
+                    raise ValueError(msg)
+                yield {"a": i}
+
+        with pytest.raises(ValueError, match="row failed"), ExportWriter(target) as writer:
+            writer.write_rows(rows())
+
+        assert target.read_text(encoding="utf-8") == "previous export"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["out.csv"]
+
+    def test_parquet_output(self, tmp_path: Path) -> None:
+        """Test Parquet files hold the rows with columns widened for later chunks."""
+        pytest.importorskip("pyarrow")
+        rows = [{"a": i, "b": None if i < 3 else f"v{i}", "c": i + 0.5} for i in range(10)]
+
+        with ExportWriter(tmp_path / "out.parquet", metadata_lines=["# one"], chunk_rows=3) as writer:
+            writer.write_rows(rows)
+
+        table = pd.read_parquet(tmp_path / "out.parquet")
+        assert table["a"].tolist() == list(range(10))
+        assert table["b"].tolist()[3:] == [f"v{i}" for i in range(3, 10)]
+
+    @pytest.mark.parametrize(
+        ("values", "expected"),
+        [
+            ([None, None, None, 1, 2], [None, None, None, 1.0, 2.0]),
+            ([0.5, 1.5, "n/a", None, 2], ["0.5", "1.5", "n/a", None, "2"]),
+            (["a", "b", 3, None, 4.5], ["a", "b", "3", None, "4.5"]),
+        ],
+    )
+    def test_parquet_type_changes_between_chunks(self, tmp_path: Path, values: list, expected: list) -> None:
+        """Test a column whose type changes after the first chunk is widened, keeping the rows already written."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        rows = [{"id": str(i), "value": value} for i, value in enumerate(values)]
+
+        with ExportWriter(tmp_path / "out.parquet", metadata_lines=["# one"], chunk_rows=2) as writer:
+            writer.write_rows(rows)
+
+        table = pd.read_parquet(tmp_path / "out.parquet")
+        assert table["id"].tolist() == [str(i) for i in range(len(values))]
+        assert [None if pd.isna(value) else value for value in table["value"]] == expected
+        assert pq.read_schema(tmp_path / "out.parquet").metadata[b"export_metadata"] == b"# one"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["out.parquet"]
+
+    @pytest.mark.skipif(pyarrow_available(), reason="pyarrow is installed")
+    def test_parquet_without_pyarrow(self, tmp_path: Path) -> None:
+        """Test Parquet output reports the missing optional dependency."""
+        with pytest.raises(ValueError, match="pyarrow"), ExportWriter(tmp_path / "out.parquet"):
+            pass
+        assert not (tmp_path / "out.parquet").exists()
+
+
+@pytest.mark.slow
+class TestExportWriterBenchmark:
+    """Peak memory and time of a large export."""
+
+    def test_streamed_export_bounded_memory(self, export_manager: ExportManager, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        """Test exporting 3000 nights streams the DataFrame export's values with a fraction of its peak memory."""
+        caplog.set_level(logging.ERROR, logger="sleep_scoring_app.core.dataclasses")  # One data source warning per row
+        metrics = _study(n_participants=60, n_nights=50, seed=3)
+        nwt_resolver = NonwearDataService(export_manager.db_manager).load_sensor_resolver()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        reference = _reference_frame(export_manager, metrics)
+        reference.to_csv(tmp_path / "reference.csv", index=False, float_format="%.4f")
+        reference_time = time.perf_counter() - start
+        reference_peak = tracemalloc.get_traced_memory()[1]
+        del reference
+        tracemalloc.reset_peak()
+
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        with ExportWriter(tmp_path / "streamed.csv") as writer:
+            writer.write_rows(export_manager._iter_export_rows(metrics, nwt_resolver))
+        streamed_time = time.perf_counter() - start
+        streamed_peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+        print(
+            f"\nExport {writer.rows_written} rows: DataFrame {reference_time * 1000:.0f} ms / {reference_peak / 2**20:.1f} MiB peak, "
+            f"streamed {streamed_time * 1000:.0f} ms / {streamed_peak / 2**20:.1f} MiB peak"
+        )
+
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "streamed.csv"), pd.read_csv(tmp_path / "reference.csv"), check_dtype=False)
+        assert streamed_peak * 3 < reference_peak
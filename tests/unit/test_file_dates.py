@@ -0,0 +1,173 @@
+"""
+Unit tests for the per-file activity date index.
+
+Verifies that the file date queries read from the file_dates index return what
+the original DISTINCT DATE(timestamp) scan over both activity storages returned,
+that the index follows imports, re-imports and deletions, and that databases
+imported before the index existed get it filled on initialization. Also
+benchmarks the file list queries against the scan.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable, FeatureFlags
+from sleep_scoring_app.data import database as database_module
+from sleep_scoring_app.data.database import DatabaseManager
+from sleep_scoring_app.data.file_dates import rebuild_file_dates
+from sleep_scoring_app.services.import_service import ImportService
+from tests.unit.conftest import register_file
+
+
+def _reference_dates(db_manager: DatabaseManager) -> dict[str, list[str]]:
+    """Original scan over every stored epoch row and block, kept as the parity reference."""
+    with db_manager._get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {DatabaseColumn.FILENAME}, date FROM (
+                SELECT {DatabaseColumn.FILENAME}, DATE({DatabaseColumn.TIMESTAMP}) AS date FROM {DatabaseTable.RAW_ACTIVITY_DATA}
+                UNION
+                SELECT {DatabaseColumn.FILENAME}, {DatabaseColumn.BLOCK_DATE} AS date FROM {DatabaseTable.RAW_ACTIVITY_BLOCKS}
+            )
+            ORDER BY {DatabaseColumn.FILENAME}, date
+            """
+        ).fetchall()
+    dates: dict[str, list[str]] = {}
+    for filename, day in rows:
+        dates.setdefault(filename, []).append(day)
+    return dates
+
+
+def _assert_matches_reference(db_manager: DatabaseManager) -> None:
+    reference = _reference_dates(db_manager)
+
+    assert db_manager.get_all_file_date_ranges() == {filename: len(days) for filename, days in reference.items()}
+    assert db_manager.get_all_file_date_ranges_batch() == {filename: (days[0], days[-1]) for filename, days in reference.items()}
+    for filename, days in reference.items():
+        assert db_manager.get_file_date_ranges(filename) == [date.fromisoformat(day) for day in days]
+
+
+def _write_csv(path: Path, start: str, n_rows: int) -> Path:
+    times = pd.date_range(start, periods=n_rows, freq="60s")
+    df = pd.DataFrame(
+        {
+            "Date": times.strftime("%m/%d/%Y"),
+            " Time": times.strftime("%H:%M:%S"),
+            "Axis1": np.arange(n_rows) % 300,
+            "Vector Magnitude": np.arange(n_rows) % 400,
+        }
+    )
+    df.to_csv(path, index=False)
+    return path
+
+
+def _import(db_manager: DatabaseManager, paths: list[Path], force_reimport: bool = False) -> None:
+    progress = ImportService(db_manager, max_workers=1).import_files(paths, skip_rows=0, force_reimport=force_reimport)
+    assert progress.errors == []
+
+
+class TestDateIndexParity:
+    """Indexed reads match the scan over the stored data."""
+
+    @pytest.mark.parametrize("columnar", [True, False], ids=["blocks", "rows"])
+    def test_imported_files(self, db_manager: DatabaseManager, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, columnar: bool) -> None:
+        """Test files imported into either storage are indexed with their days."""
+        monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", columnar)
+        paths = [
+            _write_csv(tmp_path / "DEMO-101_T1_G1_actigraph.csv", "2024-01-01 12:00", 3000),
+            _write_csv(tmp_path / "DEMO-102_T1_G1_actigraph.csv", "2024-02-28 23:30", 100),
+        ]
+
+        _import(db_manager, paths)
+
+        assert len(db_manager.get_file_date_ranges(paths[0].name)) == 3
+        assert db_manager.get_all_file_date_ranges_batch()[paths[1].name] == ("2024-02-28", "2024-02-29")
+        _assert_matches_reference(db_manager)
+
+    def test_reimport_and_delete(self, db_manager: DatabaseManager, tmp_path: Path) -> None:
+        """Test re-importing replaces a file's dates and deleting or clearing removes them."""
+        first = _write_csv(tmp_path / "DEMO-101_T1_G1_actigraph.csv", "2024-01-01", 3000)
+        second = _write_csv(tmp_path / "DEMO-102_T1_G1_actigraph.csv", "2024-03-01", 1500)
+        _import(db_manager, [first, second])
+
+        _write_csv(first, "2024-06-10", 500)
+        _import(db_manager, [first], force_reimport=True)
+        assert db_manager.get_file_date_ranges(first.name) == [date(2024, 6, 10)]
+        _assert_matches_reference(db_manager)
+
+        assert db_manager.delete_imported_file(second.name)
+        assert db_manager.get_file_date_ranges(second.name) == []
+        _assert_matches_reference(db_manager)
+
+        db_manager.clear_activity_data()
+        assert db_manager.get_all_file_date_ranges() == {}
+
+
+class TestDateIndexBackfill:
+    """Databases imported before the index existed are indexed on initialization."""
+
+    def test_missing_index_rebuilt(self, db_manager: DatabaseManager, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test dropping the index table and re-initializing restores the same dates."""
+        _import(db_manager, [_write_csv(tmp_path / "DEMO-101_T1_G1_actigraph.csv", "2024-01-01", 5000)])
+        expected = db_manager.get_all_file_date_ranges_batch()
+        with db_manager._get_connection() as conn:
+            conn.execute(f"DROP TABLE {DatabaseTable.FILE_DATES}")
+            conn.commit()
+
+        monkeypatch.setattr(database_module, "_database_initialized", False)
+        DatabaseManager(db_manager.db_path)
+
+        assert db_manager.get_all_file_date_ranges_batch() == expected
+        _assert_matches_reference(db_manager)
+
+
+def _insert_legacy_rows(conn: sqlite3.Connection, n_files: int, n_days: int) -> None:
+    """Register files and store minute epochs in the per-epoch row table."""
+    start = datetime(2024, 1, 1)
+    stamps = [(start + timedelta(minutes=i)).isoformat() for i in range(n_days * 1440)]
+    for index in range(n_files):
+        filename = f"P{index:03d}.csv"
+        register_file(conn, filename, str(index))
+        conn.executemany(
+            f"""
+            INSERT INTO {DatabaseTable.RAW_ACTIVITY_DATA} (
+                {DatabaseColumn.FILE_HASH}, {DatabaseColumn.FILENAME}, {DatabaseColumn.PARTICIPANT_ID},
+                {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y}
+            ) VALUES ('hash', ?, ?, ?, 1.0)
+            """,
+            ((filename, str(index), stamp) for stamp in stamps),
+        )
+
+
+@pytest.mark.slow
+class TestDateIndexBenchmark:
+    """Benchmark populating the file list of a large study."""
+
+    def test_benchmark_file_list_dates(self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Time the file list queries over 1M stored epochs with the scan and from the index, which must agree."""
+        monkeypatch.setattr(FeatureFlags, "ENABLE_COLUMNAR_ACTIVITY_STORAGE", False)
+        with db_manager._get_connection() as conn:
+            _insert_legacy_rows(conn, n_files=100, n_days=7)
+            rebuild_file_dates(conn)
+            conn.commit()
+
+        start = time.perf_counter()
+        reference = _reference_dates(db_manager)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        day_counts = db_manager.get_all_file_date_ranges()
+        ranges = db_manager.get_all_file_date_ranges_batch()
+        indexed_time = time.perf_counter() - start
+
+        print(f"\nFile list dates for 100 files / 1M epochs: scan {scan_time * 1000:.0f} ms, index {indexed_time * 1000:.1f} ms")
+        assert day_counts == {filename: len(days) for filename, days in reference.items()}
+        assert ranges == {filename: (days[0], days[-1]) for filename, days in reference.items()}
@@ -0,0 +1,175 @@
+"""
+Unit tests for single-pass format detection.
+
+Verifies that FormatDetector.detect_all returns what detect_header_rows,
+detect_epoch_length and detect_device_format return for the same file, and
+that results are cached by path, size and modification time. Also benchmarks
+previewing a folder both ways.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.constants import DevicePreset
+from sleep_scoring_app.services import format_detector
+from sleep_scoring_app.services.format_detector import FormatDetector
+
+ACTIGRAPH_HEADER = [
+    "------------ Data File Created By ActiGraph GT3X+ ActiLife v6.13.3 Firmware v2.5.0 date format M/d/yyyy at 30 Hz  Filter Normal -----------",
+    "Serial Number: TEST123",
+    "Start Time 08:00:00",
+    "Start Date 1/15/2024",
+    "Epoch Period (hh:mm:ss) 00:01:00",
+    "Download Time 08:30:00",
+    "Download Date 1/16/2024",
+    "Current Memory Address: 0",
+    "Current Battery Voltage: 4.22     Mode = 12",
+    "--------------------------------------------------",
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_detection_cache():
+    format_detector._detection_cache.clear()
+    format_detector._parse_datetime_string.cache_clear()
+    yield
+    format_detector._detection_cache.clear()
+
+
+def _write(path: Path, lines: list[str], newline: str = "\n", trailing: bool = True) -> Path:
+    path.write_bytes((newline.join(lines) + (newline if trailing else "")).encode())
+    return path
+
+
+def _actigraph_lines(n_rows: int, epoch_seconds: int = 60, delimiter: str = ",") -> list[str]:
+    times = pd.date_range("2024-01-15 08:00", periods=n_rows, freq=f"{epoch_seconds}s")
+    header = delimiter.join(["Date", " Time", "Axis1", "Axis2", "Axis3", "Steps", "Lux", "Vector Magnitude"])
+    rows = [delimiter.join([f"{t.month}/{t.day}/{t.year}", t.strftime("%H:%M:%S"), "12", "7", "3", "0", "15", "14.35"]) for t in times]
+    return [*ACTIGRAPH_HEADER, header, *rows]
+
+
+def _geneactiv_lines(n_rows: int) -> list[str]:
+    times = pd.date_range("2024-01-15 08:00", periods=n_rows, freq="30s")
+    return ["timestamp,x,y,z,SVM,Temperature", *(f"{t:%Y-%m-%d %H:%M:%S},0.1,-0.9,0.2,0.03,25.5" for t in times)]
+
+
+def _assert_matches_individual(path: Path) -> None:
+    detector = FormatDetector()
+    detection = detector.detect_all(path)
+
+    skip_rows, skip_confidence = detector.detect_header_rows(path)
+    assert (detection.skip_rows, detection.skip_rows_confidence) == (skip_rows, skip_confidence)
+    assert (detection.epoch_length, detection.epoch_confidence) == detector.detect_epoch_length(path, skip_rows)
+    assert (detection.device, detection.device_confidence) == detector.detect_device_format(path)
+
+
+class TestDetectAllParity:
+    """detect_all matches the three separate detections."""
+
+    @pytest.mark.parametrize(
+        ("lines", "newline", "trailing"),
+        [
+            (_actigraph_lines(300), "\n", True),
+            (_actigraph_lines(300), "\r\n", True),
+            (_actigraph_lines(300, epoch_seconds=30, delimiter="\t"), "\n", True),
+            (_actigraph_lines(300, delimiter=";"), "\n", False),
+            (_actigraph_lines(5), "\n", False),
+            (_actigraph_lines(20_000), "\n", True),
+            (_geneactiv_lines(500), "\n", True),
+            (["no,data,here", "just,text,rows"], "\n", True),
+            ([], "\n", False),
+        ],
+        ids=["actigraph", "crlf", "tab_30s", "semicolon_no_final_newline", "short", "longer_than_head", "geneactiv", "no_data", "empty"],
+    )
+    def test_matches_individual_methods(self, tmp_path: Path, lines: list[str], newline: str, trailing: bool) -> None:
+        """Test every value and confidence equals the separate method's result."""
+        _assert_matches_individual(_write(tmp_path / "file.csv", lines, newline, trailing))
+
+    def test_delimiter_and_overall_confidence(self, tmp_path: Path) -> None:
+        """Test the data rows' delimiter is reported and confidence is that of the least certain value."""
+        tab = FormatDetector().detect_all(_write(tmp_path / "tab.csv", _actigraph_lines(300, delimiter="\t")))
+        detection = FormatDetector().detect_all(_write(tmp_path / "comma.csv", _actigraph_lines(300)))
+
+        assert (tab.delimiter, tab.skip_rows) == ("\t", 10)
+        assert (detection.delimiter, detection.skip_rows, detection.epoch_length) == (",", 10, 60)
+        assert detection.device == DevicePreset.ACTIGRAPH
+        assert detection.confidence == min(detection.skip_rows_confidence, detection.epoch_confidence, detection.device_confidence)
+
+    def test_missing_file_falls_back(self, tmp_path: Path) -> None:
+        """Test a missing file gives the low-confidence defaults."""
+        detection = FormatDetector().detect_all(tmp_path / "missing.csv")
+
+        assert (detection.skip_rows, detection.epoch_length, detection.device) == (10, 60, DevicePreset.GENERIC_CSV)
+        assert detection.confidence == 0.3
+
+
+class TestDetectionCache:
+    """Results are reused until the file changes."""
+
+    def test_unchanged_file_not_read_again(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a second detection of an unchanged file, from any detector, comes from the cache."""
+        path = _write(tmp_path / "file.csv", _actigraph_lines(300))
+        first = FormatDetector().detect_all(path)
+
+        def fail(_path):
+            raise AssertionError("file read again")
+
+        monkeypatch.setattr(FormatDetector, "_read_head_lines", staticmethod(fail))
+        assert FormatDetector().detect_all(path) is first
+
+    def test_modified_file_detected_again(self, tmp_path: Path) -> None:
+        """Test rewriting a file with a new size or modification time invalidates its entry."""
+        path = _write(tmp_path / "file.csv", _actigraph_lines(300))
+        first = FormatDetector().detect_all(path)
+
+        _write(path, _actigraph_lines(300, epoch_seconds=30))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = FormatDetector().detect_all(path)
+
+        assert (first.epoch_length, second.epoch_length) == (60, 30)
+
+
+@pytest.mark.slow
+class TestDetectionBenchmark:
+    """Benchmark previewing a folder against the separate detections."""
+
+    def test_benchmark_folder_preview(self, tmp_path: Path) -> None:
+        """Time previewing 200 files with the separate detections, with detect_all, and again from the cache, which must all agree."""
+        paths = [_write(tmp_path / f"P{i:03d}.csv", _actigraph_lines(2000)) for i in range(200)]
+        detector = FormatDetector()
+
+        start = time.perf_counter()
+        separate = []
+        for path in paths:
+            skip_rows, skip_confidence = detector.detect_header_rows(path)
+            separate.append(((skip_rows, skip_confidence), detector.detect_epoch_length(path, skip_rows), detector.detect_device_format(path)))
+        separate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first = [detector.detect_all(path) for path in paths]
+        first_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = [detector.detect_all(path) for path in paths]
+        cached_time = time.perf_counter() - start
+
+        print(
+            f"\nPreview 200 files: separate {separate_time * 1000:.0f} ms, detect_all {first_time * 1000:.0f} ms, again {cached_time * 1000:.1f} ms"
+        )
+        combined = [
+            (
+                (detection.skip_rows, detection.skip_rows_confidence),
+                (detection.epoch_length, detection.epoch_confidence),
+                (detection.device, detection.device_confidence),
+            )
+            for detection in first
+        ]
+        assert combined == separate
+        assert cached == first
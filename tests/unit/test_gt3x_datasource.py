@@ -7,17 +7,21 @@ Tests the GT3X binary data source loader implementation using pygt3x library.
 from __future__ import annotations
 
 import struct
+import time
+import tracemalloc
 import zipfile
 from datetime import datetime
+from types import SimpleNamespace
 
 import numpy as np
 import pandas as pd
 import pytest
 
 from sleep_scoring_app.core.algorithms.datasource_protocol import DataSourceLoader
-from sleep_scoring_app.core.algorithms.gt3x_datasource import GT3XDataSourceLoader
+from sleep_scoring_app.core.algorithms.gt3x_datasource import EpochAccumulator, GT3XDataSourceLoader, iter_sample_chunks
 from sleep_scoring_app.core.constants import DatabaseColumn
 from sleep_scoring_app.core.dataclasses import ColumnMapping
+from sleep_scoring_app.data.raw_sample_cache import RawSampleCache, file_content_hash
 
 
 @pytest.fixture
@@ -488,3 +492,137 @@ class TestGT3XLoaderIntegration:
 
         # Both should have same columns
         assert set(df_raw.columns) == set(df_epoch.columns)
+
+
+def _fake_reader(n_samples: int, sample_rate: int = 30, seed: int = 0, nhanes: bool = True) -> SimpleNamespace:
+    """Stand-in for an open pygt3x FileReader: acceleration rows of (timestamp, X, Y, Z, idle sleep mode)."""
+    rng = np.random.default_rng(seed)
+    acceleration = np.zeros((n_samples, 5))
+    acceleration[:, 0] = 1_705_305_600 + np.arange(n_samples) / sample_rate
+    acceleration[:, 1:4] = np.round(rng.normal(0, 0.5, size=(n_samples, 3)), 3)
+    return SimpleNamespace(acceleration=acceleration, nhanes=nhanes, calibrate_acceleration=lambda samples: samples / 256.0)
+
+
+def _full_epoch_dataframe(reader: SimpleNamespace, loader: GT3XDataSourceLoader, sample_rate: float) -> pd.DataFrame:
+    """Original whole-recording path: calibrate everything, then aggregate at once."""
+    samples = reader.acceleration[:, 1:4] if reader.nhanes else reader.calibrate_acceleration(reader.acceleration[:, 1:4])
+    return loader._create_epoch_dataframe(samples.astype(np.float32), reader.acceleration[:, 0], sample_rate)
+
+
+class TestChunkedEpochAggregation:
+    """Chunked aggregation with carry-over matches aggregating the whole recording."""
+
+    @pytest.mark.parametrize("chunk_samples", [1, 7, 1799, 1800, 1801, 5000, 1_000_000])
+    def test_chunks_match_whole_recording(self, chunk_samples: int) -> None:
+        """Test every chunk size, including ones that split epochs, gives identical epochs."""
+        reader = _fake_reader(30 * 60 * 5 + 123, nhanes=False)
+        loader = GT3XDataSourceLoader()
+
+        accumulator = EpochAccumulator(30 * 60)
+        for timestamps, samples in iter_sample_chunks(reader, chunk_samples):
+            accumulator.add(timestamps, samples)
+
+        expected = _full_epoch_dataframe(reader, loader, 30)
+        pd.testing.assert_frame_equal(accumulator.to_dataframe(), expected)
+        assert accumulator.total_samples == len(reader.acceleration)
+        assert accumulator.epoch_count == 5
+
+    def test_unsorted_samples_are_ordered(self) -> None:
+        """Test out-of-order seconds are sorted like to_pandas before aggregation."""
+        reader = _fake_reader(30 * 60 * 2)
+        acceleration = reader.acceleration
+        reader.acceleration = np.concatenate((acceleration[1800:], acceleration[:1800]))
+
+        chunks = list(iter_sample_chunks(reader, 1000))
+
+        np.testing.assert_array_equal(np.concatenate([ts for ts, _ in chunks]), acceleration[:, 0])
+        np.testing.assert_array_equal(np.concatenate([xyz for _, xyz in chunks]), acceleration[:, 1:4].astype(np.float32))
+
+    def test_too_few_samples(self) -> None:
+        """Test an accumulator without a complete epoch returns an empty frame."""
+        accumulator = EpochAccumulator(1800)
+        accumulator.add(np.arange(100, dtype=float), np.ones((100, 3), dtype=np.float32))
+
+        assert accumulator.to_dataframe().empty
+        with pytest.raises(ValueError, match="samples_per_epoch"):
+            EpochAccumulator(0)
+
+    def test_load_file_matches_whole_recording(self, mock_gt3x_file_large_epoch) -> None:
+        """Test loading in small chunks gives the epochs of to_pandas plus whole-array aggregation."""
+        from pygt3x.reader import FileReader
+
+        result = GT3XDataSourceLoader(chunk_samples=1000).load_file(mock_gt3x_file_large_epoch)
+
+        with FileReader(str(mock_gt3x_file_large_epoch)) as reader:
+            df = reader.to_pandas(calibrate=True)
+            expected = GT3XDataSourceLoader()._create_epoch_dataframe(df[["X", "Y", "Z"]].values, df.index.to_numpy(), reader.info.sample_rate)
+        pd.testing.assert_frame_equal(result["activity_data"], expected)
+        assert result["metadata"]["total_samples"] == len(df)
+        assert result["metadata"]["samples_per_second"] > 0
+
+
+class TestRawSampleCaching:
+    """Raw samples are decoded once and mapped from the cache afterwards."""
+
+    def test_raw_mode_from_cache_matches_decoding(self, mock_gt3x_file, tmp_path) -> None:
+        """Test raw loads with a cold and a warm cache equal an uncached load."""
+        expected = GT3XDataSourceLoader(return_raw=True).load_file(mock_gt3x_file)
+        loader = GT3XDataSourceLoader(return_raw=True, raw_cache=RawSampleCache(tmp_path / "cache"))
+
+        cold = loader.load_file(mock_gt3x_file)
+        warm = loader.load_file(mock_gt3x_file)
+
+        pd.testing.assert_frame_equal(cold["activity_data"], expected["activity_data"])
+        pd.testing.assert_frame_equal(warm["activity_data"], expected["activity_data"])
+        assert warm["metadata"]["serial_number"] == "TEST123"
+        assert warm["metadata"]["total_samples"] == expected["metadata"]["total_samples"]
+
+    def test_cached_samples_skip_decoding(self, mock_gt3x_file, tmp_path, monkeypatch) -> None:
+        """Test a cached file is mapped without opening it with pygt3x."""
+        import pygt3x.reader
+
+        loader = GT3XDataSourceLoader(raw_cache=RawSampleCache(tmp_path / "cache"))
+        decoded = loader.load_raw_samples(mock_gt3x_file)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("decoded again")
+
+        monkeypatch.setattr(pygt3x.reader, "FileReader", fail)
+        mapped = loader.load_raw_samples(mock_gt3x_file, file_hash=file_content_hash(mock_gt3x_file))
+
+        assert isinstance(mapped.samples, np.memmap)
+        np.testing.assert_array_equal(mapped.samples, decoded.samples)
+        np.testing.assert_array_equal(mapped.timestamps, decoded.timestamps)
+
+
+@pytest.mark.slow
+class TestChunkedAggregationBenchmark:
+    """Peak memory and throughput of chunked aggregation against the whole-recording path."""
+
+    def test_peak_memory_bounded(self) -> None:
+        """Test a day at 30 Hz aggregates with a fraction of the whole-recording temporaries."""
+        reader = _fake_reader(30 * 86400, nhanes=False)
+        loader = GT3XDataSourceLoader()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        expected = _full_epoch_dataframe(reader, loader, 30)
+        full_time = time.perf_counter() - started
+        full_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        accumulator = EpochAccumulator(30 * 60)
+        for timestamps, samples in iter_sample_chunks(reader, 100_000):
+            accumulator.add(timestamps, samples)
+        result = accumulator.to_dataframe()
+        chunked_time = time.perf_counter() - started
+        chunked_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"\nGT3X aggregation of {accumulator.total_samples} samples: whole {full_peak / 1e6:.0f} MB peak, "
+            f"chunked {chunked_peak / 1e6:.0f} MB peak ({accumulator.total_samples / chunked_time:,.0f} samples/s, whole {full_time * 1000:.0f} ms)"
+        )
+        pd.testing.assert_frame_equal(result, expected)
+        assert chunked_peak * 5 < full_peak
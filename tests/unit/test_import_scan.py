@@ -0,0 +1,212 @@
+"""
+Unit tests for the pre-import change scan.
+
+Verifies that ImportService.scan_for_import makes the same decision per file
+as the original per-file registry query and full hash, that files whose size
+and modification time are unchanged are never read, that files found
+unchanged after hashing are not hashed again on the next scan, and that hashes
+computed by the scan are reused by the import. Also benchmarks re-scanning an
+unchanged folder both ways.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable, ImportStatus
+from sleep_scoring_app.services.activity_importer import modified_time
+from sleep_scoring_app.services.import_parser import ActivityFileParser
+from sleep_scoring_app.services.import_service import ImportDecision, ImportService
+from tests.unit.conftest import write_activity_csv, write_activity_csv_files
+
+
+def _reference_check(service: ImportService, file_path: Path) -> tuple[bool, str | None]:
+    """Original per-file check: full hash plus one registry query, kept as the parity reference."""
+    participant_key = service.extract_participant_info(file_path).participant_key
+    current_hash = service.calculate_file_hash(file_path)
+    with service.db_manager._get_connection() as conn:
+        result = conn.execute(
+            f"""
+            SELECT {DatabaseColumn.FILE_HASH}, {DatabaseColumn.STATUS}, {DatabaseColumn.FILENAME}
+            FROM {DatabaseTable.FILE_REGISTRY}
+            WHERE {DatabaseColumn.PARTICIPANT_KEY} = ?
+            """,
+            (participant_key,),
+        ).fetchone()
+    if result is None:
+        return True, "New participant data"
+    stored_hash, status, existing_filename = result
+    if existing_filename != file_path.name:
+        return True, "Different file for participant"
+    if stored_hash != current_hash:
+        return True, "File changed"
+    if status == ImportStatus.ERROR:
+        return True, "Previous import failed"
+    return False, "Already imported"
+
+
+def _touch(path: Path, seconds: int = 10) -> None:
+    """Move a file's modification time forward without changing its content."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def _rewrite_same_size(path: Path) -> None:
+    """Change one byte of a file's content, keeping its size."""
+    content = bytearray(path.read_bytes())
+    content[-3] = ord("1") if content[-3] != ord("1") else ord("2")
+    path.write_bytes(bytes(content))
+    _touch(path)
+
+
+def _set_status(service: ImportService, filename: str, status: str) -> None:
+    with service.db_manager._get_connection() as conn:
+        conn.execute(
+            f"UPDATE {DatabaseTable.FILE_REGISTRY} SET {DatabaseColumn.STATUS} = ? WHERE {DatabaseColumn.FILENAME} = ?",
+            (status, filename),
+        )
+        conn.commit()
+
+
+def _fail_hashing(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(_self, file_path):
+        raise AssertionError(f"{file_path.name} hashed")
+
+    monkeypatch.setattr(ActivityFileParser, "calculate_file_hash", fail)
+
+
+class TestScanParity:
+    """The scan decides like the per-file hash and registry query."""
+
+    def test_decisions_match_reference(self, import_service: ImportService, tmp_path: Path) -> None:
+        """Test every kind of change gets the reference decision and reason."""
+        paths = write_activity_csv_files(tmp_path / "csv", 7)
+        import_service.import_files(paths[:6], skip_rows=0)
+
+        _touch(paths[1])  # Same content, new modification time
+        _rewrite_same_size(paths[2])  # New content, same size
+        write_activity_csv(paths[3], n_rows=400)  # New content and size
+        _set_status(import_service, paths[4].name, ImportStatus.ERROR)
+        _touch(paths[4])
+        renamed = paths[5].with_name("DEMO-105_T1_G1_actigraph_v2.csv")
+        paths[5].rename(renamed)
+        paths[5] = renamed
+        # paths[0] unchanged; paths[6] never imported
+
+        decisions = import_service.scan_for_import(paths)
+
+        for path in paths:
+            assert (decisions[path].needs_import, decisions[path].reason) == _reference_check(import_service, path), path.name
+            assert import_service.check_file_needs_import(path) == _reference_check(import_service, path)
+
+
+class TestChangeDetection:
+    """Only possibly changed files are read, and hashes are kept for the next scan."""
+
+    def test_unchanged_files_not_read(self, import_service: ImportService, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test files with registered size and modification time are skipped without hashing."""
+        paths = write_activity_csv_files(tmp_path / "csv", 3)
+        import_service.import_files(paths, skip_rows=0)
+        _fail_hashing(monkeypatch)
+
+        progress = import_service.import_files(paths, skip_rows=0)
+
+        assert progress.imported_files == []
+        assert sorted(progress.skipped_files) == sorted(f"{path.name}: Already imported" for path in paths)
+
+    def test_touched_file_hashed_once(self, import_service: ImportService, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a file found unchanged after hashing has its new modification time registered."""
+        paths = write_activity_csv_files(tmp_path / "csv", 2)
+        import_service.import_files(paths, skip_rows=0)
+        _touch(paths[0])
+
+        first = import_service.scan_for_import(paths)
+        expected_hash = ActivityFileParser().calculate_file_hash(paths[0])
+        _fail_hashing(monkeypatch)
+        second = import_service.scan_for_import(paths)
+
+        assert first[paths[0]] == ImportDecision(False, "Already imported", expected_hash)
+        assert second[paths[0]] == ImportDecision(False, "Already imported")
+
+    def test_scan_hash_reused_by_import(self, import_service: ImportService, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a changed file hashed by the scan is not hashed again when parsed."""
+        paths = write_activity_csv_files(tmp_path / "csv", 2)
+        import_service.import_files(paths, skip_rows=0)
+        _rewrite_same_size(paths[0])
+
+        hashed = []
+        original = ActivityFileParser.calculate_file_hash
+
+        def counting(self, file_path):
+            hashed.append(file_path.name)
+            return original(self, file_path)
+
+        monkeypatch.setattr(ActivityFileParser, "calculate_file_hash", counting)
+        progress = import_service.import_files(paths, skip_rows=0)
+
+        assert progress.imported_files == [paths[0].name]
+        assert hashed == [paths[0].name]
+        with import_service.db_manager._get_connection() as conn:
+            stored = conn.execute(
+                f"SELECT {DatabaseColumn.FILE_HASH} FROM {DatabaseTable.FILE_REGISTRY} WHERE {DatabaseColumn.FILENAME} = ?",
+                (paths[0].name,),
+            ).fetchone()[0]
+        assert stored == original(ActivityFileParser(), paths[0])
+
+
+@pytest.mark.slow
+class TestScanBenchmark:
+    """Benchmark re-scanning an unchanged study folder."""
+
+    def test_benchmark_rescan(self, import_service: ImportService, tmp_path: Path) -> None:
+        """Time re-scanning 200 registered 1 MB files with per-file hashes and queries and with scan_for_import, which must agree."""
+        directory = tmp_path / "study"
+        directory.mkdir()
+        parser = ActivityFileParser()
+        rows = []
+        paths = []
+        for index in range(200):
+            path = directory / f"DEMO-{1000 + index}_T1_G1_actigraph.csv"
+            path.write_bytes(os.urandom(1024 * 1024))
+            stat = path.stat()
+            info = import_service.extract_participant_info(path)
+            rows.append(
+                (
+                    path.name,
+                    str(path),
+                    info.participant_key,
+                    info.numerical_id,
+                    stat.st_size,
+                    parser.calculate_file_hash(path),
+                    modified_time(stat),
+                    ImportStatus.IMPORTED,
+                )
+            )
+            paths.append(path)
+        with import_service.db_manager._get_connection() as conn:
+            conn.executemany(
+                f"""
+                INSERT INTO {DatabaseTable.FILE_REGISTRY} (
+                    {DatabaseColumn.FILENAME}, {DatabaseColumn.ORIGINAL_PATH}, {DatabaseColumn.PARTICIPANT_KEY},
+                    {DatabaseColumn.PARTICIPANT_ID}, {DatabaseColumn.FILE_SIZE}, {DatabaseColumn.FILE_HASH},
+                    {DatabaseColumn.LAST_MODIFIED}, {DatabaseColumn.STATUS}
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+
+        start = time.perf_counter()
+        expected = {path: _reference_check(import_service, path) for path in paths}
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decisions = import_service.scan_for_import(paths)
+        scan_time = time.perf_counter() - start
+
+        print(f"\nRe-scan 200 unchanged files: per-file {reference_time * 1000:.0f} ms, scan {scan_time * 1000:.0f} ms")
+        assert {path: (decision.needs_import, decision.reason) for path, decision in decisions.items()} == expected
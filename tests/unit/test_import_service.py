@@ -0,0 +1,194 @@
+"""
+Unit tests for the vectorized ImportService bulk import stage.
+
+Verifies that records built from column arrays match the original per-row
+record builder, that ISO formatting matches Timestamp.isoformat(), that
+import throughput is reported through ImportProgress, and that multi-file
+imports parsed in worker processes store the same data as sequential ones.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.constants import DatabaseColumn, DatabaseTable
+from sleep_scoring_app.core.dataclasses import ParticipantInfo
+from sleep_scoring_app.services.import_parser import ActivityFileParser
+from sleep_scoring_app.services.import_service import ImportProgress, ImportService
+from tests.unit.conftest import activity_frame, register_file, write_activity_csv_files
+
+DEMO_ACTIGRAPH_FILE = Path(__file__).parent.parent.parent / "demo_data" / "activity" / "DEMO-001_T1_G1_actigraph.csv"
+
+EXTRA_COLS = {
+    DatabaseColumn.AXIS_Y: "Axis1",
+    DatabaseColumn.AXIS_X: "Axis2",
+    DatabaseColumn.AXIS_Z: "Axis3",
+}
+
+
+def _reference_records(df: pd.DataFrame, timestamps: list[str], activity_col: str, extra_cols: dict[str, str]) -> list[tuple]:
+    """Original per-row record builder, kept as the parity reference."""
+    activity_data = df[activity_col].fillna(0).astype(float)
+    records = []
+    for i in range(min(len(df), len(timestamps))):
+        if DatabaseColumn.AXIS_Y in extra_cols and extra_cols[DatabaseColumn.AXIS_Y] in df.columns:
+            axis_y_value = df[extra_cols[DatabaseColumn.AXIS_Y]].iloc[i]
+            axis_y_value = float(axis_y_value) if not pd.isna(axis_y_value) else 0.0
+        else:
+            axis_y_value = float(activity_data.iloc[i])
+
+        axis_x_value = None
+        if DatabaseColumn.AXIS_X in extra_cols and extra_cols[DatabaseColumn.AXIS_X] in df.columns:
+            value = df[extra_cols[DatabaseColumn.AXIS_X]].iloc[i]
+            axis_x_value = float(value) if not pd.isna(value) else None
+
+        axis_z_value = None
+        if DatabaseColumn.AXIS_Z in extra_cols and extra_cols[DatabaseColumn.AXIS_Z] in df.columns:
+            value = df[extra_cols[DatabaseColumn.AXIS_Z]].iloc[i]
+            axis_z_value = float(value) if not pd.isna(value) else None
+
+        vector_magnitude = None
+        if DatabaseColumn.VECTOR_MAGNITUDE in extra_cols and extra_cols[DatabaseColumn.VECTOR_MAGNITUDE] in df.columns:
+            value = df[extra_cols[DatabaseColumn.VECTOR_MAGNITUDE]].iloc[i]
+            vector_magnitude = float(value) if not pd.isna(value) else None
+        elif axis_x_value is not None and axis_z_value is not None:
+            vector_magnitude = math.sqrt(axis_x_value**2 + axis_y_value**2 + axis_z_value**2)
+
+        records.append((timestamps[i], axis_y_value, axis_x_value, axis_z_value, vector_magnitude))
+    return records
+
+
+def _stored_records(service: ImportService, filename: str) -> list[tuple]:
+    with service.db_manager._get_connection() as conn:
+        return conn.execute(
+            f"""
+            SELECT {DatabaseColumn.TIMESTAMP}, {DatabaseColumn.AXIS_Y}, {DatabaseColumn.AXIS_X},
+                   {DatabaseColumn.AXIS_Z}, {DatabaseColumn.VECTOR_MAGNITUDE}
+            FROM {DatabaseTable.RAW_ACTIVITY_DATA}
+            WHERE {DatabaseColumn.FILENAME} = ?
+            ORDER BY {DatabaseColumn.ID}
+            """,
+            (filename,),
+        ).fetchall()
+
+
+class TestVectorizedBatches:
+    """Records built from column arrays match the per-row builder."""
+
+    @pytest.mark.parametrize(
+        "extra_cols",
+        [
+            EXTRA_COLS,
+            {**EXTRA_COLS, DatabaseColumn.VECTOR_MAGNITUDE: "Vector Magnitude"},
+            {DatabaseColumn.AXIS_X: "Axis2"},
+            {},
+        ],
+        ids=["computed_vm", "file_vm", "partial_axes", "activity_only"],
+    )
+    def test_records_match_reference(self, import_service: ImportService, extra_cols: dict[str, str]) -> None:
+        """Test every stored value equals the per-row reference, including NULLs."""
+        df = activity_frame(2500)
+        timestamps = [ts.isoformat() for ts in pd.date_range("2024-01-01", periods=len(df) - 3, freq="60s")]
+        participant = ParticipantInfo(numerical_id="1000")
+        import_service.batch_size = 1000
+
+        with import_service.db_manager._get_connection() as conn:
+            register_file(conn, "P1.csv")
+            progress = ImportProgress()
+            columns = ActivityFileParser().build_activity_columns(df, "Axis1", extra_cols)
+            assert import_service._import_activity_data_batched(conn, "P1.csv", participant, "hash", timestamps, columns, progress)
+            conn.commit()
+
+        assert progress.processed_records == len(timestamps)
+        assert _stored_records(import_service, "P1.csv") == _reference_records(df, timestamps, "Axis1", extra_cols)
+
+    @pytest.mark.skipif(not DEMO_ACTIGRAPH_FILE.exists(), reason="Demo data not available")
+    def test_csv_import_reports_throughput(self, import_service: ImportService) -> None:
+        """Test a full CSV import stores every epoch and reports rows per second."""
+        progress = ImportProgress(total_files=1)
+        assert import_service.import_csv_file(DEMO_ACTIGRAPH_FILE, progress)
+
+        records = _stored_records(import_service, DEMO_ACTIGRAPH_FILE.name)
+        assert len(records) == progress.processed_records > 0
+        assert records[0][0] == "2000-01-01T00:00:00"
+        assert progress.rows_per_second > 0
+
+    @pytest.mark.parametrize("column", ["Axis1", "Vector Magnitude"])
+    def test_non_numeric_value_fails_file(self, import_service: ImportService, tmp_path: Path, column: str) -> None:
+        """Test a non-numeric activity value fails the file instead of being stored as missing."""
+        path = write_activity_csv_files(tmp_path / "csv", 1)[0]
+        df = pd.read_csv(path, dtype=str)
+        df.loc[3, column] = "ERR"
+        df.to_csv(path, index=False)
+
+        progress = import_service.import_files([path], skip_rows=0)
+
+        assert progress.imported_files == []
+        assert len(progress.errors) == 1
+        assert f"Column '{column}' has non-numeric values" in progress.errors[0]
+        assert _stored_records(import_service, path.name) == []
+
+
+class TestIsoTimestamps:
+    """Vectorized ISO formatting matches Timestamp.isoformat()."""
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            ["1/1/2000 00:00:00", "1/1/2000 00:01:00", "12/31/2000 23:59:00"],
+            ["2000-01-01 00:00:00.250000", "2000-01-01 00:00:01.000000"],
+            ["2000-01-01 00:00:00+02:00", "2000-01-01 00:01:00+02:00"],
+        ],
+        ids=["whole_seconds", "fractional", "timezone"],
+    )
+    def test_matches_isoformat(self, values: list[str]) -> None:
+        """Test formatted strings equal per-element isoformat()."""
+        timestamps = pd.to_datetime(pd.Series(values))
+        assert ActivityFileParser().format_iso_timestamps(timestamps) == [ts.isoformat() for ts in timestamps]
+
+
+@pytest.mark.slow
+class TestParallelImport:
+    """Multi-file imports parsed in worker processes with a single writer."""
+
+    def test_parallel_matches_sequential(self, import_service: ImportService, tmp_path: Path) -> None:
+        """Test every file is stored identically whether parsed in-process or in the pool."""
+        paths = write_activity_csv_files(tmp_path / "csv", 4)
+        sequential = import_service.import_files(paths, skip_rows=0)
+        expected = {path.name: _stored_records(import_service, path.name) for path in paths}
+
+        import_service.max_workers = 2
+        progress = import_service.import_files(paths, skip_rows=0, force_reimport=True)
+
+        assert sorted(progress.imported_files) == sorted(sequential.imported_files) == sorted(expected)
+        assert progress.errors == []
+        assert progress.processed_records == sequential.processed_records
+        for path in paths:
+            assert _stored_records(import_service, path.name) == expected[path.name]
+
+    def test_per_file_errors_reported(self, import_service: ImportService, tmp_path: Path) -> None:
+        """Test a file that fails to parse is reported while the others are imported."""
+        paths = write_activity_csv_files(tmp_path / "csv", 3)
+        pd.DataFrame({"Date": ["01/01/2024"], "Steps": [1]}).to_csv(paths[1], index=False)
+
+        import_service.max_workers = 2
+        progress = import_service.import_directory(tmp_path / "csv", skip_rows=0)
+
+        assert sorted(progress.imported_files) == sorted([paths[0].name, paths[2].name])
+        assert progress.errors == [f"Required columns not found in {paths[1].name}"]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_cancel_stops_before_next_file(self, import_service: ImportService, tmp_path: Path, max_workers: int) -> None:
+        """Test cancelling from a progress callback leaves the remaining files unimported."""
+        paths = write_activity_csv_files(tmp_path / "csv", 3)
+        import_service.max_workers = max_workers
+
+        progress = import_service.import_files(paths, skip_rows=0, progress_callback=lambda _: import_service.cancel())
+
+        assert len(progress.imported_files) < len(paths)
+        assert len(progress.warnings) == 1
+        assert progress.warnings[0].startswith("Import cancelled")
@@ -0,0 +1,186 @@
+"""
+Unit tests for the batched NWT sensor resolver used by exports.
+
+Verifies that NonwearSensorResolver, loaded with one query for all participants,
+gives the same onset, offset and overlap-count values and per-minute masks as
+querying get_nonwear_periods_for_file for each sleep period, including nested,
+overlapping and boundary-touching nonwear periods, and that exports built with
+it match the per-period database lookups.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from sleep_scoring_app.core import dataclasses as dataclasses_module
+from sleep_scoring_app.core.constants import AlgorithmType, MarkerType, NonwearDataSource, ParticipantGroup, ParticipantTimepoint
+from sleep_scoring_app.core.dataclasses import DailySleepMarkers, NonwearPeriod, ParticipantInfo, SleepMetrics, SleepPeriod
+from sleep_scoring_app.services.nonwear_service import NonwearDataService, NonwearSensorResolver
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.data.database import DatabaseManager
+
+START = datetime(2024, 3, 1, 20, 0)
+
+
+def _reference_nwt(service: NonwearDataService, filename: str, start_time: datetime, end_time: datetime, metric_type: str) -> int:
+    """Original per-period query and scan from SleepMetrics._calculate_nwt_from_database, kept as the parity reference."""
+    periods = service.get_nonwear_periods_for_file(
+        filename=filename, source=NonwearDataSource.NONWEAR_SENSOR, start_time=start_time, end_time=end_time
+    )
+    if metric_type == "onset":
+        return int(any(period.start_time <= start_time <= period.end_time for period in periods))
+    if metric_type == "offset":
+        return int(any(period.start_time <= end_time <= period.end_time for period in periods))
+    return sum(1 for period in periods if not (period.end_time < start_time or period.start_time > end_time))
+
+
+def _reference_mask(service: NonwearDataService, filename: str, timestamps: list[datetime], start_time: datetime, end_time: datetime) -> list[int]:
+    """Original per-minute loop from ExportManager._ensure_metrics_calculated_for_export."""
+    periods = service.get_nonwear_periods_for_file(
+        filename=filename, source=NonwearDataSource.NONWEAR_SENSOR, start_time=start_time, end_time=end_time
+    )
+    results = [0] * len(timestamps)
+    for period in periods:
+        for i, ts in enumerate(timestamps):
+            if period.start_time <= ts <= period.end_time:
+                results[i] = 1
+    return results
+
+
+@pytest.fixture
+def service(db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch) -> NonwearDataService:
+    """NonwearDataService over a fresh database, also used for per-period export lookups."""
+    monkeypatch.setattr(dataclasses_module, "_cached_db_manager", db_manager)
+    return NonwearDataService(db_manager)
+
+
+def _filename(index: int) -> str:
+    return f"DEMO-{100 + index}_T1_G1_actigraph.csv"
+
+
+def _save_sensor_periods(service: NonwearDataService, n_participants: int, n_periods: int, seed: int = 0) -> None:
+    """Store random nonwear periods per participant, some nested, overlapping or on whole minutes."""
+    rng = random.Random(seed)
+    for index in range(n_participants):
+        filename = _filename(index)
+        participant_id = service.extract_participant_from_filename(Path(filename))
+        periods = []
+        for _ in range(n_periods):
+            start = START + timedelta(minutes=rng.randrange(0, 14 * 1440))
+            periods.append(
+                NonwearPeriod(
+                    start_time=start,
+                    end_time=start + timedelta(minutes=rng.randrange(0, 600)),
+                    participant_id=participant_id,
+                    source=NonwearDataSource.NONWEAR_SENSOR,
+                )
+            )
+        assert service.save_nonwear_periods(periods, f"{participant_id}_nonwear.csv")
+
+
+def _sleep_windows(n_windows: int, seed: int = 1) -> list[tuple[datetime, datetime]]:
+    rng = random.Random(seed)
+    windows = []
+    for _ in range(n_windows):
+        onset = START + timedelta(minutes=rng.randrange(0, 14 * 1440))
+        windows.append((onset, onset + timedelta(minutes=rng.randrange(1, 720))))
+    return windows
+
+
+class TestResolverParity:
+    """In-memory lookups give the per-period query's values."""
+
+    def test_values_match_reference(self, service: NonwearDataService) -> None:
+        """Test onset, offset and overlap counts for random sleep periods of every participant."""
+        _save_sensor_periods(service, n_participants=4, n_periods=40)
+        resolver = service.load_sensor_resolver()
+
+        for index in range(5):  # The last participant has no sensor periods
+            for onset, offset in _sleep_windows(60, seed=index):
+                for metric_type in ("onset", "offset", "total"):
+                    expected = _reference_nwt(service, _filename(index), onset, offset, metric_type)
+                    assert resolver.nwt_value(_filename(index), onset, offset, metric_type) == expected, (index, onset, offset, metric_type)
+
+    def test_period_boundaries(self) -> None:
+        """Test moments on a period's start or end count as nonwear and touching periods overlap."""
+        resolver = NonwearSensorResolver(
+            {"DEMO-100": [(START, START + timedelta(hours=1)), (START + timedelta(minutes=10), START + timedelta(minutes=20))]}
+        )
+        filename = _filename(0)
+
+        assert resolver.nwt_value(filename, START + timedelta(hours=1), START + timedelta(hours=2), "onset") == 1
+        assert resolver.nwt_value(filename, START - timedelta(hours=1), START, "offset") == 1
+        assert resolver.nwt_value(filename, START - timedelta(hours=1), START, "total") == 1
+        assert resolver.nwt_value(filename, START + timedelta(minutes=15), START + timedelta(minutes=30), "total") == 2
+        assert resolver.nwt_value(filename, START + timedelta(hours=1, seconds=1), START + timedelta(hours=2), "total") == 0
+        assert resolver.nwt_value(filename, START, START, "unknown") is None
+
+    def test_mask_matches_reference(self, service: NonwearDataService) -> None:
+        """Test per-minute masks, including buffer minutes around the sleep period, match the per-minute loop."""
+        _save_sensor_periods(service, n_participants=2, n_periods=60)
+        resolver = service.load_sensor_resolver()
+
+        for onset, offset in _sleep_windows(40):
+            timestamps = [onset - timedelta(minutes=5) + timedelta(minutes=i) for i in range(int((offset - onset).total_seconds() // 60) + 11)]
+            for index in range(2):
+                expected = _reference_mask(service, _filename(index), timestamps, onset, offset)
+                assert resolver.nonwear_mask(_filename(index), timestamps, onset, offset) == expected
+
+    def test_export_rows_match_per_period_lookups(self, service: NonwearDataService) -> None:
+        """Test export rows built with the resolver equal those built with per-period queries."""
+        _save_sensor_periods(service, n_participants=1, n_periods=80)
+        resolver = service.load_sensor_resolver()
+        participant = ParticipantInfo(
+            numerical_id="DEMO-100", full_id="DEMO-100 T1 G1", group=ParticipantGroup.GROUP_1, timepoint=ParticipantTimepoint.T1
+        )
+
+        for onset, offset in _sleep_windows(20):
+            markers = DailySleepMarkers()
+            markers.period_1 = SleepPeriod(onset.timestamp(), offset.timestamp(), marker_index=1, marker_type=MarkerType.MAIN_SLEEP)
+            markers.period_2 = SleepPeriod(offset.timestamp() + 3600, offset.timestamp() + 7200, marker_index=2, marker_type=MarkerType.NAP)
+            metric = SleepMetrics(
+                participant=participant,
+                filename=_filename(0),
+                analysis_date=onset.strftime("%Y-%m-%d"),
+                algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+                daily_sleep_markers=markers,
+            )
+
+            assert metric.to_export_dict_list(resolver) == metric.to_export_dict_list()
+
+
+@pytest.mark.slow
+class TestResolverAtScale:
+    """The NWT values of a large export."""
+
+    def test_resolver_matches_per_period_queries(self, service: NonwearDataService) -> None:
+        """Test 300 sleep periods of 30 participants resolve from one load as they do with a query per value."""
+        _save_sensor_periods(service, n_participants=30, n_periods=50)
+        periods = [(_filename(index % 30), onset, offset) for index, (onset, offset) in enumerate(_sleep_windows(300))]
+        metric = SleepMetrics(
+            participant=ParticipantInfo(numerical_id="DEMO-100"),
+            filename="",
+            analysis_date="",
+            algorithm_type=AlgorithmType.SADEH_1994_ACTILIFE,
+            daily_sleep_markers=DailySleepMarkers(),
+        )
+
+        reference = []
+        for filename, onset, offset in periods:
+            metric.filename = filename
+            sleep_period = SleepPeriod(onset.timestamp(), offset.timestamp(), marker_index=1)
+            reference.append(tuple(metric._calculate_nwt_from_database(sleep_period, metric_type) for metric_type in ("onset", "offset", "total")))
+
+        resolver = service.load_sensor_resolver()
+        resolved = [
+            tuple(resolver.nwt_value(filename, onset, offset, metric_type) for metric_type in ("onset", "offset", "total"))
+            for filename, onset, offset in periods
+        ]
+
+        assert resolved == reference
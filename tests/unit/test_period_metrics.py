@@ -0,0 +1,234 @@
+"""
+Unit tests for the prefix-sum sleep period metrics engine.
+
+Verifies that DataManager.calculate_sleep_metrics returns exactly what the
+original per-epoch loop returned for random windows and marker pairs, that the
+engine is reused while the same window is passed in, and that the side panel
+shows live metrics for a marker pair. Also benchmarks the engine against the loop.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import SleepMetricsEngine
+from sleep_scoring_app.services.data_service import DataManager
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.core.algorithms import PeriodMetrics
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+def _reference_period_metrics(sadeh_results, choi_results, activity_data, x_data, onset_timestamp, offset_timestamp, nwt_sensor_results):
+    """Original calculate_sleep_metrics epoch loop, kept as the parity reference."""
+
+    def closest(timestamp):
+        min_diff, closest_idx = float("inf"), None
+        for i, data_timestamp in enumerate(x_data):
+            diff = abs(data_timestamp - timestamp)
+            if diff < min_diff:
+                min_diff, closest_idx = diff, i
+        return closest_idx
+
+    onset_idx, offset_idx = closest(onset_timestamp), closest(offset_timestamp)
+    total_activity = 0
+    movement_events = 0
+    sleep_minutes = 0
+    awakenings = 0
+    awakening_lengths = []
+    current_awakening_length = 0
+    first_sleep_idx = None
+    last_sleep_idx = None
+    for i in range(onset_idx, min(offset_idx, len(sadeh_results))):
+        if sadeh_results[i] == 1:
+            if first_sleep_idx is None:
+                first_sleep_idx = i
+            last_sleep_idx = i
+    for i in range(onset_idx, min(offset_idx, len(sadeh_results))):
+        if i < len(activity_data):
+            total_activity += activity_data[i]
+            if activity_data[i] > 0:
+                movement_events += 1
+        if sadeh_results[i] == 1:
+            sleep_minutes += 1
+            if current_awakening_length > 0:
+                awakening_lengths.append(current_awakening_length)
+                current_awakening_length = 0
+        elif first_sleep_idx is not None and i > first_sleep_idx and i <= last_sleep_idx:
+            current_awakening_length += 1
+            if current_awakening_length == 1:
+                awakenings += 1
+    if current_awakening_length > 0 and last_sleep_idx is not None:
+        awakening_lengths.append(current_awakening_length)
+
+    tib = offset_idx - onset_idx
+    if first_sleep_idx is not None:
+        tst = sum(1 for i in range(first_sleep_idx, last_sleep_idx + 1) if sadeh_results[i] == 1)
+        waso = (last_sleep_idx - first_sleep_idx + 1) - sleep_minutes
+    else:
+        tst = 0
+        waso = tib - tst
+    return {
+        "Total Counts": int(total_activity),
+        "Efficiency": round((tst / tib * 100) if tib > 0 else 0, 2),
+        "Total Minutes in Bed": round(tib, 1),
+        "Total Sleep Time (TST)": round(tst, 1),
+        "Wake After Sleep Onset (WASO)": round(waso, 1),
+        "Number of Awakenings": awakenings,
+        "Average Awakening Length": round(sum(awakening_lengths) / len(awakening_lengths) if awakening_lengths else 0, 1),
+        "Movement Index": round(movement_events / tib if tib > 0 else 0, 3),
+        "Fragmentation Index": round((awakenings / tst * 100) if tst > 0 else 0, 2),
+        "Sleep Fragmentation Index": round(((waso + movement_events) / tib * 100) if tib > 0 else 0, 2),
+        "Sadeh Algorithm Value at Sleep Onset": sadeh_results[onset_idx] if onset_idx < len(sadeh_results) else None,
+        "Total Choi Algorithm Counts over the Sleep Period": int(sum(choi_results[onset_idx : offset_idx + 1])),
+        "Total NWT Sensor Counts over the Sleep Period": int(sum(nwt_sensor_results[onset_idx : offset_idx + 1])),
+    }
+
+
+def _window(n_epochs: int, seed: int) -> tuple[list[int], list[int], list[float], list[float], list[int]]:
+    """Sleep scores with runs, counts with zeros, Choi/NWT masks and minute timestamps."""
+    rng = np.random.default_rng(seed)
+    scores: list[int] = []
+    value = 0
+    while len(scores) < n_epochs:
+        scores.extend([value] * int(rng.integers(1, 30)))
+        value = 1 - value
+    counts = rng.integers(0, 500, size=n_epochs).astype(float)
+    counts[rng.random(n_epochs) < 0.4] = 0
+    choi = (rng.random(n_epochs) < 0.1).astype(int).tolist()
+    nwt = (rng.random(n_epochs) < 0.05).astype(int).tolist()
+    x_data = [(START + timedelta(minutes=i)).timestamp() for i in range(n_epochs)]
+    return scores[:n_epochs], choi, counts.tolist(), x_data, nwt
+
+
+def _rounded(period: PeriodMetrics) -> dict:
+    """Engine metrics rounded and keyed like the reference."""
+    return {
+        "Total Counts": int(period.total_activity),
+        "Efficiency": round(period.efficiency, 2),
+        "Total Minutes in Bed": round(period.total_minutes_in_bed, 1),
+        "Total Sleep Time (TST)": round(period.total_sleep_time, 1),
+        "Wake After Sleep Onset (WASO)": round(period.waso, 1),
+        "Number of Awakenings": period.awakenings,
+        "Average Awakening Length": round(period.average_awakening_length, 1),
+        "Movement Index": round(period.movement_index, 3),
+        "Fragmentation Index": round(period.fragmentation_index, 2),
+        "Sleep Fragmentation Index": round(period.sleep_fragmentation_index, 2),
+        "Total Choi Algorithm Counts over the Sleep Period": int(period.total_choi_counts),
+        "Total NWT Sensor Counts over the Sleep Period": int(period.total_nwt_counts),
+    }
+
+
+@pytest.fixture
+def data_manager() -> DataManager:
+    return DataManager(database_manager=Mock())
+
+
+class TestMetricsParity:
+    """Prefix-sum metrics match the per-epoch loop."""
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_random_marker_pairs(self, data_manager: DataManager, seed: int) -> None:
+        """Test every metric for random marker pairs, including markers between epochs and outside the window."""
+        scores, choi, counts, x_data, nwt = _window(2880, seed)
+        rng = np.random.default_rng(seed + 100)
+
+        for _ in range(50):
+            onset, offset = sorted(x_data[0] + float(x) for x in rng.uniform(-600, 2890 * 60, size=2))
+            result = data_manager.calculate_sleep_metrics([offset, onset], scores, choi, counts, x_data, None, nwt)
+            expected = _reference_period_metrics(scores, choi, counts, x_data, onset, offset, nwt)
+
+            assert {key: result[key] for key in expected} == expected
+
+    def test_scores_shorter_than_window(self, data_manager: DataManager) -> None:
+        """Test sleep scores and counts covering only part of the timestamps are clipped like the loop."""
+        scores, choi, counts, x_data, nwt = _window(600, 7)
+        markers = [x_data[100], x_data[550]]
+
+        result = data_manager.calculate_sleep_metrics(markers, scores[:400], choi, counts[:300], x_data, None, nwt)
+
+        expected = _reference_period_metrics(scores[:400], choi, counts[:300], x_data, markers[0], markers[1], nwt)
+        assert {key: result[key] for key in expected} == expected
+
+    def test_fractional_counts_summed_in_order(self, data_manager: DataManager) -> None:
+        """Test non-integer counts give the same total as summing epoch by epoch."""
+        scores, choi, _, x_data, nwt = _window(1000, 8)
+        counts = (np.random.default_rng(8).random(1000) * 100).tolist()
+        markers = [x_data[10], x_data[990]]
+
+        result = data_manager.calculate_sleep_metrics(markers, scores, choi, counts, x_data, None, nwt)
+
+        assert result["Total Counts"] == int(sum(counts[10:990]))
+
+    def test_no_scores_falls_back_to_marker_duration(self, data_manager: DataManager) -> None:
+        """Test metrics without sleep scores still report time in bed from the markers."""
+        _, choi, counts, x_data, nwt = _window(100, 9)
+
+        result = data_manager.calculate_sleep_metrics([x_data[10], x_data[70]], [], choi, counts, x_data, None, nwt)
+
+        assert result["Total Minutes in Bed"] == 60
+        assert result["Total Sleep Time (TST)"] is None
+
+
+def test_engine_reused_for_same_window(data_manager: DataManager) -> None:
+    """Test repeated calls with the same arrays reuse one engine, and new arrays rebuild it."""
+    scores, choi, counts, x_data, nwt = _window(500, 1)
+
+    data_manager.calculate_sleep_metrics([x_data[0], x_data[100]], scores, choi, counts, x_data, None, nwt)
+    engine = data_manager._metrics_engine
+    data_manager.calculate_sleep_metrics([x_data[50], x_data[300]], scores, choi, counts, x_data, None, nwt)
+
+    assert data_manager._metrics_engine is engine
+    data_manager.calculate_sleep_metrics([x_data[50], x_data[300]], list(scores), choi, counts, x_data, None, nwt)
+    assert data_manager._metrics_engine is not engine
+
+
+def test_live_metrics_label_follows_markers() -> None:
+    """Test the side panel label shows the engine's metrics and clears without a complete pair."""
+    from sleep_scoring_app.ui.main_window import SleepScoringMainWindow
+
+    scores, _, _, x_data, _ = _window(500, 2)
+    window = Mock()
+    window.plot_widget.sadeh_results = scores
+    window.plot_widget.x_data = x_data
+    window._live_metrics_engine = None
+    window._get_live_metrics_engine = lambda: SleepScoringMainWindow._get_live_metrics_engine(window)
+
+    SleepScoringMainWindow.update_live_sleep_metrics(window, [x_data[20], x_data[400]])
+
+    metrics = SleepMetricsEngine(scores, None, x_data).evaluate(20, 400)
+    text = window.live_metrics_label.setText.call_args[0][0]
+    assert f"TST: {metrics.total_sleep_time} min" in text
+    assert f"Awakenings: {metrics.awakenings}" in text
+    SleepScoringMainWindow.update_live_sleep_metrics(window, [x_data[20]])
+    window.live_metrics_label.setText.assert_called_with("")
+
+
+@pytest.mark.slow
+class TestMetricsBenchmark:
+    """Benchmark marker-pair evaluation against the per-epoch loop."""
+
+    def test_benchmark_many_marker_positions(self) -> None:
+        """Time evaluating many marker positions of a 48h window with the loop and with one engine, which must agree."""
+        scores, choi, counts, x_data, nwt = _window(2880, 3)
+        pairs = [(x_data[100 + i], x_data[2700 - i]) for i in range(50)]
+
+        start = time.perf_counter()
+        expected = [_reference_period_metrics(scores, choi, counts, x_data, onset, offset, nwt) for onset, offset in pairs]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = SleepMetricsEngine(scores, counts, x_data, choi, nwt)
+        periods = [engine.evaluate_timestamps(onset, offset) for onset, offset in pairs]
+        engine_time = time.perf_counter() - start
+
+        print(f"\nSleep metrics x{len(pairs)} on 2880 epochs: loop {loop_time * 1000:.1f} ms, engine {engine_time * 1000:.1f} ms")
+        metric_keys = _rounded(periods[0]).keys()
+        assert [_rounded(period) for period in periods] == [{key: reference[key] for key in metric_keys} for reference in expected]
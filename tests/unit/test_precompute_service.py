@@ -0,0 +1,158 @@
+"""
+Unit tests for scoring precomputed at import.
+
+Verifies that whole-recording results are stored per algorithm setting, that
+any window is served as a slice of them, that changed settings or file contents
+invalidate them, and that the plot, nonwear overlay and export read them
+instead of rerunning the algorithms.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import AlgorithmFactory, NonwearAlgorithmFactory
+from sleep_scoring_app.core.algorithms.nonwear_detection_protocol import nonwear_parameters
+from sleep_scoring_app.core.constants import ActivityDataPreference, DatabaseColumn, DatabaseTable
+from sleep_scoring_app.core.nonwear_data import ActivityDataView, NonwearData, NonwearDataFactory
+from sleep_scoring_app.data.activity_blocks import to_epoch_seconds, write_activity_blocks
+from sleep_scoring_app.data.algorithm_cache import AlgorithmResultCache
+from sleep_scoring_app.services.export_service import ExportManager
+from sleep_scoring_app.services.precompute_service import ScoringPrecomputeService
+from tests.unit.conftest import register_file
+
+if TYPE_CHECKING:
+    from sleep_scoring_app.data.database import DatabaseManager
+
+FILENAME = "P1.csv"
+START = datetime(2024, 3, 1, 12, 0)
+N_EPOCHS = 4 * 1440
+AXIS_Y_GAP = slice(3000, 3010)  # Epochs without an axis_y value
+NONWEAR = slice(600, 800)  # Zero counts crossing the first midnight (epoch 720)
+
+
+@pytest.fixture
+def recording() -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Four days of minute epochs with an axis_y gap and a nonwear block."""
+    timestamps = np.array([START + timedelta(minutes=i) for i in range(N_EPOCHS)], dtype="datetime64[s]")
+    rng = np.random.default_rng(0)
+    axis_y = rng.integers(0, 300, size=N_EPOCHS).astype(float)
+    axis_y[rng.random(N_EPOCHS) < 0.3] = 0
+    axis_y[NONWEAR] = 0
+    vector_magnitude = axis_y * 1.3
+    axis_y[AXIS_Y_GAP] = np.nan
+    return timestamps, {DatabaseColumn.AXIS_Y: axis_y, DatabaseColumn.VECTOR_MAGNITUDE: vector_magnitude}
+
+
+@pytest.fixture
+def db_manager(db_manager: DatabaseManager, recording: tuple[np.ndarray, dict[str, np.ndarray]]) -> DatabaseManager:
+    """Database with one imported, precomputed file."""
+    timestamps, values = recording
+    with db_manager._get_connection() as conn:
+        register_file(conn, FILENAME, file_hash="abc123")
+        write_activity_blocks(conn, FILENAME, to_epoch_seconds(timestamps), values)
+        conn.commit()
+    assert ScoringPrecomputeService(db_manager).precompute_file(FILENAME)
+    return db_manager
+
+
+def _window(recording: tuple[np.ndarray, dict[str, np.ndarray]], column: str, start: datetime, hours: int = 48) -> tuple[list, list]:
+    """The epochs the plot loads for a column: the window, minus epochs without a value."""
+    timestamps, values = recording
+    in_window = (timestamps >= np.datetime64(start)) & (timestamps < np.datetime64(start + timedelta(hours=hours))) & ~np.isnan(values[column])
+    return timestamps[in_window].tolist(), values[column][in_window].tolist()
+
+
+def test_window_is_a_slice_of_the_whole_recording(db_manager: DatabaseManager, recording: tuple[np.ndarray, dict[str, np.ndarray]]) -> None:
+    """Test a 48h window reads the stored scores and matches scoring the window away from its edges."""
+    algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+    timestamps, axis_y = _window(recording, DatabaseColumn.AXIS_Y, datetime(2024, 3, 2))
+    cache = AlgorithmResultCache(db_manager)
+
+    result = cache.get(cache.make_key(FILENAME, timestamps, algorithm.identifier, algorithm.get_parameters()))
+
+    expected = np.asarray(algorithm.score_array(axis_y, timestamps))
+    assert len(result) == len(timestamps) == 2 * 1440 - 10
+    np.testing.assert_array_equal(result.mask[5:-5], expected[5:-5])  # Edges differ: the stored run saw the epochs around the window
+
+
+def test_choi_periods_clipped_to_window(db_manager: DatabaseManager, recording: tuple[np.ndarray, dict[str, np.ndarray]]) -> None:
+    """Test a nonwear period crossing the window start is cut at the first epoch."""
+    choi = NonwearAlgorithmFactory.create("choi_2011")
+    timestamps, _ = _window(recording, DatabaseColumn.VECTOR_MAGNITUDE, datetime(2024, 3, 2))
+    cache = AlgorithmResultCache(db_manager)
+
+    result = cache.get(cache.make_key(FILENAME, timestamps, choi.identifier, nonwear_parameters(choi, ActivityDataPreference.VECTOR_MAGNITUDE)))
+
+    full_timestamps, values = recording
+    crossing = next(p for p in choi.detect(values[DatabaseColumn.VECTOR_MAGNITUDE], full_timestamps.tolist()) if p.start_index < 720 <= p.end_index)
+    assert result.ranges.tolist()[0] == [0, crossing.end_index - 720]
+    assert result.mask[: crossing.end_index - 720 + 1].all()
+
+
+class TestInvalidation:
+    """Stored results are only used while they still describe the file and settings."""
+
+    def test_changed_parameters_not_served(self, db_manager: DatabaseManager) -> None:
+        """Test results computed with other settings are ignored."""
+        algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+        parameters = algorithm.get_parameters()
+
+        assert db_manager.load_epoch_scores(FILENAME, algorithm.identifier, parameters) is not None
+        assert db_manager.load_epoch_scores(FILENAME, algorithm.identifier, {**parameters, "threshold": 99}) is None
+        assert db_manager.load_epoch_scores(FILENAME, "cole_kripke_1992", parameters) is None
+
+    def test_changed_file_not_served(self, db_manager: DatabaseManager) -> None:
+        """Test results are ignored once the file is reimported with different contents."""
+        algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+        with db_manager._get_connection() as conn:
+            conn.execute(f"UPDATE {DatabaseTable.FILE_REGISTRY} SET {DatabaseColumn.FILE_HASH} = 'changed'")
+            conn.commit()
+
+        assert db_manager.load_epoch_scores(FILENAME, algorithm.identifier, algorithm.get_parameters()) is None
+
+    def test_results_deleted_with_file(self, db_manager: DatabaseManager) -> None:
+        """Test deleting an imported file removes its precomputed results."""
+        assert db_manager.delete_imported_file(FILENAME)
+
+        with db_manager._get_connection() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {DatabaseTable.EPOCH_SCORES}").fetchone()[0] == 0
+
+
+def test_nonwear_overlay_reads_stored_periods(
+    db_manager: DatabaseManager, recording: tuple[np.ndarray, dict[str, np.ndarray]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test loading a date uses the stored Choi periods for the plotted column."""
+    timestamps, counts = _window(recording, DatabaseColumn.VECTOR_MAGNITUDE, datetime(2024, 3, 1))
+    view = ActivityDataView.create(timestamps, counts, FILENAME)
+    expected = NonwearData.create_for_activity_view(view, [])
+    monkeypatch.setattr(NonwearData, "_compute_choi_periods", Mock(side_effect=AssertionError("Choi should not rerun")))
+    nonwear_service = Mock()
+    nonwear_service.get_nonwear_periods_for_file.return_value = []
+    factory = NonwearDataFactory(nonwear_service, AlgorithmResultCache(db_manager, memory_entries=0))
+
+    nonwear_data = factory.get_nonwear_data(view, activity_column=ActivityDataPreference.VECTOR_MAGNITUDE)
+
+    assert nonwear_data.choi_mask == expected.choi_mask
+    assert [(p.start_index, p.end_index) for p in nonwear_data.choi_periods] == [(p.start_index, p.end_index) for p in expected.choi_periods]
+
+
+def test_export_reads_stored_scores(db_manager: DatabaseManager, recording: tuple[np.ndarray, dict[str, np.ndarray]]) -> None:
+    """Test export takes a sleep period's scores from the stored results only when the epochs line up."""
+    algorithm = AlgorithmFactory.create(AlgorithmFactory.get_default_algorithm_id())
+    start, end = datetime(2024, 3, 2, 21, 55), datetime(2024, 3, 3, 7, 5)
+    timestamps, _ = _window(recording, DatabaseColumn.AXIS_Y, start, hours=10)
+    timestamps = [ts for ts in timestamps if ts < end]
+    export_manager = ExportManager(db_manager)
+
+    mask = export_manager._load_precomputed_mask(FILENAME, algorithm.identifier, algorithm.get_parameters(), timestamps, start, end)
+
+    stored_timestamps, stored = db_manager.load_epoch_scores(FILENAME, algorithm.identifier, algorithm.get_parameters())
+    first = int(np.searchsorted(stored_timestamps, np.datetime64(start)))
+    assert mask == stored.mask[first : first + len(timestamps)].tolist()
+    assert export_manager._load_precomputed_mask(FILENAME, algorithm.identifier, algorithm.get_parameters(), timestamps[1:], start, end) is None
@@ -0,0 +1,128 @@
+"""
+Unit tests for the memory-mapped raw sample cache.
+
+Verifies round trips through the cache, read-only mapping that the raw-data
+algorithms accept, least-recently-used eviction under the size cap, and that
+failed or corrupt writes leave no usable entry behind.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import calibrate, impute_timegaps
+from sleep_scoring_app.core.algorithms.van_hees import VanHeesNonwearAlgorithm
+from sleep_scoring_app.data.raw_sample_cache import RawSampleCache, file_content_hash
+
+SAMPLE_RATE = 30
+
+
+def _chunks(n_samples: int, chunk_size: int, seed: int = 0) -> list[tuple[np.ndarray, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    timestamps = 1_705_305_600 + np.arange(n_samples) / SAMPLE_RATE
+    samples = rng.normal(0, 0.3, size=(n_samples, 3)).astype(np.float32)
+    samples[:, 1] += 1
+    return [(timestamps[i : i + chunk_size], samples[i : i + chunk_size]) for i in range(0, n_samples, chunk_size)]
+
+
+def _age(cache: RawSampleCache, file_hash: str, seconds_ago: float) -> None:
+    """Backdate an entry's last use."""
+    stamp = time.time() - seconds_ago
+    os.utime(cache.cache_dir / file_hash / "meta.json", (stamp, stamp))
+
+
+class TestRoundTrip:
+    """Samples written once are mapped back unchanged."""
+
+    def test_put_then_get(self, tmp_path) -> None:
+        """Test chunks are stored in order and read back as read-only memory maps."""
+        cache = RawSampleCache(tmp_path)
+        chunks = _chunks(1000, 300)
+
+        stored = cache.put("abc", SAMPLE_RATE, 1000, chunks)
+        mapped = RawSampleCache(tmp_path).get("abc")
+
+        assert "abc" in cache
+        assert isinstance(mapped.samples, np.memmap)
+        assert mapped.sample_rate == SAMPLE_RATE
+        np.testing.assert_array_equal(mapped.timestamps, np.concatenate([ts for ts, _ in chunks]))
+        np.testing.assert_array_equal(mapped.samples, np.concatenate([xyz for _, xyz in chunks]))
+        np.testing.assert_array_equal(stored.samples, mapped.samples)
+        with pytest.raises(ValueError, match="read-only"):
+            mapped.samples[0, 0] = 1.0
+
+    def test_missing_and_corrupt_entries(self, tmp_path) -> None:
+        """Test unknown hashes miss and unreadable entries are discarded."""
+        cache = RawSampleCache(tmp_path)
+        cache.put("abc", SAMPLE_RATE, 100, _chunks(100, 100))
+        (tmp_path / "abc" / "samples.npy").write_bytes(b"not an array")
+
+        assert cache.get("missing") is None
+        assert cache.get("abc") is None
+        assert not (tmp_path / "abc").exists()
+
+    def test_wrong_sample_count_leaves_no_entry(self, tmp_path) -> None:
+        """Test chunks that do not add up to n_samples fail without a partial entry."""
+        cache = RawSampleCache(tmp_path)
+
+        with pytest.raises(ValueError, match="Expected 200 samples"):
+            cache.put("abc", SAMPLE_RATE, 200, _chunks(100, 50))
+        with pytest.raises(ValueError, match="more than 50"):
+            cache.put("abc", SAMPLE_RATE, 50, _chunks(100, 50))
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_mapped_samples_feed_raw_algorithms(self, tmp_path) -> None:
+        """Test calibration, imputation and van Hees accept the read-only mapped arrays."""
+        cache = RawSampleCache(tmp_path)
+        raw = cache.put("abc", SAMPLE_RATE, SAMPLE_RATE * 3600, _chunks(SAMPLE_RATE * 3600, 10_000))
+
+        assert calibrate(raw.samples, raw.sample_rate).scale.shape == (3,)
+        assert len(impute_timegaps(raw.samples, raw.timestamps, raw.sample_rate).data) == len(raw)
+        assert isinstance(VanHeesNonwearAlgorithm().detect(raw.samples, list(raw.datetimes())), list)
+
+    def test_file_content_hash(self, tmp_path) -> None:
+        """Test the key is the SHA256 of the file content."""
+        import hashlib
+
+        path = tmp_path / "file.gt3x"
+        path.write_bytes(b"x" * 3_000_000)
+
+        assert file_content_hash(path) == hashlib.sha256(b"x" * 3_000_000).hexdigest()
+        assert RawSampleCache(tmp_path / "cache").key_for(path) == file_content_hash(path)
+
+
+class TestEviction:
+    """The cache stays under its size cap by dropping least recently used entries."""
+
+    def test_least_recently_used_entry_evicted(self, tmp_path) -> None:
+        """Test reading an entry protects it from the next eviction."""
+        entry_bytes = 1000 * (8 + 12)
+        cache = RawSampleCache(tmp_path, max_bytes=int(2.5 * entry_bytes))
+        cache.put("first", SAMPLE_RATE, 1000, _chunks(1000, 1000))
+        cache.put("second", SAMPLE_RATE, 1000, _chunks(1000, 1000))
+        _age(cache, "first", 20)
+        _age(cache, "second", 10)
+
+        cache.get("first")
+        cache.put("third", SAMPLE_RATE, 1000, _chunks(1000, 1000))
+
+        assert "first" in cache
+        assert "second" not in cache
+        assert "third" in cache
+        assert cache.size_bytes() <= cache.max_bytes
+
+    def test_newest_entry_kept_over_cap(self, tmp_path) -> None:
+        """Test an entry larger than the cap is still stored and returned."""
+        cache = RawSampleCache(tmp_path, max_bytes=100)
+        cache.put("old", SAMPLE_RATE, 100, _chunks(100, 100))
+
+        raw = cache.put("big", SAMPLE_RATE, 1000, _chunks(1000, 1000))
+
+        assert len(raw) == 1000
+        assert "big" in cache
+        assert "old" not in cache
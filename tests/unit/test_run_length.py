@@ -0,0 +1,245 @@
+"""
+Unit tests for the run-length sleep/wake index used by onset/offset rules.
+
+Verifies that SleepRules and TudorLockeRule return exactly the indices of the
+original per-position scans for random scores, markers and rule settings, and
+that the plot builds the index once per scoring result. Also benchmarks the
+index against the scans.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sleep_scoring_app.core.algorithms import SleepRules, SleepRulesConfig, SleepWakeRunIndex, TudorLockeConfig, TudorLockeRule
+from sleep_scoring_app.core.algorithms.run_length import SLEEP, WAKE, find_marker_indices
+from sleep_scoring_app.ui.widgets.plot_algorithm_manager import PlotAlgorithmManager
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+def _reference_marker_indices(timestamps, sleep_start_marker, sleep_end_marker):
+    start_idx = None
+    end_idx = None
+    for i, timestamp in enumerate(timestamps):
+        if start_idx is None and timestamp >= sleep_start_marker:
+            start_idx = i
+        if timestamp <= sleep_end_marker:
+            end_idx = i
+    return start_idx, end_idx
+
+
+def _reference_consecutive_rules(config: SleepRulesConfig, scores, start_idx, end_idx):
+    """Original SleepRules scans, kept as the parity reference."""
+    n = len(scores)
+    extended_start = max(0, start_idx - config.search_extension_minutes)
+    extended_end = min(n - 1, end_idx + config.search_extension_minutes)
+
+    onset = None
+    for i in range(extended_start, min(extended_end, n - config.onset_consecutive_minutes) + 1):
+        if all(scores[i + offset] == 1 for offset in range(config.onset_consecutive_minutes)):
+            onset = i
+            break
+    if onset is None:
+        return None, None
+
+    m = config.offset_consecutive_minutes
+    safe_end = min(extended_end, n - (m + 1)) if config.require_wake_after_offset else min(extended_end, n - m)
+    offset = None
+    for i in range(max(onset + m, m), safe_end + 1):
+        if not all(scores[i + k] == 1 for k in range(m)):
+            continue
+        if config.require_wake_after_offset and not (i + m < n and scores[i + m] == 0):
+            continue
+        offset = i + m - 1
+    return onset, offset
+
+
+def _reference_tudor_locke(config: TudorLockeConfig, scores, start_idx, end_idx):
+    """Original TudorLockeRule scans, kept as the parity reference."""
+    n = len(scores)
+    extended_start = max(0, start_idx - config.search_extension_minutes)
+    extended_end = min(n - 1, end_idx + config.search_extension_minutes)
+
+    onset = None
+    for i in range(extended_start, min(extended_end, n - config.onset_consecutive_minutes) + 1):
+        if all(scores[i + k] == 1 for k in range(config.onset_consecutive_minutes)):
+            onset = i
+            break
+    if onset is None:
+        return None, None
+
+    m = config.offset_consecutive_wake_minutes
+    for i in range(onset + config.onset_consecutive_minutes, min(extended_end, n - m) + 1):
+        if all(scores[i + k] == 0 for k in range(m)) and i > onset and scores[i - 1] == 1:
+            return onset, i - 1
+    for i in range(extended_end, onset, -1):
+        if scores[i] == 1:
+            return onset, i
+    return onset, None
+
+
+def _scores(n_epochs: int, seed: int, sleep_fraction: float = 0.6) -> list[int]:
+    """Sleep/wake series with runs of varied length."""
+    rng = np.random.default_rng(seed)
+    scores: list[int] = []
+    value = int(rng.random() < sleep_fraction)
+    while len(scores) < n_epochs:
+        scores.extend([value] * int(rng.integers(1, 15)))
+        value = 1 - value
+    return scores[:n_epochs]
+
+
+def _timestamps(n_epochs: int) -> list[datetime]:
+    return [START + timedelta(minutes=i) for i in range(n_epochs)]
+
+
+def _random_markers(rng: np.random.Generator, n_epochs: int) -> tuple[datetime, datetime]:
+    first, second = sorted(int(x) for x in rng.integers(-20, n_epochs + 20, size=2))
+    return START + timedelta(minutes=first, seconds=int(rng.integers(0, 60))), START + timedelta(minutes=second)
+
+
+class TestRunIndexQueries:
+    """Window queries against brute force."""
+
+    def test_first_and_last_window_match_scan(self) -> None:
+        """Test every query range and window length against a direct scan."""
+        scores = [0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 0, 1, 2, 1, 1]
+        index = SleepWakeRunIndex(scores)
+        n = len(scores)
+
+        for value in (SLEEP, WAKE):
+            for length in range(1, 6):
+                valid = [i for i in range(n - length + 1) if all(scores[i + k] == value for k in range(length))]
+                starts = [i for i in valid if i > 0 and scores[i - 1] == 1 - value]
+                ends = [i for i in valid if i + length < n and scores[i + length] == 1 - value]
+                for lo in range(-2, n + 2):
+                    for hi in range(lo - 1, n + 2):
+                        in_range = [i for i in valid if lo <= i <= hi]
+                        assert index.first_window(value, length, lo, hi) == (in_range[0] if in_range else None)
+                        assert index.last_window(value, length, lo, hi) == (in_range[-1] if in_range else None)
+                        in_range = [i for i in starts if lo <= i <= hi]
+                        assert index.first_window(value, length, lo, hi, preceded_by_other=True) == (in_range[0] if in_range else None)
+                        in_range = [i for i in ends if lo <= i <= hi]
+                        assert index.last_window(value, length, lo, hi, followed_by_other=True) == (in_range[-1] if in_range else None)
+
+    def test_index_is_a_sequence_of_the_scores(self) -> None:
+        """Test the index can stand in for the scores list."""
+        scores = [0, 1, 1, 0]
+        index = SleepWakeRunIndex(scores)
+
+        assert len(index) == 4
+        assert list(index) == scores
+        assert index[1] == 1
+        assert SleepWakeRunIndex.from_scores(index) is index
+        with pytest.raises(ValueError, match="length"):
+            index.first_window(SLEEP, 0, 0, 3)
+
+    def test_marker_indices_match_scan(self) -> None:
+        """Test bisected marker indices match the enumerate scan, including markers outside the data."""
+        timestamps = _timestamps(50)
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            start, end = _random_markers(rng, 50)
+            assert find_marker_indices(timestamps, start, end) == _reference_marker_indices(timestamps, start, end)
+        assert find_marker_indices([], START, START) == (None, None)
+
+
+class TestRuleParity:
+    """Rules built on the index return the original scan results."""
+
+    @pytest.mark.parametrize("require_wake", [True, False])
+    @pytest.mark.parametrize(("onset_minutes", "offset_minutes", "extension"), [(3, 5, 5), (1, 1, 0), (5, 10, 15), (10, 3, 2)])
+    def test_consecutive_rules(self, onset_minutes: int, offset_minutes: int, extension: int, require_wake: bool) -> None:
+        """Test SleepRules indices for random scores and markers."""
+        config = SleepRulesConfig(
+            onset_consecutive_minutes=onset_minutes,
+            offset_consecutive_minutes=offset_minutes,
+            search_extension_minutes=extension,
+            require_wake_after_offset=require_wake,
+        )
+        rules = SleepRules(config=config)
+        rng = np.random.default_rng(onset_minutes * 100 + offset_minutes)
+
+        for seed in range(40):
+            n_epochs = int(rng.integers(1, 400))
+            scores, timestamps = _scores(n_epochs, seed), _timestamps(n_epochs)
+            start, end = _random_markers(rng, n_epochs)
+            expected = (None, None)
+            start_idx, end_idx = _reference_marker_indices(timestamps, start, end)
+            if start_idx is not None and end_idx is not None:
+                expected = _reference_consecutive_rules(config, scores, start_idx, end_idx)
+
+            assert rules.apply_rules(scores, start, end, timestamps) == expected
+
+    @pytest.mark.parametrize(("onset_minutes", "wake_minutes", "extension"), [(5, 10, 5), (1, 1, 0), (3, 4, 30)])
+    def test_tudor_locke(self, onset_minutes: int, wake_minutes: int, extension: int) -> None:
+        """Test TudorLockeRule indices for random scores and markers."""
+        config = TudorLockeConfig(
+            onset_consecutive_minutes=onset_minutes,
+            offset_consecutive_wake_minutes=wake_minutes,
+            search_extension_minutes=extension,
+        )
+        rule = TudorLockeRule(config=config)
+        rng = np.random.default_rng(onset_minutes * 100 + wake_minutes)
+
+        for seed in range(40):
+            n_epochs = int(rng.integers(1, 400))
+            scores, timestamps = _scores(n_epochs, seed, sleep_fraction=0.7), _timestamps(n_epochs)
+            start, end = _random_markers(rng, n_epochs)
+            expected = (None, None)
+            start_idx, end_idx = _reference_marker_indices(timestamps, start, end)
+            if start_idx is not None and end_idx is not None:
+                expected = _reference_tudor_locke(config, scores, start_idx, end_idx)
+
+            assert rule.apply_rules(scores, start, end, timestamps) == expected
+
+
+def test_plot_builds_index_once_per_scoring_result() -> None:
+    """Test repeated rule application on the same scores reuses the index and timestamps."""
+    scores = _scores(2880, 0)
+    parent = Mock()
+    parent.sadeh_results = scores
+    parent.x_data = np.array([ts.timestamp() for ts in _timestamps(2880)])
+    manager = PlotAlgorithmManager(parent)
+
+    index = manager._get_sleep_run_index()
+    timestamps = manager._get_rule_timestamps()
+
+    assert manager._get_sleep_run_index() is index
+    assert manager._get_rule_timestamps() is timestamps
+    parent.sadeh_results = list(scores)
+    assert manager._get_sleep_run_index() is not index
+
+
+@pytest.mark.slow
+class TestRunIndexBenchmark:
+    """Benchmark rule application against the per-position scans."""
+
+    def test_benchmark_repeated_drags(self) -> None:
+        """Time repeated marker drags over a 3-day window with the scans and with a shared index, which must agree."""
+        n_epochs = 3 * 1440
+        scores, timestamps = _scores(n_epochs, 1), _timestamps(n_epochs)
+        config = SleepRulesConfig(onset_consecutive_minutes=10, offset_consecutive_minutes=10)
+        rules = SleepRules(config=config)
+        start, end = timestamps[100], timestamps[-100]
+
+        t0 = time.perf_counter()
+        for _ in range(20):
+            expected = _reference_consecutive_rules(config, scores, *_reference_marker_indices(timestamps, start, end))
+        scan_time = time.perf_counter() - t0
+
+        index = SleepWakeRunIndex(scores)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            result = rules.apply_rules(index, start, end, timestamps)
+        index_time = time.perf_counter() - t0
+
+        assert result == expected
+        assert expected[0] is not None
+        print(f"\nOnset/offset rules x20 on {n_epochs} epochs: scan {scan_time * 1000:.1f} ms, index {index_time * 1000:.1f} ms")
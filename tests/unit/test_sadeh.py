@@ -0,0 +1,131 @@
+"""
+Unit tests for the vectorized Sadeh (1994) scoring kernel.
+
+Verifies that the sliding-window implementation is bit-for-bit identical to the
+original per-epoch loop (ActiLife-compatible forward SD) and benchmarks both.
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.algorithms.sadeh import (
+    ACTIVITY_CAP,
+    COEFFICIENT_A,
+    COEFFICIENT_B,
+    COEFFICIENT_C,
+    COEFFICIENT_D,
+    COEFFICIENT_E,
+    NATS_MAX,
+    NATS_MIN,
+    WINDOW_SIZE,
+    SadehAlgorithm,
+    sadeh_score,
+    score_activity,
+)
+
+
+def _reference_sadeh_loop(activity_data: np.ndarray, threshold: float = -4.0) -> list[int]:
+    """Original per-epoch Sadeh loop, kept as the parity reference."""
+    capped_activity = np.minimum(np.asarray(activity_data, dtype=np.float64), ACTIVITY_CAP)
+    sleep_wake_scores = np.zeros(len(capped_activity), dtype=int)
+    padded_activity = np.pad(capped_activity, pad_width=5, mode="constant", constant_values=0)
+
+    rolling_sds = np.zeros(len(capped_activity))
+    for i in range(len(capped_activity)):
+        sd_window = padded_activity[i : i + 6]
+        rolling_sds[i] = np.std(sd_window, ddof=1) if len(sd_window) >= 2 else 0.0
+
+    for i in range(len(capped_activity)):
+        window = padded_activity[i : i + WINDOW_SIZE]
+        avg = np.mean(window)
+        nats = np.sum((window >= NATS_MIN) & (window < NATS_MAX))
+        sd = rolling_sds[i]
+        lg = np.log(capped_activity[i] + 1)
+        ps = COEFFICIENT_A - (COEFFICIENT_B * avg) - (COEFFICIENT_C * nats) - (COEFFICIENT_D * sd) - (COEFFICIENT_E * lg)
+        sleep_wake_scores[i] = 1 if ps > threshold else 0
+
+    return sleep_wake_scores.tolist()
+
+
+def _simulated_counts(n_epochs: int, seed: int = 42) -> np.ndarray:
+    """Generate integer counts with long quiet stretches and active bursts."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(0, 120, size=n_epochs).astype(np.float64)
+    active = rng.random(n_epochs) < 0.3
+    counts[active] = rng.integers(100, 800, size=int(active.sum()))
+    return counts
+
+
+class TestSadehVectorizedParity:
+    """Vectorized kernel must reproduce the loop implementation exactly."""
+
+    @pytest.mark.parametrize("n_epochs", [1, 2, 5, 6, 10, 11, 12, 100, 2881])
+    def test_parity_integer_counts(self, n_epochs: int) -> None:
+        """Test parity on integer activity counts at and around window sizes."""
+        counts = _simulated_counts(n_epochs)
+        assert score_activity(counts) == _reference_sadeh_loop(counts)
+
+    @pytest.mark.parametrize("threshold", [-4.0, 0.0, -2.5, 3.0])
+    def test_parity_thresholds(self, threshold: float) -> None:
+        """Test parity for ActiLife, original and custom thresholds."""
+        counts = _simulated_counts(5000, seed=7)
+        assert score_activity(counts, threshold=threshold) == _reference_sadeh_loop(counts, threshold=threshold)
+
+    def test_parity_fractional_counts(self) -> None:
+        """Test parity when counts are non-integer floats (summation order matters)."""
+        rng = np.random.default_rng(123)
+        counts = rng.random(10000) * rng.choice([1.0, 60.0, 400.0], size=10000)
+        assert score_activity(counts) == _reference_sadeh_loop(counts)
+
+    def test_parity_all_zero_and_all_capped(self) -> None:
+        """Test parity for constant series (zero SD in the interior)."""
+        for value in (0.0, 75.0, 1000.0):
+            counts = np.full(500, value)
+            assert score_activity(counts) == _reference_sadeh_loop(counts)
+
+    def test_dataframe_api_matches_reference(self) -> None:
+        """Test sadeh_score column matches the loop reference."""
+        counts = _simulated_counts(1440, seed=3)
+        df = pd.DataFrame(
+            {
+                "datetime": pd.date_range("2024-01-01 12:00:00", periods=len(counts), freq="60s"),
+                "Axis1": counts,
+            }
+        )
+        result = sadeh_score(df)
+        assert result["Sadeh Score"].tolist() == _reference_sadeh_loop(counts)
+
+    def test_score_array_uses_vectorized_kernel(self) -> None:
+        """Test SadehAlgorithm.score_array matches the reference for both variants."""
+        counts = _simulated_counts(3000, seed=11)
+        assert SadehAlgorithm().score_array(counts) == _reference_sadeh_loop(counts, threshold=-4.0)
+        assert SadehAlgorithm(threshold=0.0).score_array(counts) == _reference_sadeh_loop(counts, threshold=0.0)
+
+    def test_empty_input(self) -> None:
+        """Test empty input still returns an empty list."""
+        assert score_activity([]) == []
+
+
+@pytest.mark.slow
+class TestSadehBenchmark:
+    """Benchmark the vectorized kernel against the loop reference."""
+
+    def test_benchmark_against_loop(self) -> None:
+        """Time scoring a 3-week recording with the loop and with the kernel, which must agree."""
+        counts = _simulated_counts(21 * 1440)
+
+        start = time.perf_counter()
+        loop_scores = _reference_sadeh_loop(counts)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized_scores = score_activity(counts)
+        vectorized_time = time.perf_counter() - start
+
+        assert vectorized_scores == loop_scores
+        print(f"\nSadeh {len(counts)} epochs: loop {loop_time * 1000:.1f} ms, vectorized {vectorized_time * 1000:.1f} ms")
@@ -0,0 +1,188 @@
+"""
+Unit tests for the shared epoch time index.
+
+Verifies that EpochTimeIndex lookups return what the original linear scans
+returned (closest timestamp, fuzzy 30 second matching of the 24hr view against
+the 48hr results, nonwear period masks), for both the datetime and the Unix
+second clocks. Also benchmarks the 24hr view switch against the scan.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sleep_scoring_app.core.algorithms import EpochTimeIndex
+from sleep_scoring_app.core.constants import NonwearDataSource
+from sleep_scoring_app.core.dataclasses import NonwearPeriod
+from sleep_scoring_app.core.nonwear_data import ActivityDataView, NonwearData
+from sleep_scoring_app.ui.widgets.plot_algorithm_manager import PlotAlgorithmManager
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+def _reference_closest(timestamps, target):
+    """Original auto_score._find_closest_index scan, kept as the parity reference."""
+    min_diff, closest_idx = float("inf"), None
+    for i, ts in enumerate(timestamps):
+        diff = abs((ts - target).total_seconds())
+        if diff < min_diff:
+            min_diff, closest_idx = diff, i
+    return closest_idx
+
+
+def _reference_view_subset(view_timestamps, main_timestamps, main_results):
+    """Original exact-then-fuzzy matching of the 24hr view, kept as the parity reference."""
+    subset = []
+    for ts in view_timestamps:
+        try:
+            idx = main_timestamps.index(ts)
+        except ValueError:
+            idx = next((i for i, main_ts in enumerate(main_timestamps) if abs((ts - main_ts).total_seconds()) <= 30), None)
+        subset.append(main_results[idx] if idx is not None and idx < len(main_results) else 0)
+    return subset
+
+
+def _timestamps(n_epochs: int, start: datetime = START) -> list[datetime]:
+    return [start + timedelta(minutes=i) for i in range(n_epochs)]
+
+
+def _manager(view_timestamps: list[datetime], main_timestamps: list[datetime], main_results: list[int]) -> PlotAlgorithmManager:
+    parent = Mock()
+    parent.timestamps = view_timestamps
+    parent.main_48h_axis_y_timestamps = main_timestamps
+    parent.current_view_hours = 24
+    manager = PlotAlgorithmManager(parent)
+    manager.main_48h_sadeh_results = main_results
+    return manager
+
+
+class TestLookups:
+    """Nearest, tolerance and range lookups."""
+
+    def test_nearest_matches_scan(self) -> None:
+        """Test nearest against a scan for targets between, on and outside the epochs."""
+        timestamps = _timestamps(200)
+        index = EpochTimeIndex(timestamps)
+        rng = np.random.default_rng(0)
+
+        for seconds in rng.integers(-3600, 201 * 60, size=300).tolist():
+            target = START + timedelta(seconds=seconds)
+            assert index.nearest(target) == _reference_closest(timestamps, target)
+            assert index.nearest(target.timestamp()) == _reference_closest(timestamps, target)
+
+    def test_tolerance_and_ties(self) -> None:
+        """Test tolerance limits, accepted as timedelta or seconds, and ties resolve to the earliest epoch."""
+        index = EpochTimeIndex(_timestamps(10))
+
+        assert index.nearest(START + timedelta(seconds=90)) == 1
+        assert index.nearest(START + timedelta(seconds=150), tolerance=timedelta(seconds=25)) is None
+        assert index.nearest(START + timedelta(seconds=150), tolerance=30) == 2
+        assert index.nearest(pd.Timestamp(START + timedelta(minutes=3))) == 3
+        assert EpochTimeIndex([START, START, START + timedelta(minutes=1)]).nearest(START) == 0
+        assert EpochTimeIndex([]).nearest(START) is None
+
+    def test_slice_and_mask_between(self) -> None:
+        """Test range lookups include both ends by default and map unsorted input back to its positions."""
+        timestamps = _timestamps(10)
+        index = EpochTimeIndex(timestamps)
+
+        assert index.slice_between(timestamps[2], timestamps[5]) == slice(2, 6)
+        assert index.slice_between(timestamps[2], timestamps[5], include_end=False) == slice(2, 5)
+        assert index.slice_between(timestamps[5], timestamps[2]) == slice(5, 5)
+
+        shuffled = [timestamps[i] for i in (3, 0, 2, 1)]
+        assert EpochTimeIndex(shuffled).mask_between(timestamps[1], timestamps[2]).tolist() == [False, False, True, True]
+        assert EpochTimeIndex(shuffled).nearest(timestamps[0]) == 1
+
+    def test_unix_clock(self) -> None:
+        """Test an index over Unix seconds answers datetime and second queries."""
+        timestamps = _timestamps(100)
+        index = EpochTimeIndex(np.array([ts.timestamp() for ts in timestamps]))
+
+        assert index.unix_clock
+        assert index.nearest(timestamps[40]) == 40
+        assert index.nearest(timestamps[40].timestamp() + 29) == 40
+        assert index.nearest_indices([timestamps[1].timestamp(), 0.0], tolerance=60).tolist() == [1, -1]
+
+
+class TestCallSiteParity:
+    """Call sites built on the index return the original scan results."""
+
+    @pytest.mark.parametrize("offset_seconds", [0, 7, 29, 31])
+    def test_view_subset_matches_scan(self, offset_seconds: int) -> None:
+        """Test the 24hr subset for view timestamps on, near and out of tolerance of the 48hr epochs."""
+        main_timestamps = _timestamps(2880)
+        main_results = np.random.default_rng(offset_seconds).integers(0, 2, size=2880).tolist()
+        view_timestamps = _timestamps(1440, START + timedelta(hours=12, seconds=offset_seconds))
+        manager = _manager(view_timestamps, main_timestamps, main_results)
+
+        manager._extract_view_subset_from_main_results()
+
+        assert manager.parent.sadeh_results == _reference_view_subset(view_timestamps, main_timestamps, main_results)
+
+    def test_view_subset_defaults_to_wake(self) -> None:
+        """Test view epochs past the 48hr results or timestamps are scored as wake."""
+        main_timestamps = _timestamps(100)
+        view_timestamps = _timestamps(60, START + timedelta(minutes=80))
+        manager = _manager(view_timestamps, main_timestamps, [1] * 90)
+
+        manager._extract_view_subset_from_main_results()
+
+        assert manager.parent.sadeh_results == [1] * 10 + [0] * 50
+
+    def test_axis_y_index_reused_until_new_file(self) -> None:
+        """Test the 48hr time index is built once per set of main timestamps."""
+        main_timestamps = _timestamps(100)
+        manager = _manager(_timestamps(50), main_timestamps, [1] * 100)
+
+        manager._extract_view_subset_from_main_results()
+        index = manager._axis_y_time_index
+        manager._extract_view_subset_from_main_results()
+
+        assert manager._axis_y_time_index is index
+        manager.parent.main_48h_axis_y_timestamps = list(main_timestamps)
+        manager._extract_view_subset_from_main_results()
+        assert manager._axis_y_time_index is not index
+
+    def test_nonwear_mask_from_period_times(self) -> None:
+        """Test periods without indices mark every epoch between their start and end times."""
+        view = ActivityDataView.create(_timestamps(30), [0.0] * 30, "file.csv")
+        period = NonwearPeriod(
+            start_time=START + timedelta(minutes=4, seconds=30),
+            end_time=START + timedelta(minutes=9),
+            participant_id="",
+            source=NonwearDataSource.NONWEAR_SENSOR,
+        )
+
+        mask = NonwearData._periods_to_mask([period], view)
+
+        assert mask == tuple(1 if 5 <= i <= 9 else 0 for i in range(30))
+
+
+@pytest.mark.slow
+class TestTimeIndexBenchmark:
+    """Benchmark the 24hr view switch against the per-epoch scan."""
+
+    def test_benchmark_view_switch(self) -> None:
+        """Time extracting a 24hr subset with sub-minute offsets with the scan and with the index, which must agree."""
+        main_timestamps = _timestamps(2880)
+        main_results = np.random.default_rng(1).integers(0, 2, size=2880).tolist()
+        view_timestamps = _timestamps(1440, START + timedelta(hours=12, seconds=5))
+
+        t0 = time.perf_counter()
+        expected = _reference_view_subset(view_timestamps, main_timestamps, main_results)
+        scan_time = time.perf_counter() - t0
+
+        manager = _manager(view_timestamps, main_timestamps, main_results)
+        t0 = time.perf_counter()
+        manager._extract_view_subset_from_main_results()
+        index_time = time.perf_counter() - t0
+
+        assert manager.parent.sadeh_results == expected
+        print(f"\n24hr view subset of 2880 epochs: scan {scan_time * 1000:.1f} ms, index {index_time * 1000:.1f} ms")
@@ -431,3 +431,60 @@ class TestVanHeesAlgorithmRealistic:
 
             overlaps = any(period.start_time < nonwear_end_time and period.end_time > nonwear_start_time for period in result)
             assert overlaps
+
+
+def _reference_nonwear_scores(algorithm: VanHeesNonwearAlgorithm, data: np.ndarray) -> np.ndarray:
+    """Original per-epoch, per-axis scoring loop, kept as the parity reference."""
+    params = algorithm.get_parameters()
+    medium_epoch_size = int(params["medium_epoch_sec"] * params["sample_freq"])
+    n_medium_epochs = len(data) // medium_epoch_size
+    scores = np.zeros(n_medium_epochs, dtype=int)
+    for h in range(n_medium_epochs):
+        epoch_data = data[h * medium_epoch_size : (h + 1) * medium_epoch_size]
+        for axis_idx in range(3):
+            axis_data = epoch_data[:, axis_idx]
+            if np.ptp(axis_data) < params["range_criterion"] and np.std(axis_data, ddof=1) < params["sd_criterion"]:
+                scores[h] += 1
+    return scores
+
+
+def _mixed_raw_data(n_epochs: int, samples_per_epoch: int, seed: int = 0) -> np.ndarray:
+    """Per-epoch, per-axis noise levels straddling the SD and range criteria."""
+    rng = np.random.default_rng(seed)
+    noise_levels = rng.choice([0.0005, 0.01, 0.0128, 0.0132, 0.03, 0.2], size=(n_epochs, 3))
+    samples = rng.standard_normal((n_epochs, samples_per_epoch, 3)) * noise_levels[:, None, :]
+    samples[:, :, 1] += 1.0
+    # Trailing partial epoch that must be ignored
+    tail = rng.standard_normal((samples_per_epoch // 3, 3)) * 0.001
+    return np.concatenate([samples.reshape(-1, 3), tail])
+
+
+class TestVanHeesVectorizedParity:
+    """Batched scoring must match the per-epoch loop exactly."""
+
+    @pytest.mark.parametrize("chunk_epochs", [None, 1, 7, 64])
+    def test_scores_match_reference(self, chunk_epochs: int | None) -> None:
+        """Test scores match the loop for any chunk size."""
+        algorithm = VanHeesNonwearAlgorithm(medium_epoch_sec=60, sample_freq=10.0)
+        data = _mixed_raw_data(200, 600, seed=1)
+        scores = algorithm._detect_nonwear_scores(data, chunk_epochs=chunk_epochs)
+        np.testing.assert_array_equal(scores, _reference_nonwear_scores(algorithm, data))
+
+    def test_periods_from_run_lengths(self) -> None:
+        """Test run-length periods cover each nonwear run, with the final run extending to the last sample."""
+        algorithm = VanHeesNonwearAlgorithm(medium_epoch_sec=60, sample_freq=1.0)
+        scores = np.array([0, 2, 3, 1, 0, 2, 2, 3])
+        timestamps = [datetime(2000, 1, 1) + timedelta(seconds=i) for i in range(len(scores) * 60 + 30)]
+
+        periods = algorithm._scores_to_periods(scores, timestamps)
+
+        assert [(p.start_index, p.end_index, p.duration_minutes) for p in periods] == [(60, 179, 2), (300, 509, 3)]
+        assert periods[0].start_time == timestamps[60]
+        assert periods[1].end_time == timestamps[-1]
+
+    def test_detect_mask_matches_reference(self) -> None:
+        """Test detect_mask thresholds the batched scores at two axes."""
+        algorithm = VanHeesNonwearAlgorithm(medium_epoch_sec=60, sample_freq=10.0)
+        data = _mixed_raw_data(120, 600, seed=5)
+        expected = (_reference_nonwear_scores(algorithm, data) >= 2).astype(int).tolist()
+        assert algorithm.detect_mask(data) == expected